@@ -12,6 +12,7 @@ import stat
 import uuid
 import zipfile
 from codecs import decode as codecs_decode
+from collections import deque
 from collections.abc import Awaitable, Callable
 from dataclasses import dataclass
 from datetime import UTC, datetime
@@ -996,17 +997,161 @@ class LineEventStreamer:
 
 StreamPublish = Callable[[str, bytes], Awaitable[None]]
 
+# Line streaming: lines are coalesced into frames so a chatty playbook does not
+# turn into one NATS publish per line awaited inline with reading stdout.
+STREAM_FRAME_MAX_LINES = 500
+STREAM_FRAME_MAX_BYTES = 256 * 1024
+STREAM_FRAME_INTERVAL_SECONDS = 0.05
+STREAM_QUEUE_MAX_LINES = 20000
+STREAM_CLOSE_TIMEOUT_SECONDS = 5
 
-def _build_stream_log_payload(execution_id: str, line: str) -> bytes:
+
+def _build_stream_frame_payload(execution_id: str, lines: list[str], seq: int, dropped: int) -> bytes:
     payload = {
         "execution_id": execution_id,
         "stream": "stdout",
-        "line": line,
+        "lines": lines,
+        "seq": seq,
+        "dropped": dropped,
         "timestamp": datetime.now(UTC).isoformat(),
     }
     return json.dumps(payload, ensure_ascii=False).encode("utf-8")
 
 
+def _frame_line_size(line: str) -> int:
+    return len(line.encode("utf-8")) + 1
+
+
+class StreamFrameBatcher:
+    """Decouple reading subprocess output from publishing it.
+
+    ``put()`` never awaits: lines go into a bounded in-memory queue and a
+    background task drains it into frames of at most ``max_lines`` lines /
+    ``max_bytes`` bytes, waiting up to ``interval`` seconds for a frame to fill.
+    When the queue is full new lines are dropped and counted; the count is
+    carried on the next frame (``dropped``) so consumers can show the gap.
+    Publishing is best-effort: failures are logged and counted, never raised.
+    """
+
+    def __init__(
+        self,
+        publish: StreamPublish,
+        topic: str,
+        execution_id: str,
+        *,
+        max_lines: int = STREAM_FRAME_MAX_LINES,
+        max_bytes: int = STREAM_FRAME_MAX_BYTES,
+        interval: float = STREAM_FRAME_INTERVAL_SECONDS,
+        max_queue_lines: int = STREAM_QUEUE_MAX_LINES,
+    ) -> None:
+        self._publish = publish
+        self._topic = topic
+        self._execution_id = execution_id
+        self._max_lines = max(1, max_lines)
+        self._max_bytes = max(1, max_bytes)
+        self._interval = max(0.0, interval)
+        self._max_queue_lines = max(1, max_queue_lines)
+        self._queue: deque[str] = deque()
+        # UTF-8 bytes queued (one extra per line for the separator), kept in step with the queue
+        self._queued_bytes = 0
+        self._wakeup = asyncio.Event()
+        self._closed = False
+        self._pending_dropped = 0
+        self._task: asyncio.Task | None = None
+        self.frames_published = 0
+        self.lines_published = 0
+        self.dropped_total = 0
+        self.publish_errors = 0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def put(self, line: str) -> None:
+        if len(self._queue) >= self._max_queue_lines:
+            self._pending_dropped += 1
+            self.dropped_total += 1
+            return
+        self._queue.append(line)
+        self._queued_bytes += _frame_line_size(line)
+        self._wakeup.set()
+
+    async def close(self, timeout: float = STREAM_CLOSE_TIMEOUT_SECONDS) -> None:
+        """Flush queued lines and stop; gives up (counting the rest as dropped) after ``timeout``."""
+        self._closed = True
+        self._wakeup.set()
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(self._task), timeout=timeout)
+        except asyncio.TimeoutError:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self.dropped_total += len(self._queue)
+            self._queue.clear()
+            self._queued_bytes = 0
+        if self.dropped_total or self.publish_errors:
+            logger.warning(
+                "stream log overloaded: execution_id=%s published_lines=%s dropped_lines=%s publish_errors=%s",
+                self._execution_id,
+                self.lines_published,
+                self.dropped_total,
+                self.publish_errors,
+            )
+
+    def _take_frame(self) -> list[str]:
+        lines: list[str] = []
+        size = 0
+        while self._queue and len(lines) < self._max_lines:
+            line_size = _frame_line_size(self._queue[0])
+            if lines and size + line_size > self._max_bytes:
+                break
+            lines.append(self._queue.popleft())
+            size += line_size
+        self._queued_bytes -= size
+        return lines
+
+    def _frame_full(self) -> bool:
+        return len(self._queue) >= self._max_lines or self._queued_bytes >= self._max_bytes
+
+    async def _run(self) -> None:
+        while True:
+            if not self._queue and not self._pending_dropped:
+                if self._closed:
+                    return
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            # Give a partially filled frame a short window to coalesce more lines.
+            if self._interval and not self._closed and not self._frame_full():
+                await asyncio.sleep(self._interval)
+            lines = self._take_frame()
+            dropped, self._pending_dropped = self._pending_dropped, 0
+            await self._send(lines, dropped)
+
+    async def _send(self, lines: list[str], dropped: int) -> None:
+        try:
+            data = _build_stream_frame_payload(self._execution_id, lines, self.frames_published, dropped)
+            await self._publish(self._topic, data)
+        except Exception as publish_err:  # noqa: BLE001 - intentionally swallowed
+            self.publish_errors += 1
+            logger.warning("stream log publish failed: %s", publish_err)
+        else:
+            self.lines_published += len(lines)
+        finally:
+            self.frames_published += 1
+
+
+def _kill_process_group(proc: asyncio.subprocess.Process) -> None:
+    if os.name == "posix":
+        with contextlib.suppress(ProcessLookupError):
+            os.killpg(proc.pid, signal.SIGKILL)
+    else:
+        with contextlib.suppress(ProcessLookupError):
+            proc.kill()
+
+
 async def run_command(
     cmd: list[str],
     timeout: int,
@@ -1028,14 +1173,9 @@ async def run_command(
 
     streaming_enabled = bool(stream_publish and stream_log_topic and execution_id)
     streamer = LineEventStreamer() if streaming_enabled else None
-
-    async def _publish_line(line: str) -> None:
-        # Streaming is best-effort: a publish failure must never break the run.
-        try:
-            data = _build_stream_log_payload(execution_id, line)
-            await stream_publish(stream_log_topic, data)
-        except Exception as publish_err:  # noqa: BLE001 - intentionally swallowed
-            logger.warning("stream log publish failed: %s", publish_err)
+    batcher = StreamFrameBatcher(stream_publish, stream_log_topic, execution_id) if streaming_enabled else None
+    if batcher is not None:
+        batcher.start()
 
     async def _collect_output() -> tuple[bytes, dict[str, Any]]:
         assert proc.stdout is not None
@@ -1059,12 +1199,12 @@ async def run_command(
                 truncated = True
             if streamer is not None:
                 for line in streamer.feed(chunk):
-                    await _publish_line(line)
+                    batcher.put(line)
 
         if streamer is not None:
             trailing = streamer.flush()
             if trailing is not None:
-                await _publish_line(trailing)
+                batcher.put(trailing)
 
         return b"".join(chunks), {
             "truncated": truncated,
@@ -1073,31 +1213,37 @@ async def run_command(
             "output_max_bytes": max_output_bytes,
         }
 
+    # The process group is killed before the batcher is closed, and the batcher
+    # is always closed (flushing what it can) so its background task never
+    # outlives the command, including on cancellation.
     try:
-        stdout, output_meta = await asyncio.wait_for(_collect_output(), timeout=timeout)
-        await asyncio.wait_for(proc.wait(), timeout=5)
-    except asyncio.TimeoutError:
-        if os.name == "posix":
-            with contextlib.suppress(ProcessLookupError):
-                os.killpg(proc.pid, signal.SIGKILL)
-        else:
-            proc.kill()
-        with contextlib.suppress(asyncio.TimeoutError):
+        try:
+            stdout, output_meta = await asyncio.wait_for(_collect_output(), timeout=timeout)
             await asyncio.wait_for(proc.wait(), timeout=5)
+        except asyncio.TimeoutError:
+            _kill_process_group(proc)
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(proc.wait(), timeout=5)
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+            logger.error("command timed out: %s", " ".join(shlex.quote(part) for part in cmd))
+            return (
+                124,
+                "command timed out",
+                {
+                    "truncated": False,
+                    "output_bytes_total": 0,
+                    "output_bytes_retained": 0,
+                    "output_max_bytes": max_output_bytes,
+                },
+            )
+    finally:
         if proc.returncode is None:
-            proc.kill()
-            await proc.wait()
-        logger.error("command timed out: %s", " ".join(shlex.quote(part) for part in cmd))
-        return (
-            124,
-            "command timed out",
-            {
-                "truncated": False,
-                "output_bytes_total": 0,
-                "output_bytes_retained": 0,
-                "output_max_bytes": max_output_bytes,
-            },
-        )
+            # Cancelled or failed mid-run: don't leave the process group behind.
+            _kill_process_group(proc)
+        if batcher is not None:
+            await batcher.close()
     output, decode_strategy = decode_command_output(stdout)
     exit_code = proc.returncode or 0
     logger.info(
@@ -24,7 +24,7 @@ from service.ansible_runner import (
     to_adhoc_request,
     to_playbook_request,
 )
-from service.task_store import TERMINAL_TASK_STATUSES, TaskStore, _sanitize_payload_for_storage
+from service.task_store import TERMINAL_TASK_STATUSES, LeaseRenewalBatcher, TaskStore, _sanitize_payload_for_storage
 
 # logging.basicConfig(
 #     level=os.getenv("LOG_LEVEL", "INFO").upper(),
@@ -86,6 +86,7 @@ class AnsibleNATSService:
         self.config = config
         self.workers: list[asyncio.Task] = []
         self.task_store = TaskStore(config.state_db_path)
+        self.lease_renewer = LeaseRenewalBatcher(self.task_store)
 
     @staticmethod
     def _now_iso() -> str:
@@ -207,7 +208,7 @@ class AnsibleNATSService:
             await asyncio.sleep(interval)
             now = datetime.now(UTC)
             lease_expires_at = self._lease_expiry_iso(now)
-            renewed = self.task_store.renew_lease(task_id, owner_id, lease_expires_at, now.isoformat())
+            renewed = await self.lease_renewer.renew(task_id, owner_id, lease_expires_at, now.isoformat())
             if not renewed:
                 logger.warning("stop ack keepalive without active lease: task_id=%s owner_id=%s", task_id, owner_id)
                 return
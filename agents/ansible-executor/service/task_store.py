@@ -1,5 +1,7 @@
+import asyncio
 import json
 import sqlite3
+import threading
 from pathlib import Path
 from typing import Any
 
@@ -56,13 +58,51 @@ def _sanitize_payload_for_storage(payload: dict[str, Any]) -> dict[str, Any]:
     return sanitized
 
 
+_SQLITE_BUSY_TIMEOUT_MS = 5000
+
+_RENEW_LEASE_SQL = """
+    UPDATE task_state
+    SET lease_expires_at = ?, heartbeat_at = ?, updated_at = ?
+    WHERE task_id = ? AND lease_owner = ? AND execution_status = 'running'
+"""
+
+
 class TaskStore:
+    """SQLite-backed task state.
+
+    Each thread keeps one persistent connection (WAL journal, NORMAL sync), so
+    heartbeat / lease traffic reuses sqlite3's per-connection statement cache
+    instead of reopening the file and re-preparing SQL on every call. WAL lets
+    status reads proceed while a writer holds the lock.
+    """
+
     def __init__(self, db_path: str):
         self.db_path = db_path
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
         self._ensure_schema()
 
-    def _connect(self):
-        return sqlite3.connect(self.db_path)
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # check_same_thread=False only so close() can release other threads' connections;
+            # each connection is otherwise used solely by the thread that opened it.
+            conn = sqlite3.connect(self.db_path, timeout=_SQLITE_BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={_SQLITE_BUSY_TIMEOUT_MS}")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self) -> None:
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
 
     def _ensure_schema(self):
         Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
@@ -151,6 +191,8 @@ class TaskStore:
 
     def claim_task(self, task_id: str, owner_id: str, lease_expires_at: str, now_iso: str) -> dict[str, Any]:
         with self._connect() as conn:
+            # Take the write lock before reading so check-then-update is atomic across workers.
+            conn.execute("BEGIN IMMEDIATE")
             cursor = conn.execute(
                 """
                 SELECT status, execution_status, callback_status, lease_owner, lease_expires_at, execution_attempt
@@ -220,16 +262,23 @@ class TaskStore:
 
     def renew_lease(self, task_id: str, owner_id: str, lease_expires_at: str, now_iso: str) -> bool:
         with self._connect() as conn:
-            cursor = conn.execute(
-                """
-                UPDATE task_state
-                SET lease_expires_at = ?, heartbeat_at = ?, updated_at = ?
-                WHERE task_id = ? AND lease_owner = ? AND execution_status = 'running'
-                """,
-                (lease_expires_at, now_iso, now_iso, task_id, owner_id),
-            )
+            cursor = conn.execute(_RENEW_LEASE_SQL, (lease_expires_at, now_iso, now_iso, task_id, owner_id))
             return cursor.rowcount > 0
 
+    def renew_leases(self, renewals: list[tuple[str, str, str, str]]) -> list[bool]:
+        """Renew many leases in one transaction.
+
+        ``renewals`` holds ``(task_id, owner_id, lease_expires_at, now_iso)``
+        tuples; returns whether each lease was renewed, in the same order.
+        """
+        if not renewals:
+            return []
+        with self._connect() as conn:
+            return [
+                conn.execute(_RENEW_LEASE_SQL, (lease_expires_at, now_iso, now_iso, task_id, owner_id)).rowcount > 0
+                for task_id, owner_id, lease_expires_at, now_iso in renewals
+            ]
+
     def update_execution_result(
         self,
         task_id: str,
@@ -360,3 +409,40 @@ class TaskStore:
             if not row or not row[0]:
                 return None
             return json.loads(row[0])
+
+
+class LeaseRenewalBatcher:
+    """Coalesce lease renewals from concurrent keepalive loops.
+
+    Renewals requested within ``window_seconds`` of each other are written by a
+    single ``TaskStore.renew_leases`` call (one transaction, one commit) instead
+    of one commit per task.
+    """
+
+    def __init__(self, store: TaskStore, window_seconds: float = 0.05):
+        self.store = store
+        self.window_seconds = window_seconds
+        self._pending: list[tuple[tuple[str, str, str, str], asyncio.Future]] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+
+    async def renew(self, task_id: str, owner_id: str, lease_expires_at: str, now_iso: str) -> bool:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append(((task_id, owner_id, lease_expires_at, now_iso), future))
+        if self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window_seconds, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        pending, self._pending = self._pending, []
+        self._flush_handle = None
+        try:
+            results = self.store.renew_leases([renewal for renewal, _ in pending])
+        except Exception as err:  # noqa: BLE001 - delivered to every waiter
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(err)
+            return
+        for (_, future), renewed in zip(pending, results):
+            if not future.done():
+                future.set_result(renewed)
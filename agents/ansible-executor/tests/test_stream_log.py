@@ -1,8 +1,10 @@
+import asyncio
 import json
 import sys
+import time
 
 import pytest
-from service.ansible_runner import LineEventStreamer, run_command
+from service.ansible_runner import LineEventStreamer, StreamFrameBatcher, run_command
 
 # ---------------------------------------------------------------------------
 # Pure-logic tests: bytes -> per-line events (no subprocess, no NATS).
@@ -66,23 +68,133 @@ def test_line_streamer_decodes_utf8_with_replacement():
 
 
 # ---------------------------------------------------------------------------
-# Integration tests: run_command streams stdout line-by-line via callback.
+# Integration tests: run_command streams stdout in frames via callback.
 # ---------------------------------------------------------------------------
 
 
 class FakePublisher:
-    def __init__(self, fail: bool = False):
+    def __init__(self, fail: bool = False, delay: float = 0.0):
         self.calls: list[tuple[str, bytes]] = []
         self.fail = fail
+        self.delay = delay
 
     async def publish(self, subject: str, data: bytes) -> None:
         self.calls.append((subject, data))
+        if self.delay:
+            await asyncio.sleep(self.delay)
         if self.fail:
             raise RuntimeError("nats down")
 
     def decoded(self) -> list[dict]:
         return [json.loads(data.decode("utf-8")) for _, data in self.calls]
 
+    def lines(self) -> list[str]:
+        return [line for frame in self.decoded() for line in frame["lines"]]
+
+
+# ---------------------------------------------------------------------------
+# StreamFrameBatcher: coalescing, bounded queue, best-effort publish.
+# ---------------------------------------------------------------------------
+
+
+async def _run_batcher(lines: list[str], publisher: FakePublisher, **kwargs) -> StreamFrameBatcher:
+    batcher = StreamFrameBatcher(publisher.publish, "bk.stream", "exec-b", **kwargs)
+    batcher.start()
+    for line in lines:
+        batcher.put(line)
+    await batcher.close()
+    return batcher
+
+
+@pytest.mark.asyncio
+async def test_batcher_coalesces_lines_into_frames():
+    publisher = FakePublisher()
+    lines = [f"line{i}" for i in range(1000)]
+    batcher = await _run_batcher(lines, publisher, max_lines=300, interval=0.01)
+
+    assert publisher.lines() == lines
+    assert [len(frame["lines"]) for frame in publisher.decoded()] == [300, 300, 300, 100]
+    assert [frame["seq"] for frame in publisher.decoded()] == [0, 1, 2, 3]
+    assert batcher.lines_published == 1000
+    assert batcher.dropped_total == 0
+
+
+@pytest.mark.asyncio
+async def test_batcher_respects_frame_byte_limit():
+    publisher = FakePublisher()
+    lines = ["x" * 99 for _ in range(10)]
+    await _run_batcher(lines, publisher, max_bytes=300, interval=0)
+
+    assert publisher.lines() == lines
+    assert all(len(frame["lines"]) <= 3 for frame in publisher.decoded())
+
+
+@pytest.mark.asyncio
+async def test_batcher_oversized_line_still_published():
+    publisher = FakePublisher()
+    await _run_batcher(["y" * 1000], publisher, max_bytes=100)
+    assert publisher.lines() == ["y" * 1000]
+
+
+@pytest.mark.asyncio
+async def test_batcher_drops_when_queue_full_and_reports_count():
+    publisher = FakePublisher()
+    # Nothing is drained until close(): the queue holds 5 lines, the rest are dropped.
+    batcher = await _run_batcher([f"l{i}" for i in range(8)], publisher, max_queue_lines=5)
+
+    assert publisher.lines() == ["l0", "l1", "l2", "l3", "l4"]
+    assert sum(frame["dropped"] for frame in publisher.decoded()) == 3
+    assert batcher.dropped_total == 3
+
+
+@pytest.mark.asyncio
+async def test_batcher_frame_contract():
+    publisher = FakePublisher()
+    await _run_batcher(["中文"], publisher)
+    (frame,) = publisher.decoded()
+    assert set(frame.keys()) == {"execution_id", "stream", "lines", "seq", "dropped", "timestamp"}
+    assert frame["execution_id"] == "exec-b"
+    assert frame["stream"] == "stdout"
+    assert frame["lines"] == ["中文"]
+    assert "中文".encode("utf-8") in publisher.calls[0][1]
+
+
+@pytest.mark.asyncio
+async def test_batcher_counts_publish_errors():
+    publisher = FakePublisher(fail=True)
+    batcher = await _run_batcher(["a", "b"], publisher)
+    assert batcher.publish_errors == len(publisher.calls) >= 1
+    assert batcher.lines_published == 0
+
+
+@pytest.mark.asyncio
+async def test_batcher_frame_full_counts_utf8_bytes():
+    publisher = FakePublisher()
+    # 4 characters but 12 UTF-8 bytes: the frame is already full, so it must not wait out the interval.
+    batcher = StreamFrameBatcher(publisher.publish, "bk.stream", "exec-b", max_bytes=10, interval=5)
+    batcher.start()
+    batcher.put("中文中文")
+    await asyncio.sleep(0.2)
+
+    assert publisher.lines() == ["中文中文"]
+    await batcher.close()
+    assert batcher._queued_bytes == 0
+
+
+@pytest.mark.asyncio
+async def test_batcher_close_gives_up_on_stuck_publisher():
+    publisher = FakePublisher(delay=10)
+    batcher = StreamFrameBatcher(publisher.publish, "bk.stream", "exec-b", interval=0)
+    batcher.start()
+    batcher.put("a")
+    await asyncio.sleep(0.01)
+    batcher.put("b")
+
+    started = time.monotonic()
+    await batcher.close(timeout=0.1)
+    assert time.monotonic() - started < 1
+    assert batcher.dropped_total == 1
+
 
 @pytest.mark.asyncio
 async def test_run_command_streams_each_line():
@@ -100,16 +212,35 @@ async def test_run_command_streams_each_line():
     # Full output is still accumulated and returned unchanged.
     assert "line0" in output and "line2" in output
 
-    events = publisher.decoded()
-    assert [e["line"] for e in events] == ["line0", "line1", "line2"]
+    assert publisher.lines() == ["line0", "line1", "line2"]
     # Topic correct on every publish.
     assert all(subject == "bk.ans_exec.stream.exec-1" for subject, _ in publisher.calls)
-    # Flat JSON contract.
-    for event in events:
-        assert event["execution_id"] == "exec-1"
-        assert event["stream"] == "stdout"
-        assert "timestamp" in event and event["timestamp"]
-        assert set(event.keys()) == {"execution_id", "stream", "line", "timestamp"}
+    for frame in publisher.decoded():
+        assert frame["execution_id"] == "exec-1"
+        assert frame["stream"] == "stdout"
+        assert frame["timestamp"]
+
+
+@pytest.mark.asyncio
+async def test_run_command_slow_publisher_does_not_stall_output():
+    # 20k lines against a 5ms publish: one publish per line would take ~100s.
+    publisher = FakePublisher(delay=0.005)
+    started = time.monotonic()
+    code, _, meta = await run_command(
+        [sys.executable, "-c", "for i in range(20000): print('row %d' % i)"],
+        timeout=30,
+        stream_publish=publisher.publish,
+        stream_log_topic="bk.stream",
+        execution_id="exec-4",
+    )
+
+    assert code == 0
+    assert time.monotonic() - started < 10
+    assert meta["output_bytes_total"] > 0
+    lines = publisher.lines()
+    assert len(lines) + sum(frame["dropped"] for frame in publisher.decoded()) == 20000
+    assert lines[0] == "row 0"
+    assert len(publisher.calls) < 1000
 
 
 @pytest.mark.asyncio
@@ -125,8 +256,7 @@ async def test_run_command_flushes_trailing_line_without_newline():
 
     assert code == 0
     assert output.strip() == "no-newline-tail"
-    lines = [e["line"] for e in publisher.decoded()]
-    assert lines == ["no-newline-tail"]
+    assert publisher.lines() == ["no-newline-tail"]
 
 
 @pytest.mark.asyncio
@@ -155,3 +285,64 @@ async def test_run_command_swallows_publish_errors():
     assert output.strip() == "still works"
     # Publish was attempted (and raised) at least once.
     assert len(publisher.calls) >= 1
+
+
+@pytest.mark.asyncio
+async def test_run_command_timeout_kills_before_closing_batcher(monkeypatch):
+    from service import ansible_runner
+
+    events: list[str] = []
+    kill = ansible_runner._kill_process_group
+    close = StreamFrameBatcher.close
+
+    def _kill(proc):
+        events.append("kill")
+        kill(proc)
+
+    async def _close(self, *args, **kwargs):
+        events.append("close")
+        await close(self, *args, **kwargs)
+
+    monkeypatch.setattr(ansible_runner, "_kill_process_group", _kill)
+    monkeypatch.setattr(StreamFrameBatcher, "close", _close)
+    publisher = FakePublisher()
+    code, output, _ = await run_command(
+        [sys.executable, "-c", "import time; print('x', flush=True); time.sleep(30)"],
+        timeout=1,
+        stream_publish=publisher.publish,
+        stream_log_topic="bk.stream",
+        execution_id="exec-4",
+    )
+
+    assert (code, output) == (124, "command timed out")
+    assert events == ["kill", "close"]
+
+
+@pytest.mark.asyncio
+async def test_run_command_cancellation_closes_batcher_and_kills_process(monkeypatch):
+    closed: list[StreamFrameBatcher] = []
+    close = StreamFrameBatcher.close
+
+    async def _close(self, *args, **kwargs):
+        await close(self, *args, **kwargs)
+        closed.append(self)
+
+    monkeypatch.setattr(StreamFrameBatcher, "close", _close)
+    publisher = FakePublisher()
+    task = asyncio.create_task(
+        run_command(
+            [sys.executable, "-c", "import time; print('x', flush=True); time.sleep(30)"],
+            timeout=60,
+            stream_publish=publisher.publish,
+            stream_log_topic="bk.stream",
+            execution_id="exec-5",
+        )
+    )
+    await asyncio.sleep(0.5)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    (batcher,) = closed
+    assert batcher._task.done()
+    assert publisher.lines() == ["x"]
@@ -1,4 +1,13 @@
-from service.task_store import SENSITIVE_CREDENTIAL_KEYS, TaskStore, _sanitize_payload_for_storage
+import asyncio
+import sqlite3
+import threading
+import time
+
+import pytest
+from service.task_store import SENSITIVE_CREDENTIAL_KEYS, LeaseRenewalBatcher, TaskStore, _sanitize_payload_for_storage
+
+NOW = "2026-04-23T00:00:00+00:00"
+LEASE = "2026-04-23T00:01:00+00:00"
 
 
 def test_claim_task_blocks_active_lease(tmp_path):
@@ -251,3 +260,135 @@ def test_sensitive_credential_keys_is_comprehensive():
         "inventory_content",
     }
     assert SENSITIVE_CREDENTIAL_KEYS == expected_keys
+
+
+def _store_with_tasks(tmp_path, count: int) -> TaskStore:
+    store = TaskStore(str(tmp_path / "task.db"))
+    for i in range(count):
+        store.create_if_absent(f"task-{i}", "queued", {"task_id": f"task-{i}"}, {}, NOW)
+    return store
+
+
+def test_store_uses_wal(tmp_path):
+    store = TaskStore(str(tmp_path / "task.db"))
+    conn = store._connect()
+
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_store_reuses_connection_per_thread(tmp_path):
+    store = TaskStore(str(tmp_path / "task.db"))
+    assert store._connect() is store._connect()
+
+    other: list[sqlite3.Connection] = []
+    thread = threading.Thread(target=lambda: other.append(store._connect()))
+    thread.start()
+    thread.join()
+    assert other[0] is not store._connect()
+
+    store.close()
+    # A closed store reconnects lazily.
+    assert store.get_status("missing") is None
+
+
+def test_renew_leases_reports_each_renewal_in_order(tmp_path):
+    store = _store_with_tasks(tmp_path, 3)
+    store.claim_task("task-0", "worker-a", LEASE, NOW)
+    store.claim_task("task-2", "worker-a", LEASE, NOW)
+
+    renewed = store.renew_leases(
+        [
+            ("task-0", "worker-a", "2026-04-23T00:02:00+00:00", "2026-04-23T00:00:30+00:00"),
+            ("task-1", "worker-a", "2026-04-23T00:02:00+00:00", "2026-04-23T00:00:30+00:00"),
+            ("task-2", "worker-b", "2026-04-23T00:02:00+00:00", "2026-04-23T00:00:30+00:00"),
+        ]
+    )
+
+    assert renewed == [True, False, False]
+    assert store.get_task("task-0")["lease_expires_at"] == "2026-04-23T00:02:00+00:00"
+    assert store.get_task("task-2")["lease_expires_at"] == LEASE
+    assert store.renew_leases([]) == []
+
+
+def test_claim_task_is_atomic_across_threads(tmp_path):
+    store = _store_with_tasks(tmp_path, 1)
+    barrier = threading.Barrier(8)
+    results: list[bool] = []
+
+    def claim(worker: int) -> None:
+        barrier.wait()
+        results.append(store.claim_task("task-0", f"worker-{worker}", LEASE, NOW)["claimed"])
+
+    threads = [threading.Thread(target=claim, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results.count(True) == 1
+    assert store.get_task("task-0")["execution_attempt"] == 1
+
+
+@pytest.mark.asyncio
+async def test_lease_renewal_batcher_coalesces_concurrent_renewals(tmp_path, monkeypatch):
+    store = _store_with_tasks(tmp_path, 5)
+    for i in range(4):
+        store.claim_task(f"task-{i}", "worker-a", LEASE, NOW)
+    batches: list[int] = []
+    original = store.renew_leases
+
+    def counting_renew_leases(renewals):
+        batches.append(len(renewals))
+        return original(renewals)
+
+    monkeypatch.setattr(store, "renew_leases", counting_renew_leases)
+    batcher = LeaseRenewalBatcher(store, window_seconds=0.01)
+
+    results = await asyncio.gather(
+        *(batcher.renew(f"task-{i}", "worker-a", "2026-04-23T00:02:00+00:00", NOW) for i in range(5))
+    )
+
+    assert results == [True, True, True, True, False]
+    assert batches == [5]
+
+
+@pytest.mark.asyncio
+async def test_lease_renewal_batcher_propagates_store_errors(tmp_path, monkeypatch):
+    store = TaskStore(str(tmp_path / "task.db"))
+
+    def broken(renewals):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(store, "renew_leases", broken)
+    batcher = LeaseRenewalBatcher(store, window_seconds=0)
+
+    with pytest.raises(sqlite3.OperationalError):
+        await batcher.renew("task-0", "worker-a", LEASE, NOW)
+
+
+@pytest.mark.slow
+def test_claim_renew_throughput_benchmark(tmp_path):
+    """Claim/renew throughput: persistent WAL connection vs. reconnect-per-call with default journal."""
+
+    class ReconnectingTaskStore(TaskStore):
+        def _connect(self):
+            return sqlite3.connect(self.db_path)
+
+    def ops_per_second(store: TaskStore, count: int = 200, renew_rounds: int = 3) -> float:
+        for i in range(count):
+            store.create_if_absent(f"task-{i}", "queued", {"task_id": f"task-{i}"}, {}, NOW)
+        started = time.perf_counter()
+        for i in range(count):
+            store.claim_task(f"task-{i}", "worker-a", LEASE, NOW)
+        for _ in range(renew_rounds):
+            for i in range(count):
+                store.renew_lease(f"task-{i}", "worker-a", LEASE, NOW)
+        return count * (1 + renew_rounds) / (time.perf_counter() - started)
+
+    (tmp_path / "legacy").mkdir()
+    (tmp_path / "wal").mkdir()
+    legacy = ops_per_second(ReconnectingTaskStore(str(tmp_path / "legacy" / "task.db")))
+    persistent = ops_per_second(TaskStore(str(tmp_path / "wal" / "task.db")))
+
+    print(f"claim/renew throughput: reconnect={legacy:.0f} ops/s persistent_wal={persistent:.0f} ops/s")
+    assert persistent > legacy * 2
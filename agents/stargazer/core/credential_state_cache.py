@@ -1,56 +1,57 @@
 import json
+import time
 import uuid
 from datetime import datetime, timezone
-from typing import Any, Optional
+from typing import Any, Iterable, Optional
 
-from arq import create_pool
-from arq.connections import RedisSettings
-
-from core.redis_config import REDIS_CONFIG
+from core.redis_pool import get_redis_pool
 
 
 class CredentialStateCache:
-    """基于 Redis 的 host-credential 运行态缓存。"""
+    """基于 Redis 的 host-credential 运行态缓存。
+
+    复用应用级共享连接池；同一 (task, host) 的各凭据失败态存放在一个 Hash 中
+    （field 为 credential_id），读取多个凭据 / 成功后清空都只需一次往返。
+    Hash 字段无法单独设置 TTL，冷却到期时间写在字段值里，读取时过滤。
+    """
 
     SUCCESS_TTL_SECONDS = 7 * 24 * 3600
     FAILURE_TTL_SECONDS = 24 * 3600
     EVENT_RETENTION_SECONDS = 7 * 24 * 3600
     COOLDOWN_HOURS = {1: 1, 2: 4, 3: 24}
+    _EXPIRES_AT_FIELD = "_expires_at"
 
     @classmethod
     async def get_success_credential(cls, collect_task_id: Any, host: str) -> str:
-        pool = await cls._create_pool()
-        try:
-            value = await pool.get(cls._success_key(collect_task_id, host))
-            if isinstance(value, (bytes, bytearray)):
-                return value.decode()
-            return str(value or "")
-        finally:
-            await pool.close()
+        pool = await get_redis_pool()
+        value = await pool.get(cls._success_key(collect_task_id, host))
+        if isinstance(value, (bytes, bytearray)):
+            return value.decode()
+        return str(value or "")
 
     @classmethod
     async def get_failure_state(cls, collect_task_id: Any, host: str, credential_id: str) -> dict:
-        pool = await cls._create_pool()
-        try:
-            value = await pool.get(cls._failure_key(collect_task_id, host, credential_id))
-            if not value:
-                return {}
-            if isinstance(value, (bytes, bytearray)):
-                value = value.decode()
-            return json.loads(value)
-        finally:
-            await pool.close()
+        pool = await get_redis_pool()
+        value = await pool.hget(cls._failure_key(collect_task_id, host), str(credential_id))
+        return cls._decode_failure_state(value)
+
+    @classmethod
+    async def get_failure_states(cls, collect_task_id: Any, host: str, credential_ids: Iterable[Any]) -> dict:
+        """一次 HMGET 读取多个凭据的失败态，返回 {credential_id: state}（未冷却为 {}）。"""
+        fields = [str(credential_id) for credential_id in credential_ids]
+        if not fields:
+            return {}
+        pool = await get_redis_pool()
+        values = await pool.hmget(cls._failure_key(collect_task_id, host), fields)
+        return {field: cls._decode_failure_state(value) for field, value in zip(fields, values)}
 
     @classmethod
     async def mark_success(cls, collect_task_id: Any, host: str, credential_id: str) -> None:
-        pool = await cls._create_pool()
-        try:
-            await pool.set(cls._success_key(collect_task_id, host), credential_id, ex=cls.SUCCESS_TTL_SECONDS)
-            pattern = cls._failure_pattern(collect_task_id, host)
-            async for key in cls._scan_keys(pool, pattern):
-                await pool.delete(key)
-        finally:
-            await pool.close()
+        pool = await get_redis_pool()
+        async with pool.pipeline(transaction=True) as pipe:
+            pipe.set(cls._success_key(collect_task_id, host), credential_id, ex=cls.SUCCESS_TTL_SECONDS)
+            pipe.delete(cls._failure_key(collect_task_id, host))
+            await pipe.execute()
 
     @classmethod
     async def mark_failure(
@@ -63,91 +64,71 @@ class CredentialStateCache:
         consecutive_failures: int,
         next_retry_at: str,
     ) -> None:
-        pool = await cls._create_pool()
-        try:
-            payload = {
-                "is_cooled": True,
-                "error_message": error_message or "",
-                "cooldown_level": cooldown_level,
-                "consecutive_failures": consecutive_failures,
-                "next_retry_at": next_retry_at,
-            }
-            await pool.set(
-                cls._failure_key(collect_task_id, host, credential_id),
-                json.dumps(payload),
-                ex=cls.cooldown_seconds_for(cooldown_level),
-            )
-        finally:
-            await pool.close()
+        cooldown_seconds = cls.cooldown_seconds_for(cooldown_level)
+        payload = {
+            "is_cooled": True,
+            "error_message": error_message or "",
+            "cooldown_level": cooldown_level,
+            "consecutive_failures": consecutive_failures,
+            "next_retry_at": next_retry_at,
+            cls._EXPIRES_AT_FIELD: int(time.time()) + cooldown_seconds,
+        }
+        failure_key = cls._failure_key(collect_task_id, host)
+        pool = await get_redis_pool()
+        async with pool.pipeline(transaction=True) as pipe:
+            pipe.hset(failure_key, str(credential_id), json.dumps(payload))
+            pipe.expire(failure_key, max(cls.FAILURE_TTL_SECONDS, cooldown_seconds))
+            await pipe.execute()
 
     @classmethod
     async def clear_success(cls, collect_task_id: Any, host: str) -> None:
-        pool = await cls._create_pool()
-        try:
-            await pool.delete(cls._success_key(collect_task_id, host))
-        finally:
-            await pool.close()
+        pool = await get_redis_pool()
+        await pool.delete(cls._success_key(collect_task_id, host))
 
     @classmethod
     async def append_result_event(cls, event: dict) -> None:
-        pool = await cls._create_pool()
-        try:
-            finished_at = str(event.get("finished_at") or datetime.now(timezone.utc).isoformat())
-            score = cls._event_score(finished_at)
-            payload = {**dict(event or {}), "event_id": uuid.uuid4().hex, "finished_at": finished_at}
-            await pool.zadd(cls._event_stream_key(), {json.dumps(payload, ensure_ascii=False): score})
-            await pool.zremrangebyscore(cls._event_stream_key(), 0, score - cls.EVENT_RETENTION_SECONDS * 1000)
-        finally:
-            await pool.close()
+        finished_at = str(event.get("finished_at") or datetime.now(timezone.utc).isoformat())
+        score = cls._event_score(finished_at)
+        payload = {**dict(event or {}), "event_id": uuid.uuid4().hex, "finished_at": finished_at}
+        pool = await get_redis_pool()
+        async with pool.pipeline(transaction=False) as pipe:
+            pipe.zadd(cls._event_stream_key(), {json.dumps(payload, ensure_ascii=False): score})
+            pipe.zremrangebyscore(cls._event_stream_key(), 0, score - cls.EVENT_RETENTION_SECONDS * 1000)
+            await pipe.execute()
 
     @classmethod
     async def list_result_events(cls, since: str | None = None, limit: int = 500) -> list[dict]:
-        pool = await cls._create_pool()
-        try:
-            min_score = "-inf"
-            if since:
-                min_score = f"({cls._event_score(since)}"
-            raw_items = await pool.zrangebyscore(cls._event_stream_key(), min=min_score, max="+inf", start=0, num=limit)
-            events = []
-            for item in raw_items or []:
-                if isinstance(item, (bytes, bytearray)):
-                    item = item.decode()
-                events.append(json.loads(item))
-            return events
-        finally:
-            await pool.close()
+        min_score = "-inf"
+        if since:
+            min_score = f"({cls._event_score(since)}"
+        pool = await get_redis_pool()
+        raw_items = await pool.zrangebyscore(cls._event_stream_key(), min=min_score, max="+inf", start=0, num=limit)
+        events = []
+        for item in raw_items or []:
+            if isinstance(item, (bytes, bytearray)):
+                item = item.decode()
+            events.append(json.loads(item))
+        return events
 
     @classmethod
-    async def _create_pool(cls):
-        redis_settings = RedisSettings(
-            host=REDIS_CONFIG["host"],
-            port=REDIS_CONFIG["port"],
-            password=REDIS_CONFIG["password"],
-            database=REDIS_CONFIG["database"],
-        )
-        return await create_pool(redis_settings)
-
-    @staticmethod
-    async def _scan_keys(pool, pattern: str):
-        cursor = 0
-        while True:
-            cursor, keys = await pool.scan(cursor=cursor, match=pattern, count=100)
-            for key in keys:
-                yield key
-            if cursor == 0:
-                break
+    def _decode_failure_state(cls, value: Optional[Any], now: Optional[float] = None) -> dict:
+        if not value:
+            return {}
+        if isinstance(value, (bytes, bytearray)):
+            value = value.decode()
+        state = json.loads(value)
+        expires_at = state.pop(cls._EXPIRES_AT_FIELD, None)
+        if expires_at is not None and expires_at <= (time.time() if now is None else now):
+            return {}
+        return state
 
     @staticmethod
     def _success_key(collect_task_id: Any, host: str) -> str:
         return f"collect:task:{collect_task_id}:host:{host}:success"
 
     @staticmethod
-    def _failure_key(collect_task_id: Any, host: str, credential_id: str) -> str:
-        return f"collect:task:{collect_task_id}:host:{host}:credential:{credential_id}:failure"
-
-    @staticmethod
-    def _failure_pattern(collect_task_id: Any, host: str) -> str:
-        return f"collect:task:{collect_task_id}:host:{host}:credential:*:failure"
+    def _failure_key(collect_task_id: Any, host: str) -> str:
+        return f"collect:task:{collect_task_id}:host:{host}:failures"
 
     @staticmethod
     def _event_stream_key() -> str:
@@ -159,24 +140,18 @@ class CredentialStateCache:
 
     @classmethod
     async def get_push_cursor(cls) -> str:
-        pool = await cls._create_pool()
-        try:
-            value = await pool.get(cls._push_cursor_key())
-            if isinstance(value, (bytes, bytearray)):
-                return value.decode()
-            return str(value or "")
-        finally:
-            await pool.close()
+        pool = await get_redis_pool()
+        value = await pool.get(cls._push_cursor_key())
+        if isinstance(value, (bytes, bytearray)):
+            return value.decode()
+        return str(value or "")
 
     @classmethod
     async def set_push_cursor(cls, since: str) -> None:
         if not since:
             return
-        pool = await cls._create_pool()
-        try:
-            await pool.set(cls._push_cursor_key(), since)
-        finally:
-            await pool.close()
+        pool = await get_redis_pool()
+        await pool.set(cls._push_cursor_key(), since)
 
     @staticmethod
     def _event_score(value: str) -> int:
@@ -0,0 +1,82 @@
+# -- coding: utf-8 --
+"""
+应用级共享 Redis 连接池
+
+作用：
+Sanic Server / ARQ Worker 进程内只保留一个 ArqRedis 连接池，
+TaskQueue、CredentialStateCache、Worker 清理逻辑统一从这里获取，
+避免每次读写都 create_pool + close（多凭据采集每台主机会触发多次）。
+
+- Server：TaskQueue 在 before_server_start 时创建，after_server_stop 时关闭
+- Worker：启动时登记 ARQ 自身的 ctx["redis"]，由 ARQ 负责关闭
+- 其它场景（脚本、测试）：首次 get_redis_pool() 时按需创建
+
+连接池绑定事件循环，检测到事件循环变化时重新创建。
+
+使用方式：
+    from core.redis_pool import get_redis_pool
+    pool = await get_redis_pool()
+"""
+import asyncio
+from typing import Optional
+
+from arq import create_pool
+from arq.connections import ArqRedis, RedisSettings
+
+from core.redis_config import REDIS_CONFIG
+
+_pool: Optional[ArqRedis] = None
+_pool_loop: Optional[asyncio.AbstractEventLoop] = None
+_pool_owned = False
+_lock: Optional[asyncio.Lock] = None
+_lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def build_redis_settings() -> RedisSettings:
+    """按统一配置构造 ARQ RedisSettings"""
+    return RedisSettings(
+        host=REDIS_CONFIG["host"],
+        port=REDIS_CONFIG["port"],
+        password=REDIS_CONFIG["password"],
+        database=REDIS_CONFIG["database"],
+    )
+
+
+def _get_lock(loop: asyncio.AbstractEventLoop) -> asyncio.Lock:
+    global _lock, _lock_loop
+    if _lock is None or _lock_loop is not loop:
+        _lock = asyncio.Lock()
+        _lock_loop = loop
+    return _lock
+
+
+async def get_redis_pool() -> ArqRedis:
+    """获取当前事件循环的共享连接池，不存在时创建（并发调用只创建一次）"""
+    global _pool, _pool_loop, _pool_owned
+    loop = asyncio.get_running_loop()
+    if _pool is not None and _pool_loop is loop:
+        return _pool
+
+    async with _get_lock(loop):
+        if _pool is None or _pool_loop is not loop:
+            _pool = await create_pool(build_redis_settings())
+            _pool_loop = loop
+            _pool_owned = True
+    return _pool
+
+
+def set_redis_pool(pool: ArqRedis) -> None:
+    """登记外部创建的连接池（如 ARQ Worker 的 ctx["redis"]），其生命周期由调用方管理"""
+    global _pool, _pool_loop, _pool_owned
+    _pool = pool
+    _pool_loop = asyncio.get_running_loop()
+    _pool_owned = False
+
+
+async def close_redis_pool() -> None:
+    """释放共享连接池：自行创建的会关闭，外部登记的只解除登记"""
+    global _pool, _pool_loop, _pool_owned
+    pool, owned = _pool, _pool_owned
+    _pool, _pool_loop, _pool_owned = None, None, False
+    if pool is not None and owned:
+        await pool.close()
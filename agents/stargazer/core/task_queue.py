@@ -13,12 +13,12 @@ import hashlib
 import asyncio
 import uuid
 from typing import Optional, Dict, Any
-from arq import create_pool
-from arq.connections import RedisSettings, ArqRedis
+from arq.connections import ArqRedis
 from arq.jobs import Job
 from sanic import Sanic
 from sanic.log import logger
 from core.redis_config import REDIS_CONFIG, print_redis_config
+from core.redis_pool import close_redis_pool, get_redis_pool
 
 
 async def _is_host_remote_callback_pending(task_id: str) -> bool:
@@ -133,15 +133,8 @@ class TaskQueue:
         """连接到Redis - 使用统一配置"""
         if self.pool is None:
             try:
-                # ✅ 使用统一的 Redis 配置
-                redis_settings = RedisSettings(
-                    host=REDIS_CONFIG["host"],
-                    port=REDIS_CONFIG["port"],
-                    password=REDIS_CONFIG["password"],
-                    database=REDIS_CONFIG["database"],
-                )
-
-                self.pool = await create_pool(redis_settings)
+                # ✅ 使用应用级共享连接池（与 CredentialStateCache 等共用）
+                self.pool = await get_redis_pool()
                 self._is_healthy = True
 
                 logger.info("=" * 70)
@@ -158,7 +151,7 @@ class TaskQueue:
         """关闭连接"""
         if self.pool:
             try:
-                await self.pool.close()
+                await close_redis_pool()
                 self._is_healthy = False
                 logger.info("Redis connection closed gracefully")
             except Exception as e:
@@ -11,7 +11,6 @@ ARQ Worker 配置和任务处理
 import os
 import time
 from typing import Dict, Any
-from arq import create_pool
 from arq.connections import RedisSettings
 from core.redis_config import REDIS_CONFIG
 from sanic.log import logger
@@ -184,16 +183,10 @@ async def _clear_running_flag(task_id: str):
 
     这是一个独立的辅助函数，确保无论任务成功或失败都会执行
     """
-    pool = None
     try:
-        redis_settings = RedisSettings(
-            host=REDIS_CONFIG["host"],
-            port=REDIS_CONFIG["port"],
-            password=REDIS_CONFIG["password"],
-            database=REDIS_CONFIG["database"],
-        )
+        from core.redis_pool import get_redis_pool
 
-        pool = await create_pool(redis_settings)
+        pool = await get_redis_pool()
         running_key = f"task:running:{task_id}"
         await pool.delete(running_key)
 
@@ -201,25 +194,14 @@ async def _clear_running_flag(task_id: str):
 
     except Exception as e:
         logger.warning(f"Failed to clear running flag for {task_id}: {e}")
-    finally:
-        # 正确关闭Redis连接池
-        if pool:
-            await pool.close()
 
 
 async def _clear_dedupe_key(params: Dict[str, Any], job_id: str | None = None):
-    pool = None
     try:
+        from core.redis_pool import get_redis_pool
         from core.task_queue import generate_dedupe_key
 
-        redis_settings = RedisSettings(
-            host=REDIS_CONFIG["host"],
-            port=REDIS_CONFIG["port"],
-            password=REDIS_CONFIG["password"],
-            database=REDIS_CONFIG["database"],
-        )
-
-        pool = await create_pool(redis_settings)
+        pool = await get_redis_pool()
         dedupe_key = generate_dedupe_key(params or {})
         redis_key = f"task:dedupe:{dedupe_key}"
         existing_job_id = await pool.get(redis_key)
@@ -248,9 +230,20 @@ async def _clear_dedupe_key(params: Dict[str, Any], job_id: str | None = None):
 
     except Exception as e:
         logger.warning("event=task_dedupe_clear status=failed error=%s", e)
-    finally:
-        if pool:
-            await pool.close()
+
+
+async def _on_worker_startup(ctx: Dict):
+    """Worker 启动：登记 ARQ 自身的连接池为进程共享池"""
+    from core.redis_pool import set_redis_pool
+
+    set_redis_pool(ctx["redis"])
+
+
+async def _on_worker_shutdown(ctx: Dict):
+    """Worker 关闭：解除登记（连接池由 ARQ 关闭）"""
+    from core.redis_pool import close_redis_pool
+
+    await close_redis_pool()
 
 
 class WorkerSettings:
@@ -277,6 +270,10 @@ class WorkerSettings:
     # 注册的任务函数
     functions = [collect_task, process_host_remote_callback_task]
 
+    # 生命周期钩子：任务内的 Redis 读写复用 Worker 连接池
+    on_startup = _on_worker_startup
+    on_shutdown = _on_worker_shutdown
+
     # Worker 运行配置
     max_jobs = int(os.getenv("TASK_MAX_JOBS", "10"))
     job_timeout = int(os.getenv("TASK_JOB_TIMEOUT", "600"))
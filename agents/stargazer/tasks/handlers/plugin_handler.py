@@ -280,9 +280,15 @@ async def _build_next_credential_task(
     credentials_pool = params.get("credentials_pool") or []
     collect_task_id = params.get("collect_task_id")
     host = params.get("host")
-    for next_index in range(current_index + 1, len(credentials_pool)):
-        next_credential = dict(credentials_pool[next_index])
-        failure_state = await cache_cls.get_failure_state(collect_task_id, host, next_credential.get("credential_id"))
+    remaining = [dict(credential) for credential in credentials_pool[current_index + 1:]]
+    if not remaining:
+        return None
+    # 剩余凭据的冷却状态一次读出，避免逐个凭据往返 Redis
+    failure_states = await cache_cls.get_failure_states(
+        collect_task_id, host, [credential.get("credential_id") for credential in remaining]
+    )
+    for next_index, next_credential in enumerate(remaining, start=current_index + 1):
+        failure_state = failure_states.get(str(next_credential.get("credential_id"))) or {}
         if failure_state.get("is_cooled"):
             continue
         return {
@@ -443,6 +443,9 @@ class _RecordingCache:
     async def get_failure_state(self, collect_task_id, host, credential_id):
         return {"is_cooled": True}
 
+    async def get_failure_states(self, collect_task_id, host, credential_ids):
+        return {str(c): await self.get_failure_state(collect_task_id, host, c) for c in credential_ids}
+
 
 def test_handle_multicred_post_execute_cools_unreachable_failure():
     from tasks.handlers.plugin_handler import _handle_multicred_post_execute
@@ -1443,6 +1446,9 @@ class _FakeCredCache:
     async def get_failure_state(self, t, h, c):
         return {"is_cooled": True} if (str(t), h, c) in self._cooled else {}
 
+    async def get_failure_states(self, t, h, cs):
+        return {str(c): await self.get_failure_state(t, h, c) for c in cs}
+
 
 class _FakeQueue:
     def __init__(self):
@@ -0,0 +1,239 @@
+"""CredentialStateCache / 共享 Redis 连接池测试
+
+覆盖：
+1. 共享连接池：并发获取只创建一次；自建的关闭、外部登记的只解除登记
+2. 失败态按 (task, host) 存 Hash：批量读取、成功后清空均为一次往返
+3. 冷却到期的字段读取时过滤
+"""
+import asyncio
+import importlib
+import json
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self):
+        self.redis.round_trips += 1
+        return [await getattr(self.redis, f"_{name}")(*args, **kwargs) for name, args, kwargs in self.commands]
+
+
+class FakeRedis:
+    """内存版 ArqRedis 子集，记录往返次数（单条命令或一次 pipeline.execute 各计 1 次）。"""
+
+    def __init__(self):
+        self.strings = {}
+        self.hashes = {}
+        self.zsets = {}
+        self.ttls = {}
+        self.round_trips = 0
+        self.closed = False
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def __getattr__(self, name):
+        handler = getattr(self, f"_{name}")
+
+        async def command(*args, **kwargs):
+            self.round_trips += 1
+            return await handler(*args, **kwargs)
+
+        return command
+
+    async def _get(self, key):
+        value = self.strings.get(key)
+        return value.encode() if value is not None else None
+
+    async def _set(self, key, value, ex=None):
+        self.strings[key] = str(value)
+        self.ttls[key] = ex
+
+    async def _delete(self, *keys):
+        removed = 0
+        for key in keys:
+            for store in (self.strings, self.hashes, self.zsets):
+                if store.pop(key, None) is not None:
+                    removed += 1
+        return removed
+
+    async def _hget(self, key, field):
+        value = self.hashes.get(key, {}).get(field)
+        return value.encode() if value is not None else None
+
+    async def _hmget(self, key, fields):
+        return [await self._hget(key, field) for field in fields]
+
+    async def _hset(self, key, field, value):
+        self.hashes.setdefault(key, {})[field] = value
+
+    async def _expire(self, key, seconds):
+        self.ttls[key] = seconds
+
+    async def _zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update(mapping)
+
+    async def _zremrangebyscore(self, key, minimum, maximum):
+        zset = self.zsets.get(key, {})
+        for member in [m for m, score in zset.items() if minimum <= score <= maximum]:
+            del zset[member]
+
+    async def _close(self):
+        self.closed = True
+
+
+def _install_module(monkeypatch, name, **attrs):
+    module = types.ModuleType(name)
+    for key, value in attrs.items():
+        setattr(module, key, value)
+    monkeypatch.setitem(sys.modules, name, module)
+    return module
+
+
+@pytest.fixture
+def modules(monkeypatch):
+    created = []
+
+    async def fake_create_pool(settings):
+        pool = FakeRedis()
+        created.append(pool)
+        await asyncio.sleep(0)
+        return pool
+
+    _install_module(monkeypatch, "arq", create_pool=fake_create_pool)
+    _install_module(monkeypatch, "arq.connections", RedisSettings=lambda **kwargs: kwargs, ArqRedis=FakeRedis)
+    for name in ("core.redis_pool", "core.credential_state_cache"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+    redis_pool = importlib.import_module("core.redis_pool")
+    cache_module = importlib.import_module("core.credential_state_cache")
+    return types.SimpleNamespace(redis_pool=redis_pool, cache=cache_module.CredentialStateCache, created=created)
+
+
+def test_shared_pool_created_once_for_concurrent_callers(modules):
+    async def scenario():
+        pools = await asyncio.gather(*(modules.redis_pool.get_redis_pool() for _ in range(10)))
+        await modules.redis_pool.close_redis_pool()
+        return pools
+
+    pools = asyncio.run(scenario())
+
+    assert len(modules.created) == 1
+    assert all(pool is modules.created[0] for pool in pools)
+    assert modules.created[0].closed is True
+
+
+def test_registered_pool_is_not_closed_by_release(modules):
+    external = FakeRedis()
+
+    async def scenario():
+        modules.redis_pool.set_redis_pool(external)
+        pool = await modules.redis_pool.get_redis_pool()
+        await modules.redis_pool.close_redis_pool()
+        return pool
+
+    assert asyncio.run(scenario()) is external
+    assert external.closed is False
+    assert modules.created == []
+
+
+def test_failure_states_read_in_single_round_trip(modules):
+    cache = modules.cache
+    redis = FakeRedis()
+
+    async def scenario():
+        modules.redis_pool.set_redis_pool(redis)
+        await cache.mark_failure(7, "10.0.0.1", "cred-1", "auth failed", 1, 1, "2026-01-01T01:00:00+00:00")
+        await cache.mark_failure(7, "10.0.0.1", "cred-2", "timeout", 3, 3, "2026-01-02T00:00:00+00:00")
+        redis.round_trips = 0
+        states = await cache.get_failure_states(7, "10.0.0.1", ["cred-1", "cred-2", "cred-3"])
+        single = await cache.get_failure_state(7, "10.0.0.1", "cred-2")
+        return states, single
+
+    states, single = asyncio.run(scenario())
+
+    assert redis.round_trips == 2
+    assert states["cred-1"]["is_cooled"] is True
+    assert states["cred-1"]["error_message"] == "auth failed"
+    assert states["cred-2"]["cooldown_level"] == 3
+    assert states["cred-3"] == {}
+    assert "_expires_at" not in single
+    assert single == states["cred-2"]
+    key = "collect:task:7:host:10.0.0.1:failures"
+    assert set(redis.hashes[key]) == {"cred-1", "cred-2"}
+    assert redis.ttls[key] == cache.FAILURE_TTL_SECONDS
+
+
+def test_mark_success_clears_failures_in_one_round_trip(modules):
+    cache = modules.cache
+    redis = FakeRedis()
+
+    async def scenario():
+        modules.redis_pool.set_redis_pool(redis)
+        await cache.mark_failure(7, "10.0.0.1", "cred-1", "auth failed", 1, 1, "")
+        await cache.mark_failure(7, "10.0.0.1", "cred-2", "auth failed", 1, 1, "")
+        redis.round_trips = 0
+        await cache.mark_success(7, "10.0.0.1", "cred-3")
+        trips = redis.round_trips
+        return trips, await cache.get_success_credential(7, "10.0.0.1"), await cache.get_failure_state(7, "10.0.0.1", "cred-1")
+
+    trips, success, failure = asyncio.run(scenario())
+
+    assert trips == 1
+    assert success == "cred-3"
+    assert failure == {}
+    assert redis.hashes == {}
+
+
+def test_expired_cooldown_is_ignored(modules, monkeypatch):
+    cache = modules.cache
+    redis = FakeRedis()
+    cache_module = sys.modules["core.credential_state_cache"]
+
+    async def scenario():
+        modules.redis_pool.set_redis_pool(redis)
+        monkeypatch.setattr(cache_module.time, "time", lambda: 1_000_000)
+        await cache.mark_failure(7, "h", "cred-1", "auth failed", 1, 1, "")
+        monkeypatch.setattr(cache_module.time, "time", lambda: 1_000_000 + 3600)
+        return await cache.get_failure_state(7, "h", "cred-1")
+
+    assert asyncio.run(scenario()) == {}
+    stored = json.loads(redis.hashes["collect:task:7:host:h:failures"]["cred-1"])
+    assert stored["_expires_at"] == 1_000_000 + 3600
+
+
+def test_append_result_event_pipelines_trim(modules):
+    cache = modules.cache
+    redis = FakeRedis()
+
+    async def scenario():
+        modules.redis_pool.set_redis_pool(redis)
+        await cache.append_result_event({"host": "h", "finished_at": "2026-01-01T00:00:00+00:00"})
+
+    asyncio.run(scenario())
+
+    assert redis.round_trips == 1
+    (members,) = redis.zsets.values()
+    assert json.loads(next(iter(members)))["host"] == "h"
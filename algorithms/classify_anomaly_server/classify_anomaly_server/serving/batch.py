@@ -0,0 +1,228 @@
+"""多序列批量异常检测.
+
+单序列接口逐点构造 TimeSeriesPoint 再转 pandas，监控侧每分钟数千条序列时校验和转换开销占主导。
+批量接口直接接收列式数组（JSON 数组或 Arrow IPC），按数组整体校验，
+每条序列独立转换为 pd.Series 并调用模型（模型内部完成特征工程与 ECOD/EWMA/PELT 打分），
+多条序列在线程池中并行；单条序列失败只影响自身结果。
+"""
+
+import base64
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from .schemas import (
+    BATCH_MAX_DATA_POINTS,
+    BATCH_MAX_SERIES,
+    PREDICT_MAX_DATA_POINTS,
+    BatchPredictRequest,
+    ErrorDetail,
+    SeriesResult,
+)
+
+# 批量检测线程池大小
+BATCH_WORKERS = int(os.getenv("PREDICT_BATCH_WORKERS", str(min(8, os.cpu_count() or 1))))
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+class SeriesArrays(NamedTuple):
+    """一条序列的列式数据."""
+
+    series_id: str
+    timestamps: np.ndarray
+    values: np.ndarray
+    threshold: Optional[float] = None
+
+
+def get_batch_pool() -> ThreadPoolExecutor:
+    """进程内共享的检测线程池（惰性创建）."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(
+                    max_workers=BATCH_WORKERS, thread_name_prefix="anomaly-batch"
+                )
+    return _pool
+
+
+def shutdown_batch_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+            _pool = None
+
+
+def decode_arrow_ipc(payload: str) -> List[SeriesArrays]:
+    """解码 base64 Arrow IPC stream（列 series_id / timestamp / value），按 series_id 首次出现顺序分组."""
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc as ipc
+    except ImportError as e:
+        raise ValueError("服务端未安装 pyarrow，不支持 Arrow IPC 格式") from e
+
+    try:
+        table = ipc.open_stream(pa.py_buffer(base64.b64decode(payload))).read_all()
+    except Exception as e:
+        raise ValueError(f"Arrow IPC 解码失败: {e}") from e
+
+    missing = {"series_id", "timestamp", "value"} - set(table.column_names)
+    if missing:
+        raise ValueError(f"Arrow IPC 缺少列: {sorted(missing)}")
+
+    ids = table.column("series_id").to_numpy(zero_copy_only=False)
+    timestamps = table.column("timestamp").to_numpy(zero_copy_only=False)
+    values = table.column("value").to_numpy(zero_copy_only=False)
+
+    codes, uniques = pd.factorize(ids)
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+    return [
+        SeriesArrays(
+            str(series_id),
+            timestamps[order[bounds[i]:bounds[i + 1]]],
+            values[order[bounds[i]:bounds[i + 1]]],
+        )
+        for i, series_id in enumerate(uniques)
+    ]
+
+
+def request_arrays(request: BatchPredictRequest) -> List[SeriesArrays]:
+    """把批量请求展开为列式数组（请求级格式错误抛 ValueError）."""
+    if (request.series is None) == (request.arrow_ipc is None):
+        raise ValueError("series 与 arrow_ipc 必须且只能提供一个")
+    if request.arrow_ipc is not None:
+        return decode_arrow_ipc(request.arrow_ipc)
+    return [
+        SeriesArrays(
+            item.series_id,
+            np.asarray(item.timestamps, dtype=np.int64),
+            np.asarray(item.values, dtype=np.float64),
+            item.threshold,
+        )
+        for item in request.series
+    ]
+
+
+def check_batch_limits(items: List[SeriesArrays]) -> Optional[str]:
+    """请求级上界检查，超限返回错误消息."""
+    if not items:
+        return "请求数据不能为空"
+    if len(items) > BATCH_MAX_SERIES:
+        return f"序列数 {len(items)} 超过单次请求上限 {BATCH_MAX_SERIES}，请分批提交"
+    total = sum(len(item.timestamps) for item in items)
+    if total > BATCH_MAX_DATA_POINTS:
+        return f"数据点总数 {total} 超过单次请求上限 {BATCH_MAX_DATA_POINTS}，请分批提交"
+    return None
+
+
+def validate_arrays(item: SeriesArrays) -> Optional[str]:
+    """单条序列的数组级校验，不通过返回错误消息."""
+    if len(item.timestamps) != len(item.values):
+        return f"timestamps 与 values 长度不一致: {len(item.timestamps)} != {len(item.values)}"
+    if len(item.timestamps) == 0:
+        return "序列不能为空"
+    if len(item.timestamps) > PREDICT_MAX_DATA_POINTS:
+        return f"数据点数 {len(item.timestamps)} 超过单条序列上限 {PREDICT_MAX_DATA_POINTS}"
+    if not np.issubdtype(item.timestamps.dtype, np.integer):
+        return "timestamps 必须为整数（Unix 秒级时间戳）"
+    if not np.issubdtype(item.values.dtype, np.number):
+        return "values 必须为数值"
+    if not np.isfinite(item.values).all():
+        return "values 包含 NaN 或无穷值"
+    return None
+
+
+def to_series(timestamps: np.ndarray, values: np.ndarray) -> pd.Series:
+    """转换为按时间升序、重复时间戳保留最后一个值的 pd.Series（与单序列接口一致）."""
+    if len(timestamps) > 1 and np.any(timestamps[1:] < timestamps[:-1]):
+        order = np.argsort(timestamps, kind="stable")
+        timestamps, values = timestamps[order], values[order]
+    if len(timestamps) > 1:
+        keep = np.append(timestamps[1:] != timestamps[:-1], True)
+        if not keep.all():
+            timestamps, values = timestamps[keep], values[keep]
+    return pd.Series(values.astype(float), index=pd.to_datetime(timestamps, unit="s"))
+
+
+def _failure(series_id: str, code: str, message: str, error_type: str) -> SeriesResult:
+    return SeriesResult(
+        series_id=series_id,
+        success=False,
+        error=ErrorDetail(code=code, message=message, details={"error_type": error_type}),
+    )
+
+
+def score_series(model, item: SeriesArrays, threshold: Optional[float] = None) -> SeriesResult:
+    """校验、转换并检测一条序列."""
+    error = validate_arrays(item)
+    if error:
+        return _failure(item.series_id, "E1001", error, "ValidationError")
+
+    try:
+        series = to_series(item.timestamps, item.values)
+
+        inferred_freq = None
+        if len(series) >= 3:
+            try:
+                inferred_freq = pd.infer_freq(series.index)
+            except Exception:
+                inferred_freq = None
+
+        model_input = {"data": series}
+        threshold = item.threshold if item.threshold is not None else threshold
+        if threshold is not None:
+            model_input["threshold"] = threshold
+        detection_result = model.predict(model_input)
+
+        labels = np.asarray(detection_result.get("labels", []), dtype=int)
+        scores = np.asarray(detection_result.get("scores", []), dtype=float)
+        severity = detection_result.get("anomaly_severity", [])
+        if len(labels) != len(series) or len(scores) != len(series):
+            raise ValueError(
+                f"模型返回结果长度不匹配: 输入{len(series)}个点, "
+                f"返回labels={len(labels)}, scores={len(scores)}"
+            )
+        # 兼容性处理：如果模型没有返回anomaly_severity，使用scores作为fallback
+        severity = np.asarray(severity, dtype=float) if len(severity) == len(series) else scores
+
+        anomaly_count = int(labels.sum())
+        return SeriesResult(
+            series_id=item.series_id,
+            success=True,
+            timestamps=series.index.as_unit("s").asi8.tolist(),
+            values=series.to_numpy().tolist(),
+            labels=labels.tolist(),
+            scores=scores.tolist(),
+            anomaly_severity=severity.tolist(),
+            detected_anomalies=anomaly_count,
+            anomaly_rate=anomaly_count / len(series),
+            input_frequency=inferred_freq,
+        )
+    except ValueError as e:
+        return _failure(item.series_id, "E1001", str(e), "ValidationError")
+    except Exception as e:
+        logger.error(f"序列 {item.series_id} 检测失败: {e}")
+        return _failure(item.series_id, "E2002", f"异常检测失败: {e}", type(e).__name__)
+
+
+def run_batch(
+    model,
+    items: Iterable[SeriesArrays],
+    threshold: Optional[float] = None,
+    pool: Optional[ThreadPoolExecutor] = None,
+) -> List[SeriesResult]:
+    """在线程池中逐序列检测，结果顺序与输入一致."""
+    items = list(items)
+    if len(items) <= 1:
+        return [score_series(model, item, threshold) for item in items]
+    pool = pool or get_batch_pool()
+    return list(pool.map(lambda item: score_series(model, item, threshold), items))
@@ -28,3 +28,32 @@ health_check_counter = metrics.Counter(
     name="health_checks_total",
     documentation="Total number of health checks",
 )
+
+# 批量预测：处理的序列数（按结果状态）
+batch_series_counter = metrics.Counter(
+    name="batch_series_total",
+    documentation="Total number of series scored by batch predictions",
+    labelnames=["model_source", "status"],
+)
+
+# 批量预测：处理的数据点数
+batch_points_counter = metrics.Counter(
+    name="batch_data_points_total",
+    documentation="Total number of data points scored by batch predictions",
+    labelnames=["model_source"],
+)
+
+# 批量预测：单次请求耗时
+batch_duration = metrics.Histogram(
+    name="batch_prediction_duration_seconds",
+    documentation="Batch prediction duration in seconds",
+    labelnames=["model_source"],
+)
+
+# 批量预测：吞吐（序列/秒）
+batch_throughput = metrics.Histogram(
+    name="batch_series_per_second",
+    documentation="Batch prediction throughput in series per second",
+    labelnames=["model_source"],
+    buckets=(10, 50, 100, 500, 1000, 5000, 10000, 50000),
+)
@@ -9,6 +9,13 @@ from .api_schema import (
     ResponseMetadata,
     ErrorDetail,
     PREDICT_MAX_DATA_POINTS,
+    BATCH_MAX_SERIES,
+    BATCH_MAX_DATA_POINTS,
+    ColumnarSeries,
+    BatchPredictRequest,
+    SeriesResult,
+    BatchMetadata,
+    BatchPredictResponse,
 )
 
 __all__ = [
@@ -20,4 +27,11 @@ __all__ = [
     "ResponseMetadata",
     "ErrorDetail",
     "PREDICT_MAX_DATA_POINTS",
+    "BATCH_MAX_SERIES",
+    "BATCH_MAX_DATA_POINTS",
+    "ColumnarSeries",
+    "BatchPredictRequest",
+    "SeriesResult",
+    "BatchMetadata",
+    "BatchPredictResponse",
 ]
@@ -8,6 +8,10 @@ import pandas as pd
 # 单次预测请求允许的最大数据点数，可通过环境变量覆盖
 PREDICT_MAX_DATA_POINTS = int(os.getenv("PREDICT_MAX_DATA_POINTS", "10000"))
 
+# 批量预测：单次请求的最大序列数与总数据点数（单条序列仍受 PREDICT_MAX_DATA_POINTS 约束）
+BATCH_MAX_SERIES = int(os.getenv("PREDICT_BATCH_MAX_SERIES", "5000"))
+BATCH_MAX_DATA_POINTS = int(os.getenv("PREDICT_BATCH_MAX_DATA_POINTS", "2000000"))
+
 
 class TimeSeriesPoint(BaseModel):
     """时间序列数据点."""
@@ -106,3 +110,66 @@ class PredictResponse(BaseModel):
     results: Optional[list[AnomalyPoint]] = Field(None, description="检测结果列表")
     metadata: ResponseMetadata = Field(..., description="响应元数据")
     error: Optional[ErrorDetail] = Field(None, description="错误信息")
+
+
+class ColumnarSeries(BaseModel):
+    """列式时间序列：时间戳与观测值为等长数组（数组级校验，不逐点构造模型）."""
+
+    series_id: str = Field(..., description="序列标识")
+    timestamps: list[int] = Field(..., description="Unix时间戳数组（秒级）")
+    values: list[float] = Field(..., description="观测值数组")
+    threshold: Optional[float] = Field(
+        None, description="该序列的阈值（可选，覆盖请求级配置）", gt=0.0
+    )
+
+
+class BatchPredictRequest(BaseModel):
+    """批量异常检测请求.
+
+    series 与 arrow_ipc 二选一：
+    - series: 列式 JSON，每条序列一组 timestamps/values 数组
+    - arrow_ipc: base64 编码的 Arrow IPC stream，列为 series_id / timestamp / value（需安装 pyarrow）
+    """
+
+    series: Optional[list[ColumnarSeries]] = Field(
+        None, description="列式序列列表", max_length=BATCH_MAX_SERIES
+    )
+    arrow_ipc: Optional[str] = Field(None, description="base64 编码的 Arrow IPC stream")
+    config: Optional[DetectionConfig] = Field(None, description="检测配置（可选）")
+
+
+class SeriesResult(BaseModel):
+    """单条序列的检测结果（列式数组，按时间排序、去重后的点）."""
+
+    series_id: str = Field(..., description="序列标识")
+    success: bool = Field(..., description="是否成功")
+    timestamps: list[int] = Field(default_factory=list, description="Unix时间戳（秒级）")
+    values: list[float] = Field(default_factory=list, description="原始观测值")
+    labels: list[int] = Field(default_factory=list, description="标签: 0=正常, 1=异常")
+    scores: list[float] = Field(default_factory=list, description="异常分数")
+    anomaly_severity: list[float] = Field(default_factory=list, description="归一化的异常严重度 [0,1]")
+    detected_anomalies: int = Field(0, description="检测到的异常点数")
+    anomaly_rate: float = Field(0.0, description="异常率")
+    input_frequency: Optional[str] = Field(None, description="检测到的输入频率")
+    error: Optional[ErrorDetail] = Field(None, description="错误信息")
+
+
+class BatchMetadata(BaseModel):
+    """批量响应元数据."""
+
+    model_uri: Optional[str] = Field(None, description="模型URI")
+    series_count: int = Field(..., description="输入序列数")
+    failed_series: int = Field(0, description="失败的序列数")
+    input_data_points: int = Field(..., description="输入数据点总数")
+    detected_anomalies: int = Field(0, description="检测到的异常点总数")
+    execution_time_ms: float = Field(..., description="执行耗时（毫秒）")
+    series_per_second: float = Field(0.0, description="吞吐（序列/秒）")
+
+
+class BatchPredictResponse(BaseModel):
+    """批量异常检测响应（单条序列失败不影响其他序列）."""
+
+    success: bool = Field(default=True, description="请求是否成功")
+    results: Optional[list[SeriesResult]] = Field(None, description="每条序列的检测结果")
+    metadata: BatchMetadata = Field(..., description="响应元数据")
+    error: Optional[ErrorDetail] = Field(None, description="请求级错误信息")
@@ -1,5 +1,6 @@
 """BentoML service definition."""
 
+import asyncio
 import bentoml
 from loguru import logger
 import time
@@ -7,14 +8,27 @@ import os
 
 from .config import get_model_config
 from .exceptions import ModelInferenceError
+from .batch import check_batch_limits, request_arrays, run_batch, shutdown_batch_pool
 from .metrics import (
+    batch_duration,
+    batch_points_counter,
+    batch_series_counter,
+    batch_throughput,
     health_check_counter,
     model_load_counter,
     prediction_counter,
     prediction_duration,
 )
 from .models import load_model
-from .schemas import PredictRequest, PredictResponse, PREDICT_MAX_DATA_POINTS
+from .schemas import (
+    BatchMetadata,
+    BatchPredictRequest,
+    BatchPredictResponse,
+    ErrorDetail,
+    PredictRequest,
+    PredictResponse,
+    PREDICT_MAX_DATA_POINTS,
+)
 
 
 @bentoml.service(
@@ -97,6 +111,7 @@ class MLService:
         # - 关闭数据库连接
         # - 保存缓存状态
         # - 释放 GPU 显存
+        shutdown_batch_pool()
         logger.info("=== Cleanup completed ===")
 
     @bentoml.api
@@ -376,6 +391,93 @@ class MLService:
                 ),
             )
 
+    @bentoml.api
+    async def predict_batch(self, request: BatchPredictRequest) -> BatchPredictResponse:
+        """
+        多序列批量异常检测接口.
+
+        接收列式 payload（series: [{series_id, timestamps, values}] 或 Arrow IPC），
+        数组级校验后逐序列在线程池中检测；单条序列失败只体现在该序列的结果中。
+
+        Args:
+            request: 批量检测请求
+
+        Returns:
+            每条序列的检测结果
+        """
+        request_start = time.time()
+        model_uri = getattr(self.config, "mlflow_model_uri", None)
+
+        def _reject(code: str, message: str, error_type: str, series_count: int = 0, points: int = 0):
+            batch_series_counter.labels(
+                model_source=self.config.source, status="rejected"
+            ).inc(series_count)
+            return BatchPredictResponse(
+                success=False,
+                results=None,
+                metadata=BatchMetadata(
+                    model_uri=model_uri,
+                    series_count=series_count,
+                    input_data_points=points,
+                    execution_time_ms=(time.time() - request_start) * 1000,
+                ),
+                error=ErrorDetail(code=code, message=message, details={"error_type": error_type}),
+            )
+
+        try:
+            items = request_arrays(request)
+        except ValueError as e:
+            logger.error(f"Batch request validation failed: {e}")
+            return _reject("E1000", f"请求格式验证失败: {e}", "ValidationError")
+
+        total_points = sum(len(item.timestamps) for item in items)
+        limit_error = check_batch_limits(items)
+        if limit_error:
+            logger.warning(f"批量请求被拒绝: {limit_error}")
+            if not items:
+                return _reject("E1000", limit_error, "ValidationError")
+            return _reject("E1002", limit_error, "InputTooLarge", len(items), total_points)
+
+        logger.info(f"📥 Received batch anomaly detection request: series={len(items)}, data_points={total_points}")
+
+        threshold = request.config.threshold if request.config else None
+        detect_start = time.time()
+        results = await asyncio.get_running_loop().run_in_executor(
+            None, run_batch, self.model, items, threshold
+        )
+        detect_time = time.time() - detect_start
+
+        failed = sum(1 for result in results if not result.success)
+        anomalies = sum(result.detected_anomalies for result in results)
+        series_per_second = len(results) / detect_time if detect_time > 0 else 0.0
+
+        source = self.config.source
+        batch_series_counter.labels(model_source=source, status="success").inc(len(results) - failed)
+        batch_series_counter.labels(model_source=source, status="failure").inc(failed)
+        batch_points_counter.labels(model_source=source).inc(total_points)
+        batch_duration.labels(model_source=source).observe(time.time() - request_start)
+        batch_throughput.labels(model_source=source).observe(series_per_second)
+
+        logger.info(
+            f"📈 Batch summary: series={len(results)}, failed={failed}, anomalies={anomalies}, "
+            f"{series_per_second:.0f} series/s"
+        )
+
+        return BatchPredictResponse(
+            success=True,
+            results=results,
+            metadata=BatchMetadata(
+                model_uri=model_uri,
+                series_count=len(results),
+                failed_series=failed,
+                input_data_points=total_points,
+                detected_anomalies=anomalies,
+                execution_time_ms=(time.time() - request_start) * 1000,
+                series_per_second=series_per_second,
+            ),
+            error=None,
+        )
+
     @bentoml.api
     async def health(self) -> dict:
         """健康检查接口."""
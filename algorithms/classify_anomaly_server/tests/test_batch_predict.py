@@ -0,0 +1,192 @@
+"""多序列批量异常检测接口的单元测试。
+
+覆盖：
+- 列式 JSON / Arrow IPC 两种 payload 的解析与按序列分组
+- 数组级校验：单条序列失败不影响其他序列，请求级上界拒绝
+- 批量结果与单序列接口逐条检测结果一致（使用 DummyModel）
+- 批量与逐条调用单序列接口的吞吐对比（slow）
+"""
+
+import base64
+import sys
+import time
+import types
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+
+def _stub_bentoml():
+    """向 sys.modules 注入最小化的 bentoml 存根，避免真实 BentoML 启动。"""
+    bentoml = types.ModuleType("bentoml")
+    bentoml.service = lambda **kwargs: (lambda cls: cls)
+    bentoml.api = lambda fn=None, **kwargs: fn if fn is not None else (lambda f: f)
+    bentoml.on_deployment = lambda fn: fn
+    bentoml.on_shutdown = lambda fn: fn
+
+    bentoml_exceptions = types.ModuleType("bentoml.exceptions")
+
+    class BentoMLException(Exception):
+        error_code = 500
+
+    bentoml_exceptions.BentoMLException = BentoMLException
+    bentoml.exceptions = bentoml_exceptions
+
+    bentoml_metrics = types.ModuleType("bentoml.metrics")
+
+    def _make_metric(**kwargs):
+        m = MagicMock()
+        m.labels.return_value = m
+        return m
+
+    bentoml_metrics.Counter = _make_metric
+    bentoml_metrics.Histogram = _make_metric
+    bentoml.metrics = bentoml_metrics
+
+    sys.modules.setdefault("bentoml", bentoml)
+    sys.modules.setdefault("bentoml.exceptions", bentoml_exceptions)
+    sys.modules.setdefault("bentoml.metrics", bentoml_metrics)
+
+
+_stub_bentoml()
+
+
+from classify_anomaly_server.serving import batch  # noqa: E402
+from classify_anomaly_server.serving.models.dummy_model import DummyModel  # noqa: E402
+from classify_anomaly_server.serving.schemas import BatchPredictRequest  # noqa: E402
+
+
+def _service():
+    from classify_anomaly_server.serving.service import MLService
+
+    svc = object.__new__(MLService)
+    svc.model = DummyModel()
+    config = MagicMock()
+    config.source = "dummy"
+    config.mlflow_model_uri = None
+    svc.config = config
+    return svc
+
+
+def _series(series_id, n=20, seed=0):
+    rng = np.random.default_rng(seed)
+    values = rng.normal(size=n)
+    values[n // 2] = 25.0
+    return {
+        "series_id": series_id,
+        "timestamps": [1700000000 + 60 * i for i in range(n)],
+        "values": values.tolist(),
+    }
+
+
+def _arrow_payload(rows):
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+
+    table = pa.table(
+        {
+            "series_id": [r[0] for r in rows],
+            "timestamp": pa.array([r[1] for r in rows], type=pa.int64()),
+            "value": pa.array([r[2] for r in rows], type=pa.float64()),
+        }
+    )
+    sink = pa.BufferOutputStream()
+    with ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return base64.b64encode(sink.getvalue().to_pybytes()).decode()
+
+
+@pytest.mark.asyncio
+async def test_batch_matches_single_series_predict():
+    svc = _service()
+    payload = [_series(f"s{i}", seed=i) for i in range(3)]
+
+    response = await svc.predict_batch(BatchPredictRequest(series=payload, config={"threshold": 0.8}))
+
+    assert response.success is True
+    assert response.metadata.series_count == 3 and response.metadata.input_data_points == 60
+    for item, result in zip(payload, response.results):
+        single = await svc.predict(
+            [{"timestamp": t, "value": v} for t, v in zip(item["timestamps"], item["values"])],
+            {"threshold": 0.8},
+        )
+        assert result.series_id == item["series_id"]
+        assert result.labels == [p.label for p in single.results]
+        assert result.scores == pytest.approx([p.anomaly_score for p in single.results])
+        assert result.timestamps == item["timestamps"]
+    assert response.metadata.detected_anomalies == sum(r.detected_anomalies for r in response.results)
+
+
+@pytest.mark.asyncio
+async def test_invalid_series_fails_alone():
+    svc = _service()
+    bad_length = dict(_series("bad_length"), values=[1.0])
+    not_finite = _series("nan")
+    not_finite["values"][3] = float("nan")
+
+    response = await svc.predict_batch(
+        BatchPredictRequest(series=[_series("ok"), bad_length, not_finite])
+    )
+
+    assert response.success is True and response.metadata.failed_series == 2
+    ok, length_result, nan_result = response.results
+    assert ok.success and len(ok.labels) == 20
+    assert not length_result.success and length_result.error.code == "E1001"
+    assert "NaN" in nan_result.error.message
+
+
+@pytest.mark.asyncio
+async def test_request_level_rejections(monkeypatch):
+    svc = _service()
+
+    neither = await svc.predict_batch(BatchPredictRequest())
+    assert neither.success is False and neither.error.code == "E1000"
+
+    monkeypatch.setattr(batch, "BATCH_MAX_DATA_POINTS", 30)
+    too_large = await svc.predict_batch(BatchPredictRequest(series=[_series("a"), _series("b")]))
+    assert too_large.success is False and too_large.error.code == "E1002"
+    assert too_large.metadata.input_data_points == 40
+
+
+def test_to_series_sorts_and_keeps_last_duplicate():
+    series = batch.to_series(np.array([30, 10, 20, 10]), np.array([3.0, 1.0, 2.0, 9.0]))
+
+    assert (series.index.as_unit("s").asi8 == [10, 20, 30]).all()
+    assert series.tolist() == [9.0, 2.0, 3.0]
+
+
+@pytest.mark.asyncio
+async def test_arrow_ipc_payload_grouped_by_series():
+    pytest.importorskip("pyarrow")
+    rows = []
+    for i in range(10):
+        rows.append(("b", 1700000000 + 60 * i, float(i)))
+        rows.append(("a", 1700000000 + 60 * i, float(-i)))
+
+    items = batch.decode_arrow_ipc(_arrow_payload(rows))
+    assert [item.series_id for item in items] == ["b", "a"]
+    assert items[1].values.tolist() == [float(-i) for i in range(10)]
+
+    response = await _service().predict_batch(BatchPredictRequest(arrow_ipc=_arrow_payload(rows)))
+    assert [r.series_id for r in response.results] == ["b", "a"]
+    assert all(r.success for r in response.results)
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_benchmark_batch_vs_single_requests():
+    svc = _service()
+    payload = [_series(f"s{i}", n=120, seed=i) for i in range(1000)]
+
+    started = time.perf_counter()
+    response = await svc.predict_batch(BatchPredictRequest(series=payload))
+    batch_elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for item in payload:
+        await svc.predict([{"timestamp": t, "value": v} for t, v in zip(item["timestamps"], item["values"])])
+    single_elapsed = time.perf_counter() - started
+
+    assert response.metadata.failed_series == 0
+    assert batch_elapsed < single_elapsed
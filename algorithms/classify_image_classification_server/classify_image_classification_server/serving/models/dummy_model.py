@@ -6,20 +6,44 @@ from loguru import logger
 class DummyModel:
     """模拟模型,返回固定的预测结果."""
 
+    class_names = ["cat", "dog", "bird", "car", "plane", "ship"]
+
     def __init__(self):
         self.version = "0.1.0-dummy"
         logger.info("DummyModel initialized")
 
-    def predict(self, features: dict[str, float]) -> float:
+    def predict(self, model_input):
         """
         模拟预测.
 
         Args:
-            features: 特征字典
+            model_input: 图片列表（多个请求堆叠后的 PIL 图片列表），或特征字典
 
         Returns:
-            预测结果(所有特征值的和)
+            图片列表输入：每张图片一个 {"top5": [...]}，与 YOLO 包装器输出格式一致
+            特征字典输入：所有特征值的和
         """
-        result = sum(features.values())
-        logger.debug(f"DummyModel predict: {features} -> {result}")
-        return result
+        if isinstance(model_input, dict):
+            result = sum(model_input.values())
+            logger.debug(f"DummyModel predict: {model_input} -> {result}")
+            return result
+
+        results = [self._top5(image) for image in model_input]
+        logger.debug(f"DummyModel predicted {len(results)} images")
+        return results
+
+    def _top5(self, image) -> dict:
+        # 按图片尺寸生成确定性的伪置信度，便于测试比对
+        width, height = getattr(image, "size", (0, 0))
+        seed = (width * 31 + height) % len(self.class_names)
+        order = [(seed + i) % len(self.class_names) for i in range(5)]
+        return {
+            "top5": [
+                {
+                    "class_id": class_id,
+                    "class_name": self.class_names[class_id],
+                    "confidence": round(0.5 / (rank + 1), 4),
+                }
+                for rank, class_id in enumerate(order)
+            ]
+        }
@@ -6,7 +6,9 @@ import base64
 from io import BytesIO
 from PIL import Image
 import time
+from typing import Optional
 
+from .batching import AdaptiveBatcher, batching_enabled
 from .config import get_model_config
 from .exceptions import ModelInferenceError
 from .metrics import (
@@ -77,6 +79,24 @@ class MLService:
         # - 释放 GPU 显存
         logger.info("=== Cleanup completed ===")
 
+    def _get_batcher(self) -> Optional[AdaptiveBatcher]:
+        """惰性创建微批器（ADAPTIVE_BATCHING_ENABLED=false 时返回 None）."""
+        batcher = getattr(self, "_batcher", None)
+        if batcher is None and batching_enabled():
+            batcher = AdaptiveBatcher.from_env(
+                lambda images, _key: self.model.predict(images),
+                default_max_batch_size=32,
+            )
+            self._batcher = batcher
+        return batcher
+
+    async def _model_predict(self, images: list) -> list:
+        """调用模型：并发请求的图片堆叠为一次 model.predict，再按请求切分结果."""
+        batcher = self._get_batcher()
+        if batcher is None:
+            return self.model.predict(images)
+        return await batcher.submit(images)
+
     def _decode_base64_image(self, img_data: str) -> Image.Image:
         """
         解码base64图片，支持纯base64和Data URI格式.
@@ -251,8 +271,8 @@ class MLService:
         predict_error = None
 
         try:
-            # 直接传入PIL图片列表，YOLO自动批处理
-            predictions = self.model.predict(valid_images)
+            # 直接传入PIL图片列表，YOLO自动批处理；并发请求的图片合并为同一批
+            predictions = await self._model_predict(valid_images)
             predict_time = time.time() - predict_start
 
             logger.info(f"✅ Prediction completed successfully")
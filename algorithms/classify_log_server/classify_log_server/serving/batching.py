@@ -0,0 +1,147 @@
+"""自适应请求微批（adaptive micro-batching）.
+
+小请求的模型调用固定开销（Python/MLflow 调用链、向量化、GPU 启动）占主导时，
+把同一 worker 内并发到达的多个请求的输入堆叠成一次模型调用，再按请求切分结果。
+
+策略与 BentoML adaptive batching 一致：
+- 第一个请求到达后最多等待 max_latency_ms，期间到达的请求并入同一批
+- 批内输入条数达到 max_batch_size 立即执行（单个请求超过上限时单独成批，不拆分请求）
+- 模型调用在线程池中执行，同一时刻每个 batcher 只有一批在执行；执行期间到达的请求自然排队成下一批
+- 推理参数不同的请求（key 不同）分组调用，互不混批
+- 合批调用失败时逐个请求重试，单个坏请求不会拖垮同批的其他请求
+
+配置（环境变量）：
+- ADAPTIVE_BATCHING_ENABLED: 是否启用（默认 true）
+- BATCH_MAX_SIZE: 单批最大输入条数
+- BATCH_MAX_LATENCY_MS: 最大等待时间（毫秒）
+"""
+
+import asyncio
+import os
+from typing import Any, Callable, Hashable, Optional
+
+from loguru import logger
+
+
+def batching_enabled() -> bool:
+    return os.getenv("ADAPTIVE_BATCHING_ENABLED", "true").lower() == "true"
+
+
+def slice_output(output: Any, start: int, end: int) -> Any:
+    """按输入区间切分模型输出（list / numpy 数组 / DataFrame）."""
+    if hasattr(output, "iloc"):
+        return output.iloc[start:end].reset_index(drop=True)
+    return output[start:end]
+
+
+class AdaptiveBatcher:
+    """把并发请求的输入堆叠成一次模型调用.
+
+    Args:
+        predict_fn: predict_fn(inputs, key) -> 与 inputs 等长、可按 slice_output 切分的输出
+        max_batch_size: 单批最大输入条数
+        max_latency_ms: 第一个请求最多等待的时间
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[list, Hashable], Any],
+        max_batch_size: int = 64,
+        max_latency_ms: float = 5.0,
+    ):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_latency = max(0.0, max_latency_ms) / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop = None
+        self._carry = None
+        self.batches = 0
+        self.requests = 0
+
+    @classmethod
+    def from_env(cls, predict_fn, default_max_batch_size: int, default_max_latency_ms: float = 5.0):
+        return cls(
+            predict_fn,
+            max_batch_size=int(os.getenv("BATCH_MAX_SIZE", str(default_max_batch_size))),
+            max_latency_ms=float(os.getenv("BATCH_MAX_LATENCY_MS", str(default_max_latency_ms))),
+        )
+
+    async def submit(self, inputs: list, key: Hashable = None) -> Any:
+        """提交一个请求的输入，返回该请求对应的模型输出."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._carry = None
+            self._worker = loop.create_task(self._run())
+        future = loop.create_future()
+        self._queue.put_nowait((list(inputs), key, future))
+        return await future
+
+    async def _next(self, timeout: Optional[float] = None):
+        if self._carry is not None:
+            item, self._carry = self._carry, None
+            return item
+        if timeout is None:
+            return await self._queue.get()
+        return await asyncio.wait_for(self._queue.get(), timeout)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            first = await self._next()
+            batch = [first]
+            size = len(first[0])
+            deadline = loop.time() + self.max_latency
+            while size < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await self._next(timeout)
+                except asyncio.TimeoutError:
+                    break
+                if size + len(item[0]) > self.max_batch_size:
+                    self._carry = item
+                    break
+                batch.append(item)
+                size += len(item[0])
+            await self._execute(batch)
+
+    async def _execute(self, batch) -> None:
+        loop = asyncio.get_running_loop()
+        self.batches += 1
+        self.requests += len(batch)
+
+        groups = {}
+        for item in batch:
+            groups.setdefault(item[1], []).append(item)
+
+        for key, items in groups.items():
+            stacked = [x for inputs, _, _ in items for x in inputs]
+            try:
+                output = await loop.run_in_executor(None, self.predict_fn, stacked, key)
+                if len(items) == 1:
+                    if not items[0][2].done():
+                        items[0][2].set_result(output)
+                    continue
+                offset = 0
+                for inputs, _, future in items:
+                    if not future.done():
+                        future.set_result(slice_output(output, offset, offset + len(inputs)))
+                    offset += len(inputs)
+            except Exception as e:
+                if len(items) == 1:
+                    if not items[0][2].done():
+                        items[0][2].set_exception(e)
+                    continue
+                logger.warning(f"合批推理失败，逐个请求重试: {e}")
+                for inputs, _, future in items:
+                    try:
+                        output = await loop.run_in_executor(None, self.predict_fn, inputs, key)
+                        if not future.done():
+                            future.set_result(output)
+                    except Exception as single_error:
+                        if not future.done():
+                            future.set_exception(single_error)
@@ -1,5 +1,8 @@
 """Dummy model for demonstration and testing."""
 
+import zlib
+
+import pandas as pd
 from loguru import logger
 
 
@@ -10,16 +13,32 @@ class DummyModel:
         self.version = "0.1.0-dummy"
         logger.info("DummyModel initialized")
 
-    def predict(self, features: dict[str, float]) -> float:
+    def predict(self, model_input):
         """
         模拟预测.
 
         Args:
-            features: 特征字典
+            model_input: 日志列表（多个请求堆叠后的日志列表），或特征字典
 
         Returns:
-            预测结果(所有特征值的和)
+            日志列表输入：与 SpellWrapper 输出格式一致的 DataFrame（log / cluster_id / template），
+                按首个 token 聚类（与批次组成无关），空日志为 -1
+            特征字典输入：所有特征值的和
         """
-        result = sum(features.values())
-        logger.debug(f"DummyModel predict: {features} -> {result}")
-        return result
+        if isinstance(model_input, dict):
+            result = sum(model_input.values())
+            logger.debug(f"DummyModel predict: {model_input} -> {result}")
+            return result
+
+        logs = list(model_input)
+        first_tokens = [log.split()[0] if log.split() else None for log in logs]
+
+        result_df = pd.DataFrame(
+            {
+                "log": logs,
+                "cluster_id": [zlib.crc32(token.encode()) % 1000 if token else -1 for token in first_tokens],
+                "template": [f"{token} <*>" if token else None for token in first_tokens],
+            }
+        )
+        logger.debug(f"DummyModel predicted {len(logs)} logs")
+        return result_df
@@ -2,10 +2,12 @@
 
 import time
 from collections import Counter
+from typing import Optional
 
 import bentoml
 from loguru import logger
 
+from .batching import AdaptiveBatcher, batching_enabled
 from .config import get_model_config
 from .exceptions import ModelInferenceError
 from .metrics import (
@@ -77,6 +79,24 @@ class MLService:
         # - 释放 GPU 显存
         logger.info("=== Cleanup completed ===")
 
+    def _get_batcher(self) -> Optional[AdaptiveBatcher]:
+        """惰性创建微批器（ADAPTIVE_BATCHING_ENABLED=false 时返回 None）."""
+        batcher = getattr(self, "_batcher", None)
+        if batcher is None and batching_enabled():
+            batcher = AdaptiveBatcher.from_env(
+                lambda logs, _key: self.model.predict(logs),
+                default_max_batch_size=10000,
+            )
+            self._batcher = batcher
+        return batcher
+
+    async def _model_predict(self, logs: list[str]):
+        """调用模型：并发请求的日志堆叠为一次 model.predict（跨请求去重），再按请求切分结果."""
+        batcher = self._get_batcher()
+        if batcher is None:
+            return self.model.predict(logs)
+        return await batcher.submit(logs)
+
     @bentoml.api
     async def predict(self, request: LogClusterRequest) -> LogClusterResponseV2:
         """
@@ -116,7 +136,7 @@ class MLService:
             import pandas as pd
 
             if hasattr(self.model, "predict"):
-                result_df = self.model.predict(data)
+                result_df = await self._model_predict(data)
             else:
                 result_df = pd.DataFrame(
                     {
@@ -0,0 +1,102 @@
+"""Spell 模型使用的 LCS 计算内核。
+
+原实现为纯 Python O(m·n) 二维 DP + lcs.insert(0, ...) 回溯，
+日志量大时 LCS 成为推理瓶颈。这里使用位并行 LCS（Allison-Dix / Hyyrö）：
+
+- 以 seq2 的每个位置为一个比特，预先为每个 token 构造匹配掩码
+- seq1 每个 token 只需常数次大整数运算即可得到 DP 的一整行，复杂度 O(m·⌈n/w⌉)
+- DP 第 i 行第 j 列的值 = j - popcount(V_i 的低 j 位)，回溯时按需还原，
+  与原 DP 回溯的分支顺序完全一致，返回的 LCS 与原实现相同
+
+token 可以是字符串或整数 id（推理时模板 token 编码为整数 id）。
+"""
+
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Sequence, Tuple
+
+
+def match_masks(seq2: Sequence[Hashable]) -> Dict[Hashable, int]:
+    """构造 seq2 的 token 匹配掩码：第 j 位为 1 表示 seq2[j] == token"""
+    masks = {}
+    for j, token in enumerate(seq2):
+        masks[token] = masks.get(token, 0) | (1 << j)
+    return masks
+
+
+def lcs_rows(seq1: Sequence[Hashable], masks: Dict[Hashable, int], n: int) -> List[int]:
+    """计算位并行 DP 的全部行向量（第 0 行为全 1，即 DP 第 0 行全为 0）"""
+    full = (1 << n) - 1
+    v = full
+    rows = [v]
+    for token in seq1:
+        u = v & masks.get(token, 0)
+        v = ((v + u) | (v - u)) & full
+        rows.append(v)
+    return rows
+
+
+def lcs_length(seq1: Sequence[Hashable], seq2: Sequence[Hashable], masks: Dict[Hashable, int] = None) -> int:
+    """LCS 长度"""
+    n = len(seq2)
+    if not seq1 or not n:
+        return 0
+    masks = match_masks(seq2) if masks is None else masks
+    full = (1 << n) - 1
+    v = full
+    for token in seq1:
+        u = v & masks.get(token, 0)
+        v = ((v + u) | (v - u)) & full
+    return n - v.bit_count()
+
+
+def lcs_positions(
+    seq1: Sequence[Hashable], seq2: Sequence[Hashable], masks: Dict[Hashable, int] = None
+) -> Tuple[int, ...]:
+    """LCS 在 seq1 中的位置（升序），回溯规则与原二维 DP 一致"""
+    m, n = len(seq1), len(seq2)
+    if not m or not n:
+        return ()
+    masks = match_masks(seq2) if masks is None else masks
+    rows = lcs_rows(seq1, masks, n)
+
+    def dp(i, j):
+        return j - (rows[i] & ((1 << j) - 1)).bit_count()
+
+    positions = []
+    i, j = m, n
+    while i > 0 and j > 0:
+        if seq1[i - 1] == seq2[j - 1]:
+            positions.append(i - 1)
+            i -= 1
+            j -= 1
+        elif dp(i - 1, j) > dp(i, j - 1):
+            i -= 1
+        else:
+            j -= 1
+    positions.reverse()
+    return tuple(positions)
+
+
+class LRUCache(OrderedDict):
+    """有界 LRU 缓存：命中时移到末尾，超出容量时淘汰最久未使用的条目"""
+
+    def __init__(self, maxsize: int = 50000):
+        super().__init__()
+        self.maxsize = maxsize
+
+    def lookup(self, key):
+        """命中返回缓存值，未命中返回 None"""
+        value = self.get(key)
+        if value is not None:
+            self.move_to_end(key)
+        return value
+
+    def store(self, key, value) -> None:
+        self[key] = value
+        self.move_to_end(key)
+        if len(self) > self.maxsize:
+            self.popitem(last=False)
+
+    def __reduce__(self):
+        # 序列化时不带缓存内容，只保留容量
+        return (self.__class__, (self.maxsize,))
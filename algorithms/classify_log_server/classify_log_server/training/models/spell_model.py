@@ -3,12 +3,55 @@
 from typing import Any, Dict, List, Optional, Tuple, Set
 from collections import Counter, defaultdict
 from datetime import datetime
+import copy
 import time
 
 import mlflow
 from loguru import logger
 
 from .base import BaseLogClusterModel, ModelRegistry
+from .lcs import LRUCache, lcs_length, lcs_positions, match_masks
+
+# LCS 缓存默认容量（条目数）
+DEFAULT_CACHE_SIZE = 50000
+# 并行批量预测时每个进程任务处理的日志条数
+PREDICT_CHUNK_SIZE = 20000
+
+
+class _PredictIndex:
+    """推理索引：模板 token 的整数编码、匹配掩码，以及无通配符模板的完全匹配表
+    
+    模板 token 全部在 vocab 中，日志中不在 vocab 的 token 编码为 -1（与任何模板 token 都不相等），
+    因此按 (日志 id 元组, 模板 id 元组) 缓存 LCS 结果是精确的。
+    """
+
+    def __init__(self, clusters: List[Dict]):
+        self.vocab = {}
+        self.templates = []
+        self.exact = {}
+        for idx, cluster in enumerate(clusters):
+            template = cluster['template']
+            ids = tuple(self.vocab.setdefault(token, len(self.vocab)) for token in template)
+            self.templates.append((ids, match_masks(ids)))
+            if template and '<*>' not in template:
+                self.exact.setdefault(tuple(template), idx)
+
+    def encode(self, tokens: List[str]) -> Tuple[int, ...]:
+        vocab = self.vocab
+        return tuple(vocab.get(token, -1) for token in tokens)
+
+
+# 进程池 worker 内的模型副本
+_worker_model = None
+
+
+def _init_predict_worker(model: "SpellModel") -> None:
+    global _worker_model
+    _worker_model = model
+
+
+def _predict_worker_chunk(logs: List[str]) -> List[int]:
+    return _worker_model._predict_unique(logs)
 
 
 @ModelRegistry.register("Spell")
@@ -32,6 +75,7 @@ class SpellModel(BaseLogClusterModel):
                 - use_position_weight: 是否启用位置权重 (默认 True)
                 - position_weight_config: 位置权重配置 (可选)
                 - use_cache: 是否启用 LCS 缓存 (默认 True)
+                - cache_size: LCS 缓存容量，LRU 淘汰 (默认 50000)
                 - merge_threshold: 聚类合并阈值 (默认 0.85)
                 - diversity_threshold: Token 多样性阈值 (默认 3)
                 - min_cluster_size: 最小聚类大小 (默认 5)
@@ -52,6 +96,7 @@ class SpellModel(BaseLogClusterModel):
         
         # 优化参数
         self.use_cache = kwargs.get("use_cache", True)
+        self.cache_size = kwargs.get("cache_size", DEFAULT_CACHE_SIZE)
         self.merge_threshold = kwargs.get("merge_threshold", 0.85)
         self.diversity_threshold = kwargs.get("diversity_threshold", 3)
         self.min_cluster_size = kwargs.get("min_cluster_size", 5)
@@ -62,8 +107,9 @@ class SpellModel(BaseLogClusterModel):
         # 初始化内部状态
         self.clusters = []  # 聚类列表
         self.token_index = defaultdict(set)  # 倒排索引
-        self.lcs_cache = {} if self.use_cache else None
+        self.lcs_cache = LRUCache(self.cache_size) if self.use_cache else None
         self.raw_logs = []  # 存储原始日志（用于可解释性）
+        self._predict_index = None  # 推理索引，模板变化后重建
         
         super().__init__(config=kwargs)
         logger.info(f"SpellModel initialized with tau={self.tau}, use_position_weight={self.use_position_weight}")
@@ -99,6 +145,7 @@ class SpellModel(BaseLogClusterModel):
         if self.lcs_cache is not None:
             self.lcs_cache.clear()
         self.raw_logs = []
+        self._predict_index = None
         
         # 统计信息
         stats = {
@@ -241,6 +288,14 @@ class SpellModel(BaseLogClusterModel):
                 "模型未训练，请先调用 fit() 方法"
             )
 
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # 兼容旧版本序列化的模型：LCS 缓存为无界 dict、没有推理索引
+        self.__dict__.setdefault("cache_size", DEFAULT_CACHE_SIZE)
+        if self.lcs_cache is not None and not isinstance(self.lcs_cache, LRUCache):
+            self.lcs_cache = LRUCache(self.cache_size)
+        self._predict_index = None
+
     def predict(self, logs: List[str]) -> List[int]:
         """
         预测日志的聚类 ID。
@@ -251,56 +306,139 @@ class SpellModel(BaseLogClusterModel):
         Returns:
             聚类 ID 列表（模板 ID）
         """
+        return self.predict_batch(logs)
+
+    def predict_batch(
+        self,
+        logs: List[str],
+        n_jobs: int = 1,
+        chunk_size: int = PREDICT_CHUNK_SIZE,
+    ) -> List[int]:
+        """
+        批量预测日志的聚类 ID。
+        
+        - 相同的日志只匹配一次
+        - 与无通配符模板完全一致的日志直接命中（相似度为 1，不再计算 LCS）
+        - n_jobs > 1 且去重后日志超过 chunk_size 时，按 chunk_size 分块交给进程池并行匹配
+
+        Args:
+            logs: 预处理后的日志消息列表
+            n_jobs: 并行进程数（1 表示在当前进程内匹配）
+            chunk_size: 每个进程任务处理的日志条数
+
+        Returns:
+            聚类 ID 列表（模板 ID），未匹配为 -1
+        """
         self._check_fitted()
 
-        cluster_ids = []
+        unique = {}
+        inverse = [unique.setdefault(log, len(unique)) for log in logs]
+        unique_logs = list(unique)
 
-        for log in logs:
-            tokens = self._tokenize(log)
-            
-            if not tokens:
-                cluster_ids.append(-1)
-                continue
-            
-            # 查找最佳匹配聚类
-            best_cluster_id = -1
-            best_similarity = 0.0
-            
-            # 使用倒排索引快速获取候选聚类
-            candidate_clusters = set()
-            for token in tokens:
-                if token in self.token_index:
-                    candidate_clusters.update(self.token_index[token])
-            
-            # 如果没有候选，尝试所有聚类（fallback）
-            if not candidate_clusters:
-                candidate_clusters = set(range(len(self.clusters)))
-            
-            # 快速过滤 + LCS 匹配
-            for cluster_id in candidate_clusters:
-                cluster = self.clusters[cluster_id]
-                template = cluster['template']
-                
-                # 快速过滤
-                if not self._quick_filter(tokens, template):
-                    continue
-                
-                # 计算 LCS 相似度
-                similarity = self._lcs_similarity(tokens, template)
-                
-                if similarity > best_similarity:
-                    best_similarity = similarity
-                    best_cluster_id = cluster_id
-            
-            # 如果相似度达到阈值，返回聚类 ID，否则返回 -1
-            if best_similarity >= self.tau:
-                cluster_ids.append(best_cluster_id)
-            else:
-                cluster_ids.append(-1)
+        if n_jobs > 1 and len(unique_logs) > chunk_size:
+            labels = self._predict_parallel(unique_logs, n_jobs, chunk_size)
+        else:
+            labels = self._predict_unique(unique_logs)
 
-        logger.info(f"Predicted cluster IDs for {len(logs)} logs")
+        cluster_ids = [labels[i] for i in inverse]
+        logger.info(f"Predicted cluster IDs for {len(logs)} logs ({len(unique_logs)} unique)")
         return cluster_ids
 
+    def _get_predict_index(self) -> _PredictIndex:
+        if self._predict_index is None:
+            self._predict_index = _PredictIndex(self.clusters)
+        return self._predict_index
+
+    def _predict_unique(self, logs: List[str]) -> List[int]:
+        """逐条匹配（调用方已去重）"""
+        index = self._get_predict_index()
+        return [self._match_log(log, index) for log in logs]
+
+    def _predict_parallel(self, logs: List[str], n_jobs: int, chunk_size: int) -> List[int]:
+        """进程池分块匹配，worker 只携带推理所需的模板状态"""
+        from concurrent.futures import ProcessPoolExecutor
+
+        chunks = [logs[i:i + chunk_size] for i in range(0, len(logs), chunk_size)]
+        with ProcessPoolExecutor(
+            max_workers=min(n_jobs, len(chunks)),
+            initializer=_init_predict_worker,
+            initargs=(self._inference_copy(),),
+        ) as pool:
+            return [label for labels in pool.map(_predict_worker_chunk, chunks) for label in labels]
+
+    def _inference_copy(self) -> "SpellModel":
+        """只保留模板、倒排索引和匹配参数的轻量副本（不含训练日志和缓存）"""
+        model = copy.copy(self)
+        model.clusters = [{'id': cluster['id'], 'template': cluster['template']} for cluster in self.clusters]
+        model.raw_logs = []
+        model.lcs_cache = LRUCache(self.cache_size) if self.lcs_cache is not None else None
+        model._predict_index = None
+        return model
+
+    def _match_log(self, log: str, index: _PredictIndex) -> int:
+        """匹配单条日志，返回聚类 ID 或 -1"""
+        tokens = self._tokenize(log)
+        if not tokens:
+            return -1
+
+        # 完全匹配无通配符模板：相似度为 1
+        exact = index.exact.get(tuple(tokens))
+        if exact is not None:
+            return exact
+
+        # 使用倒排索引快速获取候选聚类
+        candidate_clusters = set()
+        for token in tokens:
+            if token in self.token_index:
+                candidate_clusters.update(self.token_index[token])
+
+        # 如果没有候选，尝试所有聚类（fallback）
+        if not candidate_clusters:
+            candidate_clusters = set(range(len(self.clusters)))
+
+        token_ids = index.encode(tokens)
+        best_cluster_id = -1
+        best_similarity = 0.0
+
+        # 快速过滤 + LCS 匹配
+        for cluster_id in candidate_clusters:
+            template = self.clusters[cluster_id]['template']
+
+            # 快速过滤
+            if not self._quick_filter(tokens, template):
+                continue
+
+            # 计算 LCS 相似度（整数编码 + 位并行内核）
+            similarity = self._indexed_similarity(tokens, token_ids, index.templates[cluster_id])
+
+            if similarity > best_similarity:
+                best_similarity = similarity
+                best_cluster_id = cluster_id
+
+        # 如果相似度达到阈值，返回聚类 ID，否则返回 -1
+        return best_cluster_id if best_similarity >= self.tau else -1
+
+    def _indexed_similarity(
+        self,
+        tokens: List[str],
+        token_ids: Tuple[int, ...],
+        template_entry: Tuple[Tuple[int, ...], Dict[int, int]],
+    ) -> float:
+        """与 _lcs_similarity 相同的相似度，使用推理索引中的整数编码和预计算掩码"""
+        template_ids, masks = template_entry
+        if not template_ids:
+            return 0.0
+        if not self.use_position_weight:
+            return lcs_length(token_ids, template_ids, masks) / len(tokens)
+
+        key = (token_ids, template_ids)
+        positions = self.lcs_cache.lookup(key) if self.lcs_cache is not None else None
+        if positions is None:
+            positions = lcs_positions(token_ids, template_ids, masks)
+            if self.lcs_cache is not None:
+                self.lcs_cache.store(key, positions)
+        return self._weighted_similarity(tokens, positions)
+
     def evaluate(
         self,
         logs: List[str],
@@ -1136,42 +1274,19 @@ class SpellModel(BaseLogClusterModel):
         Returns:
             LCS 序列
         """
-        # 检查缓存
-        if self.lcs_cache is not None:
-            key = (tuple(seq1), tuple(seq2))
-            if key in self.lcs_cache:
-                return self.lcs_cache[key]
-        
-        # 动态规划计算 LCS
-        m, n = len(seq1), len(seq2)
-        dp = [[0] * (n + 1) for _ in range(m + 1)]
-        
-        for i in range(1, m + 1):
-            for j in range(1, n + 1):
-                if seq1[i-1] == seq2[j-1]:
-                    dp[i][j] = dp[i-1][j-1] + 1
-                else:
-                    dp[i][j] = max(dp[i-1][j], dp[i][j-1])
-        
-        # 回溯构建 LCS
-        lcs = []
-        i, j = m, n
-        while i > 0 and j > 0:
-            if seq1[i-1] == seq2[j-1]:
-                lcs.insert(0, seq1[i-1])
-                i -= 1
-                j -= 1
-            elif dp[i-1][j] > dp[i][j-1]:
-                i -= 1
-            else:
-                j -= 1
-        
-        # 更新缓存
-        if self.lcs_cache is not None and len(self.lcs_cache) < 5000:
-            key = (tuple(seq1), tuple(seq2))
-            self.lcs_cache[key] = lcs
-        
-        return lcs
+        return [seq1[i] for i in self._lcs_positions(seq1, seq2)]
+    
+    def _lcs_positions(self, seq1: List[str], seq2: List[str]) -> Tuple[int, ...]:
+        """LCS 在 seq1 中的位置（位并行内核 + LRU 缓存）"""
+        if self.lcs_cache is None:
+            return lcs_positions(seq1, seq2)
+        
+        key = (tuple(seq1), tuple(seq2))
+        positions = self.lcs_cache.lookup(key)
+        if positions is None:
+            positions = lcs_positions(seq1, seq2)
+            self.lcs_cache.store(key, positions)
+        return positions
     
     def _get_position_weight(self, position: int, length: int) -> float:
         """获取位置权重
@@ -1212,14 +1327,23 @@ class SpellModel(BaseLogClusterModel):
         if not seq1 or not seq2:
             return 0.0
         
-        lcs = self._compute_lcs(seq1, seq2)
-        
         if not self.use_position_weight:
             # 标准 LCS 相似度
-            return len(lcs) / len(seq1)
+            return lcs_length(seq1, seq2) / len(seq1)
         
-        # 位置加权相似度
-        lcs_set = set(lcs)
+        return self._weighted_similarity(seq1, self._lcs_positions(seq1, seq2))
+    
+    def _weighted_similarity(self, seq1: List[str], positions: Tuple[int, ...]) -> float:
+        """位置加权相似度：seq1 中出现在 LCS 里的 token 按位置权重计分
+        
+        Args:
+            seq1: 序列1
+            positions: LCS 在 seq1 中的位置
+            
+        Returns:
+            相似度得分 [0, 1]
+        """
+        lcs_set = {seq1[i] for i in positions}
         total_weight = 0.0
         max_weight = 0.0
         
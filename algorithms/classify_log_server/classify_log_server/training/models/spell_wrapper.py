@@ -1,5 +1,6 @@
 """Spell 模型的 MLflow pyfunc 封装器"""
 
+import os
 from typing import Any, Dict, List, Union
 
 import mlflow
@@ -53,8 +54,9 @@ class SpellWrapper(mlflow.pyfunc.PythonModel):
             logs = self.preprocessor.preprocess(logs)
             logger.debug(f"Preprocessed {len(logs)} logs")
 
-        # 获取预测结果
-        cluster_ids = self.model.predict(logs)
+        # 获取预测结果（批量：去重 + 可选进程池，进程数由 SPELL_PREDICT_WORKERS 配置）
+        n_jobs = int(os.getenv("SPELL_PREDICT_WORKERS", "1"))
+        cluster_ids = self.model.predict_batch(logs, n_jobs=n_jobs)
 
         # 获取每条日志的模板
         templates = [self.model.get_template_by_id(cid) for cid in cluster_ids]
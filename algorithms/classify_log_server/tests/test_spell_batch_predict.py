@@ -0,0 +1,167 @@
+"""SpellModel 位并行 LCS 与批量预测的单元测试。
+
+覆盖：
+- 位并行 LCS 与原二维 DP 回溯结果一致
+- LRU 缓存容量有界
+- predict_batch（去重、完全匹配快速路径、进程池）与原逐条匹配结果一致
+- 旧版本序列化模型（dict 缓存）加载后可用
+- 批量预测耗时对比（slow）
+"""
+
+import pickle
+import random
+import time
+
+import pytest
+
+from classify_log_server.training.models.lcs import LRUCache, lcs_length, lcs_positions
+from classify_log_server.training.models.spell_model import SpellModel
+
+
+def _legacy_lcs(seq1, seq2):
+    """原实现：二维 DP + 回溯"""
+    m, n = len(seq1), len(seq2)
+    dp = [[0] * (n + 1) for _ in range(m + 1)]
+    for i in range(1, m + 1):
+        for j in range(1, n + 1):
+            if seq1[i - 1] == seq2[j - 1]:
+                dp[i][j] = dp[i - 1][j - 1] + 1
+            else:
+                dp[i][j] = max(dp[i - 1][j], dp[i][j - 1])
+    lcs = []
+    i, j = m, n
+    while i > 0 and j > 0:
+        if seq1[i - 1] == seq2[j - 1]:
+            lcs.insert(0, seq1[i - 1])
+            i -= 1
+            j -= 1
+        elif dp[i - 1][j] > dp[i][j - 1]:
+            i -= 1
+        else:
+            j -= 1
+    return lcs
+
+
+def _legacy_predict(model, logs):
+    """原实现：逐条分词 + 候选聚类 LCS 匹配"""
+    cluster_ids = []
+    for log in logs:
+        tokens = log.split()
+        if not tokens:
+            cluster_ids.append(-1)
+            continue
+        candidates = set()
+        for token in tokens:
+            if token in model.token_index:
+                candidates.update(model.token_index[token])
+        if not candidates:
+            candidates = set(range(len(model.clusters)))
+        best_id, best_sim = -1, 0.0
+        for cluster_id in candidates:
+            template = model.clusters[cluster_id]["template"]
+            if not model._quick_filter(tokens, template):
+                continue
+            lcs = _legacy_lcs(tokens, template)
+            if model.use_position_weight:
+                lcs_set = set(lcs)
+                total = weights = 0.0
+                for i, token in enumerate(tokens):
+                    weight = model._get_position_weight(i, len(tokens))
+                    weights += weight
+                    if token in lcs_set:
+                        total += weight
+                sim = total / weights
+            else:
+                sim = len(lcs) / len(tokens)
+            if sim > best_sim:
+                best_sim, best_id = sim, cluster_id
+        cluster_ids.append(best_id if best_sim >= model.tau else -1)
+    return cluster_ids
+
+
+def _logs(count, seed=0):
+    rng = random.Random(seed)
+    patterns = [
+        "User {} login failed from IP {}",
+        "Database connection timeout after {} seconds on {}",
+        "Service {} started successfully on port {}",
+        "Disk usage {} percent on volume {}",
+        "Request {} completed with status {}",
+    ]
+    return [
+        rng.choice(patterns).format(rng.choice(["alice", "bob", "carol", "42", "7"]), rng.randint(1, 40))
+        for _ in range(count)
+    ]
+
+
+def _fit(**kwargs):
+    model = SpellModel(tau=0.5, **kwargs)
+    model.fit(_logs(300), log_to_mlflow=False, verbose=False)
+    return model
+
+
+def test_bit_parallel_lcs_matches_dp():
+    rng = random.Random(1)
+    for _ in range(2000):
+        seq1 = [rng.choice("abcd") for _ in range(rng.randint(0, 12))]
+        seq2 = [rng.choice("abcde") for _ in range(rng.randint(0, 70))]
+        expected = _legacy_lcs(seq1, seq2)
+        assert [seq1[i] for i in lcs_positions(seq1, seq2)] == expected
+        assert lcs_length(seq1, seq2) == len(expected)
+
+
+def test_lru_cache_is_bounded():
+    cache = LRUCache(maxsize=2)
+    cache.store("a", (0,))
+    cache.store("b", (1,))
+    assert cache.lookup("a") == (0,)
+    cache.store("c", ())
+
+    assert list(cache) == ["a", "c"]
+    assert cache.lookup("c") == ()
+    assert pickle.loads(pickle.dumps(cache)).maxsize == 2
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"use_position_weight": False}, {"use_cache": False}])
+def test_predict_batch_matches_legacy(kwargs):
+    model = _fit(**kwargs)
+    logs = _logs(500, seed=1) + ["", "completely unrelated message", model.templates[0]]
+
+    assert model.predict_batch(logs) == _legacy_predict(model, logs)
+    assert model.predict(logs) == _legacy_predict(model, logs)
+
+
+def test_predict_batch_process_pool():
+    model = _fit()
+    logs = _logs(400, seed=2) + [f"unique event {i}" for i in range(200)]
+
+    assert model.predict_batch(logs, n_jobs=2, chunk_size=100) == model.predict_batch(logs)
+
+
+def test_legacy_pickled_model_upgrades_cache():
+    model = _fit()
+    state = dict(model.__dict__, lcs_cache={})
+    state.pop("cache_size")
+    state.pop("_predict_index")
+    restored = SpellModel.__new__(SpellModel)
+    restored.__setstate__(state)
+
+    assert isinstance(restored.lcs_cache, LRUCache)
+    assert restored.predict(_logs(50, seed=3)) == _legacy_predict(model, _logs(50, seed=3))
+
+
+@pytest.mark.slow
+def test_benchmark_batch_vs_legacy():
+    model = _fit()
+    logs = _logs(20000, seed=4)
+
+    started = time.perf_counter()
+    batch = model.predict_batch(logs)
+    batch_elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    legacy = _legacy_predict(model, logs)
+    legacy_elapsed = time.perf_counter() - started
+
+    assert batch == legacy
+    assert batch_elapsed * 3 < legacy_elapsed
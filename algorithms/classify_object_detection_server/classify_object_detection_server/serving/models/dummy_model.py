@@ -34,17 +34,19 @@ class DummyModel:
         # 处理输入
         if isinstance(model_input, dict):
             images = model_input.get("images", [])
-            batch_size = len(images) if isinstance(images, list) else 1
-        elif isinstance(model_input, list):
-            batch_size = len(model_input)
         else:
-            batch_size = 1
+            images = model_input
+        if not isinstance(images, list):
+            images = [images]
+        batch_size = len(images)
 
         logger.debug(f"DummyModel predict for batch_size={batch_size}")
 
-        # 为每张图片生成模拟检测结果
+        # 为每张图片生成模拟检测结果（由图片尺寸决定，与所在批次位置无关，便于合批结果比对）
         predictions = []
-        for i in range(batch_size):
+        for image in images:
+            width, height = getattr(image, "size", (0, 0))
+            i = (width + height) % 10
             # 生成2-3个模拟检测框
             num_detections = 2 + (i % 2)  # 2或3个检测框
 
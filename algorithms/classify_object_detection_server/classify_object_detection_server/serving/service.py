@@ -6,7 +6,9 @@ import base64
 from io import BytesIO
 from PIL import Image
 import time
+from typing import Optional
 
+from .batching import AdaptiveBatcher, batching_enabled
 from .config import get_model_config
 from .exceptions import ModelInferenceError
 from .metrics import (
@@ -79,6 +81,26 @@ class MLService:
         # - 释放 GPU 显存
         logger.info("=== Cleanup completed ===")
 
+    def _predict_images(self, images: list, params: tuple) -> list:
+        conf, iou = params
+        # 构造模型输入（包含推理参数）
+        return self.model.predict({"images": images, "conf": conf, "iou": iou})
+
+    def _get_batcher(self) -> Optional[AdaptiveBatcher]:
+        """惰性创建微批器（ADAPTIVE_BATCHING_ENABLED=false 时返回 None）."""
+        batcher = getattr(self, "_batcher", None)
+        if batcher is None and batching_enabled():
+            batcher = AdaptiveBatcher.from_env(self._predict_images, default_max_batch_size=32)
+            self._batcher = batcher
+        return batcher
+
+    async def _model_predict(self, images: list, conf: float, iou: float) -> list:
+        """调用模型：conf/iou 相同的并发请求图片堆叠为一次 model.predict，再按请求切分结果."""
+        batcher = self._get_batcher()
+        if batcher is None:
+            return self._predict_images(images, (conf, iou))
+        return await batcher.submit(images, key=(conf, iou))
+
     def _decode_base64_image(self, img_data: str) -> Image.Image:
         """
         解码base64图片，支持纯base64和Data URI格式.
@@ -260,15 +282,12 @@ class MLService:
         predict_error = None
 
         try:
-            # 构造模型输入（包含推理参数）
-            model_input = {
-                "images": valid_images,
-                "conf": request.config.conf_threshold,
-                "iou": request.config.iou_threshold,
-            }
-
-            # 调用模型预测（返回格式见 YOLOWrapper）
-            predictions = self.model.predict(model_input)
+            # 调用模型预测（返回格式见 YOLOWrapper）；推理参数相同的并发请求合并为同一批
+            predictions = await self._model_predict(
+                valid_images,
+                conf=request.config.conf_threshold,
+                iou=request.config.iou_threshold,
+            )
             predict_time = time.time() - predict_start
 
             logger.info("✅ Detection completed successfully")
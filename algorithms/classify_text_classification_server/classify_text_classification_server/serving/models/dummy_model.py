@@ -18,12 +18,16 @@ class DummyModel:
         模拟批量预测（MLflow PyFunc接口）.
 
         Args:
-            context: MLflow上下文（未使用）
-            model_input: 输入数据，可以是DataFrame、list或str
+            context: MLflow上下文（未使用）；仅传一个参数时视为输入数据
+            model_input: 输入数据，可以是DataFrame、list或str（多个请求堆叠后的文本列表）
 
         Returns:
             预测结果DataFrame，包含prediction, probability等列
         """
+        # 兼容直接调用 predict(data)：单个位置参数即为输入
+        if model_input is None:
+            model_input = context
+
         # 提取文本
         if isinstance(model_input, pd.DataFrame):
             texts = model_input["text"].tolist() if "text" in model_input.columns else model_input.iloc[:, 0].tolist()
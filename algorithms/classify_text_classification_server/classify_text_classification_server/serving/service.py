@@ -9,6 +9,7 @@ import pandas as pd
 import bentoml
 from loguru import logger
 
+from .batching import AdaptiveBatcher, batching_enabled
 from .config import get_model_config
 from .exceptions import ModelInferenceError
 from .metrics import (
@@ -150,7 +151,7 @@ class MLService:
                 logger.debug(
                     f"Calling model.predict with text summary: {text_batch_summary}"
                 )
-                model_output = self.model.predict(processed_texts)
+                model_output = await self._model_predict(processed_texts)
 
                 predict_time = (time.time() - predict_start) * 1000
                 logger.info(f"⏱️  Model prediction completed in {predict_time:.1f}ms")
@@ -213,6 +214,24 @@ class MLService:
                 execution_time_ms=(time.time() - request_start) * 1000,
             )
 
+    def _get_batcher(self) -> Optional[AdaptiveBatcher]:
+        """惰性创建微批器（ADAPTIVE_BATCHING_ENABLED=false 时返回 None）."""
+        batcher = getattr(self, "_batcher", None)
+        if batcher is None and batching_enabled():
+            batcher = AdaptiveBatcher.from_env(
+                lambda texts, _key: self.model.predict(texts),
+                default_max_batch_size=256,
+            )
+            self._batcher = batcher
+        return batcher
+
+    async def _model_predict(self, texts: list[str]):
+        """调用模型：并发请求的文本堆叠为一次 model.predict，再按请求切分结果."""
+        batcher = self._get_batcher()
+        if batcher is None:
+            return self.model.predict(texts)
+        return await batcher.submit(texts)
+
     def _preprocess_texts(
         self, texts: list[str]
     ) -> tuple[list[str], list[list[TextWarning]]]:
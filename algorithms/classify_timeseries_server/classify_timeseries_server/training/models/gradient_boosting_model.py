@@ -350,68 +350,42 @@ class GradientBoostingModel(BaseTimeSeriesModel):
     def _predict_with_feature_engineering(self, steps: int) -> np.ndarray:
         """使用特征工程的递归预测
         
-        策略：维护完整的时间序列历史，每步预测后追加到历史，
-        重新调用feature_engineer.transform()提取特征。
-        
-        优点：
-        - 特征提取逻辑完全一致，不会出错
-        - 支持任意复杂的特征工程（时间特征、周期特征等）
-        - 代码简洁，易于维护
-        
-        性能考虑：
-        - 每步都调用transform有开销
-        - 但对于月度数据，预测步数通常不多（12-36步），可接受
-        - 正确性 >> 性能
+        策略：从训练历史构造增量特征状态（feature_engineer.stream()），
+        每步只计算最后一行特征，预测后把预测值追加到状态。
+        
+        - 最后一行特征只依赖有限回看窗口，每步 O(window)，不随历史长度增长
+        - 不再每步 pd.concat 复制整段历史
+        - 特征与 transform(完整历史) 的最后一行一致（状态构造时对拍，不支持的配置退化为窗口 transform）
+        - 下一时间步推断规则不变（原始频率 → 最近12个点推断 → 最近间隔）
         """
         if not hasattr(self, 'last_train_data') or self.last_train_data is None:
             raise RuntimeError("last_train_data 未初始化，无法进行预测")
         
-        # 维护完整的历史序列（包含DatetimeIndex）
-        history = self.last_train_data.copy()
         predictions = []
+        try:
+            state = self.feature_engineer.stream(self.last_train_data)
+        except Exception as e:
+            logger.error(f"特征提取失败: {e}")
+            logger.warning("回退到简单预测方法")
+            return self._predict_simple(steps)
         
         for step in range(steps):
-            # 1. 从完整历史中提取特征
+            # 1. 计算当前最后一个点的特征
             try:
-                X, _ = self.feature_engineer.transform(history)
+                last_features = state.features()
             except Exception as e:
                 logger.error(f"特征提取失败: {e}")
                 logger.warning("回退到简单预测方法")
                 return self._predict_simple(steps - step)
             
-            if len(X) == 0:
+            if last_features is None:
                 logger.warning(f"第 {step+1} 步特征提取结果为空，停止预测")
                 break
             
-            # 2. 使用最后一行特征进行预测
-            last_features = X.iloc[-1:].copy()
+            # 2. 预测并追加到状态（时间戳按频率推断）
             pred = self.model.predict(last_features)[0]
             predictions.append(pred)
-            
-            # 3. 推断下一个时间步（基于频率）
-            last_timestamp = history.index[-1]
-            if isinstance(history.index, pd.DatetimeIndex):
-                # 尝试推断频率
-                freq = history.index.freq
-                if freq is None:
-                    try:
-                        freq = pd.infer_freq(history.index[-12:])  # 用最近12个点推断
-                    except:
-                        freq = None
-                
-                if freq:
-                    next_timestamp = last_timestamp + pd.tseries.frequencies.to_offset(freq)
-                else:
-                    # 回退：使用平均间隔
-                    avg_delta = (history.index[-1] - history.index[-2])
-                    next_timestamp = last_timestamp + avg_delta
-            else:
-                # 非时间索引，简单递增
-                next_timestamp = last_timestamp + 1
-            
-            # 4. 将预测值追加到历史（构造新的Series）
-            new_point = pd.Series([pred], index=[next_timestamp])
-            history = pd.concat([history, new_point])
+            state.append(pred)
         
         return np.array(predictions)
     
@@ -524,7 +498,7 @@ class GradientBoostingModel(BaseTimeSeriesModel):
             # 特征工程模式:维护完整的历史序列(包含DatetimeIndex)
             if not hasattr(self, 'last_train_data') or self.last_train_data is None:
                 raise RuntimeError("last_train_data未初始化,无法进行滚动预测")
-            history = self.last_train_data.copy()
+            state = self.feature_engineer.stream(self.last_train_data)
         else:
             # 简单模式:维护滞后窗口
             history_values = self.last_train_values.copy()
@@ -543,9 +517,9 @@ class GradientBoostingModel(BaseTimeSeriesModel):
                 # 特征工程模式:逐步预测,使用test_data的时间戳
                 preds = []
                 for timestamp, true_value in target_slice.items():
-                    # 提取特征
+                    # 增量计算最后一行特征
                     try:
-                        X, _ = self.feature_engineer.transform(history)
+                        last_features = state.features()
                     except Exception as e:
                         logger.error(f"特征提取失败: {e}")
                         # 回退到简单预测
@@ -554,18 +528,15 @@ class GradientBoostingModel(BaseTimeSeriesModel):
                         preds.extend(simple_preds)
                         break
                     
-                    if len(X) == 0:
+                    if last_features is None:
                         logger.warning(f"特征提取结果为空,停止预测")
                         break
                     
-                    # 使用最后一行特征进行预测
-                    last_features = X.iloc[-1:].copy()
                     pred = self.model.predict(last_features)[0]
                     preds.append(pred)
                     
                     # 使用test_data的时间戳追加真实值
-                    new_point = pd.Series([true_value], index=[timestamp])
-                    history = pd.concat([history, new_point])
+                    state.append(true_value, timestamp)
             else:
                 # 简单模式:使用滞后窗口的递归预测
                 preds = self._predict_simple_rolling(
@@ -91,8 +91,8 @@ class GradientBoostingWrapper(mlflow.pyfunc.PythonModel):
     def _predict_with_feature_engineering(self, history: pd.Series, steps: int) -> np.ndarray:
         """使用特征工程的递归预测
         
-        策略：维护完整的时间序列历史，每步预测后追加到历史，
-        重新调用 feature_engineer.transform() 提取特征。
+        策略：从历史构造增量特征状态（feature_engineer.stream()），
+        每步只计算最后一行特征，预测值追加到状态，不再每步对完整历史调用 transform()。
         
         Args:
             history: 历史时间序列数据
@@ -101,55 +101,52 @@ class GradientBoostingWrapper(mlflow.pyfunc.PythonModel):
         Returns:
             预测结果数组
         """
-        history = history.copy()
         predictions = []
+        try:
+            state = self.feature_engineer.stream(history, keep=self.lag_features)
+        except Exception as e:
+            logger.warning(f"特征提取失败（第1步）: {e}，回退到简单预测")
+            return self._predict_simple(history, steps)
         
         for step in range(steps):
-            # 1. 从完整历史中提取特征
+            # 1. 计算当前最后一个点的特征
             try:
-                X, _ = self.feature_engineer.transform(history)
+                last_features = state.features()
             except Exception as e:
                 logger.warning(f"特征提取失败（第{step+1}步）: {e}，回退到简单预测")
-                # 回退到简单预测
+                # 回退到简单预测（保留的历史至少包含 lag_features 个点）
                 remaining = steps - step
-                simple_preds = self._predict_simple(history, remaining)
+                simple_preds = self._predict_simple(state.history(), remaining)
                 predictions.extend(simple_preds)
                 break
             
-            if len(X) == 0:
+            if last_features is None:
                 logger.warning(f"第 {step+1} 步特征提取结果为空，停止预测")
                 break
             
             # 2. 使用最后一行特征进行预测
-            last_features = X.iloc[-1:].copy()
             pred = self.model.predict(last_features)[0]
             predictions.append(pred)
             
-            # 3. 推断下一个时间步（基于频率）
-            last_timestamp = history.index[-1]
-            if isinstance(history.index, pd.DatetimeIndex):
-                # 尝试使用频率推断
-                if self.training_frequency:
-                    try:
-                        next_timestamp = last_timestamp + pd.tseries.frequencies.to_offset(self.training_frequency)
-                    except:
-                        # 频率解析失败，使用平均间隔
-                        avg_delta = (history.index[-1] - history.index[-2])
-                        next_timestamp = last_timestamp + avg_delta
-                else:
-                    # 无频率信息，使用平均间隔
-                    avg_delta = (history.index[-1] - history.index[-2])
-                    next_timestamp = last_timestamp + avg_delta
-            else:
-                # 非时间索引，简单递增
-                next_timestamp = last_timestamp + 1
-            
-            # 4. 将预测值追加到历史（构造新的 Series）
-            new_point = pd.Series([pred], index=[next_timestamp])
-            history = pd.concat([history, new_point])
+            # 3. 按训练频率推断下一个时间步，追加预测值
+            state.append(pred, self._next_timestamp(state))
         
         return np.array(predictions)
     
+    def _next_timestamp(self, state):
+        """推断下一个时间步：优先使用训练频率，否则使用最近间隔"""
+        last_timestamp = state.last_timestamp
+        if not state.is_datetime:
+            # 非时间索引，简单递增
+            return last_timestamp + 1
+        if self.training_frequency:
+            try:
+                return last_timestamp + pd.tseries.frequencies.to_offset(self.training_frequency)
+            except:
+                # 频率解析失败，使用平均间隔
+                pass
+        return last_timestamp + state.last_delta
+    
     def _predict_simple(self, history: pd.Series, steps: int) -> np.ndarray:
         """简单滞后窗口预测
         
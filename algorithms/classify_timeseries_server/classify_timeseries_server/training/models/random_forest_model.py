@@ -322,48 +322,33 @@ class RandomForestModel(BaseTimeSeriesModel):
         return np.array(predictions)
     
     def _predict_with_feature_engineering(self, steps: int) -> np.ndarray:
-        """使用特征工程的递归预测"""
+        """使用特征工程的递归预测（增量特征状态，每步只计算最后一行特征）"""
         if not hasattr(self, 'last_train_data') or self.last_train_data is None:
             raise RuntimeError("last_train_data 未初始化，无法进行预测")
         
-        history = self.last_train_data.copy()
         predictions = []
+        try:
+            state = self.feature_engineer.stream(self.last_train_data)
+        except Exception as e:
+            logger.error(f"特征提取失败: {e}")
+            logger.warning("回退到简单预测方法")
+            return self._predict_simple(steps)
         
         for step in range(steps):
             try:
-                X, _ = self.feature_engineer.transform(history)
+                last_features = state.features()
             except Exception as e:
                 logger.error(f"特征提取失败: {e}")
                 logger.warning("回退到简单预测方法")
                 return self._predict_simple(steps - step)
             
-            if len(X) == 0:
+            if last_features is None:
                 logger.warning(f"第 {step+1} 步特征提取结果为空，停止预测")
                 break
             
-            last_features = X.iloc[-1:].copy()
             pred = self.model.predict(last_features)[0]
             predictions.append(pred)
-            
-            last_timestamp = history.index[-1]
-            if isinstance(history.index, pd.DatetimeIndex):
-                freq = history.index.freq
-                if freq is None:
-                    try:
-                        freq = pd.infer_freq(history.index[-12:])
-                    except:
-                        freq = None
-                
-                if freq:
-                    next_timestamp = last_timestamp + pd.tseries.frequencies.to_offset(freq)
-                else:
-                    avg_delta = (history.index[-1] - history.index[-2])
-                    next_timestamp = last_timestamp + avg_delta
-            else:
-                next_timestamp = last_timestamp + 1
-            
-            new_point = pd.Series([pred], index=[next_timestamp])
-            history = pd.concat([history, new_point])
+            state.append(pred)
         
         return np.array(predictions)
     
@@ -170,6 +170,22 @@ class TimeSeriesFeatureEngineer:
         self.fit(data)
         return self.transform(data)
 
+    def stream(self, history: pd.Series, keep: int = 0) -> "IncrementalFeatureState":
+        """创建递归预测用的增量特征状态
+
+        只保留回看窗口内的历史，每步 O(window) 计算最后一行特征，结果与 transform() 一致。
+
+        Args:
+            history: 预测起点之前的历史序列
+            keep: 至少保留的历史点数
+
+        Returns:
+            IncrementalFeatureState
+        """
+        from .incremental_features import IncrementalFeatureState
+
+        return IncrementalFeatureState(self, history, keep=keep)
+
     def _fit_transformers(self, df: pd.DataFrame):
         """初始化并拟合所有转换器
 
@@ -0,0 +1,225 @@
+"""递归预测的增量特征计算
+
+TimeSeriesFeatureEngineer.transform() 每次都在完整历史上重算全部特征，
+递归预测 / 滚动评估逐步调用时复杂度为 O(步数 × 历史长度)，且每步 pd.concat 产生大量分配。
+
+递归预测只需要最后一行特征，而最后一行只依赖有限的回看窗口：
+- 滞后特征 lag_p：t-p 的值
+- 滚动窗口特征 window_w：t-w ~ t-1 的统计量（feature-engine 默认右移 1 期）
+- 差分特征 diff_p：t 与 t-p 的差
+- 时间 / 周期性特征：只依赖时间戳
+
+IncrementalFeatureState 只保留 max(回看) + 1 个点，每步 O(window) 计算最后一行特征，
+列顺序与 transform() 输出一致。构造时与 transform() 对拍一次，
+配置不受支持或结果不一致时退化为“只在回看窗口上调用 transform()”，结果仍与全量一致。
+
+使用示例：
+    state = engineer.stream(history)
+    for _ in range(steps):
+        X = state.features()
+        pred = model.predict(X)[0]
+        state.append(pred)
+"""
+
+from collections import deque
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+# pandas rolling 统计量对应的 numpy 实现（std/var 为样本统计量，与 pandas 一致）
+_WINDOW_FUNCTIONS = {
+    "mean": np.mean,
+    "std": lambda values: np.std(values, ddof=1),
+    "var": lambda values: np.var(values, ddof=1),
+    "min": np.min,
+    "max": np.max,
+    "sum": np.sum,
+    "median": np.median,
+}
+
+_SEASONS = {12: 0, 1: 0, 2: 0, 3: 1, 4: 1, 5: 1, 6: 2, 7: 2, 8: 2, 9: 3, 10: 3, 11: 3}
+
+# 推断频率使用的最近时间戳个数（与原递归预测逻辑一致）
+_FREQ_INFER_POINTS = 12
+
+# 与 transform() 对拍的容差（滚动统计 pandas 为在线算法，存在浮点误差）
+_VERIFY_RTOL = 1e-9
+_VERIFY_ATOL = 1e-9
+
+
+def required_lookback(engineer) -> int:
+    """计算最后一行特征所需的历史点数（含当前点）"""
+    lookback = 0
+    if engineer.lag_periods:
+        lookback = max(lookback, max(engineer.lag_periods))
+    if engineer.rolling_windows:
+        lookback = max(lookback, max(engineer.rolling_windows))
+    if engineer.use_diff_features and engineer.diff_periods:
+        lookback = max(lookback, max(engineer.diff_periods))
+    return lookback + 1
+
+
+def temporal_features(timestamp: pd.Timestamp) -> dict:
+    """单个时间戳的时间特征，与 TimeSeriesFeatureEngineer._extract_temporal_features 一致"""
+    return {
+        "year": timestamp.year,
+        "month": timestamp.month,
+        "day": timestamp.day,
+        "day_of_week": timestamp.dayofweek,
+        "day_of_year": timestamp.dayofyear,
+        "week_of_year": int(timestamp.isocalendar()[1]),
+        "quarter": timestamp.quarter,
+        "hour": timestamp.hour,
+        "minute": timestamp.minute,
+        "is_weekend": int(timestamp.dayofweek >= 5),
+        "is_month_start": int(timestamp.is_month_start),
+        "is_month_end": int(timestamp.is_month_end),
+        "season": _SEASONS[timestamp.month],
+    }
+
+
+class IncrementalFeatureState:
+    """递归预测的增量特征状态
+
+    Args:
+        engineer: 已拟合的 TimeSeriesFeatureEngineer
+        history: 预测起点之前的历史序列（索引为 DatetimeIndex 或整数）
+        keep: 至少保留的历史点数（调用方回退到简单滞后预测时需要）
+    """
+
+    def __init__(self, engineer, history: pd.Series, keep: int = 0):
+        if not engineer.is_fitted:
+            raise RuntimeError("必须先调用 fit() 方法")
+        if len(history) == 0:
+            raise ValueError("history 不能为空")
+
+        self.engineer = engineer
+        self.lookback = required_lookback(engineer)
+        self.is_datetime = isinstance(history.index, pd.DatetimeIndex)
+
+        size = max(self.lookback, keep)
+        timestamp_size = max(size, _FREQ_INFER_POINTS)
+        self._values = deque(history.values[-size:].tolist(), maxlen=size)
+        self._timestamps = deque(history.index[-timestamp_size:], maxlen=timestamp_size)
+        # 原始序列的频率只在第一步有效，追加点之后与 pd.concat 的行为一致，改为按最近时间戳推断
+        self._freq = history.index.freq if self.is_datetime else None
+
+        # 历史不足一个回看窗口时 transform() 会丢弃 NaN 行，此时直接在全部（少量）历史上调用 transform()
+        self._short_history = history.copy() if len(history) < self.lookback else None
+        self.feature_names = list(engineer.feature_names_)
+        self.incremental = self._short_history is None and self._verify(history)
+
+    def _verify(self, history: pd.Series) -> bool:
+        """与 transform() 在回看窗口上的结果对拍，不一致时退化为窗口 transform 模式"""
+        try:
+            X, _ = self.engineer.transform(history.iloc[-self.lookback:])
+            if len(X) == 0:
+                return False
+            self.feature_names = list(X.columns)
+            row = self._compute_row()
+            if row is None:
+                return False
+            expected = X.iloc[-1].to_numpy(dtype=float)
+            if np.allclose(row, expected, rtol=_VERIFY_RTOL, atol=_VERIFY_ATOL, equal_nan=False):
+                return True
+            logger.warning("增量特征与 transform() 结果不一致，退化为窗口 transform 模式")
+        except Exception as e:
+            logger.warning(f"增量特征校验失败，退化为窗口 transform 模式: {e}")
+        return False
+
+    def _compute_row(self) -> Optional[np.ndarray]:
+        """计算当前最后一个点的特征行；存在不支持的特征时返回 None"""
+        engineer = self.engineer
+        values = np.asarray(self._values, dtype=float)
+        current = values[-1]
+        timestamp = self._timestamps[-1]
+        features = {}
+
+        for period in engineer.lag_periods or []:
+            features[f"value_lag_{period}"] = values[-1 - period]
+
+        for window in engineer.rolling_windows or []:
+            window_values = values[-1 - window:-1]
+            for func in engineer.rolling_features:
+                if func not in _WINDOW_FUNCTIONS:
+                    return None
+                features[f"value_window_{window}_{func}"] = _WINDOW_FUNCTIONS[func](window_values)
+
+        if self.is_datetime and (engineer.use_temporal_features or engineer.cyclical_transformer):
+            temporal = temporal_features(timestamp)
+            if engineer.use_temporal_features:
+                features.update(temporal)
+            if engineer.cyclical_transformer:
+                max_values = engineer.cyclical_transformer.max_values_
+                for variable in engineer.cyclical_transformer.variables_:
+                    angle = 2 * np.pi * temporal[variable] / max_values[variable]
+                    features[f"{variable}_sin"] = np.sin(angle)
+                    features[f"{variable}_cos"] = np.cos(angle)
+
+        if engineer.use_diff_features:
+            for period in engineer.diff_periods:
+                features[f"value_diff_{period}"] = current - values[-1 - period]
+
+        if set(features) != set(self.feature_names):
+            return None
+        return np.array([features[name] for name in self.feature_names], dtype=float)
+
+    @property
+    def last_timestamp(self):
+        return self._timestamps[-1]
+
+    @property
+    def last_delta(self):
+        """最近两个时间戳的间隔"""
+        return self._timestamps[-1] - self._timestamps[-2]
+
+    def history(self) -> pd.Series:
+        """保留的历史（回看窗口及 keep 个点）"""
+        if self._short_history is not None:
+            return self._short_history
+        timestamps = list(self._timestamps)[-len(self._values):]
+        index = pd.DatetimeIndex(timestamps) if self.is_datetime else pd.Index(timestamps)
+        return pd.Series(list(self._values), index=index)
+
+    def features(self) -> Optional[pd.DataFrame]:
+        """当前最后一个点的特征（单行 DataFrame，列名与训练时一致）；无可用特征时返回 None"""
+        if self.incremental:
+            row = self._compute_row()
+            if row is not None:
+                return pd.DataFrame([row], columns=self.feature_names)
+        X, _ = self.engineer.transform(self.history())
+        if len(X) == 0:
+            return None
+        return X.iloc[-1:]
+
+    def next_timestamp(self):
+        """推断下一个时间步，与原递归预测逻辑一致"""
+        last_timestamp = self._timestamps[-1]
+        if not self.is_datetime:
+            return last_timestamp + 1
+        freq = self._freq
+        if freq is None:
+            try:
+                freq = pd.infer_freq(pd.DatetimeIndex(list(self._timestamps)[-_FREQ_INFER_POINTS:]))
+            except Exception:
+                freq = None
+        if freq:
+            return last_timestamp + pd.tseries.frequencies.to_offset(freq)
+        return last_timestamp + self.last_delta
+
+    def append(self, value: float, timestamp=None) -> None:
+        """追加一个点（预测值或真实值），未给出时间戳时按频率推断"""
+        if timestamp is None:
+            timestamp = self.next_timestamp()
+        self._freq = None
+        self._values.append(float(value))
+        self._timestamps.append(timestamp)
+        if self._short_history is not None:
+            history = pd.concat([self._short_history, pd.Series([value], index=[timestamp])])
+            if len(history) >= self.lookback:
+                self._short_history = None
+                self.incremental = self._verify(history)
+            else:
+                self._short_history = history
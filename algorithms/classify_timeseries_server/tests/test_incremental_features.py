@@ -0,0 +1,122 @@
+"""递归预测增量特征状态的单元测试。
+
+覆盖：
+- IncrementalFeatureState.features() 与 transform(完整历史) 最后一行逐步一致
+- 历史短于回看窗口、整数索引时的行为
+- GradientBoostingWrapper 递归预测与原“每步 transform + concat”实现一致
+- 预测步数增加时的耗时对比（slow）
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import GradientBoostingRegressor
+
+from classify_timeseries_server.training.models.gradient_boosting_wrapper import GradientBoostingWrapper
+from classify_timeseries_server.training.preprocessing.feature_engineering import TimeSeriesFeatureEngineer
+
+
+def _series(n=120, freq="h", seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2024-01-01", periods=n, freq=freq)
+    values = 10 + np.sin(np.arange(n) * 2 * np.pi / 7) + rng.normal(scale=0.2, size=n)
+    return pd.Series(values, index=index)
+
+
+def _engineer(series, **kwargs):
+    config = dict(lag_periods=[1, 2, 7], rolling_windows=[3, 7], use_diff_features=True, diff_periods=[1, 7])
+    config.update(kwargs)
+    return TimeSeriesFeatureEngineer(**config).fit(series)
+
+
+def _legacy_forecast(engineer, model, history, steps, frequency):
+    """原实现：每步在完整历史上 transform，再 concat 预测值"""
+    predictions = []
+    for _ in range(steps):
+        X, _ = engineer.transform(history)
+        pred = model.predict(X.iloc[-1:])[0]
+        predictions.append(pred)
+        next_timestamp = history.index[-1] + pd.tseries.frequencies.to_offset(frequency)
+        history = pd.concat([history, pd.Series([pred], index=[next_timestamp])])
+    return np.array(predictions)
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"use_cyclical_features": False}, {"rolling_features": ["mean", "median", "sum"]}])
+def test_features_match_transform_across_appends(kwargs):
+    series = _series()
+    engineer = _engineer(series, **kwargs)
+    history = series.iloc[:80]
+    state = engineer.stream(history)
+    assert state.incremental
+
+    for timestamp, value in series.iloc[80:100].items():
+        X, _ = engineer.transform(history)
+        features = state.features()
+        assert list(features.columns) == list(X.columns)
+        np.testing.assert_allclose(features.to_numpy()[0], X.iloc[-1].to_numpy(dtype=float), rtol=1e-9)
+
+        state.append(value, timestamp)
+        history = pd.concat([history, pd.Series([value], index=[timestamp])])
+
+
+def test_short_history_and_inferred_timestamps():
+    series = _series()
+    engineer = _engineer(series)
+    state = engineer.stream(series.iloc[:5])
+    assert not state.incremental
+    assert state.features() is None
+
+    for value in series.iloc[5:12]:
+        state.append(value)
+
+    # 超过回看窗口后切换为增量模式，时间戳按小时频率推断
+    assert state.incremental
+    assert state.last_timestamp == series.index[11]
+    X, _ = engineer.transform(series.iloc[:12])
+    np.testing.assert_allclose(state.features().to_numpy()[0], X.iloc[-1].to_numpy(dtype=float), rtol=1e-9)
+
+
+def test_integer_index():
+    series = _series().reset_index(drop=True)
+    engineer = _engineer(series, use_temporal_features=False, use_cyclical_features=False)
+    state = engineer.stream(series.iloc[:60])
+    state.append(series.iloc[60])
+
+    X, _ = engineer.transform(series.iloc[:61])
+    assert state.last_timestamp == 60
+    np.testing.assert_allclose(state.features().to_numpy()[0], X.iloc[-1].to_numpy(dtype=float), rtol=1e-9)
+
+
+def test_wrapper_forecast_matches_legacy_loop():
+    series = _series()
+    engineer = _engineer(series)
+    X, y = engineer.transform(series)
+    model = GradientBoostingRegressor(n_estimators=20, random_state=0).fit(X, y)
+    wrapper = GradientBoostingWrapper(model, 7, True, engineer, "h")
+
+    predictions = wrapper.predict(None, {"history": series, "steps": 15})
+
+    np.testing.assert_allclose(predictions, _legacy_forecast(engineer, model, series, 15, "h"), rtol=1e-9)
+
+
+@pytest.mark.slow
+def test_benchmark_horizon_scaling():
+    series = _series(n=2000, freq="h")
+    engineer = _engineer(series, lag_periods=[1, 2, 24], rolling_windows=[6, 24], diff_periods=[1, 24])
+    X, y = engineer.transform(series)
+    model = GradientBoostingRegressor(n_estimators=20, random_state=0).fit(X, y)
+    wrapper = GradientBoostingWrapper(model, 24, True, engineer, "h")
+    steps = 200
+
+    started = time.perf_counter()
+    predictions = wrapper.predict(None, {"history": series, "steps": steps})
+    incremental_elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    legacy = _legacy_forecast(engineer, model, series, steps, "h")
+    legacy_elapsed = time.perf_counter() - started
+
+    np.testing.assert_allclose(predictions, legacy, rtol=1e-9)
+    assert incremental_elapsed * 5 < legacy_elapsed
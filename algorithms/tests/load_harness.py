@@ -0,0 +1,193 @@
+"""算法服务微批压测工具.
+
+直接加载各服务的 serving/batching.py 与内置 DummyModel（不启动 BentoML），
+模拟真实模型"固定调用开销 + 按条计算"的耗时特征，
+并发发起小请求，对比启用 / 关闭自适应微批时的 p50/p99 延迟与吞吐。
+
+用法:
+    python algorithms/tests/load_harness.py [--requests 400] [--concurrency 32]
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import statistics
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+ALGORITHMS_DIR = Path(__file__).resolve().parents[1]
+
+# 支持输入堆叠的服务（anomaly / timeseries 为逐序列模型，不参与微批）
+BATCHED_SERVICES = (
+    "classify_text_classification_server",
+    "classify_image_classification_server",
+    "classify_object_detection_server",
+    "classify_log_server",
+)
+
+
+def _load(service: str, relative: str, module_name: str):
+    path = ALGORITHMS_DIR / service / service / "serving" / relative
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_batching(service: str):
+    return _load(service, "batching.py", f"_harness_{service}_batching")
+
+
+def load_dummy_model(service: str):
+    return _load(service, "models/dummy_model.py", f"_harness_{service}_dummy").DummyModel()
+
+
+def make_inputs(service: str, index: int, size: int) -> list:
+    """生成一个请求的输入（size 条）."""
+    if service in ("classify_image_classification_server", "classify_object_detection_server"):
+        from PIL import Image
+
+        return [Image.new("RGB", (32 + (index + i) % 7, 32)) for i in range(size)]
+    if service == "classify_log_server":
+        return [f"service{(index + i) % 5} request {index} done in {i} ms" for i in range(size)]
+    return [f"第{index}条请求的第{i}段文本" for i in range(size)]
+
+
+def make_predict_fn(service: str, model, call_overhead_ms: float, item_cost_ms: float) -> Callable:
+    """包装 DummyModel.predict 为 predict_fn(inputs, key)，附加模拟的调用开销.
+
+    真实模型推理独占 GPU / 计算核心，这里用锁让模型调用串行执行。
+    """
+    lock = threading.Lock()
+
+    def predict_fn(inputs: list, key=None):
+        with lock:
+            time.sleep((call_overhead_ms + item_cost_ms * len(inputs)) / 1000)
+            if service == "classify_object_detection_server":
+                conf, iou = key
+                return model.predict({"images": inputs, "conf": conf, "iou": iou})
+            return model.predict(inputs)
+
+    return predict_fn
+
+
+@dataclass
+class LoadReport:
+    service: str
+    batching: bool
+    requests: int
+    p50_ms: float
+    p99_ms: float
+    throughput_rps: float
+    model_calls: Optional[int] = None
+
+    def __str__(self) -> str:
+        calls = "-" if self.model_calls is None else str(self.model_calls)
+        mode = "batched" if self.batching else "direct"
+        return (
+            f"{self.service:<40} {mode:<8} p50={self.p50_ms:8.2f}ms "
+            f"p99={self.p99_ms:8.2f}ms throughput={self.throughput_rps:9.1f} req/s calls={calls}"
+        )
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+async def run_load(
+    service: str,
+    batching: bool,
+    requests: int = 400,
+    concurrency: int = 32,
+    items_per_request: int = 1,
+    call_overhead_ms: float = 2.0,
+    item_cost_ms: float = 0.02,
+    max_batch_size: int = 64,
+    max_latency_ms: float = 2.0,
+) -> LoadReport:
+    """以固定并发发起请求，返回延迟分位数与吞吐."""
+    batching_module = load_batching(service)
+    predict_fn = make_predict_fn(service, load_dummy_model(service), call_overhead_ms, item_cost_ms)
+    key = (0.25, 0.45) if service == "classify_object_detection_server" else None
+    loop = asyncio.get_running_loop()
+
+    batcher = None
+    if batching:
+        batcher = batching_module.AdaptiveBatcher(
+            predict_fn, max_batch_size=max_batch_size, max_latency_ms=max_latency_ms
+        )
+
+    async def call(inputs):
+        if batcher is not None:
+            return await batcher.submit(inputs, key=key)
+        return await loop.run_in_executor(None, predict_fn, inputs, key)
+
+    latencies: List[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(index: int):
+        inputs = make_inputs(service, index, items_per_request)
+        async with semaphore:
+            started = time.perf_counter()
+            output = await call(inputs)
+            latencies.append((time.perf_counter() - started) * 1000)
+        assert len(output) == len(inputs)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+
+    return LoadReport(
+        service=service,
+        batching=batching,
+        requests=requests,
+        p50_ms=statistics.median(latencies),
+        p99_ms=_percentile(latencies, 0.99),
+        throughput_rps=requests / elapsed,
+        model_calls=batcher.batches if batcher is not None else requests,
+    )
+
+
+def compare(service: str, **kwargs) -> Dict[bool, LoadReport]:
+    """同一负载下分别测量直接调用与微批."""
+    return {batching: asyncio.run(run_load(service, batching, **kwargs)) for batching in (False, True)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--items", type=int, default=1, help="每个请求的输入条数")
+    parser.add_argument("--call-overhead-ms", type=float, default=2.0)
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-latency-ms", type=float, default=2.0)
+    parser.add_argument("--service", choices=BATCHED_SERVICES, action="append")
+    args = parser.parse_args()
+
+    from loguru import logger
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    for service in args.service or BATCHED_SERVICES:
+        reports = compare(
+            service,
+            requests=args.requests,
+            concurrency=args.concurrency,
+            items_per_request=args.items,
+            call_overhead_ms=args.call_overhead_ms,
+            max_batch_size=args.max_batch_size,
+            max_latency_ms=args.max_latency_ms,
+        )
+        for report in reports.values():
+            print(report)
+
+
+if __name__ == "__main__":
+    main()
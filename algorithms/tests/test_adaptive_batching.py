@@ -0,0 +1,117 @@
+"""各算法服务自适应微批的测试（使用内置 DummyModel，不依赖 BentoML）."""
+
+import asyncio
+
+import pytest
+
+from load_harness import (
+    BATCHED_SERVICES,
+    compare,
+    load_batching,
+    load_dummy_model,
+    make_inputs,
+    make_predict_fn,
+)
+
+
+def _to_records(output):
+    return output.to_dict("records") if hasattr(output, "to_dict") else output
+
+
+@pytest.mark.parametrize(
+    "service", [s for s in BATCHED_SERVICES if s != "classify_text_classification_server"]
+)
+def test_batched_results_match_direct_calls(service):
+    batching = load_batching(service)
+    predict_fn = make_predict_fn(service, load_dummy_model(service), 1.0, 0.0)
+    key = (0.25, 0.45) if service == "classify_object_detection_server" else None
+    requests = [make_inputs(service, i, 1 + i % 3) for i in range(12)]
+
+    async def run():
+        batcher = batching.AdaptiveBatcher(predict_fn, max_batch_size=8, max_latency_ms=20)
+        outputs = await asyncio.gather(*(batcher.submit(inputs, key=key) for inputs in requests))
+        return batcher, outputs
+
+    batcher, outputs = asyncio.run(run())
+
+    assert batcher.requests == len(requests)
+    assert batcher.batches < len(requests)
+    for inputs, output in zip(requests, outputs):
+        assert _to_records(output) == _to_records(predict_fn(inputs, key))
+
+
+def test_text_batch_output_sliced_per_request():
+    service = "classify_text_classification_server"
+    batching = load_batching(service)
+    predict_fn = make_predict_fn(service, load_dummy_model(service), 0.0, 0.0)
+
+    async def run():
+        batcher = batching.AdaptiveBatcher(predict_fn, max_batch_size=64, max_latency_ms=20)
+        return await asyncio.gather(
+            batcher.submit(["a", "b"]), batcher.submit(["c"]), batcher.submit(["d", "e", "f"])
+        )
+
+    outputs = asyncio.run(run())
+
+    assert [len(o) for o in outputs] == [2, 1, 3]
+    assert all(list(o.index) == list(range(len(o))) for o in outputs)
+
+
+def test_groups_by_key_and_isolates_failures():
+    batching = load_batching("classify_log_server")
+    calls = []
+
+    def predict_fn(inputs, key):
+        calls.append((key, list(inputs)))
+        if "bad" in inputs:
+            raise ValueError("bad input")
+        return [f"{key}:{x}" for x in inputs]
+
+    async def run():
+        batcher = batching.AdaptiveBatcher(predict_fn, max_batch_size=64, max_latency_ms=20)
+        return await asyncio.gather(
+            batcher.submit(["a"], key=1),
+            batcher.submit(["b"], key=2),
+            batcher.submit(["bad"], key=1),
+            batcher.submit(["c", "d"], key=1),
+            return_exceptions=True,
+        )
+
+    first, second, bad, rest = asyncio.run(run())
+
+    assert first == ["1:a"] and second == ["2:b"] and rest == ["1:c", "1:d"]
+    assert isinstance(bad, ValueError)
+    # 合批失败后逐个请求重试
+    assert calls[0] == (1, ["a", "bad", "c", "d"])
+
+
+def test_request_larger_than_batch_is_not_split():
+    batching = load_batching("classify_log_server")
+    sizes = []
+
+    def predict_fn(inputs, key):
+        sizes.append(len(inputs))
+        return list(inputs)
+
+    async def run():
+        batcher = batching.AdaptiveBatcher(predict_fn, max_batch_size=4, max_latency_ms=20)
+        return await asyncio.gather(
+            batcher.submit(list(range(3))), batcher.submit(list(range(6))), batcher.submit([9])
+        )
+
+    outputs = asyncio.run(run())
+
+    assert [len(o) for o in outputs] == [3, 6, 1]
+    # 放不下的请求顺延到下一批，超过上限的请求单独成批
+    assert sizes == [3, 6, 1]
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("service", BATCHED_SERVICES)
+def test_benchmark_batching_throughput(service):
+    reports = compare(service, requests=400, concurrency=32, call_overhead_ms=2.0)
+    direct, batched = reports[False], reports[True]
+    print(f"\n{direct}\n{batched}")
+
+    assert batched.model_calls < direct.model_calls
+    assert batched.throughput_rps > direct.throughput_rps
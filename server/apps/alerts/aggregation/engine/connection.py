@@ -3,9 +3,35 @@ import json
 from typing import List, Dict, Any
 import threading
 import pandas as pd
+import pyarrow as pa
 
 from apps.core.logger import alert_logger as logger
 
+# 加载到 DuckDB 的事件字段（聚合维度白名单须与此保持一致）
+EVENT_FIELDS = (
+    "event_id",
+    "title",
+    "description",
+    "level",
+    "resource_name",
+    "resource_id",
+    "resource_type",
+    "item",
+    "external_id",
+    "received_at",
+    "action",
+    "source_id",
+    "push_source_id",
+    "labels",
+    "service",
+    "location",
+    "event_type",
+    "tags",
+)
+# 共享事件缓冲注册到 DuckDB 的表名，以及单个策略命中事件的视图名
+EVENT_BUFFER_TABLE = "events_buffer"
+BUFFERED_EVENTS_VIEW = "strategy_events"
+
 
 class DuckDBConnection:
     _local = threading.local()
@@ -40,28 +66,7 @@ class DuckDBConnection:
         conn = self._local.conn
 
         # 1. 从 QuerySet 提取需要的字段
-        events_data = list(
-            events_queryset.values(
-                "event_id",
-                "title",
-                "description",
-                "level",
-                "resource_name",
-                "resource_id",
-                "resource_type",
-                "item",
-                "external_id",
-                "received_at",
-                "action",
-                "source_id",
-                "push_source_id",
-                "labels",
-                "service",
-                "location",
-                "event_type",
-                "tags",
-            )
-        )
+        events_data = list(events_queryset.values(*EVENT_FIELDS))
 
         # 2. 防御性检查：理论上不应该出现空数据（上游已过滤）
         if not events_data:
@@ -92,6 +97,29 @@ class DuckDBConnection:
 
         return True
 
+    def bind_event_buffer(self, events_table) -> None:
+        """注册共享事件缓冲（Arrow 表，零拷贝），同一轮聚合内所有策略共用。"""
+        self._ensure_connection()
+        self._local.conn.register(EVENT_BUFFER_TABLE, events_table)
+
+    def select_buffered_events(self, event_ids: List[str]):
+        """
+        从共享事件缓冲中圈定单个策略命中的事件，生成 BUFFERED_EVENTS_VIEW 视图供聚合 SQL 查询
+
+        Returns:
+            True 表示视图已就绪；event_ids 为空时返回 None
+        """
+        if not event_ids:
+            return None
+        self._ensure_connection()
+        conn = self._local.conn
+        conn.register("matched_event_ids", pa.table({"event_id": pa.array(event_ids, type=pa.string())}))
+        conn.execute(
+            f"CREATE OR REPLACE TEMP VIEW {BUFFERED_EVENTS_VIEW} AS "
+            f"SELECT * FROM {EVENT_BUFFER_TABLE} WHERE event_id IN (SELECT event_id FROM matched_event_ids)"
+        )
+        return True
+
     def close(self):
         if hasattr(self._local, "conn") and self._local.conn is not None:
             self._local.conn.close()
@@ -0,0 +1,158 @@
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from apps.alerts.aggregation.engine.connection import EVENT_FIELDS
+from apps.alerts.constants import EventAction
+from apps.alerts.constants.constants import EventStatus
+from apps.alerts.models.models import Event
+from apps.core.logger import alert_logger as logger
+
+EVENT_SCHEMA = pa.schema(
+    [
+        ("event_id", pa.string()),
+        ("title", pa.string()),
+        ("description", pa.string()),
+        ("level", pa.string()),
+        ("resource_name", pa.string()),
+        ("resource_id", pa.string()),
+        ("resource_type", pa.string()),
+        ("item", pa.string()),
+        ("external_id", pa.string()),
+        ("received_at", pa.timestamp("us", tz="UTC")),
+        ("action", pa.string()),
+        ("source_id", pa.int64()),
+        ("push_source_id", pa.string()),
+        ("labels", pa.string()),
+        ("service", pa.string()),
+        ("location", pa.string()),
+        ("event_type", pa.int64()),
+        ("tags", pa.string()),
+        ("source__name", pa.string()),
+    ]
+)
+# 缓冲额外携带告警源名称，供编译后的 match_rules 谓词按 source__name 匹配
+BUFFER_FIELDS = EVENT_FIELDS + ("source__name",)
+# 可参与 match_rules 列式求值的列：JSON 序列化的 labels/tags 与时间列仍交由 ORM 匹配
+MATCHABLE_SCHEMA = pa.schema([field for field in EVENT_SCHEMA if field.name not in ("labels", "tags", "received_at")])
+
+
+class EventBuffer:
+    """
+    进程级共享事件缓冲（Arrow 列式表）
+
+    每轮聚合只按 received_at 水位增量拉取一次新事件，淘汰超出最大策略窗口的旧事件，
+    所有策略共享同一张表（注册进 DuckDB 为零拷贝扫描），避免每个策略重复查库、重建 DataFrame。
+    """
+
+    # 增量拉取时回看的时长：并发事务晚提交的事件 received_at 可能略早于水位，按 event_id 去重
+    WATERMARK_LAG = timedelta(seconds=60)
+    # 增量追加产生的 chunk 超过该数量时合并，避免扫描时碎片过多
+    MAX_CHUNKS = 64
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._table: pa.Table = EVENT_SCHEMA.empty_table()
+        self._watermark: Optional[datetime] = None
+        self._covered_from: Optional[datetime] = None
+
+    @property
+    def table(self) -> pa.Table:
+        return self._table
+
+    def __len__(self) -> int:
+        return self._table.num_rows
+
+    def reset(self) -> None:
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._table = EVENT_SCHEMA.empty_table()
+        self._watermark = None
+        self._covered_from = None
+
+    def refresh(self, now: datetime, window_minutes: int) -> pa.Table:
+        """
+        同步缓冲到 [now - window_minutes, now] 窗口
+
+        首次调用或窗口向前扩大时全量加载，其余情况只拉取水位之后的新事件，
+        并剔除窗口外事件以及入库后才被屏蔽的事件。
+        """
+        if self._pid != os.getpid():
+            self.reset()
+        cutoff = now - timedelta(minutes=window_minutes)
+        with self._lock:
+            queryset = Event.objects.filter(action=EventAction.CREATED).exclude(status=EventStatus.SHIELD)
+            if self._watermark is None or self._covered_from is None or cutoff < self._covered_from:
+                rows = list(queryset.filter(received_at__gte=cutoff).values(*BUFFER_FIELDS))
+                self._table = EVENT_SCHEMA.empty_table()
+                self._covered_from = cutoff
+                appended = self._append_rows(rows)
+                logger.info("[EventBuffer] 全量加载 %s 条事件, 窗口=%s分钟", appended, window_minutes)
+            else:
+                since = max(cutoff, self._watermark - self.WATERMARK_LAG)
+                rows = list(queryset.filter(received_at__gte=since).values(*BUFFER_FIELDS))
+                appended = self._append_rows(rows)
+                self._covered_from = max(self._covered_from, cutoff)
+                logger.debug("[EventBuffer] 增量追加 %s 条事件, 水位=%s", appended, self._watermark)
+
+            self._evict_before(cutoff)
+            shielded = list(
+                Event.objects.filter(received_at__gte=cutoff, status=EventStatus.SHIELD).values_list("event_id", flat=True)
+            )
+            self._remove_events(shielded)
+            return self._table
+
+    def _append_rows(self, rows: List[Dict[str, Any]]) -> int:
+        """追加事件行（按 event_id 去重），返回实际追加条数。"""
+        if not rows:
+            return 0
+        for row in rows:
+            labels = row.get("labels")
+            tags = row.get("tags")
+            row["labels"] = json.dumps(labels) if labels else None
+            row["tags"] = json.dumps(tags) if tags else None
+        new_table = pa.Table.from_pylist(rows, schema=EVENT_SCHEMA)
+        if self._table.num_rows:
+            duplicated = pc.is_in(new_table["event_id"], value_set=self._table["event_id"].combine_chunks())
+            new_table = new_table.filter(pc.invert(duplicated))
+        if new_table.num_rows:
+            self._table = pa.concat_tables([self._table, new_table])
+            if self._table["event_id"].num_chunks > self.MAX_CHUNKS:
+                self._table = self._table.combine_chunks()
+            latest = pc.max(new_table["received_at"]).as_py()
+            if self._watermark is None or latest > self._watermark:
+                self._watermark = latest
+        return new_table.num_rows
+
+    def _evict_before(self, cutoff: datetime) -> None:
+        if not self._table.num_rows:
+            return
+        in_window = pc.greater_equal(self._table["received_at"], pa.scalar(cutoff, type=EVENT_SCHEMA.field("received_at").type))
+        if not pc.all(in_window).as_py():
+            self._table = self._table.filter(in_window)
+
+    def _remove_events(self, event_ids: Iterable[str]) -> None:
+        event_ids = list(event_ids)
+        if not event_ids or not self._table.num_rows:
+            return
+        removed = pc.is_in(self._table["event_id"], value_set=pa.array(event_ids, type=pa.string()))
+        if pc.any(removed).as_py():
+            self._table = self._table.filter(pc.invert(removed))
+
+
+def select_event_ids(table: pa.Table, mask, since: datetime) -> List[str]:
+    """按命中掩码与起始时间从缓冲表中取事件 ID"""
+    in_window = pc.greater_equal(table["received_at"], pa.scalar(since, type=EVENT_SCHEMA.field("received_at").type))
+    return table.filter(pc.and_(mask, in_window))["event_id"].to_pylist()
+
+
+event_buffer = EventBuffer()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=event_buffer.reset)
@@ -21,9 +21,11 @@ from apps.alerts.constants import (
 )
 from apps.alerts.constants.constants import EventStatus
 from apps.alerts.aggregation.strategy.matcher import StrategyMatcher
+from apps.alerts.aggregation.strategy.compiled_matcher import MultiStrategyMatcher, RuleCompiler
 from apps.alerts.aggregation.window.factory import WindowFactory
 from apps.alerts.aggregation.query.builder import SQLBuilder
-from apps.alerts.aggregation.engine.connection import DuckDBConnection
+from apps.alerts.aggregation.engine.connection import BUFFERED_EVENTS_VIEW, DuckDBConnection
+from apps.alerts.aggregation.engine.event_buffer import MATCHABLE_SCHEMA, event_buffer, select_event_ids
 from apps.alerts.aggregation.builder.alert_builder import AlertBuilder
 from apps.alerts.aggregation.builder.synthetic_alert_builder import (
     SyntheticAlertBuilder,
@@ -40,6 +42,11 @@ class AggregationProcessor:
     def __init__(self):
         self.sql_builder = SQLBuilder()
         self.db_conn = DuckDBConnection()
+        # 本轮是否已加载共享事件缓冲；加载失败时各策略退回按 QuerySet 单独装载
+        self._event_buffer_ready = False
+        self._events_table = None
+        # 本轮各策略在共享缓冲上的命中掩码（规则无法编译的策略不在其中，仍走 ORM 匹配）
+        self._strategy_masks: Dict[int, Any] = {}
 
     @staticmethod
     def _validate_dimensions(raw_dimensions: list, strategy_name: str) -> List[str]:
@@ -77,6 +84,8 @@ class AggregationProcessor:
                 sum(1 for strategy in active_strategies if strategy.strategy_type == AlarmStrategyType.MISSING_DETECTION),
             )
 
+            self._refresh_event_buffer(active_strategies, timezone.now())
+
             for strategy in active_strategies:
                 logger.info("[AlertAggregation] 处理策略: %s (ID: %s)", strategy.name, strategy.id)
                 self._process_strategy(strategy, timezone.now())
@@ -90,6 +99,40 @@ class AggregationProcessor:
         finally:
             AlertBuilder.clear_event_cache()
             self.db_conn.close()
+            self._event_buffer_ready = False
+            self._events_table = None
+            self._strategy_masks = {}
+
+    def _refresh_event_buffer(self, strategies: List[AlarmStrategy], now: datetime) -> None:
+        """按所有聚合策略的最大窗口同步一次共享事件缓冲，并注册到 DuckDB 供各策略复用"""
+        strategies = [strategy for strategy in strategies if strategy.strategy_type != AlarmStrategyType.MISSING_DETECTION]
+        window_sizes = [
+            parse_aggregation_window_size(cast(Dict[str, Any], strategy.params or {}).get("window_size"), clamp=True)[0]
+            for strategy in strategies
+        ]
+        if not window_sizes:
+            return
+        try:
+            events_table = event_buffer.refresh(now, max(window_sizes))
+            self.db_conn.bind_event_buffer(events_table)
+            self._events_table = events_table
+            self._event_buffer_ready = True
+            logger.info("[AlertAggregation] 共享事件缓冲就绪: 事件数=%s, 最大窗口=%s分钟", events_table.num_rows, max(window_sizes))
+        except Exception:  # noqa
+            self._event_buffer_ready = False
+            logger.exception("[AlertAggregation] 共享事件缓冲加载失败，退回按策略装载事件")
+            return
+
+        # 所有策略的 match_rules 在缓冲上单次扫描求值
+        matcher = MultiStrategyMatcher(
+            RuleCompiler(MATCHABLE_SCHEMA),
+            {strategy.id: cast(List[List[Dict]], strategy.match_rules or []) for strategy in strategies},
+        )
+        self._strategy_masks = matcher.evaluate(events_table)
+        logger.info(
+            "[AlertAggregation] 策略规则批量匹配完成: 编译=%s, 退回ORM=%s",
+            len(self._strategy_masks), len(strategies) - len(self._strategy_masks),
+        )
 
     def _get_active_strategies(self) -> List[AlarmStrategy]:
         # 排除 INSTANT 策略：即时告警走 InstantAlertDispatcher 旁路，不进聚合管线
@@ -107,6 +150,24 @@ class AggregationProcessor:
         根据策略配置获取事件
         每个策略有自己的时间窗口和过滤条件
         """
+        cutoff_time = AggregationProcessor.get_cutoff_time(strategy, now)
+
+        # 排除已被屏蔽的事件：屏蔽策略命中的事件不应再参与聚合产出告警
+        events = Event.objects.filter(
+            received_at__gte=cutoff_time,
+            action=EventAction.CREATED,
+        ).exclude(
+            # 被屏蔽事件不参与聚合建警（事件级·不建警）
+            status=EventStatus.SHIELD,
+        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[AlertAggregation] 策略 %s: 时间范围内事件总数=%s", strategy.name, events.count())
+
+        return events
+
+    @staticmethod
+    def get_cutoff_time(strategy: AlarmStrategy, now: datetime) -> datetime:
+        """按策略 window_size（非法或超限时兜底）计算事件查询起始时间"""
         params = cast(Dict[str, Any], strategy.params or {})
         raw_window_size = params.get("window_size")
         window_size, normalization_reason = parse_aggregation_window_size(
@@ -128,19 +189,7 @@ class AggregationProcessor:
             "[AlertAggregation] 策略 %s: 查询时间窗口=%s分钟, 起始时间=%s",
             strategy.name, window_size, cutoff_time.isoformat(),
         )
-
-        # 排除已被屏蔽的事件：屏蔽策略命中的事件不应再参与聚合产出告警
-        events = Event.objects.filter(
-            received_at__gte=cutoff_time,
-            action=EventAction.CREATED,
-        ).exclude(
-            # 被屏蔽事件不参与聚合建警（事件级·不建警）
-            status=EventStatus.SHIELD,
-        )
-        if logger.isEnabledFor(logging.DEBUG):
-            logger.debug("[AlertAggregation] 策略 %s: 时间范围内事件总数=%s", strategy.name, events.count())
-
-        return events
+        return cutoff_time
 
     def _process_strategy(self, strategy: AlarmStrategy, now: datetime):
         logger.debug(
@@ -154,16 +203,30 @@ class AggregationProcessor:
             return
 
         try:
-            events = self.get_events_for_strategy(strategy, now)
-
-            if not events.exists():
-                logger.info("[AlertAggregation] 策略 %s: 无事件需要处理", strategy.name)
-                self._mark_strategy_executed(strategy, now)
-                return
+            match_mask = self._strategy_masks.get(strategy.id) if self._event_buffer_ready else None
+            if match_mask is not None:
+                # 规则已在共享缓冲上批量求值：按策略窗口截取命中事件 ID，无需查库
+                matched_events = None
+                event_ids = select_event_ids(self._events_table, match_mask, self.get_cutoff_time(strategy, now))
+                has_matched = bool(event_ids)
+            else:
+                events = self.get_events_for_strategy(strategy, now)
+
+                if not events.exists():
+                    logger.info("[AlertAggregation] 策略 %s: 无事件需要处理", strategy.name)
+                    self._mark_strategy_executed(strategy, now)
+                    return
 
-            matched_events = StrategyMatcher.match_events_to_strategy(events, cast(List[List[Dict]], strategy.match_rules or []))
+                matched_events = StrategyMatcher.match_events_to_strategy(events, cast(List[List[Dict]], strategy.match_rules or []))
 
-            if not matched_events.exists():
+                # 共享缓冲已就绪时只取命中事件 ID，事件明细直接从缓冲中圈定
+                if self._event_buffer_ready:
+                    event_ids = list(matched_events.values_list("event_id", flat=True))
+                    has_matched = bool(event_ids)
+                else:
+                    event_ids = None
+                    has_matched = matched_events.exists()
+            if not has_matched:
                 logger.info("[AlertAggregation] 策略 %s: 无匹配规则的事件", strategy.name)
                 self._mark_strategy_executed(strategy, now)
                 return
@@ -173,7 +236,7 @@ class AggregationProcessor:
             dimensions = self._validate_dimensions(raw_dimensions, strategy.name)
             logger.info("[AlertAggregation] 策略 %s: 聚合维度=%s", strategy.name, dimensions)
 
-            if self._aggregate_for_dimensions(strategy, matched_events, dimensions, now):
+            if self._aggregate_for_dimensions(strategy, matched_events, dimensions, now, event_ids=event_ids):
                 logger.info("[AlertAggregation] 策略 %s: 维度 %s 聚合成功", strategy.name, dimensions)
 
         except Exception as e:  # noqa
@@ -511,11 +574,20 @@ class AggregationProcessor:
         events,
         dimensions: List[str],
         now: datetime,
+        event_ids: Optional[List[str]] = None,
     ) -> bool:
-        """对指定维度执行聚合"""
+        """对指定维度执行聚合
+
+        传入 event_ids 时从本轮共享事件缓冲中圈定事件，否则按 events QuerySet 单独装载
+        """
         try:
-            # 优化：直接使用已过滤的 events QuerySet，避免重复查询
-            load_success = self.db_conn.load_events_to_memory(events)
+            if event_ids is not None:
+                load_success = self.db_conn.select_buffered_events(event_ids)
+                source_table = BUFFERED_EVENTS_VIEW
+            else:
+                # 优化：直接使用已过滤的 events QuerySet，避免重复查询
+                load_success = self.db_conn.load_events_to_memory(events)
+                source_table = "events_table"
             if not load_success:
                 logger.info("[AlertAggregation] 策略 %s 过滤后无事件，跳过聚合", strategy.name)
                 self._mark_strategy_executed(strategy, now)
@@ -532,6 +604,7 @@ class AggregationProcessor:
                 dimensions=dimensions,
                 window_config=window_config,
                 strategy_id=strategy.id,
+                source_table=source_table,
             )
 
             logger.debug("[AlertAggregation] 策略 %s: 执行聚合SQL", strategy.name)
@@ -334,12 +334,32 @@ class InstantAlertDispatcher:
     def _collect_hits(
         events: List[Event], strategies: List[InstantStrategySnapshot]
     ) -> List[InstantHit]:
+        """
+        事件 × 策略命中判断：可编译的策略先对整批事件做一次列式求值，
+        无法编译（如按 label/tag 匹配）的策略仍逐条走 InstantMatcher。
+        """
+        from apps.alerts.aggregation.strategy.compiled_matcher import MultiStrategyMatcher
         from apps.alerts.aggregation.strategy.instant_matcher import InstantMatcher
 
+        matcher = MultiStrategyMatcher(
+            InstantMatcher.compiler(),
+            {index: strategy.match_rules or [] for index, strategy in enumerate(strategies)},
+            empty_matches_all=False,
+        )
+        masks = {}
+        if matcher.compiled:
+            table = InstantMatcher.build_table(events, matcher.fields)
+            masks = {index: mask.to_pylist() for index, mask in matcher.evaluate(table).items()}
+
         hits: List[InstantHit] = []
-        for event in events:
-            for strategy in strategies:
-                if InstantMatcher.match_in_memory(event, strategy.match_rules or []):
+        for row, event in enumerate(events):
+            for index, strategy in enumerate(strategies):
+                mask = masks.get(index)
+                if mask is not None:
+                    matched = mask[row]
+                else:
+                    matched = InstantMatcher.match_in_memory(event, strategy.match_rules or [])
+                if matched:
                     hits.append(InstantHit(strategy.id, event.event_id))
                     if len(hits) >= INSTANT_HIT_CEILING:
                         logger.error(
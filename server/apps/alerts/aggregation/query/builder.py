@@ -16,6 +16,7 @@ class SQLBuilder:
         dimensions: List[str],
         window_config: WindowConfig,
         strategy_id: int,
+        source_table: str = "events_table",
     ) -> str:
         template_name = (
             "session_window.jinja"
@@ -32,6 +33,7 @@ class SQLBuilder:
             "window_start": window_start,
             "min_event_count": 1,
             "strategy_id": strategy_id,
+            "source_table": source_table,
         }
 
         if window_config.is_session_window:
@@ -0,0 +1,275 @@
+"""match_rules 编译器：把规则编译为 Arrow 列式谓词，一次扫描评估全部策略。
+
+条件先经 ``StrategyMatcher.normalize_condition`` / ``RuleMatcher.normalize_rule`` 归一化为
+(字段, 查找类型, 值)，与构建 ORM Q 对象走同一套校验，语义分歧视为 bug：
+
+- 默认按 PostgreSQL/ORM 语义求值（NULL 不命中正向条件，取反条件命中 NULL；字符型字段按字符串比较大小）；
+- ``in_memory_semantics=True`` 时按 ``InstantMatcher`` 语义求值（None 视为空串参与正则、大小比较按数值）。
+
+字段不在表结构中、值无法转换为列类型、正则不被 RE2 支持等情况抛出 ``UnsupportedRuleError``，
+调用方应对该策略退回原有匹配路径。
+"""
+
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from apps.alerts.aggregation.strategy.matcher import StrategyMatcher
+from apps.core.logger import alert_logger as logger
+
+Condition = Tuple[str, str, Any]
+
+# Python float() 可解析的常见数值格式，用于 in_memory 语义下的向量化数值比较
+NUMERIC_PATTERN = r"^\s*[-+]?(\d+(\.\d*)?|\.\d+)([eE][-+]?\d+)?\s*$"
+COMPARE_FUNCTIONS = {"gt": pc.greater, "gte": pc.greater_equal, "lt": pc.less, "lte": pc.less_equal}
+SUPPORTED_LOOKUPS = {"exact", "ne", "icontains", "not_contains", "iregex", "in", "not_in", *COMPARE_FUNCTIONS}
+
+
+class UnsupportedRuleError(ValueError):
+    """规则无法编译为内存谓词"""
+
+
+def _all(table: pa.Table, value: bool) -> pa.ChunkedArray:
+    return pa.chunked_array([pa.array([value] * table.num_rows, type=pa.bool_())])
+
+
+def _non_null(mask) -> pa.ChunkedArray:
+    return pc.fill_null(mask, False)
+
+
+class CompiledRuleSet:
+    """编译后的单个 match_rules：外层 OR、内层 AND"""
+
+    def __init__(self, groups: List[List[Condition]], match_all: bool = False):
+        self.groups = groups
+        self.match_all = match_all
+
+    @property
+    def fields(self) -> set:
+        return {field for group in self.groups for field, _, _ in group}
+
+    def evaluate(self, table: pa.Table, condition_mask: Callable[[pa.Table, Condition], pa.ChunkedArray]):
+        if self.match_all:
+            return _all(table, True)
+        result = None
+        for group in self.groups:
+            group_mask = None
+            for condition in group:
+                mask = condition_mask(table, condition)
+                group_mask = mask if group_mask is None else pc.and_(group_mask, mask)
+            result = group_mask if result is None else pc.or_(result, group_mask)
+        return result if result is not None else _all(table, False)
+
+
+class RuleCompiler:
+    """
+    将 match_rules 编译为 CompiledRuleSet，并对 Arrow 表求值单个条件
+
+    Args:
+        schema: 可参与匹配的列及其类型（字符串或整数列）
+        normalize: 条件归一化函数，默认 StrategyMatcher.normalize_condition
+        in_memory_semantics: 是否按 InstantMatcher 语义求值
+    """
+
+    def __init__(
+        self,
+        schema: pa.Schema,
+        normalize: Callable[[Dict], Optional[Condition]] = StrategyMatcher.normalize_condition,
+        in_memory_semantics: bool = False,
+    ):
+        self.schema = schema
+        self.normalize = normalize
+        self.in_memory_semantics = in_memory_semantics
+
+    def compile(self, match_rules: Optional[List[List[Dict]]], empty_matches_all: bool = True) -> CompiledRuleSet:
+        if not match_rules:
+            return CompiledRuleSet([], match_all=empty_matches_all)
+
+        groups = []
+        for and_group in match_rules:
+            if not and_group:
+                continue
+            conditions = []
+            for condition in and_group:
+                try:
+                    normalized = self.normalize(condition)
+                except Exception as e:  # noqa
+                    raise UnsupportedRuleError(f"条件校验异常: {condition}") from e
+                if normalized is None:
+                    # 与 ORM 路径一致：任一条件无效则整组失效
+                    conditions = None
+                    break
+                conditions.append(self._prepare(normalized))
+            if conditions:
+                groups.append(conditions)
+        return CompiledRuleSet(groups)
+
+    def _prepare(self, condition: Condition) -> Condition:
+        """校验字段与值并转换为列类型，返回可直接求值的条件"""
+        field, lookup, value = condition
+        if lookup not in SUPPORTED_LOOKUPS:
+            raise UnsupportedRuleError(f"不支持的查找类型: {lookup}")
+        if isinstance(value, dict) or (isinstance(value, (list, tuple)) and lookup not in ("in", "not_in")):
+            raise UnsupportedRuleError(f"{lookup} 不支持复合类型的值: {value!r}")
+        if field not in self.schema.names:
+            raise UnsupportedRuleError(f"字段不在事件表中: {field}")
+        column_type = self.schema.field(field).type
+
+        if lookup in ("in", "not_in"):
+            values = [self._convert(column_type, v, lookup) for v in value if v is not None]
+            return field, lookup, (tuple(values), any(v is None for v in value))
+        if lookup == "iregex":
+            pattern = str(value)
+            try:
+                pc.match_substring_regex(pa.array([""]), pattern, ignore_case=True)
+            except pa.ArrowInvalid as e:
+                # RE2 不支持回溯引用、环视等语法，交由原路径处理
+                raise UnsupportedRuleError(f"正则无法编译为 RE2: {pattern}") from e
+            return field, lookup, pattern
+        if lookup in ("icontains", "not_contains"):
+            return field, lookup, str(value)
+        if lookup in COMPARE_FUNCTIONS and self.in_memory_semantics:
+            try:
+                return field, lookup, float(value)
+            except (TypeError, ValueError):
+                return field, lookup, None
+        if value is None:
+            return field, lookup, None
+        return field, lookup, self._convert(column_type, value, lookup)
+
+    @staticmethod
+    def _convert(column_type: pa.DataType, value: Any, lookup: str) -> Any:
+        if isinstance(value, (list, tuple, dict)):
+            raise UnsupportedRuleError(f"{lookup} 不支持复合类型的值: {value!r}")
+        if pa.types.is_integer(column_type):
+            if isinstance(value, float) and lookup in COMPARE_FUNCTIONS:
+                return value
+            try:
+                return int(value)
+            except (TypeError, ValueError) as e:
+                raise UnsupportedRuleError(f"值无法转换为整数: {value!r}") from e
+        return str(value)
+
+    def condition_mask(self, table: pa.Table, condition: Condition) -> pa.ChunkedArray:
+        """对整张表求值单个条件，返回不含 NULL 的布尔列"""
+        field, lookup, value = condition
+        column = table[field]
+
+        if lookup in ("ne", "not_contains", "not_in"):
+            positive = {"ne": "exact", "not_contains": "icontains", "not_in": "in"}[lookup]
+            return pc.invert(self.condition_mask(table, (field, positive, value)))
+
+        if lookup == "exact":
+            if value is None:
+                return pc.is_null(column)
+            return _non_null(pc.equal(column, value))
+        if lookup == "in":
+            values, has_none = value
+            if values:
+                mask = _non_null(pc.is_in(column, value_set=pa.array(values, type=column.type)))
+            else:
+                mask = _all(table, False)
+            if has_none and self.in_memory_semantics:
+                mask = pc.or_(mask, pc.is_null(column))
+            return mask
+
+        text = column if pa.types.is_string(column.type) else pc.cast(column, pa.string())
+        if lookup == "icontains":
+            if self.in_memory_semantics and value == "":
+                return _all(table, False)
+            return _non_null(pc.match_substring(text, value, ignore_case=True))
+        if lookup == "iregex":
+            if self.in_memory_semantics:
+                text = pc.fill_null(text, "")
+            return _non_null(pc.match_substring_regex(text, value, ignore_case=True))
+
+        compare = COMPARE_FUNCTIONS[lookup]
+        if value is None:
+            return _all(table, False)
+        if self.in_memory_semantics and not pa.types.is_integer(column.type):
+            numeric = pc.if_else(pc.match_substring_regex(text, NUMERIC_PATTERN), text, pa.scalar(None, pa.string()))
+            return _non_null(compare(pc.cast(numeric, pa.float64()), value))
+        return _non_null(compare(column, value))
+
+
+class MultiStrategyMatcher:
+    """
+    多策略单次扫描匹配器
+
+    所有策略的条件按 (字段, 查找类型, 值) 去重后各自只求值一次，再按 OR/AND 组合成每个策略的命中掩码。
+    无法编译的策略记入 fallback，由调用方按原路径逐条匹配。
+    """
+
+    def __init__(
+        self,
+        compiler: RuleCompiler,
+        rules_by_strategy: Dict[Hashable, Optional[List[List[Dict]]]],
+        empty_matches_all: bool = True,
+    ):
+        self.compiler = compiler
+        self.compiled: Dict[Hashable, CompiledRuleSet] = {}
+        self.fallback: List[Hashable] = []
+        for strategy_id, match_rules in rules_by_strategy.items():
+            try:
+                self.compiled[strategy_id] = compiler.compile(match_rules, empty_matches_all=empty_matches_all)
+            except UnsupportedRuleError as e:
+                logger.info("[AlertMatch] 策略 %s 规则无法编译，退回原匹配路径: %s", strategy_id, e)
+                self.fallback.append(strategy_id)
+
+    @property
+    def fields(self) -> set:
+        """已编译策略引用到的字段"""
+        return set().union(*(compiled.fields for compiled in self.compiled.values()))
+
+    def evaluate(
+        self, table: pa.Table, strategy_ids: Optional[Iterable[Hashable]] = None
+    ) -> Dict[Hashable, pa.ChunkedArray]:
+        """
+        返回每个已编译策略的命中掩码；求值异常的策略不出现在结果中
+
+        Args:
+            strategy_ids: 只求值这些策略（默认全部已编译策略）
+        """
+        selected = None if strategy_ids is None else set(strategy_ids)
+        cache: Dict[Tuple[str, str, str], pa.ChunkedArray] = {}
+
+        def cached_mask(tbl: pa.Table, condition: Condition) -> pa.ChunkedArray:
+            key = (condition[0], condition[1], repr(condition[2]))
+            if key not in cache:
+                cache[key] = self.compiler.condition_mask(tbl, condition)
+            return cache[key]
+
+        masks = {}
+        for strategy_id, compiled in self.compiled.items():
+            if selected is not None and strategy_id not in selected:
+                continue
+            try:
+                masks[strategy_id] = compiled.evaluate(table, cached_mask)
+            except Exception:  # noqa
+                logger.exception("[AlertMatch] 策略 %s 编译谓词求值失败，退回原匹配路径", strategy_id)
+        return masks
+
+    def tag(self, table: pa.Table) -> List[List[Hashable]]:
+        """为每行事件标记命中的策略 ID 列表（按策略传入顺序）"""
+        tags: List[List[Hashable]] = [[] for _ in range(table.num_rows)]
+        for strategy_id, mask in self.evaluate(table).items():
+            for index in pc.indices_nonzero(mask).to_pylist():
+                tags[index].append(strategy_id)
+        return tags
+
+
+def rows_to_table(rows: Iterable[Dict[str, Any]], fields: Iterable[str]) -> pa.Table:
+    """把字典行转换为全字符串列的 Arrow 表（None 保留为 NULL）"""
+    rows = list(rows)
+    return pa.table(
+        {
+            field: pa.array([None if row.get(field) is None else str(row.get(field)) for row in rows], type=pa.string())
+            for field in fields
+        }
+    )
+
+
+def string_schema(fields: Iterable[str]) -> pa.Schema:
+    return pa.schema([(field, pa.string()) for field in fields])
+
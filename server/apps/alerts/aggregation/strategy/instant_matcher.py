@@ -7,8 +7,11 @@
 """
 
 import re
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
+import pyarrow as pa
+
+from apps.alerts.aggregation.strategy.compiled_matcher import RuleCompiler, string_schema
 from apps.alerts.aggregation.strategy.matcher import StrategyMatcher
 from apps.alerts.models.models import Event
 from apps.core.logger import alert_logger as logger
@@ -17,6 +20,22 @@ from apps.core.logger import alert_logger as logger
 class InstantMatcher:
     OPERATOR_MAP = StrategyMatcher.OPERATOR_MAP
     FIELD_MAP = StrategyMatcher.FIELD_MAP
+    # 可编译为列式谓词的字段；label/tag 等其余字段仍逐条走 match_in_memory
+    TABLE_SCHEMA = string_schema(dict.fromkeys(FIELD_MAP.values()))
+
+    @staticmethod
+    def compiler() -> RuleCompiler:
+        """按本匹配器语义求值的规则编译器（批量评估多策略时使用）"""
+        return RuleCompiler(InstantMatcher.TABLE_SCHEMA, in_memory_semantics=True)
+
+    @staticmethod
+    def build_table(events: List[Event], fields: Iterable[str]) -> pa.Table:
+        """按字段取值规则把事件转换为全字符串列的 Arrow 表，仅构建用到的字段"""
+        columns = {}
+        for field_name in fields:
+            values = (InstantMatcher._get_field_value(event, field_name) for event in events)
+            columns[field_name] = pa.array([None if v is None else str(v) for v in values], type=pa.string())
+        return pa.table(columns) if columns else pa.table({"_": pa.nulls(len(events))})
 
     @staticmethod
     def match_in_memory(event: Event, match_rules: Optional[List[List[Dict[str, Any]]]]) -> bool:
@@ -1,5 +1,5 @@
 import re
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from django.db.models import Q
 from apps.core.logger import alert_logger as logger
 
@@ -166,6 +166,30 @@ class StrategyMatcher:
         Returns:
             Q对象，如果条件无效返回None（而非空Q对象，以便调用方可以跳过该条件）
         """
+        normalized = StrategyMatcher.normalize_condition(condition)
+        if normalized is None:
+            return None
+
+        field_name, lookup, value = normalized
+        if lookup == "ne":
+            return ~Q(**{f"{field_name}__exact": value})
+        if lookup in ("not_contains", "not_in"):
+            positive_lookup = "icontains" if lookup == "not_contains" else "in"
+            return ~Q(**{f"{field_name}__{positive_lookup}": value})
+        # PostgreSQL 的 iregex 使用 ~* 操作符进行不区分大小写的正则匹配
+        return Q(**{f"{field_name}__{lookup}": value})
+
+    @staticmethod
+    def normalize_condition(condition: Dict) -> Optional[Tuple[str, str, Any]]:
+        """
+        校验单个条件并归一化为 (模型字段, 查找类型, 值)
+
+        查找类型取 OPERATOR_MAP 的值（exact/ne/icontains/not_contains/iregex/in/not_in/gt/gte/lt/lte），
+        ORM Q 对象与编译后的内存谓词（CompiledRuleSet）都基于该结果构建，保证两者语义一致。
+
+        Returns:
+            归一化三元组，条件无效返回None
+        """
         key = condition.get("key")
         operator = condition.get("operator")
         value = condition.get("value")
@@ -191,14 +215,10 @@ class StrategyMatcher:
             if value is None or value == "":
                 logger.warning("[AlertMatch] not_contains操作符的value不能为空: %s", condition)
                 return None
-            return ~Q(**{f"{field_name}__icontains": value})
-        elif django_operator == "ne":
-            return ~Q(**{f"{field_name}__exact": value})
-        elif django_operator == "not_in":
+        elif django_operator in ("in", "not_in"):
             if not isinstance(value, (list, tuple)):
-                logger.warning("[AlertMatch] not_in操作符需要列表类型的value: %s", condition)
+                logger.warning("[AlertMatch] %s操作符需要列表类型的value: %s", django_operator, condition)
                 return None
-            return ~Q(**{f"{field_name}__in": value})
 
         # 处理正则表达式
         elif django_operator == "iregex":
@@ -212,19 +232,8 @@ class StrategyMatcher:
                 logger.error("[AlertMatch] 无效的正则表达式 '%s': %s", value, e)
                 # 返回None让调用方跳过该条件，而非返回空结果集
                 return None
-            # PostgreSQL使用 ~* 操作符进行不区分大小写的正则匹配
-            return Q(**{f"{field_name}__iregex": value})
-
-        # 处理in操作符
-        elif django_operator == "in":
-            if not isinstance(value, (list, tuple)):
-                logger.warning("[AlertMatch] in操作符需要列表类型的value: %s", condition)
-                return None
-            return Q(**{f"{field_name}__in": value})
 
-        # 处理其他标准操作符
-        else:
-            return Q(**{f"{field_name}__{django_operator}": value})
+        return field_name, django_operator, value
 
     @staticmethod
     def _event_to_dict(event) -> Dict[str, Any]:
@@ -22,6 +22,8 @@ class AlertsConfig(AppConfig):
             _register_instant_cache_signals()
             # 注册 Level 模型缓存失效信号
             _register_level_cache_signals()
+            # 注册屏蔽策略索引失效信号
+            _register_shield_index_signals()
 
 
 def _register_instant_cache_signals():
@@ -72,3 +74,24 @@ def _register_level_cache_signals():
         post_delete.connect(_invalidate_level_cache, sender=Level, dispatch_uid="alert_builder_level_post_delete", weak=False)
     except Exception as e:  # noqa
         logger.error("[AlertInit] 注册 Level 缓存失效信号失败: %s", e, exc_info=True)
+
+
+def _register_shield_index_signals():
+    """注册 AlertShield save/delete 信号 → 递增屏蔽策略索引版本。
+
+    立即失效保证本进程后续批次可见；事务提交后再递增一次，避免其他 worker 在提交前按旧数据重建后沿用新版本号。
+    """
+    try:
+        from django.db import transaction
+        from django.db.models.signals import post_save, post_delete
+        from apps.alerts.common.shield_index import shield_index_cache
+        from apps.alerts.models.alert_operator import AlertShield
+
+        def _invalidate_shield_index(sender, **kwargs):
+            shield_index_cache.invalidate()
+            transaction.on_commit(shield_index_cache.invalidate)
+
+        post_save.connect(_invalidate_shield_index, sender=AlertShield, dispatch_uid="shield_index_post_save", weak=False)
+        post_delete.connect(_invalidate_shield_index, sender=AlertShield, dispatch_uid="shield_index_post_delete", weak=False)
+    except Exception as e:  # noqa
+        logger.error("[AlertInit] 注册屏蔽策略索引失效信号失败: %s", e, exc_info=True)
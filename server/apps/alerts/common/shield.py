@@ -16,6 +16,8 @@ from apps.alerts.models.alert_operator import AlertShield
 from apps.alerts.constants.constants import AlertShieldMatchType, EventStatus
 from apps.alerts.utils.time_range_checker import TimeRangeChecker
 from apps.alerts.utils.rule_matcher import RuleMatcher
+from apps.alerts.aggregation.strategy.compiled_matcher import MultiStrategyMatcher, RuleCompiler, rows_to_table, string_schema
+from apps.alerts.common.shield_index import ShieldIndex, shield_index_cache
 from apps.core.logger import alert_logger as logger
 
 
@@ -37,19 +39,24 @@ class EventShieldOperator(object):
         "event_id": "event_id",
     }
 
-    def __init__(self, event_id_list: List[str], active_shields=None):
+    def __init__(self, event_id_list: List[str], active_shields=None, shield_index: ShieldIndex = None):
         """
         初始化事件屏蔽操作器（性能优化版）
 
         Args:
             event_id_list: 事件ID列表
             active_shields: 预加载的活跃屏蔽策略（可选，避免重复查询）
+            shield_index: 屏蔽策略索引（未传入 active_shields 时默认使用进程级缓存索引）
         """
+        # 初始化规则匹配器
+        self.rule_matcher = RuleMatcher(self.FIELD_MAPPING)
+        self.shield_index = None
         # 优化：支持传入预加载的屏蔽策略
         if active_shields is not None:
             self.active_shields = active_shields
         else:
-            self.active_shields = self.get_shields()
+            self.shield_index = shield_index or get_shield_index()
+            self.active_shields = self.shield_index.shields
 
         if not self.active_shields:
             raise ShieldNotFoundError()
@@ -58,8 +65,6 @@ class EventShieldOperator(object):
         self.events = self.get_event_map()
         if not self.events:
             raise EventNotFoundError()
-        # 初始化规则匹配器
-        self.rule_matcher = RuleMatcher(self.FIELD_MAPPING)
 
     def get_event_map(self) -> Dict[int, Event]:
         """获取事件实例映射"""
@@ -104,13 +109,19 @@ class EventShieldOperator(object):
         # 记录已屏蔽的事件ID
         shielded_event_ids = set()
 
+        # 一次扫描预先计算所有屏蔽策略命中的事件，无法编译的策略仍逐条查询
+        precomputed = self._match_shields_in_memory(self.active_shields)
+
         # 按屏蔽策略批量处理事件
         for shield in self.active_shields:
             try:
                 # 批量查找匹配该屏蔽策略的事件（排除已屏蔽的）
-                matched_event_ids = self._batch_find_matching_events(
-                    shield, shielded_event_ids
-                )
+                if shield.id in precomputed:
+                    matched_event_ids = [i for i in precomputed[shield.id] if i not in shielded_event_ids]
+                else:
+                    matched_event_ids = self._batch_find_matching_events(
+                        shield, shielded_event_ids
+                    )
 
                 if not matched_event_ids:
                     continue
@@ -144,6 +155,8 @@ class EventShieldOperator(object):
         """
         # 使用当前时间检查屏蔽策略的时间范围是否生效
         check_time = timezone.now()
+        if self.shield_index is not None:
+            return self.shield_index.active_shields(check_time)
 
         time_matched_shields = []
         for shield in self.active_shields:
@@ -155,6 +168,47 @@ class EventShieldOperator(object):
 
         return time_matched_shields
 
+    def _match_shields_in_memory(self, shields: List[AlertShield]) -> Dict[int, List[int]]:
+        """
+        将待检查事件一次性载入列式表，对所有屏蔽策略的 match_rules 单次扫描求值
+
+        Returns:
+            {屏蔽策略ID: 命中的事件主键列表}；求值失败或规则无法编译的策略不在结果中
+        """
+        if not shields:
+            return {}
+        fields = list(dict.fromkeys(self.FIELD_MAPPING.values()))
+        try:
+            rows = list(
+                Event.objects.filter(
+                    event_id__in=self.event_id_list,
+                    status__in=[EventStatus.RECEIVED, EventStatus.PENDING],
+                ).values("id", *fields)
+            )
+            table = rows_to_table(rows, fields)
+            event_pks = [row["id"] for row in rows]
+            if self.shield_index is not None:
+                return self.shield_index.match(table, event_pks, [shield.id for shield in shields])
+            matcher = MultiStrategyMatcher(
+                RuleCompiler(string_schema(fields), normalize=self.rule_matcher.normalize_rule),
+                {
+                    shield.id: shield.match_rules or []
+                    for shield in shields
+                    if shield.match_type == AlertShieldMatchType.FILTER
+                },
+            )
+            result = {
+                shield_id: [event_pks[i] for i, hit in enumerate(mask.to_pylist()) if hit]
+                for shield_id, mask in matcher.evaluate(table).items()
+            }
+        except Exception as e:  # noqa
+            logger.warning("[AlertShield] 屏蔽规则批量求值失败，退回逐策略查询: %s", e)
+            return {}
+        for shield in shields:
+            if shield.match_type == AlertShieldMatchType.ALL:
+                result[shield.id] = list(event_pks)
+        return result
+
     def _batch_find_matching_events(
         self, shield: AlertShield, excluded_ids: set = None
     ) -> List[int]:
@@ -264,8 +318,13 @@ class EventShieldOperator(object):
         return self.execute_shield_check()
 
 
+def get_shield_index() -> ShieldIndex:
+    """获取进程级缓存的活跃屏蔽策略索引（屏蔽策略变更后按版本自动重建）"""
+    return shield_index_cache.get(EventShieldOperator.FIELD_MAPPING, RuleMatcher(EventShieldOperator.FIELD_MAPPING).normalize_rule)
+
+
 def execute_shield_check_for_events(
-    event_ids: List[str], active_shields=None
+    event_ids: List[str], active_shields=None, shield_index: ShieldIndex = None
 ) -> Dict[str, Any]:
     """
     为指定事件列表执行屏蔽检查（性能优化版）
@@ -273,6 +332,7 @@ def execute_shield_check_for_events(
     Args:
         event_ids: 事件ID列表
         active_shields: 预加载的活跃屏蔽策略（可选，避免重复查询）
+        shield_index: 预加载的屏蔽策略索引（可选，优先于 active_shields）
 
     Returns:
         执行结果
@@ -286,11 +346,10 @@ def execute_shield_check_for_events(
             "shield_results": [],
         }
 
-    # 优化：如果没有传入 active_shields，检查是否有活跃策略
+    # 优化：如果没有传入 active_shields，使用屏蔽策略索引
     if active_shields is None:
-        # 未传入，需要查询
         try:
-            operator = EventShieldOperator(event_ids)
+            operator = EventShieldOperator(event_ids, shield_index=shield_index)
         except ShieldNotFoundError:
             logger.warning("No active shields found, skipping shield check")
             return {
@@ -0,0 +1,305 @@
+"""屏蔽策略索引。
+
+屏蔽检查在每个入库批次上执行，逐批加载全部活跃屏蔽策略、逐条解析时间配置在屏蔽策略较多时开销显著。
+本模块把活跃屏蔽策略预编译为进程级索引，按版本号失效（AlertShield save/delete 信号递增版本）：
+
+- 时间窗：一次性时段按开始时间排序，二分定位后只检查已开始的时段；每日/每周/每月时段预解析为
+  (日期集合, 起止时分秒)，查询时只计算一次本地时间；
+- 匹配规则：FILTER 策略整体编译为列式谓词（见 ``compiled_matcher``），每个 AND 组中的等值条件
+  建立 (字段, 值) → 策略 的哈希索引，批次中不出现对应值的策略直接跳过，不参与求值。
+"""
+
+import bisect
+import datetime
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import pyarrow as pa
+from django.core.cache import cache
+from django.utils import timezone
+
+from apps.alerts.aggregation.strategy.compiled_matcher import MultiStrategyMatcher, RuleCompiler, string_schema
+from apps.alerts.constants.constants import AlertShieldMatchType
+from apps.alerts.models.alert_operator import AlertShield
+from apps.alerts.utils.time_range_checker import TimeRangeChecker
+from apps.core.logger import alert_logger as logger
+
+SHIELD_INDEX_VERSION_KEY = "alerts:shield_index:version"
+# 兜底重建间隔：覆盖绕过信号的批量 update 等场景
+SHIELD_INDEX_MAX_AGE = 60
+
+_ONE_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+@dataclass(frozen=True, slots=True)
+class ShieldSnapshot:
+    """屏蔽检查所需的屏蔽策略快照。"""
+
+    id: int
+    name: str
+    match_type: str
+    match_rules: list
+    suppression_time: dict
+
+
+def _day_set(day_config, max_day: int) -> Optional[Set[int]]:
+    """按 TimeRangeChecker._is_day_matched 的语义把周/月配置展开为日期集合，None 表示不限日期。"""
+    if day_config is None:
+        return None
+    if isinstance(day_config, list):
+        return {day for day in range(1, max_day + 1) if day in day_config}
+    if isinstance(day_config, str):
+        return {day for day in range(1, max_day + 1) if str(day) in day_config}
+    return set()
+
+
+class ShieldTimeIndex:
+    """
+    屏蔽时间窗索引
+
+    与 TimeRangeChecker.is_in_range 语义一致；无法预编译的配置保留 TimeRangeChecker 逐条判断。
+    """
+
+    def __init__(self, shields: Iterable[ShieldSnapshot]):
+        self.always: List[int] = []
+        self.never: List[int] = []
+        self.fallback: List[Tuple[int, dict]] = []
+        # 一次性时段：按开始时间排序，_one_starts 与 _one_windows 下标对齐
+        self._one_starts: List[datetime.datetime] = []
+        self._one_windows: List[Tuple[datetime.datetime, int]] = []
+        # 每日时段：(开始, 结束, 策略ID)，按本地时分秒字符串比较
+        self.daily: List[Tuple[str, str, int]] = []
+        # 每周/每月时段：(日期集合或 None, 开始, 结束, 策略ID)，开始/结束为 None 表示全天
+        self.weekly: List[Tuple[Optional[Set[int]], Optional[str], Optional[str], int]] = []
+        self.monthly: List[Tuple[Optional[Set[int]], Optional[str], Optional[str], int]] = []
+
+        one_windows = []
+        for shield in shields:
+            try:
+                window = self._compile(shield.suppression_time)
+            except Exception:  # noqa
+                window = None
+            if window is None:
+                self.fallback.append((shield.id, shield.suppression_time))
+                continue
+            kind, payload = window
+            if kind == "always":
+                self.always.append(shield.id)
+            elif kind == "never":
+                self.never.append(shield.id)
+            elif kind == "one":
+                one_windows.append((payload[0], payload[1], shield.id))
+            elif kind == "day":
+                self.daily.append((payload[0], payload[1], shield.id))
+            elif kind == "week":
+                self.weekly.append((*payload, shield.id))
+            else:
+                self.monthly.append((*payload, shield.id))
+
+        one_windows.sort(key=lambda item: item[0])
+        self._one_starts = [start for start, _, _ in one_windows]
+        self._one_windows = [(end, shield_id) for _, end, shield_id in one_windows]
+
+    @staticmethod
+    def _compile(config: Optional[Dict[str, Any]]) -> Optional[Tuple[str, Any]]:
+        """预编译单个时间配置，返回 (类型, 参数)；返回 None 表示交由 TimeRangeChecker 判断。"""
+        if not config:
+            return "always", None
+        time_type = config.get("type", "one")
+        start_time = config.get("start_time")
+        end_time = config.get("end_time")
+        if time_type not in ("one", "day", "week", "month"):
+            return "always", None
+        if any(value is not None and not isinstance(value, str) for value in (start_time, end_time)):
+            return None
+        if time_type == "one":
+            if not start_time or not end_time:
+                return "never", None
+            try:
+                start = timezone.make_aware(datetime.datetime.strptime(start_time, _ONE_TIME_FORMAT))
+                end = timezone.make_aware(datetime.datetime.strptime(end_time, _ONE_TIME_FORMAT))
+            except ValueError:
+                return "never", None
+            return "one", (start, end)
+        if time_type == "day":
+            if not start_time or not end_time:
+                return "never", None
+            return "day", (start_time, end_time)
+
+        max_day = 7 if time_type == "week" else 31
+        days = _day_set(config.get("week_month"), max_day)
+        if not start_time or not end_time:
+            return time_type, (days, None, None)
+        return time_type, (
+            days,
+            TimeRangeChecker._extract_time_part(start_time),
+            TimeRangeChecker._extract_time_part(end_time),
+        )
+
+    def active_ids(self, check_time: datetime.datetime) -> Set[int]:
+        """返回 check_time 时刻生效的屏蔽策略ID集合"""
+        active = set(self.always)
+
+        started = bisect.bisect_right(self._one_starts, check_time)
+        active.update(shield_id for end, shield_id in self._one_windows[:started] if check_time <= end)
+
+        local_time = timezone.localtime(check_time) if timezone.is_aware(check_time) else check_time
+        time_of_day = local_time.strftime("%H:%M:%S")
+        active.update(shield_id for start, end, shield_id in self.daily if start <= time_of_day <= end)
+        for windows, day in ((self.weekly, local_time.weekday() + 1), (self.monthly, local_time.day)):
+            for days, start, end, shield_id in windows:
+                if days is not None and day not in days:
+                    continue
+                if start is None or start <= time_of_day <= end:
+                    active.add(shield_id)
+
+        for shield_id, config in self.fallback:
+            if TimeRangeChecker(config, check_time).is_in_range():
+                active.add(shield_id)
+        return active
+
+
+class ShieldIndex:
+    """
+    活跃屏蔽策略索引
+
+    Args:
+        shields: 活跃屏蔽策略快照
+        field_mapping: 规则字段键 → 事件模型字段
+        normalize: 规则归一化函数（RuleMatcher.normalize_rule）
+    """
+
+    def __init__(
+        self,
+        shields: List[ShieldSnapshot],
+        field_mapping: Dict[str, str],
+        normalize: Callable[[Dict], Optional[Tuple[str, str, Any]]],
+    ):
+        self.shields = shields
+        self.fields = list(dict.fromkeys(field_mapping.values()))
+        self.time_index = ShieldTimeIndex(shields)
+        self.match_all_ids = [shield.id for shield in shields if shield.match_type == AlertShieldMatchType.ALL]
+        self.matcher = MultiStrategyMatcher(
+            RuleCompiler(string_schema(self.fields), normalize=normalize),
+            {
+                shield.id: shield.match_rules or []
+                for shield in shields
+                if shield.match_type == AlertShieldMatchType.FILTER
+            },
+        )
+        # (字段 → 值 → 策略ID集合)；unindexed 为存在不含等值条件的 AND 组、必须参与求值的策略
+        self.equality_index: Dict[str, Dict[str, Set[int]]] = {}
+        self.unindexed: Set[int] = set()
+        for shield_id, compiled in self.matcher.compiled.items():
+            self._index_rule_set(shield_id, compiled)
+
+    def __len__(self) -> int:
+        return len(self.shields)
+
+    def _index_rule_set(self, shield_id: int, compiled) -> None:
+        if compiled.match_all:
+            self.unindexed.add(shield_id)
+            return
+        for group in compiled.groups:
+            keys = None
+            for field, lookup, value in group:
+                if lookup == "exact" and value is not None:
+                    keys = [(field, value)]
+                    break
+                if lookup == "in" and value[0]:
+                    keys = [(field, item) for item in value[0]]
+                    break
+            if keys is None:
+                self.unindexed.add(shield_id)
+                return
+            for field, item in keys:
+                self.equality_index.setdefault(field, {}).setdefault(item, set()).add(shield_id)
+
+    def active_shields(self, check_time: datetime.datetime) -> List[ShieldSnapshot]:
+        """check_time 时刻生效的屏蔽策略（保持原有顺序）"""
+        active = self.time_index.active_ids(check_time)
+        return [shield for shield in self.shields if shield.id in active]
+
+    def candidate_ids(self, table: pa.Table, shield_ids: Iterable[int]) -> Set[int]:
+        """按批次中出现的字段值查哈希索引，过滤出可能命中的 FILTER 策略"""
+        shield_ids = set(shield_ids)
+        candidates = self.unindexed & shield_ids
+        for field, value_index in self.equality_index.items():
+            for value in set(table[field].to_pylist()):
+                if value is not None and value in value_index:
+                    candidates.update(value_index[value] & shield_ids)
+        return candidates
+
+    def match(self, table: pa.Table, event_pks: List[int], shield_ids: Iterable[int]) -> Dict[int, List[int]]:
+        """
+        对整批事件求值指定屏蔽策略
+
+        Returns:
+            {屏蔽策略ID: 命中的事件主键列表}；规则无法编译的策略不在结果中，由调用方逐条查询
+        """
+        shield_ids = set(shield_ids)
+        result: Dict[int, List[int]] = {
+            shield_id: [] for shield_id in shield_ids if shield_id in self.matcher.compiled
+        }
+        candidates = self.candidate_ids(table, shield_ids)
+        for shield_id, mask in self.matcher.evaluate(table, candidates).items():
+            result[shield_id] = [event_pks[i] for i, hit in enumerate(mask.to_pylist()) if hit]
+        for shield_id in self.match_all_ids:
+            if shield_id in shield_ids:
+                result[shield_id] = list(event_pks)
+        return result
+
+
+class ShieldIndexCache:
+    """
+    进程级屏蔽策略索引缓存
+
+    版本号存放在 Django cache（生产为 Redis），任一 worker 修改屏蔽策略后递增版本，
+    其他 worker 下次使用前比对版本即可感知；每批次只需一次缓存读取，而非全量加载屏蔽策略。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._index: Optional[ShieldIndex] = None
+        self._version = None
+        self._built_at = 0.0
+
+    def get(self, field_mapping: Dict[str, str], normalize) -> ShieldIndex:
+        version = cache.get(SHIELD_INDEX_VERSION_KEY)
+        with self._lock:
+            expired = time.monotonic() - self._built_at > SHIELD_INDEX_MAX_AGE
+            if self._index is None or version != self._version or expired:
+                shields = [
+                    ShieldSnapshot(
+                        id=row["id"],
+                        name=row["name"],
+                        match_type=row["match_type"],
+                        match_rules=row["match_rules"] or [],
+                        suppression_time=row["suppression_time"] or {},
+                    )
+                    for row in AlertShield.objects.filter(is_active=True)
+                    .order_by("id")
+                    .values("id", "name", "match_type", "match_rules", "suppression_time")
+                ]
+                self._index = ShieldIndex(shields, field_mapping, normalize)
+                self._version = version
+                self._built_at = time.monotonic()
+                logger.debug("[AlertShield] 屏蔽策略索引已重建: count=%s, version=%s", len(shields), version)
+            return self._index
+
+    def invalidate(self) -> None:
+        """递增全局版本并丢弃本进程索引"""
+        cache.set(SHIELD_INDEX_VERSION_KEY, uuid.uuid4().hex, None)
+        self.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._index = None
+            self._version = None
+            self._built_at = 0.0
+
+
+shield_index_cache = ShieldIndexCache()
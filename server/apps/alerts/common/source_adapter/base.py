@@ -15,7 +15,7 @@ from django.db.models import Prefetch
 from django.utils import timezone
 
 from apps.alerts.aggregation.recovery.recovery_handler import RecoveryHandler
-from apps.alerts.common.shield import execute_shield_check_for_events
+from apps.alerts.common.shield import execute_shield_check_for_events, get_shield_index
 from apps.alerts.constants.constants import LevelType, EventAction, AlertStatus, SNMP_TRAP_SOURCE_ID, DEFAULT_GROUP_ID
 from apps.alerts.error import AuthenticationSourceError
 from apps.alerts.models.models import Alert, Event, Level
@@ -585,12 +585,18 @@ class AlertSourceAdapter(ABC):
             events_list: 事件批次列表
         """
 
-        # 优化：预先查询活跃屏蔽策略，避免每批次重复查询
-        active_shields = self.get_active_shields()
+        # 优化：使用进程级屏蔽策略索引，无活跃屏蔽策略时直接跳过
+        try:
+            shield_index = get_shield_index()
+        except Exception:  # noqa
+            logger.error("[AlertSource] 加载屏蔽策略索引失败", exc_info=True)
+            return
+        if not len(shield_index):
+            return
 
         for event_list in events_list:
             try:
-                execute_shield_check_for_events([i.event_id for i in event_list], active_shields=active_shields)
+                execute_shield_check_for_events([i.event_id for i in event_list], shield_index=shield_index)
             except Exception as err:  # noqa
                 logger.error("[AlertSource] 事件屏蔽检查失败", exc_info=True)
 
@@ -0,0 +1,182 @@
+"""丰富结果两级缓存：进程内有界 LRU + Django cache（生产为 Redis）。
+
+- 进程内 LRU 挡在 Redis 之前，热点资源不再每批都走网络；
+- 未命中进程内缓存的 key 通过 ``get_many`` / ``set_many`` 一次往返批量读写；
+- 对仍未命中的 key 以 ``cache.add`` 抢占短时锁实现跨进程 single-flight；未抢到锁的 key 在有界时间内
+  批量轮询持锁方回填，超时仍未回填的由调用方跳过本次丰富（不自行查询），避免缓存失效瞬间击穿 CMDB。
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.core.cache import cache
+
+CACHE_KEY_PREFIX = "enrich:"
+LOCK_KEY_PREFIX = "enrich:lock:"
+LOCAL_CACHE_MAX_ENTRIES = 10000
+# 远端剩余 TTL 未知，从 Redis 回填进程内缓存时按较短时长缓存，避免放大过期窗口
+LOCAL_REFILL_TTL_SECONDS = 30
+# single-flight 锁存活时间需覆盖一次 provider 批量查询
+SINGLE_FLIGHT_LOCK_TTL = 10
+# 等待持锁方回填的上限；接入线程最多阻塞这么久，超时未回填的 key 跳过丰富
+SINGLE_FLIGHT_WAIT_SECONDS = 1.0
+SINGLE_FLIGHT_POLL_INTERVAL = 0.05
+
+
+def config_digest(provider_type: str, provider_config: Dict) -> str:
+    """provider 类型 + 配置的摘要，每条规则（按组织范围）只计算一次。"""
+    raw = json.dumps({"pt": provider_type, "cfg": provider_config}, sort_keys=True, ensure_ascii=False)
+    return hashlib.md5(raw.encode("utf-8")).hexdigest()
+
+
+def build_cache_key(digest: str, binding_key) -> str:
+    """由配置摘要与 binding key 构造确定性缓存键。"""
+    raw = digest + json.dumps(list(binding_key), ensure_ascii=False)
+    return CACHE_KEY_PREFIX + hashlib.md5(raw.encode("utf-8")).hexdigest()
+
+
+class LocalLRUCache:
+    """线程安全、带 TTL 的进程内有界 LRU。"""
+
+    def __init__(self, max_entries: int = LOCAL_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for key in keys:
+                item = self._data.get(key)
+                if item is None:
+                    continue
+                expires_at, value = item
+                if expires_at <= now:
+                    del self._data[key]
+                    continue
+                self._data.move_to_end(key)
+                found[key] = value
+        return found
+
+    def set_many(self, mapping: Dict[str, Any], timeout: float) -> None:
+        expires_at = time.monotonic() + timeout
+        with self._lock:
+            for key, value in mapping.items():
+                self._data[key] = (expires_at, value)
+                self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class EnrichmentCacheStats:
+    """按规则统计缓存命中/未命中与耗时（进程内计数）。"""
+
+    FIELDS = (
+        "local_hits",
+        "remote_hits",
+        "misses",
+        "provider_calls",
+        "single_flight_waits",
+        "single_flight_skips",
+        "cache_seconds",
+        "provider_seconds",
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def incr(self, rule_name: str, **values: float) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(rule_name, dict.fromkeys(self.FIELDS, 0))
+            for field, value in values.items():
+                stats[field] += value
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            result = {}
+            for rule_name, stats in self._stats.items():
+                item = dict(stats)
+                lookups = item["local_hits"] + item["remote_hits"] + item["misses"]
+                item["hit_ratio"] = round((item["local_hits"] + item["remote_hits"]) / lookups, 4) if lookups else None
+                result[rule_name] = item
+            return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+class TwoTierCache:
+    """进程内 LRU + Django cache 的两级读写与跨进程 single-flight。"""
+
+    def __init__(self, local: LocalLRUCache):
+        self.local = local
+
+    def get_many(self, keys: List[str]) -> Tuple[Dict[str, Any], int]:
+        """返回 (命中结果, 其中来自进程内缓存的条数)；远端命中会回填进程内缓存。"""
+        found = self.local.get_many(keys)
+        local_hits = len(found)
+        remote_keys = [key for key in keys if key not in found]
+        if remote_keys:
+            remote = cache.get_many(remote_keys)
+            if remote:
+                found.update(remote)
+                self.local.set_many(remote, LOCAL_REFILL_TTL_SECONDS)
+        return found, local_hits
+
+    def set_many(self, mapping: Dict[str, Any], timeout: int) -> None:
+        if not mapping:
+            return
+        self.local.set_many(mapping, timeout)
+        cache.set_many(mapping, timeout)
+
+    @staticmethod
+    def acquire(keys: List[str]) -> Tuple[List[str], List[str]]:
+        """逐 key 抢占 single-flight 锁，返回 (抢到的, 被其他 worker 持有的)。"""
+        owned, waiting = [], []
+        for key in keys:
+            if cache.add(LOCK_KEY_PREFIX + key, 1, SINGLE_FLIGHT_LOCK_TTL):
+                owned.append(key)
+            else:
+                waiting.append(key)
+        return owned, waiting
+
+    @staticmethod
+    def release(keys: List[str]) -> None:
+        if keys:
+            cache.delete_many([LOCK_KEY_PREFIX + key for key in keys])
+
+    def wait_for(self, keys: List[str], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """批量轮询等待其他 worker 回填，至多 timeout 秒；返回等到的结果，超时未回填的由调用方跳过。"""
+        found: Dict[str, Any] = {}
+        pending = list(keys)
+        deadline = time.monotonic() + (SINGLE_FLIGHT_WAIT_SECONDS if timeout is None else timeout)
+        while pending:
+            remote = cache.get_many(pending)
+            if remote:
+                found.update(remote)
+                pending = [key for key in pending if key not in remote]
+            if not pending or time.monotonic() + SINGLE_FLIGHT_POLL_INTERVAL > deadline:
+                break
+            time.sleep(SINGLE_FLIGHT_POLL_INTERVAL)
+        if found:
+            self.local.set_many(found, LOCAL_REFILL_TTL_SECONDS)
+        return found
+
+
+local_cache = LocalLRUCache()
+two_tier_cache = TwoTierCache(local_cache)
+enrichment_cache_stats = EnrichmentCacheStats()
@@ -1,10 +1,8 @@
-import hashlib
-import json
 import logging
+import time
 from typing import Dict, List, Optional
 
-from django.core.cache import cache
-
+from apps.alerts.enrichment.cache import build_cache_key, config_digest, enrichment_cache_stats, two_tier_cache
 from apps.alerts.enrichment.keys import resolve_binding, build_binding_key
 from apps.alerts.enrichment.matcher import event_matches
 from apps.alerts.enrichment.projection import project
@@ -31,13 +29,7 @@ class EnrichmentEngine:
     @staticmethod
     def _cache_key(provider_type, provider_config, binding_key) -> str:
         """构造确定性缓存键，纳入 provider_config 避免不同配置碰撞。"""
-        raw = json.dumps(
-            {"pt": provider_type, "cfg": provider_config, "key": list(binding_key)},
-            sort_keys=True,
-            ensure_ascii=False,
-        )
-        digest = hashlib.md5(raw.encode("utf-8")).hexdigest()
-        return "enrich:" + digest
+        return build_cache_key(config_digest(provider_type, provider_config), binding_key)
 
     def enrich_batch(self, events: List[Dict]) -> None:
         try:
@@ -90,32 +82,36 @@ class EnrichmentEngine:
             logger.warning("[Enrichment] 单批丰富 key 数 %s 超上限 %s，截断", len(all_keys), MAX_KEYS_PER_BATCH)
             all_keys = all_keys[:MAX_KEYS_PER_BATCH]
 
-        # 2. 查缓存（含负结果）
+        # 2. 两级缓存批量查询（含负结果）；配置摘要每个范围只计算一次
         provider_config = dict(rule.provider_config or {})
         provider_config["_authorized_team_ids"] = effective_team
+        digest = config_digest(provider_type, provider_config)
+        cache_keys = {bkey: build_cache_key(digest, bkey) for bkey in all_keys}
+        rule_name = getattr(rule, "name", "?")
+
+        started = time.perf_counter()
+        cached_values, local_hits = two_tier_cache.get_many(list(cache_keys.values()))
         records_by_key: Dict = {}
         miss_keys = []
         for bkey in all_keys:
-            cached = cache.get(self._cache_key(provider_type, provider_config, bkey))
+            cached = cached_values.get(cache_keys[bkey])
             if cached == _MISS:
                 records_by_key[bkey] = []
             elif cached is not None:
                 records_by_key[bkey] = cached
             else:
                 miss_keys.append(bkey)
+        enrichment_cache_stats.incr(
+            rule_name,
+            local_hits=local_hits,
+            remote_hits=len(cached_values) - local_hits,
+            misses=len(miss_keys),
+            cache_seconds=time.perf_counter() - started,
+        )
 
-        # 3. 未命中走 provider 批量查询 + 回填缓存
+        # 3. 未命中 key 经 single-flight 去重后走 provider 批量查询 + 批量回填
         if miss_keys:
-            provider = get_provider(provider_type)
-            try:
-                fetched = provider.fetch_batch(miss_keys, provider_config)
-            except Exception:
-                logger.error("[Enrichment] Provider 查询失败 provider_type=%s", provider_type, exc_info=True)
-                fetched = {}
-            for bkey in miss_keys:
-                recs = fetched.get(bkey) or []
-                records_by_key[bkey] = recs
-                cache.set(self._cache_key(provider_type, provider_config, bkey), recs or _MISS, CACHE_TTL_SECONDS)
+            self._fetch_missing(rule_name, provider_type, provider_config, miss_keys, cache_keys, records_by_key)
 
         # 4. 投影写回
         for bkey in all_keys:
@@ -124,3 +120,51 @@ class EnrichmentEngine:
                 continue
             for event in key_to_events[bkey]:
                 event.setdefault("enrichment", {})[namespace] = projected
+
+    def _fetch_missing(self, rule_name, provider_type, provider_config, miss_keys, cache_keys, records_by_key) -> None:
+        key_by_cache_key = {cache_keys[bkey]: bkey for bkey in miss_keys}
+        owned, waiting = two_tier_cache.acquire(list(key_by_cache_key))
+        try:
+            fetch_keys = [key_by_cache_key[ck] for ck in owned]
+            if fetch_keys:
+                self._fetch_and_fill(rule_name, provider_type, provider_config, fetch_keys, cache_keys, records_by_key)
+        finally:
+            two_tier_cache.release(owned)
+
+        if not waiting:
+            return
+        # 其他 worker 正在查询同一批 key：有界等待其回填，超时未回填的本批跳过丰富，不再自行查询
+        enrichment_cache_stats.incr(rule_name, single_flight_waits=len(waiting))
+        filled = two_tier_cache.wait_for(waiting)
+        skipped = 0
+        for ck in waiting:
+            if ck in filled:
+                cached = filled[ck]
+                records_by_key[key_by_cache_key[ck]] = [] if cached == _MISS else cached
+            else:
+                skipped += 1
+        if skipped:
+            enrichment_cache_stats.incr(rule_name, single_flight_skips=skipped)
+            logger.info("[Enrichment] 等待其他 worker 回填超时，跳过丰富 rule=%s keys=%s", rule_name, skipped)
+
+    @staticmethod
+    def _fetch_and_fill(rule_name, provider_type, provider_config, fetch_keys, cache_keys, records_by_key) -> None:
+        provider = get_provider(provider_type)
+        started = time.perf_counter()
+        try:
+            fetched = provider.fetch_batch(fetch_keys, provider_config)
+        except Exception:
+            logger.error("[Enrichment] Provider 查询失败 provider_type=%s", provider_type, exc_info=True)
+            fetched = {}
+        enrichment_cache_stats.incr(
+            rule_name, provider_calls=1, provider_seconds=time.perf_counter() - started
+        )
+
+        to_cache = {}
+        for bkey in fetch_keys:
+            recs = fetched.get(bkey) or []
+            records_by_key[bkey] = recs
+            to_cache[cache_keys[bkey]] = recs or _MISS
+        started = time.perf_counter()
+        two_tier_cache.set_many(to_cache, CACHE_TTL_SECONDS)
+        enrichment_cache_stats.incr(rule_name, cache_seconds=time.perf_counter() - started)
@@ -33,30 +33,23 @@ class CMDBProvider(EnrichmentProvider):
                 by_model_names[model_id].append(params["inst_name"])
                 key_meta[key] = (model_id, str(params["inst_name"]))
 
-        fetched = {}  # (model_id, value) -> instance
-        client = CMDB()
+        # 各模型的 id / name 查询并发下发，总耗时约为一次往返
+        queries, labels = [], []
         for model_id, ids in by_model_ids.items():
-            try:
-                res = client.search_instances_batch(
-                    model_id=model_id,
-                    ids=ids,
-                    organization_ids=authorized_team_ids,
-                )
-                for value, inst in res.items():
-                    fetched[(model_id, str(value))] = inst
-            except Exception:
-                logger.error("[Enrichment] CMDB 批量查询失败 model_id=%s", model_id, exc_info=True)
+            queries.append({"model_id": model_id, "ids": ids, "organization_ids": authorized_team_ids})
+            labels.append(("", model_id))
         for model_id, names in by_model_names.items():
-            try:
-                res = client.search_instances_batch(
-                    model_id=model_id,
-                    inst_names=names,
-                    organization_ids=authorized_team_ids,
-                )
-                for value, inst in res.items():
-                    fetched[(model_id, str(value))] = inst
-            except Exception:
-                logger.error("[Enrichment] CMDB 批量查询失败(name) model_id=%s", model_id, exc_info=True)
+            queries.append({"model_id": model_id, "inst_names": names, "organization_ids": authorized_team_ids})
+            labels.append(("(name)", model_id))
+
+        fetched = {}  # (model_id, value) -> instance
+        responses = CMDB().search_instances_batch_many(queries) if queries else []
+        for (suffix, model_id), res in zip(labels, responses):
+            if isinstance(res, Exception):
+                logger.error("[Enrichment] CMDB 批量查询失败%s model_id=%s", suffix, model_id, exc_info=res)
+                continue
+            for value, inst in res.items():
+                fetched[(model_id, str(value))] = inst
 
         result = {}
         for key in keys:
@@ -0,0 +1,58 @@
+import asyncio
+
+from django.core.management import BaseCommand
+from nats.aio.client import Client
+from nats.aio.errors import ErrNoServers, ErrTimeout
+
+from apps.alerts.service.ingest_stream import consume, ensure_ingest_stream, load_ingest_stream_config
+from apps.core.logger import alert_logger as logger
+from nats_client.clients import get_nc_client
+
+
+class Command(BaseCommand):
+    """告警事件流式接入 worker。
+
+    常驻消费 JetStream 流 ALERT_INGEST，把接收器入队的事件按数量/时间上限合并成微批，
+    每批按告警源分组后只跑一次接入管线。需配合 ALERT_INGEST_STREAM_ENABLED=true 使用。
+    """
+
+    help = "Starts the alert ingest stream worker."
+
+    def __init__(self, *args, **kwargs):
+        self.nats = Client()
+        self.config = load_ingest_stream_config()
+        super().__init__(*args, **kwargs)
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, dest="batch_size", help="Max events per micro-batch.")
+        parser.add_argument("--max-wait", type=float, dest="max_wait", help="Max seconds to wait for a micro-batch.")
+
+    def handle(self, *args, **options):
+        if options.get("batch_size"):
+            self.config["batch_size"] = options["batch_size"]
+        if options.get("max_wait"):
+            self.config["max_wait"] = options["max_wait"]
+        self.stdout.write(
+            f"** Starting alert ingest worker: batch_size={self.config['batch_size']}, max_wait={self.config['max_wait']}s"
+        )
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(self.worker_coroutine())
+        except KeyboardInterrupt:
+            loop.run_until_complete(self.nats.close())
+        finally:
+            loop.close()
+
+    async def worker_coroutine(self):
+        try:
+            await get_nc_client(self.nats)
+            self.stdout.write(self.style.SUCCESS("** Connected to NATS server"))
+        except (ErrNoServers, ErrTimeout) as err:
+            logger.error("alert ingest worker failed to connect to NATS: %s", str(err), exc_info=True)
+            raise
+
+        js = self.nats.jetstream()
+        await ensure_ingest_stream(js, self.config)
+        self.stdout.write(self.style.SUCCESS(f"** Consuming stream: {self.config['stream']}"))
+        await consume(js, self.config)
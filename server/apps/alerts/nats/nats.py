@@ -22,6 +22,7 @@ from apps.alerts.constants.constants import PERMISSION_ALERT, AlertsSourceTypes,
 from apps.alerts.models.alert_operator import NotifyResult
 from apps.alerts.models.alert_source import AlertSource
 from apps.alerts.models.models import Alert, Event, Incident, Level
+from apps.alerts.service import ingest_stream
 from apps.alerts.utils.permission_scope import apply_team_scope_with_group_ids
 from apps.core.logger import alert_logger as logger
 from apps.core.utils.permission_utils import get_permission_rules
@@ -741,6 +742,22 @@ def receive_alert_events(*args, **kwargs) -> Dict[str, Any]:
         # 记录推送来源信息
         logger.info("[AlertEvent] 开始处理 %s 条事件 source_id=%s pusher=%s", len(events), source_id, pusher)
 
+        # 流式接入：只入队，由 alert_ingest_worker 微批处理；入队失败退回同步处理
+        if ingest_stream.is_enabled():
+            queued = ingest_stream.enqueue(adapter, normalized_events)
+            if queued is not None:
+                return {
+                    "result": True,
+                    "data": {
+                        "processed_events": 0,
+                        "ingestion": queued,
+                        "source_id": source_id,
+                        "pusher": pusher,
+                        "timestamp": timezone.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    },
+                    "message": "Alert events queued for processing.",
+                }
+
         # 处理告警事件
         ingestion = adapter.main() or {
             "received": len(events),
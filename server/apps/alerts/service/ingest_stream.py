@@ -0,0 +1,332 @@
+"""告警事件流式接入（JetStream 微批）。
+
+开启 ALERT_INGEST_STREAM_ENABLED 后，接收器（webhook / NATS receive_alert_events）只做校验与鉴权，
+把事件信封追加到 JetStream 工作队列流后立即返回；独立的 alert_ingest_worker 进程按事件数/等待时间
+合并消息为微批，按告警源分组后每组只跑一次现有管线（create_events → 屏蔽 → 即时旁路 → 恢复）。
+
+流写满（积压超过 max_msgs/max_bytes）或 NATS 不可用时入队失败，接收器退回同步处理，形成背压。
+"""
+
+import asyncio
+import json
+import re
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import close_old_connections
+from nats.errors import TimeoutError as NatsTimeoutError
+from nats.js.api import ConsumerConfig, DiscardPolicy, RetentionPolicy, StreamConfig
+
+from apps.alerts.models.alert_source import AlertSource
+from apps.core.logger import alert_logger as logger
+from nats_client.clients import borrow_client, run_pooled
+
+INGEST_STREAM_NAME = "ALERT_INGEST"
+# 入队 → 入库延迟直方图的桶上界（秒）
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+# 单次 fetch 拉取的消息数上限
+FETCH_BATCH_LIMIT = 256
+
+
+def load_ingest_stream_config() -> Dict[str, Any]:
+    """读取流式接入配置（config/components/alert_ingest.py），worker 可通过环境变量单独部署与调优。"""
+    namespace = getattr(settings, "NATS_NAMESPACE", "bklite")
+    return {
+        "enabled": settings.ALERT_INGEST_STREAM_ENABLED,
+        "stream": INGEST_STREAM_NAME,
+        "subject_prefix": f"{namespace}.alerts.ingest",
+        "durable": settings.ALERT_INGEST_DURABLE_NAME,
+        "batch_size": settings.ALERT_INGEST_BATCH_SIZE,
+        "max_wait": settings.ALERT_INGEST_MAX_WAIT,
+        "max_msgs": settings.ALERT_INGEST_MAX_PENDING,
+        "max_bytes": settings.ALERT_INGEST_MAX_BYTES,
+        "max_age": settings.ALERT_INGEST_MAX_AGE,
+        "publish_timeout": settings.ALERT_INGEST_PUBLISH_TIMEOUT,
+        "ack_wait": settings.ALERT_INGEST_ACK_WAIT,
+    }
+
+
+def is_enabled() -> bool:
+    return settings.ALERT_INGEST_STREAM_ENABLED
+
+
+def ingest_subject(subject_prefix: str, source_id: str) -> str:
+    # source_id 可能含 NATS subject 保留字符（. * > 空白），统一替换
+    return f"{subject_prefix}.{re.sub(r'[^A-Za-z0-9_-]', '_', str(source_id))}"
+
+
+class IngestMetrics:
+    """
+    进程内接入指标
+
+    - 背压：流积压（consumer num_pending）、入队失败退回同步的事件数、重投次数；
+    - 入队 → 入库延迟直方图（按事件计数的累积桶）。
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.bucket_counts = [0] * (len(self.buckets) + 1)
+            self.latency_sum = 0.0
+            self.latency_count = 0
+            self.batches = 0
+            self.messages = 0
+            self.events = 0
+            self.rejected = 0
+            self.failed = 0
+            self.pending = 0
+
+    def observe_latency(self, seconds: float, count: int = 1) -> None:
+        if count <= 0:
+            return
+        seconds = max(seconds, 0.0)
+        with self._lock:
+            self.bucket_counts[bisect_left(self.buckets, seconds)] += count
+            self.latency_sum += seconds * count
+            self.latency_count += count
+
+    def record_batch(self, messages: int, events: int, failed: int = 0) -> None:
+        with self._lock:
+            self.batches += 1
+            self.messages += messages
+            self.events += events
+            self.failed += failed
+
+    def record_rejected(self, events: int) -> None:
+        with self._lock:
+            self.rejected += events
+
+    def set_pending(self, pending: int) -> None:
+        self.pending = pending
+
+    def quantile(self, q: float) -> Optional[float]:
+        """按桶上界估算分位数；超出最大桶时返回 None（表示 +Inf）"""
+        with self._lock:
+            if not self.latency_count:
+                return 0.0
+            rank = q * self.latency_count
+            cumulative = 0
+            for index, count in enumerate(self.bucket_counts):
+                cumulative += count
+                if cumulative >= rank:
+                    return self.buckets[index] if index < len(self.buckets) else None
+        return None
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            cumulative, histogram = 0, {}
+            for bound, count in zip([*self.buckets, "+Inf"], self.bucket_counts):
+                cumulative += count
+                histogram[str(bound)] = cumulative
+            data = {
+                "batches": self.batches,
+                "messages": self.messages,
+                "events": self.events,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "pending": self.pending,
+                "latency_count": self.latency_count,
+                "latency_sum": round(self.latency_sum, 3),
+                "latency_histogram": histogram,
+            }
+        data["latency_p50"] = self.quantile(0.5)
+        data["latency_p95"] = self.quantile(0.95)
+        return data
+
+
+ingest_metrics = IngestMetrics()
+
+
+# ----------------------------------------------------------------------------
+# 生产端：接收器入队
+# ----------------------------------------------------------------------------
+
+
+def build_envelope(adapter, events: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    构造入队信封
+
+    只携带鉴权后的归属组织而非 secret，worker 侧不再重复鉴权，也避免密钥落入流存储。
+    """
+    return {
+        "source_id": adapter.alert_source.source_id,
+        "team": list(getattr(adapter, "resolved_team", None) or []),
+        "trusted_internal": bool(getattr(adapter, "trusted_internal", False)),
+        "events": events,
+        "enqueued_at": time.time(),
+    }
+
+
+async def publish_envelope(envelope: Dict[str, Any], config: Dict[str, Any]) -> None:
+    payload = json.dumps(envelope, ensure_ascii=False, default=str).encode()
+    async with borrow_client() as nc:
+        js = nc.jetstream()
+        await js.publish(
+            ingest_subject(config["subject_prefix"], envelope["source_id"]),
+            payload,
+            timeout=config["publish_timeout"],
+            stream=config["stream"],
+        )
+
+
+def enqueue(adapter, events: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    事件入队，成功返回接入统计；失败返回 None，由调用方退回同步处理
+    """
+    config = load_ingest_stream_config()
+    try:
+        run_pooled(publish_envelope(build_envelope(adapter, events), config))
+    except Exception as e:  # noqa
+        ingest_metrics.record_rejected(len(events))
+        logger.warning(
+            "[AlertIngest] 事件入队失败，退回同步处理: source_id=%s events=%s error=%s",
+            adapter.alert_source.source_id, len(events), e,
+        )
+        return None
+    logger.debug("[AlertIngest] 事件已入队: source_id=%s events=%s", adapter.alert_source.source_id, len(events))
+    return {"received": len(events), "accepted": len(events), "skipped": 0, "errored": 0, "queued": True}
+
+
+# ----------------------------------------------------------------------------
+# 消费端：微批合并与处理
+# ----------------------------------------------------------------------------
+
+
+def process_envelopes(envelopes: List[Dict[str, Any]], metrics: IngestMetrics = ingest_metrics) -> List[bool]:
+    """
+    处理一个微批：按 (告警源, 可信内部推送, 归属组织) 分组，每组合并事件后只跑一次 adapter.main
+
+    Returns:
+        与 envelopes 对应的处理结果，False 表示该消息应重投
+    """
+    from apps.alerts.common.source_adapter.base import AlertSourceAdapterFactory
+
+    groups: Dict[Tuple, List[int]] = {}
+    for index, envelope in enumerate(envelopes):
+        key = (envelope["source_id"], bool(envelope.get("trusted_internal")), tuple(envelope.get("team") or []))
+        groups.setdefault(key, []).append(index)
+
+    results = [True] * len(envelopes)
+    for (source_id, trusted_internal, team), indexes in groups.items():
+        events = [event for index in indexes for event in envelopes[index]["events"]]
+        try:
+            alert_source = AlertSource.objects.filter(source_id=source_id, is_active=True, is_effective=True).first()
+            if not alert_source:
+                # 告警源已停用：重投也无法处理，直接丢弃
+                logger.warning("[AlertIngest] 告警源不存在或已停用，丢弃 %s 条事件: source_id=%s", len(events), source_id)
+                continue
+            adapter_class = AlertSourceAdapterFactory.get_adapter(alert_source)
+            adapter = adapter_class(alert_source=alert_source, secret="", events=events, trusted_internal=trusted_internal)
+            adapter.resolved_team = list(team)
+            ingestion = adapter.main(events)
+            logger.info("[AlertIngest] 微批处理完成: source_id=%s messages=%s result=%s", source_id, len(indexes), ingestion)
+        except Exception:  # noqa
+            logger.exception("[AlertIngest] 微批处理失败，等待重投: source_id=%s messages=%s", source_id, len(indexes))
+            for index in indexes:
+                results[index] = False
+            continue
+        now = time.time()
+        for index in indexes:
+            envelope = envelopes[index]
+            metrics.observe_latency(now - float(envelope.get("enqueued_at") or now), len(envelope["events"]))
+    return results
+
+
+def _process_in_thread(envelopes: List[Dict[str, Any]], metrics: IngestMetrics) -> List[bool]:
+    close_old_connections()
+    try:
+        return process_envelopes(envelopes, metrics)
+    finally:
+        close_old_connections()
+
+
+async def ensure_ingest_stream(js, config: Dict[str, Any]) -> None:
+    """幂等声明工作队列流：消息 ack 后即删除，写满时拒绝新消息以形成背压。"""
+    stream_config = StreamConfig(
+        name=config["stream"],
+        subjects=[f"{config['subject_prefix']}.>"],
+        retention=RetentionPolicy.WORK_QUEUE,
+        discard=DiscardPolicy.NEW,
+        max_msgs=config["max_msgs"],
+        max_bytes=config["max_bytes"],
+        max_age=config["max_age"],
+    )
+    try:
+        await js.add_stream(stream_config)
+    except Exception as e:  # noqa
+        logger.info("[AlertIngest] 流已存在，更新配置: name=%s, reason=%s", config["stream"], e)
+        await js.update_stream(stream_config)
+
+
+async def fetch_micro_batch(psub, max_events: int, max_wait: float) -> List[Tuple[Any, Dict[str, Any]]]:
+    """拉取一个微批：累计事件数达到 max_events 或等待超过 max_wait 秒即返回"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_wait
+    batch, events = [], 0
+    while events < max_events:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            break
+        try:
+            msgs = await psub.fetch(batch=max(1, min(max_events - events, FETCH_BATCH_LIMIT)), timeout=remaining)
+        except (NatsTimeoutError, asyncio.TimeoutError):
+            break
+        for msg in msgs:
+            try:
+                envelope = json.loads(msg.data.decode())
+                envelope["events"] = list(envelope.get("events") or [])
+            except (ValueError, AttributeError):
+                logger.error("[AlertIngest] 无法解析的入队消息，已丢弃: subject=%s", msg.subject)
+                await msg.ack()
+                continue
+            batch.append((msg, envelope))
+            events += len(envelope["events"])
+    return batch
+
+
+async def keep_in_progress(msgs: List[Any], interval: float) -> None:
+    """处理期间按周期发送 in_progress，重置 ack 计时，避免慢批次超过 ack_wait 被重投重复入库"""
+    while True:
+        await asyncio.sleep(interval)
+        for msg in msgs:
+            try:
+                await msg.in_progress()
+            except Exception:  # noqa
+                logger.warning("[AlertIngest] in_progress 续期失败: subject=%s", msg.subject)
+
+
+async def consume(js, config: Dict[str, Any], metrics: IngestMetrics = ingest_metrics, stop_event: asyncio.Event = None):
+    """worker 主循环：拉取微批 → 线程池内执行同步管线（期间续期 ack）→ 按结果 ack/nak"""
+    psub = await js.pull_subscribe(
+        f"{config['subject_prefix']}.>",
+        durable=config["durable"],
+        stream=config["stream"],
+        config=ConsumerConfig(ack_wait=config["ack_wait"]),
+    )
+    loop = asyncio.get_running_loop()
+    while stop_event is None or not stop_event.is_set():
+        batch = await fetch_micro_batch(psub, config["batch_size"], config["max_wait"])
+        if not batch:
+            continue
+        envelopes = [envelope for _, envelope in batch]
+        heartbeat = asyncio.ensure_future(keep_in_progress([msg for msg, _ in batch], config["ack_wait"] / 3))
+        try:
+            results = await loop.run_in_executor(None, _process_in_thread, envelopes, metrics)
+        finally:
+            heartbeat.cancel()
+        for (msg, _), ok in zip(batch, results):
+            await (msg.ack() if ok else msg.nak())
+        metrics.record_batch(len(batch), sum(len(e["events"]) for e in envelopes), failed=results.count(False))
+        try:
+            info = await psub.consumer_info()
+            metrics.set_pending(info.num_pending)
+        except Exception:  # noqa
+            pass
+        logger.info("[AlertIngest] 接入指标: %s", metrics.snapshot())
@@ -0,0 +1,21 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def reset_event_buffer():
+    """共享事件缓冲是进程级单例，每个用例前后清空，避免跨用例残留已回滚的事件。"""
+    from apps.alerts.aggregation.engine.event_buffer import event_buffer
+
+    event_buffer.reset()
+    yield
+    event_buffer.reset()
+
+
+@pytest.fixture(autouse=True)
+def reset_shield_index():
+    """屏蔽策略索引是进程级缓存，每个用例前后清空，避免沿用已回滚的屏蔽策略。"""
+    from apps.alerts.common.shield_index import shield_index_cache
+
+    shield_index_cache.clear()
+    yield
+    shield_index_cache.clear()
@@ -0,0 +1,240 @@
+"""match_rules 编译谓词测试。
+
+关键不变量：编译后的列式谓词与 ORM（StrategyMatcher / RuleMatcher）及 InstantMatcher 的命中结果完全一致；
+无法编译的规则进入 fallback，由调用方退回原匹配路径。
+"""
+
+import datetime
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+from django.utils import timezone
+
+from apps.alerts.aggregation.engine.event_buffer import MATCHABLE_SCHEMA, EventBuffer
+from apps.alerts.aggregation.processor.aggregation_processor import AggregationProcessor
+from apps.alerts.aggregation.processor.instant_dispatcher import InstantAlertDispatcher, InstantHit
+from apps.alerts.aggregation.strategy.compiled_matcher import (
+    MultiStrategyMatcher,
+    RuleCompiler,
+    UnsupportedRuleError,
+    rows_to_table,
+    string_schema,
+)
+from apps.alerts.aggregation.strategy.instant_matcher import InstantMatcher
+from apps.alerts.aggregation.strategy.matcher import StrategyMatcher
+from apps.alerts.common.shield import EventShieldOperator
+from apps.alerts.constants.constants import AlarmStrategyType
+from apps.alerts.models.alert_operator import AlarmStrategy
+from apps.alerts.models.alert_source import AlertSource
+from apps.alerts.models.models import Event
+from apps.alerts.utils.rule_matcher import RuleMatcher
+
+RULE_CASES = [
+    [],
+    [[]],
+    [[{"key": "title", "operator": "eq", "value": "CPU high"}]],
+    [[{"key": "标题", "operator": "包含", "value": "cpu"}]],
+    [[{"key": "title", "operator": "not_contains", "value": "cpu"}]],
+    [[{"key": "description", "operator": "ne", "value": "d1"}]],
+    [[{"key": "description", "operator": "ne", "value": None}]],
+    [[{"key": "service", "operator": "regex", "value": r"^svc-[ab]$"}]],
+    [[{"key": "level", "operator": "in", "value": ["0", "2"]}]],
+    [[{"key": "level", "operator": "not_in", "value": ["0"]}]],
+    [[{"key": "level", "operator": "gte", "value": 1}]],
+    [[{"key": "event_type", "operator": "eq", "value": 1}]],
+    [[{"key": "source", "operator": "eq", "value": "源1"}]],
+    [[{"key": "location", "operator": "contains", "value": "BJ"}]],
+    [
+        [{"key": "title", "operator": "contains", "value": "cpu"}, {"key": "level", "operator": "eq", "value": "0"}],
+        [{"key": "service", "operator": "eq", "value": "svc-c"}],
+    ],
+    # 无效条件：整组失效
+    [[{"key": "title", "operator": "unknown", "value": "x"}]],
+    [[{"key": "title", "operator": "eq", "value": None}], [{"key": "level", "operator": "eq", "value": "1"}]],
+]
+
+
+@pytest.fixture
+def source(db):
+    return AlertSource.objects.create(name="源1", source_id="s1", source_type="restful", secret="x")
+
+
+@pytest.fixture
+def events(source):
+    now = timezone.now()
+    specs = [
+        dict(title="CPU high", level="0", service="svc-a", description="d1", location="bj-01", event_type=1),
+        dict(title="cpu low", level="1", service="svc-b", description=None, location=None, event_type=0),
+        dict(title="disk full", level="2", service="svc-c", description="d2", location="sh-01", event_type=1),
+    ]
+    result = []
+    for i, spec in enumerate(specs):
+        result.append(
+            Event.objects.create(
+                source=source, raw_data={}, start_time=now, event_id=f"E{i}", labels={}, tags={}, **spec
+            )
+        )
+    return result
+
+
+def _buffer_table(now=None):
+    buffer = EventBuffer()
+    return buffer.refresh(now or timezone.now() + datetime.timedelta(seconds=1), 10)
+
+
+# --------------------------------------------------------------------------
+# 与 ORM / InstantMatcher 对拍
+# --------------------------------------------------------------------------
+
+
+@pytest.mark.django_db
+def test_parity_with_strategy_matcher(events):
+    table = _buffer_table()
+    matcher = MultiStrategyMatcher(RuleCompiler(MATCHABLE_SCHEMA), dict(enumerate(RULE_CASES)))
+    assert matcher.fallback == []
+
+    masks = matcher.evaluate(table)
+    event_ids = table["event_id"].to_pylist()
+    for index, rules in enumerate(RULE_CASES):
+        compiled = sorted(eid for eid, hit in zip(event_ids, masks[index].to_pylist()) if hit)
+        orm = sorted(StrategyMatcher.match_events_to_strategy(Event.objects.all(), rules).values_list("event_id", flat=True))
+        assert compiled == orm, f"parity broken for rules={rules}"
+
+
+@pytest.mark.django_db
+def test_parity_with_instant_matcher(events):
+    matcher = MultiStrategyMatcher(InstantMatcher.compiler(), dict(enumerate(RULE_CASES)), empty_matches_all=False)
+    table = InstantMatcher.build_table(events, matcher.fields)
+
+    masks = matcher.evaluate(table)
+    for index, rules in enumerate(RULE_CASES):
+        expected = [InstantMatcher.match_in_memory(event, rules) for event in events]
+        assert masks[index].to_pylist() == expected, f"parity broken for rules={rules}"
+
+
+@pytest.mark.django_db
+def test_parity_with_rule_matcher(events):
+    rule_matcher = RuleMatcher(EventShieldOperator.FIELD_MAPPING)
+    fields = list(dict.fromkeys(EventShieldOperator.FIELD_MAPPING.values()))
+    rows = list(Event.objects.order_by("id").values("id", *fields))
+    cases = [
+        [[{"key": "source_id", "operator": "eq", "value": "s1"}]],
+        [[{"key": "level", "operator": "eq", "value": ["0", "1"]}]],
+        [[{"key": "level_id", "operator": "ne", "value": ["0", "1"]}]],
+        [[{"key": "content", "operator": "not_contains", "value": "d"}]],
+        [[{"key": "title", "operator": "re", "value": "^cpu"}]],
+        [[{"key": "unknown", "operator": "eq", "value": "x"}]],
+    ]
+    matcher = MultiStrategyMatcher(
+        RuleCompiler(string_schema(fields), normalize=rule_matcher.normalize_rule), dict(enumerate(cases))
+    )
+
+    masks = matcher.evaluate(rows_to_table(rows, fields))
+    for index, rules in enumerate(cases):
+        compiled = [row["id"] for row, hit in zip(rows, masks[index].to_pylist()) if hit]
+        assert compiled == sorted(rule_matcher.filter_queryset(Event.objects.all(), rules)), f"rules={rules}"
+
+
+# --------------------------------------------------------------------------
+# 不可编译规则 → fallback
+# --------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize(
+    "rules",
+    [
+        [[{"key": "env", "operator": "eq", "value": "prod"}]],
+        [[{"key": "title", "operator": "regex", "value": r"(a)\1"}]],
+        [[{"key": "event_type", "operator": "eq", "value": "abc"}]],
+        [[{"key": "title", "operator": "eq", "value": ["a"]}]],
+    ],
+)
+def test_unsupported_rules_fall_back(rules):
+    with pytest.raises(UnsupportedRuleError):
+        RuleCompiler(MATCHABLE_SCHEMA).compile(rules)
+
+    matcher = MultiStrategyMatcher(RuleCompiler(MATCHABLE_SCHEMA), {7: rules})
+    assert matcher.fallback == [7]
+    assert matcher.compiled == {}
+
+
+def test_tag_lists_matching_strategies_per_event_and_shares_conditions():
+    table = rows_to_table(
+        [{"title": "cpu high", "level": "0"}, {"title": "disk", "level": "1"}], ["title", "level"]
+    )
+    compiler = RuleCompiler(string_schema(["title", "level"]))
+    shared = {"key": "title", "operator": "contains", "value": "cpu"}
+    matcher = MultiStrategyMatcher(
+        compiler,
+        {
+            "a": [[shared]],
+            "b": [[shared, {"key": "level", "operator": "eq", "value": "0"}]],
+            "c": [[{"key": "level", "operator": "eq", "value": "1"}]],
+        },
+    )
+
+    with mock.patch.object(compiler, "condition_mask", wraps=compiler.condition_mask) as condition_mask:
+        tags = matcher.tag(table)
+
+    assert tags == [["a", "b"], ["c"]]
+    assert condition_mask.call_count == 3
+
+
+# --------------------------------------------------------------------------
+# 调用方：即时告警 / 聚合 / 屏蔽
+# --------------------------------------------------------------------------
+
+
+def _fake_event(event_id, **fields):
+    defaults = dict(title="t", level="1", service="svc", labels={}, tags={}, event_id=event_id)
+    defaults.update(fields)
+    obj = SimpleNamespace(**defaults)
+    obj.source = SimpleNamespace(name="src1")
+    return obj
+
+
+def test_collect_hits_mixes_compiled_and_fallback_strategies_in_order():
+    events = [_fake_event("E1", title="cpu", labels={"env": "prod"}), _fake_event("E2", title="disk")]
+    strategies = [
+        SimpleNamespace(id=1, match_rules=[[{"key": "env", "operator": "eq", "value": "prod"}]]),
+        SimpleNamespace(id=2, match_rules=[[{"key": "title", "operator": "contains", "value": "c"}]]),
+        SimpleNamespace(id=3, match_rules=[]),
+    ]
+
+    hits = InstantAlertDispatcher._collect_hits(events, strategies)
+
+    assert hits == [InstantHit(1, "E1"), InstantHit(2, "E1")]
+
+
+@pytest.mark.django_db
+def test_process_strategy_uses_buffer_masks_without_orm_matching(events):
+    strategy = AlarmStrategy.objects.create(
+        name="smart", strategy_type=AlarmStrategyType.SMART_DENOISE,
+        match_rules=[[{"key": "title", "operator": "contains", "value": "cpu"}]],
+        params={"group_by": ["service"], "window_size": 10},
+    )
+    processor = AggregationProcessor()
+    now = timezone.now() + datetime.timedelta(seconds=1)
+    processor._refresh_event_buffer([strategy], now)
+
+    with mock.patch.object(StrategyMatcher, "match_events_to_strategy") as orm_match, mock.patch.object(
+        processor, "_aggregate_for_dimensions", return_value=True
+    ) as aggregate:
+        processor._process_strategy(strategy, now)
+
+    orm_match.assert_not_called()
+    assert sorted(aggregate.call_args.kwargs["event_ids"]) == ["E0", "E1"]
+    processor.db_conn.close()
+
+
+@pytest.mark.django_db
+def test_shield_rules_evaluated_in_single_pass(events):
+    shield = SimpleNamespace(id=1, match_type="filter", match_rules=[[{"key": "level", "operator": "eq", "value": "2"}]])
+    shield_all = SimpleNamespace(id=2, match_type="all", match_rules=[])
+    operator = EventShieldOperator(["E0", "E1", "E2"], active_shields=[shield, shield_all])
+
+    result = operator._match_shields_in_memory([shield, shield_all])
+
+    assert result[1] == [events[2].pk]
+    assert sorted(result[2]) == sorted(e.pk for e in events)
@@ -1,5 +1,8 @@
 import pytest
 from types import SimpleNamespace
+from unittest import mock
+from apps.alerts.enrichment import cache as enrich_cache
+from apps.alerts.enrichment.cache import LocalLRUCache, enrichment_cache_stats, local_cache
 from apps.alerts.enrichment.engine import EnrichmentEngine
 from apps.alerts.enrichment.providers.base import EnrichmentProvider, register_provider
 
@@ -31,6 +34,8 @@ def _clear():
     _CountingProvider.calls = []
     from django.core.cache import cache
     cache.clear()
+    local_cache.clear()
+    enrichment_cache_stats.reset()
 
 
 def test_enrich_writes_namespaced_field():
@@ -137,3 +142,110 @@ def test_rule_does_not_enrich_event_from_another_team():
 
     assert event["enrichment"] == {}
     assert _CountingProvider.calls == []
+
+
+@pytest.fixture
+def locmem(settings):
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    from django.core.cache import cache as django_cache
+    django_cache.close()
+    django_cache.clear()
+    return django_cache
+
+
+def _events(*resource_ids):
+    return [{"resource_type": "host", "resource_id": rid, "enrichment": {}, "team": [1]} for rid in resource_ids]
+
+
+def test_local_lru_evicts_oldest_and_expires():
+    lru = LocalLRUCache(max_entries=2)
+    lru.set_many({"a": 1, "b": 2}, 60)
+    lru.get_many(["a"])  # a 变为最近使用
+    lru.set_many({"c": 3}, 60)
+    assert lru.get_many(["a", "b", "c"]) == {"a": 1, "c": 3}
+
+    lru.set_many({"d": 4}, -1)
+    assert lru.get_many(["d"]) == {}
+
+
+def test_cache_io_is_batched_per_scope(locmem):
+    events = _events("1", "2", "3")
+    with mock.patch.object(locmem, "get_many", wraps=locmem.get_many) as get_many, mock.patch.object(
+        locmem, "set_many", wraps=locmem.set_many
+    ) as set_many:
+        EnrichmentEngine(rules=[_rule(name="r")]).enrich_batch(events)
+
+    assert get_many.call_count == 1
+    assert set_many.call_count == 1
+    assert all(event["enrichment"]["cmdb"] == {"owner": "alice"} for event in events)
+
+
+def test_local_tier_serves_repeat_lookups_without_redis(locmem):
+    rule = _rule(name="r")
+    EnrichmentEngine(rules=[rule]).enrich_batch(_events("1"))
+
+    with mock.patch.object(locmem, "get_many", wraps=locmem.get_many) as get_many:
+        events = _events("1")
+        EnrichmentEngine(rules=[rule]).enrich_batch(events)
+
+    get_many.assert_not_called()
+    assert events[0]["enrichment"]["cmdb"] == {"owner": "alice"}
+    stats = enrichment_cache_stats.snapshot()["r"]
+    assert (stats["misses"], stats["local_hits"], stats["provider_calls"]) == (1, 1, 1)
+    assert stats["hit_ratio"] == 0.5
+
+
+def test_single_flight_waits_for_other_worker_fill(locmem):
+    rule = _rule(name="r")
+    config = dict(rule.provider_config, _authorized_team_ids=[1])
+    key = EnrichmentEngine._cache_key("counting_test", config, (("_id", "7"), ("model_id", "host")))
+    # 另一个 worker 已持有该 key 的锁，并在本 worker 轮询期间回填结果
+    locmem.add(enrich_cache.LOCK_KEY_PREFIX + key, 1, 10)
+
+    def _fill_during_poll(_seconds):
+        locmem.set(key, [{"owner": "bob"}], 60)
+
+    events = _events("7")
+    with mock.patch.object(enrich_cache.time, "sleep", side_effect=_fill_during_poll) as sleep:
+        EnrichmentEngine(rules=[rule]).enrich_batch(events)
+
+    sleep.assert_called_once_with(enrich_cache.SINGLE_FLIGHT_POLL_INTERVAL)
+    assert _CountingProvider.calls == []
+    assert events[0]["enrichment"]["cmdb"] == {"owner": "bob"}
+    assert enrichment_cache_stats.snapshot()["r"]["single_flight_waits"] == 1
+
+
+def test_single_flight_held_key_skipped_after_bounded_wait(locmem):
+    rule = _rule(name="r")
+    config = dict(rule.provider_config, _authorized_team_ids=[1])
+    held = EnrichmentEngine._cache_key("counting_test", config, (("_id", "8"), ("model_id", "host")))
+    locmem.add(enrich_cache.LOCK_KEY_PREFIX + held, 1, 10)
+
+    events = _events("8", "9")
+    with mock.patch.object(enrich_cache, "SINGLE_FLIGHT_WAIT_SECONDS", 0.2):
+        EnrichmentEngine(rules=[rule]).enrich_batch(events)
+
+    # 持锁中的 key 不再自行查询，只有本 worker 抢到锁的 key 走 provider
+    assert _CountingProvider.calls == [[(("_id", "9"), ("model_id", "host"))]]
+    assert events[0]["enrichment"] == {}
+    assert events[1]["enrichment"]["cmdb"] == {"owner": "alice"}
+    stats = enrichment_cache_stats.snapshot()["r"]
+    assert (stats["single_flight_waits"], stats["single_flight_skips"]) == (1, 1)
+    assert locmem.get(enrich_cache.LOCK_KEY_PREFIX + held) == 1
+
+
+def test_owned_locks_released_before_waiting(locmem):
+    rule = _rule(name="r")
+    config = dict(rule.provider_config, _authorized_team_ids=[1])
+    held = EnrichmentEngine._cache_key("counting_test", config, (("_id", "8"), ("model_id", "host")))
+    owned = EnrichmentEngine._cache_key("counting_test", config, (("_id", "9"), ("model_id", "host")))
+    locmem.add(enrich_cache.LOCK_KEY_PREFIX + held, 1, 10)
+
+    def _wait_for(keys, timeout=None):
+        assert locmem.get(enrich_cache.LOCK_KEY_PREFIX + owned) is None
+        return {}
+
+    with mock.patch.object(enrich_cache.two_tier_cache, "wait_for", side_effect=_wait_for) as wait_for:
+        EnrichmentEngine(rules=[rule]).enrich_batch(_events("8", "9"))
+
+    wait_for.assert_called_once_with([held])
@@ -7,15 +7,14 @@ from apps.alerts.enrichment.providers.cmdb import CMDBProvider
 def test_fetch_batch_groups_by_model_and_batches_ids(mock_cmdb_cls):
     inst = MagicMock()
     mock_cmdb_cls.return_value = inst
-    inst.search_instances_batch.return_value = {
+    inst.search_instances_batch_many.return_value = [{
         "1": {"owner": "alice"}, "2": {"owner": "bob"},
-    }
+    }]
     k1 = build_binding_key({"model_id": "host", "_id": "1"})
     k2 = build_binding_key({"model_id": "host", "_id": "2"})
     out = CMDBProvider().fetch_batch([k1, k2], {"_authorized_team_ids": [7]})
-    assert inst.search_instances_batch.call_count == 1
-    inst.search_instances_batch.assert_called_once_with(
-        model_id="host", ids=["1", "2"], organization_ids=[7]
+    inst.search_instances_batch_many.assert_called_once_with(
+        [{"model_id": "host", "ids": ["1", "2"], "organization_ids": [7]}]
     )
     assert out[k1] == [{"owner": "alice"}]
     assert out[k2] == [{"owner": "bob"}]
@@ -25,7 +24,23 @@ def test_fetch_batch_groups_by_model_and_batches_ids(mock_cmdb_cls):
 def test_fetch_batch_miss_returns_empty_list(mock_cmdb_cls):
     inst = MagicMock()
     mock_cmdb_cls.return_value = inst
-    inst.search_instances_batch.return_value = {}
+    inst.search_instances_batch_many.return_value = [{}]
     k = build_binding_key({"model_id": "host", "_id": "9"})
     out = CMDBProvider().fetch_batch([k], {"_authorized_team_ids": [7]})
     assert out[k] == []
+
+
+@patch("apps.alerts.enrichment.providers.cmdb.CMDB")
+def test_fetch_batch_dispatches_id_and_name_queries_together(mock_cmdb_cls):
+    inst = MagicMock()
+    mock_cmdb_cls.return_value = inst
+    inst.search_instances_batch_many.return_value = [
+        RuntimeError("boom"),
+        {"web-01": {"owner": "carol"}},
+    ]
+    k_id = build_binding_key({"model_id": "host", "_id": "1"})
+    k_name = build_binding_key({"model_id": "host", "inst_name": "web-01"})
+    out = CMDBProvider().fetch_batch([k_id, k_name], {"_authorized_team_ids": [7]})
+    assert inst.search_instances_batch_many.call_count == 1
+    assert out[k_id] == []
+    assert out[k_name] == [{"owner": "carol"}]
@@ -0,0 +1,122 @@
+"""共享事件缓冲（EventBuffer）测试。
+
+规格：
+- 首次 refresh 全量加载窗口内 action=created 且未屏蔽的事件；
+- 后续 refresh 只按 received_at 水位增量追加，按 event_id 去重；
+- 淘汰窗口外事件、剔除入库后才被屏蔽的事件；窗口向前扩大时全量重载；
+- 注册进 DuckDB 后按策略命中 ID 圈定视图，聚合 SQL 结果与 QuerySet 装载路径一致。
+"""
+
+import datetime
+
+import pytest
+from django.utils import timezone
+
+from apps.alerts.aggregation.engine.connection import BUFFERED_EVENTS_VIEW, EVENT_FIELDS, DuckDBConnection
+from apps.alerts.aggregation.engine.event_buffer import BUFFER_FIELDS, EVENT_SCHEMA, EventBuffer
+from apps.alerts.constants.constants import EventAction, EventStatus
+from apps.alerts.models.alert_source import AlertSource
+from apps.alerts.models.models import Event
+
+
+@pytest.fixture
+def source(db):
+    return AlertSource.objects.create(name="源1", source_id="s1", source_type="restful", secret="x")
+
+
+def _event(source, event_id, received_at, **extra):
+    event = Event.objects.create(
+        source=source, raw_data={}, title="t", level="1", start_time=received_at,
+        event_id=event_id, action=extra.pop("action", EventAction.CREATED), **extra,
+    )
+    Event.objects.filter(pk=event.pk).update(received_at=received_at)
+    return event
+
+
+def _ids(buffer):
+    return sorted(buffer.table["event_id"].to_pylist())
+
+
+def test_schema_matches_loaded_fields():
+    assert tuple(EVENT_SCHEMA.names) == BUFFER_FIELDS
+    assert BUFFER_FIELDS[: len(EVENT_FIELDS)] == EVENT_FIELDS
+
+
+@pytest.mark.django_db
+def test_refresh_loads_window_and_skips_shielded_or_recovery(source):
+    now = timezone.now()
+    _event(source, "E-in", now - datetime.timedelta(minutes=1), labels={"k": "v"})
+    _event(source, "E-old", now - datetime.timedelta(minutes=30))
+    _event(source, "E-shield", now - datetime.timedelta(minutes=1), status=EventStatus.SHIELD)
+    _event(source, "E-recovery", now - datetime.timedelta(minutes=1), action=EventAction.RECOVERY)
+
+    buffer = EventBuffer()
+    buffer.refresh(now, 10)
+
+    assert _ids(buffer) == ["E-in"]
+    assert buffer.table["labels"].to_pylist() == ['{"k": "v"}']
+
+
+@pytest.mark.django_db
+def test_refresh_appends_incrementally_and_evicts(source):
+    now = timezone.now()
+    _event(source, "E1", now - datetime.timedelta(minutes=8))
+    buffer = EventBuffer()
+    buffer.refresh(now, 10)
+
+    later = now + datetime.timedelta(minutes=5)
+    _event(source, "E2", later - datetime.timedelta(seconds=10))
+    buffer.refresh(later, 10)
+
+    # E1 已滑出窗口，E2 增量追加且不重复
+    assert _ids(buffer) == ["E2"]
+    buffer.refresh(later, 10)
+    assert len(buffer) == 1
+
+
+@pytest.mark.django_db
+def test_refresh_removes_events_shielded_after_load(source):
+    now = timezone.now()
+    _event(source, "E1", now - datetime.timedelta(minutes=1))
+    _event(source, "E2", now - datetime.timedelta(minutes=1))
+    buffer = EventBuffer()
+    buffer.refresh(now, 10)
+
+    Event.objects.filter(event_id="E1").update(status=EventStatus.SHIELD)
+    buffer.refresh(now, 10)
+
+    assert _ids(buffer) == ["E2"]
+
+
+@pytest.mark.django_db
+def test_refresh_reloads_when_window_grows(source):
+    now = timezone.now()
+    _event(source, "E-old", now - datetime.timedelta(minutes=30))
+    buffer = EventBuffer()
+    buffer.refresh(now, 10)
+    assert len(buffer) == 0
+
+    buffer.refresh(now, 60)
+
+    assert _ids(buffer) == ["E-old"]
+
+
+@pytest.mark.django_db
+def test_buffered_view_matches_queryset_loading(source):
+    now = timezone.now()
+    for i in range(3):
+        _event(source, f"E{i}", now - datetime.timedelta(minutes=1), service="svc-a" if i < 2 else "svc-b")
+    buffer = EventBuffer()
+    buffer.refresh(now, 10)
+    sql = "SELECT service, COUNT(*) AS c FROM {table} GROUP BY service ORDER BY service"
+
+    conn = DuckDBConnection()
+    conn.bind_event_buffer(buffer.table)
+    assert conn.select_buffered_events([]) is None
+    assert conn.select_buffered_events(["E0", "E1", "E2"]) is True
+    buffered = conn.execute_query(sql.format(table=BUFFERED_EVENTS_VIEW))
+    conn.load_events_to_memory(Event.objects.all())
+    loaded = conn.execute_query(sql.format(table="events_table"))
+    conn.close()
+
+    assert buffered == loaded == [{"service": "svc-a", "c": 2}, {"service": "svc-b", "c": 1}]
@@ -0,0 +1,85 @@
+"""聚合事件装载基准：每策略重建 DataFrame vs 共享事件缓冲。
+
+旧路径：每个策略 load_events_to_memory（list → DataFrame → CREATE TABLE）后执行聚合 SQL；
+新路径：事件一次性追加进 Arrow 缓冲并注册到 DuckDB，每个策略只圈定命中 ID 视图后执行同一条 SQL。
+默认规模较小以便 CI 运行，完整规模：
+ALERT_BENCH_EVENTS=100000 ALERT_BENCH_STRATEGIES=200 uv run pytest apps/alerts/tests/test_event_buffer_benchmark.py -m slow -s
+"""
+
+import datetime
+import os
+import time
+
+import pytest
+from django.utils import timezone
+
+from apps.alerts.aggregation.engine.connection import BUFFERED_EVENTS_VIEW, DuckDBConnection
+from apps.alerts.aggregation.engine.event_buffer import EventBuffer
+from apps.alerts.aggregation.query.builder import SQLBuilder
+from apps.alerts.aggregation.window.factory import WindowConfig, WindowType
+
+pytestmark = pytest.mark.slow
+
+EVENTS = int(os.getenv("ALERT_BENCH_EVENTS", "20000"))
+STRATEGIES = int(os.getenv("ALERT_BENCH_STRATEGIES", "20"))
+
+
+class _FakeQS:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def values(self, *fields):
+        return [dict(row) for row in self._rows]
+
+
+def _rows(now):
+    return [
+        {
+            "event_id": f"E{i}", "title": f"cpu high {i % 50}", "description": None, "level": str(i % 3),
+            "resource_name": f"host-{i % 500}", "resource_id": str(i % 500), "resource_type": "host",
+            "item": "cpu", "external_id": f"ext-{i}", "received_at": now - datetime.timedelta(seconds=i % 3000),
+            "action": "created", "source_id": 1, "push_source_id": "bench", "labels": {"env": "prod"},
+            "service": f"svc-{i % 20}", "location": None, "event_type": 0, "tags": {},
+        }
+        for i in range(EVENTS)
+    ]
+
+
+def test_共享事件缓冲快于逐策略装载():
+    now = timezone.now()
+    rows = _rows(now)
+    sql = SQLBuilder().build_aggregation_sql(["service"], WindowConfig(WindowType.SLIDING, 60), strategy_id=1)
+    buffered_sql = SQLBuilder().build_aggregation_sql(
+        ["service"], WindowConfig(WindowType.SLIDING, 60), strategy_id=1, source_table=BUFFERED_EVENTS_VIEW
+    )
+    # 每个策略命中一半事件
+    matched_ids = [row["event_id"] for row in rows[::2]]
+
+    conn = DuckDBConnection()
+    start = time.perf_counter()
+    for _ in range(STRATEGIES):
+        conn.load_events_to_memory(_FakeQS(rows[::2]))
+        legacy_results = conn.execute_query(sql)
+    legacy = time.perf_counter() - start
+    conn.close()
+
+    conn = DuckDBConnection()
+    start = time.perf_counter()
+    buffer = EventBuffer()
+    buffer._append_rows([dict(row) for row in rows])
+    conn.bind_event_buffer(buffer.table)
+    for _ in range(STRATEGIES):
+        conn.select_buffered_events(matched_ids)
+        buffered_results = conn.execute_query(buffered_sql)
+    buffered = time.perf_counter() - start
+    conn.close()
+
+    print(f"\n[aggregation benchmark] {EVENTS} events x {STRATEGIES} strategies")
+    print(f"[aggregation benchmark] per-strategy DataFrame reload: {legacy:.2f}s")
+    print(f"[aggregation benchmark] shared Arrow event buffer:     {buffered:.2f}s")
+
+    key = lambda r: r["fingerprint"]  # noqa: E731
+    assert [r["event_count"] for r in sorted(legacy_results, key=key)] == [
+        r["event_count"] for r in sorted(buffered_results, key=key)
+    ]
+    assert buffered < legacy
@@ -0,0 +1,257 @@
+"""告警事件流式接入（JetStream 微批）测试。
+
+覆盖：信封构造（不携带 secret）、入队成功/失败退回同步、微批拉取上限、
+按告警源分组合并执行管线、失败重投、延迟直方图与接收器入队分支。
+"""
+
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+
+from apps.alerts.service import ingest_stream
+from apps.alerts.service.ingest_stream import IngestMetrics, build_envelope, fetch_micro_batch, process_envelopes
+
+
+def _adapter(source_id="src-1", team=(1,), trusted_internal=False):
+    return SimpleNamespace(
+        alert_source=SimpleNamespace(source_id=source_id), resolved_team=list(team), trusted_internal=trusted_internal,
+        secret="top-secret",
+    )
+
+
+class _FakeMsg:
+    def __init__(self, envelope, subject="bklite.alerts.ingest.src-1"):
+        self.data = json.dumps(envelope).encode() if isinstance(envelope, dict) else envelope
+        self.subject = subject
+        self.acked = False
+        self.in_progress_calls = 0
+
+    async def ack(self):
+        self.acked = True
+
+    async def in_progress(self):
+        self.in_progress_calls += 1
+
+
+class _FakePullSub:
+    def __init__(self, batches):
+        self.batches = list(batches)
+        self.requested = []
+
+    async def fetch(self, batch=1, timeout=None):
+        self.requested.append(batch)
+        if not self.batches:
+            raise asyncio.TimeoutError
+        return self.batches.pop(0)
+
+
+def test_envelope_carries_resolved_team_not_secret():
+    envelope = build_envelope(_adapter(team=(3,), trusted_internal=True), [{"title": "t"}])
+
+    assert envelope["source_id"] == "src-1"
+    assert envelope["team"] == [3]
+    assert envelope["trusted_internal"] is True
+    assert "top-secret" not in json.dumps(envelope)
+
+
+def test_ingest_subject_sanitizes_source_id():
+    assert ingest_stream.ingest_subject("ns.alerts.ingest", "a.b c>*") == "ns.alerts.ingest.a_b_c__"
+
+
+def test_enqueue_publishes_and_reports_queued():
+    published = []
+
+    async def _publish(envelope, config):
+        published.append(envelope)
+
+    with mock.patch.object(ingest_stream, "publish_envelope", _publish), mock.patch.object(
+        ingest_stream, "run_pooled", side_effect=lambda coro: asyncio.run(coro)
+    ):
+        result = ingest_stream.enqueue(_adapter(), [{"title": "a"}, {"title": "b"}])
+
+    assert result == {"received": 2, "accepted": 2, "skipped": 0, "errored": 0, "queued": True}
+    assert len(published[0]["events"]) == 2
+
+
+def test_enqueue_failure_returns_none_and_counts_rejected():
+    metrics = IngestMetrics()
+
+    def _fail(coro):
+        coro.close()
+        raise RuntimeError("maximum messages exceeded")
+
+    with mock.patch.object(ingest_stream, "run_pooled", _fail), mock.patch.object(ingest_stream, "ingest_metrics", metrics):
+        assert ingest_stream.enqueue(_adapter(), [{"title": "a"}]) is None
+
+    assert metrics.rejected == 1
+
+
+def test_fetch_micro_batch_stops_at_event_limit():
+    batches = [
+        [_FakeMsg({"source_id": "s", "events": [{}, {}, {}]})],
+        [_FakeMsg({"source_id": "s", "events": [{}, {}]})],
+        [_FakeMsg({"source_id": "s", "events": [{}]})],
+    ]
+    psub = _FakePullSub(batches)
+
+    batch = asyncio.run(fetch_micro_batch(psub, max_events=5, max_wait=1))
+
+    assert sum(len(envelope["events"]) for _, envelope in batch) == 5
+    assert psub.requested == [5, 2]
+    assert len(psub.batches) == 1
+
+
+def test_fetch_micro_batch_returns_on_timeout_and_drops_invalid():
+    bad = _FakeMsg(b"not-json")
+    psub = _FakePullSub([[bad, _FakeMsg({"source_id": "s", "events": [{}]})]])
+
+    batch = asyncio.run(fetch_micro_batch(psub, max_events=100, max_wait=0.2))
+
+    assert len(batch) == 1
+    assert bad.acked is True
+
+
+@pytest.mark.django_db
+def test_process_envelopes_runs_pipeline_once_per_source_group():
+    from apps.alerts.models.alert_source import AlertSource
+
+    AlertSource.objects.create(name="源1", source_id="src-1", source_type="restful", secret="x")
+    AlertSource.objects.create(name="源2", source_id="src-2", source_type="restful", secret="x")
+    calls = []
+
+    class FakeAdapter:
+        def __init__(self, alert_source=None, secret=None, events=None, trusted_internal=False):
+            self.alert_source = alert_source
+            self.resolved_team = []
+
+        def main(self, events=None):
+            calls.append((self.alert_source.source_id, list(self.resolved_team), len(events)))
+            return {"received": len(events)}
+
+    now = time.time()
+    envelopes = [
+        {"source_id": "src-1", "team": [1], "events": [{}, {}], "enqueued_at": now - 2},
+        {"source_id": "src-2", "team": [1], "events": [{}], "enqueued_at": now},
+        {"source_id": "src-1", "team": [1], "events": [{}], "enqueued_at": now},
+        {"source_id": "missing", "team": [1], "events": [{}], "enqueued_at": now},
+    ]
+    metrics = IngestMetrics()
+    with mock.patch(
+        "apps.alerts.common.source_adapter.base.AlertSourceAdapterFactory.get_adapter", return_value=FakeAdapter
+    ):
+        results = process_envelopes(envelopes, metrics)
+
+    assert results == [True, True, True, True]
+    assert calls == [("src-1", [1], 3), ("src-2", [1], 1)]
+    assert metrics.latency_count == 4
+
+
+@pytest.mark.django_db
+def test_process_envelopes_marks_failed_group_for_redelivery():
+    from apps.alerts.models.alert_source import AlertSource
+
+    AlertSource.objects.create(name="源1", source_id="src-1", source_type="restful", secret="x")
+
+    class BrokenAdapter:
+        def __init__(self, **_kwargs):
+            pass
+
+        def main(self, events=None):
+            raise RuntimeError("db down")
+
+    with mock.patch(
+        "apps.alerts.common.source_adapter.base.AlertSourceAdapterFactory.get_adapter", return_value=BrokenAdapter
+    ):
+        results = process_envelopes([{"source_id": "src-1", "events": [{}], "enqueued_at": time.time()}], IngestMetrics())
+
+    assert results == [False]
+
+
+def test_metrics_latency_histogram_is_cumulative():
+    metrics = IngestMetrics(buckets=(0.1, 1, 10))
+    metrics.observe_latency(0.05, 2)
+    metrics.observe_latency(0.5)
+    metrics.observe_latency(30)
+
+    snapshot = metrics.snapshot()
+
+    assert snapshot["latency_histogram"] == {"0.1": 2, "1": 3, "10": 3, "+Inf": 4}
+    assert snapshot["latency_p50"] == 0.1
+    assert metrics.quantile(1.0) is None
+
+
+def test_config_read_from_settings(settings):
+    settings.ALERT_INGEST_BATCH_SIZE = 42
+    settings.ALERT_INGEST_ACK_WAIT = 90.0
+
+    config = ingest_stream.load_ingest_stream_config()
+
+    assert config["batch_size"] == 42
+    assert config["ack_wait"] == 90.0
+
+
+def test_consume_sets_ack_wait_and_heartbeats_slow_batch():
+    msg = _FakeMsg({"source_id": "src-1", "events": [{"title": "a"}]})
+    stop = asyncio.Event()
+    subscribe_kwargs = {}
+
+    class _Sub(_FakePullSub):
+        async def consumer_info(self):
+            return SimpleNamespace(num_pending=0)
+
+    sub = _Sub([[msg]])
+
+    class _JS:
+        async def pull_subscribe(self, subject, **kwargs):
+            subscribe_kwargs.update(kwargs)
+            return sub
+
+    def _slow_process(envelopes, metrics):
+        time.sleep(0.2)
+        stop.set()
+        return [True] * len(envelopes)
+
+    config = {"subject_prefix": "bklite.alerts.ingest", "durable": "d", "stream": "s", "batch_size": 10,
+              "max_wait": 0.05, "ack_wait": 0.15}
+    with mock.patch.object(ingest_stream, "_process_in_thread", _slow_process):
+        asyncio.run(ingest_stream.consume(_JS(), config, IngestMetrics(), stop_event=stop))
+
+    assert subscribe_kwargs["config"].ack_wait == 0.15
+    assert msg.in_progress_calls >= 2
+    assert msg.acked is True
+
+
+@pytest.mark.django_db
+def test_receiver_enqueues_when_stream_enabled(monkeypatch, settings):
+    from apps.alerts.models.alert_source import AlertSource
+    from apps.alerts.tests.test_event_log_receiver_views import _post_body
+    from apps.alerts.views import receiver as receiver_module
+
+    AlertSource.objects.create(name="源1", source_id="src-1", source_type="restful", secret="sec")
+
+    class FakeAdapter:
+        def __init__(self, alert_source=None, secret=None, events=None):
+            self.alert_source = alert_source
+
+        def normalize_payload(self, data):
+            return [{"title": "t"}]
+
+        def authenticate(self):
+            return True
+
+        def main(self):
+            raise AssertionError("should not run synchronously")
+
+    monkeypatch.setattr(receiver_module.AlertSourceAdapterFactory, "get_adapter", staticmethod(lambda src: FakeAdapter))
+    settings.ALERT_INGEST_STREAM_ENABLED = True
+    queued = {"received": 1, "accepted": 1, "skipped": 0, "errored": 0, "queued": True}
+    monkeypatch.setattr(ingest_stream, "enqueue", lambda adapter, events: queued)
+
+    response = receiver_module.receiver_data(_post_body({"source_id": "src-1"}, secret="sec"))
+
+    assert response.status_code == 202
+    assert json.loads(response.content)["ingestion"] == queued
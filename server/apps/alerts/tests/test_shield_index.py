@@ -0,0 +1,142 @@
+"""屏蔽策略索引测试。
+
+关键不变量：预编译时间窗与 TimeRangeChecker 判断一致；等值哈希索引只做候选裁剪，不改变命中结果；
+屏蔽策略变更后索引按版本重建。
+"""
+
+import datetime
+from unittest import mock
+
+import pytest
+from django.utils import timezone
+
+from apps.alerts.common.shield import EventShieldOperator, execute_shield_check_for_events, get_shield_index
+from apps.alerts.common.shield_index import ShieldIndex, ShieldSnapshot, ShieldTimeIndex
+from apps.alerts.constants.constants import EventStatus
+from apps.alerts.models.alert_operator import AlertShield
+from apps.alerts.models.alert_source import AlertSource
+from apps.alerts.models.models import Event
+from apps.alerts.utils.rule_matcher import RuleMatcher
+from apps.alerts.utils.time_range_checker import TimeRangeChecker
+
+TIME_CONFIGS = [
+    {},
+    {"type": "one", "start_time": "2025-01-01 00:00:00", "end_time": "2025-01-31 23:59:59"},
+    {"type": "one", "start_time": "2025-01-10 08:00:00", "end_time": "2025-01-10 09:00:00"},
+    {"type": "one", "start_time": "2025-01-10", "end_time": "2025-01-11"},
+    {"type": "one", "start_time": "2025-01-10 08:00:00"},
+    {"type": "day", "start_time": "08:00:00", "end_time": "18:00:00"},
+    {"type": "day", "start_time": "22:00:00", "end_time": "23:59:59"},
+    {"type": "day"},
+    {"type": "week", "week_month": [1, 5], "start_time": "00:00:00", "end_time": "12:00:00"},
+    {"type": "week", "week_month": "5", "start_time": "2025-01-01 08:00:00", "end_time": "2025-01-01 20:00:00"},
+    {"type": "week", "week_month": None},
+    {"type": "month", "week_month": [10, 31], "start_time": "08:00:00", "end_time": "08:30:00"},
+    {"type": "month", "week_month": "12", "start_time": "00:00:00", "end_time": "23:59:59"},
+    {"type": "month", "week_month": 10},
+    {"type": "day", "start_time": 8, "end_time": 18},
+    {"type": "unknown"},
+]
+CHECK_TIMES = [
+    datetime.datetime(2025, 1, 10, 8, 15),  # 周五
+    datetime.datetime(2025, 1, 10, 22, 30),
+    datetime.datetime(2025, 1, 12, 3, 0),  # 周日
+    datetime.datetime(2025, 2, 1, 12, 0),
+]
+
+
+def _snapshots(configs):
+    return [
+        ShieldSnapshot(id=i, name=f"s{i}", match_type="all", match_rules=[], suppression_time=config)
+        for i, config in enumerate(configs)
+    ]
+
+
+@pytest.mark.parametrize("naive_time", CHECK_TIMES)
+def test_time_index_matches_time_range_checker(naive_time):
+    check_time = timezone.make_aware(naive_time)
+    index = ShieldTimeIndex(_snapshots(TIME_CONFIGS))
+
+    expected = {i for i, config in enumerate(TIME_CONFIGS) if TimeRangeChecker(config, check_time).is_in_range()}
+    assert index.active_ids(check_time) == expected
+
+
+def _index(shields):
+    return ShieldIndex(
+        shields, EventShieldOperator.FIELD_MAPPING, RuleMatcher(EventShieldOperator.FIELD_MAPPING).normalize_rule
+    )
+
+
+@pytest.fixture
+def source(db):
+    return AlertSource.objects.create(name="源1", source_id="s1", source_type="restful", secret="x")
+
+
+def _make_event(source, event_id, **over):
+    defaults = dict(
+        source=source, raw_data={}, title="t", level="0", start_time=timezone.now(), event_id=event_id,
+        status=EventStatus.RECEIVED,
+    )
+    defaults.update(over)
+    return Event.objects.create(**defaults)
+
+
+@pytest.mark.django_db
+def test_equality_index_prunes_shields_without_matching_values(source):
+    _make_event(source, "E1", resource_id="host-1")
+    _make_event(source, "E2", resource_id="host-2")
+    shields = [
+        ShieldSnapshot(1, "a", "filter", [[{"key": "resource_id", "operator": "eq", "value": "host-1"}]], {}),
+        ShieldSnapshot(2, "b", "filter", [[{"key": "resource_id", "operator": "eq", "value": "host-9"}]], {}),
+        ShieldSnapshot(3, "c", "filter", [[{"key": "resource_id", "operator": "eq", "value": ["host-2", "x"]}]], {}),
+        ShieldSnapshot(4, "d", "filter", [[{"key": "title", "operator": "contains", "value": "t"}]], {}),
+        ShieldSnapshot(5, "e", "all", [], {}),
+    ]
+    index = _index(shields)
+    operator = EventShieldOperator(["E1", "E2"], shield_index=index)
+    legacy = EventShieldOperator(["E1", "E2"], active_shields=shields)
+
+    with mock.patch.object(index.matcher, "evaluate", wraps=index.matcher.evaluate) as evaluate:
+        result = operator._match_shields_in_memory(shields)
+
+    assert set(evaluate.call_args.args[1]) == {1, 3, 4}
+    assert result == legacy._match_shields_in_memory(shields)
+    assert result[2] == []
+
+
+@pytest.mark.django_db
+def test_shield_check_uses_index_without_per_shield_queries(source):
+    _make_event(source, "E1", resource_id="host-1")
+    _make_event(source, "E2", resource_id="host-2")
+    for i in range(20):
+        AlertShield.objects.create(
+            name=f"维护{i}", match_type="filter", suppression_time={},
+            match_rules=[[{"key": "resource_id", "operator": "eq", "value": f"host-{i}"}]],
+        )
+
+    with mock.patch.object(EventShieldOperator, "_batch_find_matching_events") as per_shield:
+        result = execute_shield_check_for_events(["E1", "E2"], shield_index=get_shield_index())
+
+    per_shield.assert_not_called()
+    assert result["shielded_events"] == 2
+
+
+@pytest.mark.django_db
+def test_index_is_cached_and_rebuilt_after_shield_change(source, django_assert_num_queries):
+    AlertShield.objects.create(name="全屏蔽", match_type="all", match_rules=[], suppression_time={})
+    first = get_shield_index()
+
+    with django_assert_num_queries(0):
+        assert get_shield_index() is first
+
+    shield = AlertShield.objects.create(
+        name="过期屏蔽", match_type="all", match_rules=[],
+        suppression_time={"type": "one", "start_time": "2020-01-01 00:00:00", "end_time": "2020-01-02 00:00:00"},
+    )
+    rebuilt = get_shield_index()
+
+    assert rebuilt is not first
+    assert [s.name for s in rebuilt.active_shields(timezone.now())] == ["全屏蔽"]
+
+    shield.delete()
+    assert len(get_shield_index()) == 1
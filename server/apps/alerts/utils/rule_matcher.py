@@ -15,7 +15,7 @@
 """
 
 import re as regex_module
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from django.db.models import Q, QuerySet
 
@@ -141,6 +141,34 @@ class RuleMatcher:
         Returns:
             Q对象或None
         """
+        normalized = self.normalize_rule(rule)
+        if normalized is None:
+            return None
+
+        model_field, lookup, value = normalized
+        try:
+            if lookup == "ne":
+                return ~Q(**{model_field: value})
+            elif lookup == "not_in":
+                return ~Q(**{f"{model_field}__in": value})
+            elif lookup == "not_contains":
+                return ~Q(**{f"{model_field}__icontains": value})
+            return Q(**{f"{model_field}__{lookup}": value})
+
+        except Exception as e:
+            logger.error("[AlertUtil] 构建规则 Q 对象失败: %s", e, exc_info=True)
+            return None
+
+    def normalize_rule(self, rule: Dict[str, Any]) -> Optional[Tuple[str, str, Any]]:
+        """
+        校验单个规则并归一化为 (模型字段, 查找类型, 值)
+
+        查找类型与 StrategyMatcher.normalize_condition 一致（exact/ne/in/not_in/icontains/not_contains/iregex），
+        ORM Q 对象与编译后的内存谓词都基于该结果构建。
+
+        Returns:
+            归一化三元组，规则无效返回None
+        """
         key = rule.get("key", "")
         operator = rule.get("operator", "eq")
         value = rule.get("value", "")
@@ -154,34 +182,25 @@ class RuleMatcher:
             logger.warning("[AlertUtil] 规则值数组不能为空: %s", rule)
             return None
 
-        try:
-            if operator == "eq":
-                if isinstance(value, list):
-                    return Q(**{f"{model_field}__in": value})
-                return Q(**{model_field: value})
-            elif operator == "ne":
-                if isinstance(value, list):
-                    return ~Q(**{f"{model_field}__in": value})
-                return ~Q(**{model_field: value})
-            elif operator == "contains":
-                return Q(**{f"{model_field}__icontains": value})
-            elif operator == "not_contains":
-                return ~Q(**{f"{model_field}__icontains": value})
-            elif operator == "re":
-                # 验证正则表达式有效性
-                try:
-                    regex_module.compile(value)
-                except regex_module.error as e:
-                    logger.error("[AlertUtil] 无效的正则表达式 '%s': %s", value, e)
-                    return None
-                return Q(**{f"{model_field}__iregex": value})
-            else:
-                logger.warning("[AlertUtil] 未知操作符: %s", operator)
+        if operator == "eq":
+            return model_field, "in" if isinstance(value, list) else "exact", value
+        elif operator == "ne":
+            return model_field, "not_in" if isinstance(value, list) else "ne", value
+        elif operator == "contains":
+            return model_field, "icontains", value
+        elif operator == "not_contains":
+            return model_field, "not_contains", value
+        elif operator == "re":
+            # 验证正则表达式有效性
+            try:
+                regex_module.compile(value)
+            except (regex_module.error, TypeError) as e:
+                logger.error("[AlertUtil] 无效的正则表达式 '%s': %s", value, e)
                 return None
+            return model_field, "iregex", value
 
-        except Exception as e:
-            logger.error("[AlertUtil] 构建规则 Q 对象失败: %s", e, exc_info=True)
-            return None
+        logger.warning("[AlertUtil] 未知操作符: %s", operator)
+        return None
 
 
 def filter_by_rules(queryset: QuerySet, match_rules: List[List[Dict[str, Any]]], field_mapping: Dict[str, str]) -> List[int]:
@@ -14,6 +14,7 @@ from django.views.decorators.csrf import csrf_exempt
 from apps.alerts.common.source_adapter.base import AlertSourceAdapterFactory
 from apps.alerts.error import AuthenticationSourceError
 from apps.alerts.models.alert_source import AlertSource
+from apps.alerts.service import ingest_stream
 from apps.core.logger import alert_logger as logger
 from apps.core.utils.exempt import api_exempt
 from apps.core.utils.web_utils import WebUtils
@@ -67,6 +68,20 @@ def _receive_events(request, path_source_id=None, expected_source_type=None):
         if not adapter.authenticate():
             return JsonResponse({"status": "error", "message": "Invalid secret."}, status=403)
 
+        # 流式接入：鉴权通过后只入队，由 alert_ingest_worker 微批处理；入队失败退回同步处理
+        if ingest_stream.is_enabled():
+            queued = ingest_stream.enqueue(adapter, events)
+            if queued is not None:
+                return JsonResponse(
+                    {
+                        "status": "success",
+                        "time": timezone.now().strftime("%Y-%m-%d %H:%M:%S"),
+                        "message": "Data queued successfully.",
+                        "ingestion": queued,
+                    },
+                    status=202,
+                )
+
         ingestion = adapter.main() or {
             "received": len(events),
             "accepted": len(events),
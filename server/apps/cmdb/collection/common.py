@@ -5,6 +5,7 @@ from apps.cmdb.collection.change_records import write_collect_instance_change_re
 from apps.cmdb.constants.constants import INSTANCE, INSTANCE_ASSOCIATION, DataCleanupStrategy
 from apps.cmdb.graph.drivers.graph_client import GraphClient
 from apps.cmdb.services.model import ModelManage
+from apps.cmdb.services.unique_rule import UniqueIndex
 from apps.core.exceptions.base_app_exception import BaseAppException
 
 load_dotenv()
@@ -158,7 +159,7 @@ class Management:
             return result
 
         with GraphClient() as ag:
-            exist_items = self._query_existing_unique_candidates(ag, inst_list)
+            exist_items = UniqueIndex(self._query_existing_unique_candidates(ag, inst_list))
             for instance_info in inst_list:
                 assos = instance_info.pop("assos", [])
                 try:
@@ -190,7 +191,7 @@ class Management:
             return result
 
         with GraphClient() as ag:
-            exist_items = self._query_existing_unique_candidates(ag, inst_list)
+            exist_items = UniqueIndex(self._query_existing_unique_candidates(ag, inst_list))
             for instance_info in inst_list:
                 try:
                     instance_info.update(
@@ -201,7 +202,7 @@ class Management:
                         collect_time=self.collect_time,
                     )
                     assos = instance_info.pop("assos", [])
-                    exist_items = [i for i in exist_items if i["_id"] != instance_info["_id"]]
+                    exist_items.discard(instance_info["_id"])
                     entity = ag.set_entity_properties(INSTANCE, [instance_info["_id"]], instance_info, self.check_attr_map, exist_items)
                     # 更新关联
                     assos_result = self.setting_assos(dict(model_id=self.model_id, _id=entity[0]["_id"], inst_name=entity[0]["inst_name"]), assos)
@@ -226,6 +227,7 @@ class Management:
                 INSTANCE,
                 [{"field": "model_id", "type": "str=", "value": self.model_id}],
             )
+            exist_items = UniqueIndex(exist_items)
             for instance_info in inst_list:
                 heartbeat_info = {
                     "_id": instance_info["_id"],
@@ -235,16 +237,15 @@ class Management:
                     "auto_collect": True,
                     "collect_time": self.collect_time,
                 }
+                # 校验时临时排除自身，校验后放回索引
+                current_items = exist_items.discard(heartbeat_info["_id"])
                 try:
-                    current_items = [
-                        item for item in exist_items if item["_id"] != heartbeat_info["_id"]
-                    ]
                     entity = ag.set_entity_properties(
                         INSTANCE,
                         [heartbeat_info["_id"]],
                         heartbeat_info,
                         self.check_attr_map,
-                        current_items,
+                        exist_items,
                     )
                     result["success"].append(
                         {"inst_info": entity[0], "assos_result": {}, "heartbeat": True}
@@ -257,6 +258,9 @@ class Management:
                             "heartbeat": True,
                         }
                     )
+                finally:
+                    for item in current_items:
+                        exist_items.append(item)
         return result
 
     @staticmethod
@@ -8,6 +8,7 @@ import requests
 
 from apps.cmdb.constants.constants import VICTORIAMETRICS_HOST
 from apps.core.logger import cmdb_logger as logger
+from apps.core.utils.victoriametrics_client import VictoriaMetricsClient
 
 
 """
@@ -22,7 +23,10 @@ DEFAULT_RETRY_INTERVAL = 1
 
 class Collection:
     def __init__(self):
-        self.url = f"{VICTORIAMETRICS_HOST}/prometheus/api/v1/query"
+        self.path = "/prometheus/api/v1/query"
+        self.url = f"{VICTORIAMETRICS_HOST}{self.path}"
+        # 进程级共享连接池，采集任务间复用 keep-alive 连接
+        self.client = VictoriaMetricsClient(VICTORIAMETRICS_HOST)
 
     def query(self, sql, timeout=60, retries=DEFAULT_QUERY_RETRIES, retry_interval=DEFAULT_RETRY_INTERVAL):
         """查询数据 - 查询最近1小时内的最新数据。
@@ -36,7 +40,7 @@ class Collection:
 
         for attempt in range(1, attempts + 1):
             try:
-                resp = requests.post(self.url, data=params, timeout=timeout)
+                resp = self.client.request("POST", self.path, data=params, timeout=timeout)
             except requests.RequestException as exc:
                 last_error = exc
                 logger.warning(
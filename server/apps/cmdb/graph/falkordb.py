@@ -22,8 +22,9 @@ from apps.cmdb.constants.field_constraints import (
 from apps.cmdb.display_field import ExcludeFieldsCache
 from apps.cmdb.graph.falkordb_format import FormatDBResult
 from apps.cmdb.graph.format_type import FORMAT_TYPE, FORMAT_TYPE_PARAMS, ParameterCollector
+from apps.cmdb.graph.topo_tree import TopoTree, bump_graph_version, get_cached_topo, is_write_query
 from apps.cmdb.graph.validators import CQLValidator
-from apps.cmdb.services.unique_rule import raise_unique_rule_conflict_if_needed
+from apps.cmdb.services.unique_rule import UniqueIndex, raise_unique_rule_conflict_if_needed
 from apps.core.exceptions.base_app_exception import BaseAppException
 from apps.core.logger import cmdb_logger as logger
 
@@ -99,6 +100,8 @@ class FalkorDBConnectionPool:
 class FalkorDBClient:
     # 参数化查询开关（可通过环境变量控制）
     ENABLE_PARAMETERIZATION = True
+    # 批量写入每条 UNWIND 语句携带的行数
+    BULK_WRITE_CHUNK_SIZE = int(os.getenv("FALKORDB_BULK_WRITE_CHUNK_SIZE", "500"))
 
     def __init__(self):
         self._pool = FalkorDBConnectionPool()
@@ -173,6 +176,8 @@ class FalkorDBClient:
 
             execution_time = (time.time() - start_time) * 1000  # 转换为毫秒
             logger.debug(f"[CQL Result] 查询成功，耗时: {execution_time:.2f}ms")
+            if is_write_query(query):
+                bump_graph_version()
             return result
         except Exception as e:
             execution_time = (time.time() - start_time) * 1000
@@ -187,7 +192,10 @@ class FalkorDBClient:
         _format = FormatDBResult(data)
         result = _format.to_list_of_lists()
         result_list = [self.entity_to_dict(i, _format=False) for i in result]
+        return self._deserialize_instance_list(result_list)
 
+    def _deserialize_instance_list(self, result_list: list) -> list:
+        """按模型字段定义反序列化实例列表中的表格字段"""
         if result_list and result_list[0].get("model_id") and result_list[0].get("_labels") == INSTANCE:
             try:
                 model_id = str(result_list[0].get("model_id"))
@@ -311,12 +319,11 @@ class FalkorDBClient:
 
         check_attrs = [i for i in check_attr_map.keys() if i in item] if is_update else check_attr_map.keys()
 
-        for exist_item in exist_items:
-            for attr in check_attrs:
-                exist_item_attr = exist_item.get(attr)
-                item_attr = item.get(attr)
-                if exist_item_attr and item_attr and item_attr == exist_item_attr:
-                    not_only_attr.add(attr)
+        # 按属性值查哈希索引；批量场景由调用方传入 UniqueIndex 复用，避免逐行全量扫描
+        unique_index = UniqueIndex.wrap(exist_items)
+        for attr in check_attrs:
+            if unique_index.find_attr(attr, item.get(attr)):
+                not_only_attr.add(attr)
 
         if not not_only_attr:
             return
@@ -433,6 +440,19 @@ class FalkorDBClient:
         operator: str = None,
         attrs: list = None,
     ):
+        properties = self._prepare_entity(label, properties, check_attr_map, exist_items, operator, attrs)
+        return self._insert_entity(CQLValidator.validate_label(label), properties)
+
+    def _prepare_entity(
+        self,
+        label: str,
+        properties: dict,
+        check_attr_map: dict,
+        exist_items: list,
+        operator: str = None,
+        attrs: list = None,
+    ):
+        """校验待创建实体并返回最终写入的属性（补充创建人、序列化表格字段）"""
         # 验证标签（不能参数化）
         validated_label = CQLValidator.validate_label(label)
         if not validated_label:
@@ -465,9 +485,10 @@ class FalkorDBClient:
             properties = {**properties, "_creator": operator}
 
         # 序列化表格字段为 JSON 字符串
-        properties = self._serialize_table_fields(label, properties, attrs)
+        return self._serialize_table_fields(label, properties, attrs)
 
-        # 创建实体
+    def _insert_entity(self, validated_label: str, properties: dict):
+        """写入单个已校验实体"""
         if self.ENABLE_PARAMETERIZATION:
             # 参数化: CREATE + SET += 以支持 list 类型属性
             # inline map (CREATE (n $props)) 不支持 list 类型,必须用运行时赋值
@@ -482,6 +503,21 @@ class FalkorDBClient:
 
         return self.entity_to_dict(entity)
 
+    def _bulk_insert_entities(self, validated_label: str, properties_list: list):
+        """UNWIND 一次写入一块已校验实体，返回原始结果；只有写入调用本身失败时抛出（此时该块未落库）"""
+        rows = [
+            {"idx": position, "props": self.format_properties_params(properties).get("props", {})}
+            for position, properties in enumerate(properties_list)
+        ]
+        query = f"UNWIND $rows AS row CREATE (n:{validated_label}) SET n += row.props RETURN row.idx AS idx, n"
+        return self._execute_query(query, params={"rows": rows})
+
+    @staticmethod
+    def _bulk_written_rows(result) -> dict:
+        """批量写入结果 -> {row.idx: 节点/边字典}"""
+        formatted = FormatDBResult(result)
+        return {record[0]: formatted._format_value(record[1]) for record in formatted.records}
+
     def create_edge(
         self,
         label: str,
@@ -588,18 +624,58 @@ class FalkorDBClient:
         operator: str = None,
         attrs: list = None,
     ):
-        """批量创建实体"""
-        results = []
+        """
+        批量创建实体
+
+        先逐条在 Python 侧完成全部校验，再把校验通过的实体按块以 UNWIND 一次写入；
+        某块写入调用失败时该块退回逐条写入，保证逐条的错误信息。写入成功后（已落库）的结果
+        解析或条数不符不再退回，未返回的行直接记为失败，避免重复建点。
+        """
+        results = [None] * len(properties_list)
+        # 唯一性索引整批只构建一次，校验通过的实体以占位形式增量加入，写入成功后补全 _id
+        unique_index = UniqueIndex.wrap(exist_items)
+        pending = []
         for index, properties in enumerate(properties_list):
-            result = {}
             try:
-                entity = self._create_entity(label, properties, check_attr_map, exist_items, operator, attrs)
-                result.update(data=entity, success=True, message="")
-                exist_items.append(entity)
+                prepared = self._prepare_entity(label, properties, check_attr_map, unique_index, operator, attrs)
             except Exception as e:
-                message = f"article {index + 1} data, {e}"
-                result.update(message=message, success=False, data=properties)
-            results.append(result)
+                results[index] = {"message": f"article {index + 1} data, {e}", "success": False, "data": properties}
+                continue
+            placeholder = dict(prepared)
+            unique_index.append(placeholder)
+            pending.append((index, prepared, placeholder))
+
+        validated_label = CQLValidator.validate_label(label) if pending else ""
+        chunk_size = self.BULK_WRITE_CHUNK_SIZE
+        for start in range(0, len(pending), chunk_size):
+            chunk = pending[start : start + chunk_size]
+            entities, bulk_error = None, None
+            if self.ENABLE_PARAMETERIZATION:
+                try:
+                    written = self._bulk_insert_entities(validated_label, [prepared for _, prepared, _ in chunk])
+                except Exception as e:
+                    logger.warning(f"[batch_create_entity] 批量写入失败，退回逐条写入: {e}")
+                else:
+                    try:
+                        entities = self._bulk_written_rows(written)
+                        bulk_error = f"bulk create returned {len(entities)} of {len(chunk)} entities"
+                    except Exception as e:
+                        entities, bulk_error = {}, e
+                    if len(entities) != len(chunk):
+                        logger.warning(f"[batch_create_entity] 批量写入结果不完整: {bulk_error}")
+            for position, (index, prepared, placeholder) in enumerate(chunk):
+                if entities is not None and position not in entities:
+                    # 写入结果未知（可能已落库），保留占位以免批内后续行与之重复
+                    results[index] = {"message": f"article {index + 1} data, {bulk_error}", "success": False, "data": properties_list[index]}
+                    continue
+                try:
+                    entity = entities[position] if entities is not None else self._insert_entity(validated_label, prepared)
+                except Exception as e:
+                    unique_index.remove(placeholder)
+                    results[index] = {"message": f"article {index + 1} data, {e}", "success": False, "data": properties_list[index]}
+                    continue
+                placeholder.update(entity)
+                results[index] = {"data": entity, "success": True, "message": ""}
         return results
 
     def batch_create_edge(
@@ -610,21 +686,106 @@ class FalkorDBClient:
         edge_list: list,
         check_asst_key: str,
     ):
-        """批量创建边"""
-        results = []
+        """
+        批量创建边
+
+        存在性校验与写入均按块以 UNWIND 执行（MATCH ... WHERE ID(a) = row.src），每块两次往返；
+        批内重复的边按顺序视为已存在；某块校验或写入调用失败时该块退回逐条创建，
+        写入成功后的结果解析失败则整块记为失败，不再重复创建。
+        """
+        if not self.ENABLE_PARAMETERIZATION:
+            return self._batch_create_edge_one_by_one(label, a_label, b_label, edge_list, check_asst_key)
+
+        results = [None] * len(edge_list)
+        try:
+            validated_label = CQLValidator.validate_relation(label)
+            validated_a_label = CQLValidator.validate_label(a_label)
+            validated_b_label = CQLValidator.validate_label(b_label)
+            validated_check_key = CQLValidator.validate_field(check_asst_key)
+            if not validated_label:
+                raise BaseAppException("label is empty")
+        except Exception as e:
+            return [{"message": f"article {index + 1} data, {e}", "success": False} for index in range(len(edge_list))]
+
+        rows = []
+        seen = set()
         for index, edge_info in enumerate(edge_list):
-            result = {}
             try:
-                a_id = edge_info["src_id"]
-                b_id = edge_info["dst_id"]
-                edge = self._create_edge(label, a_id, a_label, b_id, b_label, edge_info, check_asst_key)
-                result.update(data=edge, success=True)
+                src_id = CQLValidator.validate_id(edge_info["src_id"])
+                dst_id = CQLValidator.validate_id(edge_info["dst_id"])
+                check_asst_val = edge_info.get(check_asst_key)
+                # 存在性校验不区分方向，批内重复同样按无向判断
+                edge_key = (frozenset((src_id, dst_id)), json.dumps(check_asst_val, sort_keys=True, default=str))
+                if edge_key in seen:
+                    raise BaseAppException("edge already exists")
+                seen.add(edge_key)
+                props = self.format_properties_params(edge_info).get("props", {})
             except Exception as e:
-                message = f"article {index + 1} data, {e}"
-                result.update(message=message, success=False)
-            results.append(result)
+                results[index] = {"message": f"article {index + 1} data, {e}", "success": False}
+                continue
+            rows.append({"idx": index, "src": src_id, "dst": dst_id, "check_val": check_asst_val, "props": props})
+
+        check_query = (
+            f"UNWIND $rows AS row MATCH (a:{validated_a_label}) WHERE ID(a) = row.src "
+            f"MATCH (a)-[e]-(b:{validated_b_label}) WHERE ID(b) = row.dst AND e.{validated_check_key} = row.check_val "
+            f"RETURN DISTINCT row.idx AS idx"
+        )
+        create_query = (
+            f"UNWIND $rows AS row MATCH (a:{validated_a_label}) WHERE ID(a) = row.src "
+            f"WITH a, row MATCH (b:{validated_b_label}) WHERE ID(b) = row.dst "
+            f"CREATE (a)-[e:{validated_label}]->(b) SET e += row.props RETURN row.idx AS idx, e"
+        )
+        chunk_size = self.BULK_WRITE_CHUNK_SIZE
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start : start + chunk_size]
+            try:
+                exist_result = FormatDBResult(self._execute_query(check_query, params={"rows": chunk}))
+                existed = {record[0] for record in exist_result.records}
+                for row in chunk:
+                    if row["idx"] in existed:
+                        results[row["idx"]] = {"message": f"article {row['idx'] + 1} data, edge already exists", "success": False}
+                chunk = [row for row in chunk if row["idx"] not in existed]
+                if not chunk:
+                    continue
+                written = self._execute_query(create_query, params={"rows": chunk})
+            except Exception as e:
+                logger.warning(f"[batch_create_edge] 批量写入失败，退回逐条创建: {e}")
+                for row in chunk:
+                    if results[row["idx"]] is None:
+                        results[row["idx"]] = self._create_edge_result(
+                            row["idx"], label, a_label, b_label, edge_list[row["idx"]], check_asst_key
+                        )
+                continue
+            try:
+                edges = self._bulk_written_rows(written)
+            except Exception as e:
+                # 边已落库，退回逐条会误报 "edge already exists"
+                logger.warning(f"[batch_create_edge] 批量写入结果解析失败: {e}")
+                for row in chunk:
+                    results[row["idx"]] = {"message": f"article {row['idx'] + 1} data, {e}", "success": False}
+                continue
+            for row in chunk:
+                # 与逐条创建一致：端点不存在时不报错，返回空数据
+                results[row["idx"]] = {"data": edges.get(row["idx"], {}), "success": True}
         return results
 
+    def _create_edge_result(self, index, label, a_label, b_label, edge_info, check_asst_key):
+        result = {}
+        try:
+            edge = self._create_edge(label, edge_info["src_id"], a_label, edge_info["dst_id"], b_label, edge_info, check_asst_key)
+            result.update(data=edge, success=True)
+        except Exception as e:
+            message = f"article {index + 1} data, {e}"
+            result.update(message=message, success=False)
+        return result
+
+    def _batch_create_edge_one_by_one(self, label, a_label, b_label, edge_list, check_asst_key):
+        """逐条创建边（非参数化模式）"""
+        return [
+            self._create_edge_result(index, label, a_label, b_label, edge_info, check_asst_key)
+            for index, edge_info in enumerate(edge_list)
+        ]
+
     def format_search_params(
         self,
         params: list,
@@ -1073,6 +1234,66 @@ class FalkorDBClient:
         nodes = self.batch_update_node_properties(label, entity_ids, properties)
         return {"data": self.entity_to_list(nodes), "success": True, "message": ""}
 
+    def batch_update_entities(
+        self,
+        label: str,
+        updates: list,
+        check_attr_map: dict,
+        attrs: list = None,
+    ):
+        """
+        按实体逐个设置不同属性的批量更新
+
+        Args:
+            updates: [(实体ID, 属性字典)]
+
+        每条先按 batch_update_entity_properties 的规则校验，再按块以
+        ``UNWIND $rows AS row MATCH (n) WHERE ID(n) = row.id SET n += row.props`` 一次写入；
+        返回与 updates 顺序一致的逐条结果。
+        """
+        results = [None] * len(updates)
+        rows = []
+        for index, (entity_id, properties) in enumerate(updates):
+            try:
+                if attrs:
+                    from apps.cmdb.validators import FieldValidator
+
+                    validation_errors = FieldValidator.validate_instance_data(properties, attrs)
+                    if validation_errors:
+                        error_msg = "; ".join([f"{err['field_name']}: {err['error']}" for err in validation_errors])
+                        raise BaseAppException(f"字段校验失败: {error_msg}")
+                self.check_required_attr(properties, check_attr_map.get("is_required", {}), is_update=True)
+                editable = self.get_editable_attr(properties, check_attr_map.get("editable", {}))
+                if not editable:
+                    raise BaseAppException("properties is empty")
+                editable = self._serialize_table_fields(label, editable, attrs)
+                props = self.format_properties_params(editable).get("props", {})
+                rows.append({"idx": index, "id": CQLValidator.validate_id(entity_id), "props": props})
+            except Exception as e:
+                logger.info(f"update entity error: {e}")
+                results[index] = {"success": False, "data": properties, "message": "update entity error"}
+
+        chunk_size = self.BULK_WRITE_CHUNK_SIZE
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start : start + chunk_size]
+            try:
+                label_str = f":{CQLValidator.validate_label(label)}" if label else ""
+                query = f"UNWIND $rows AS row MATCH (n{label_str}) WHERE ID(n) = row.id SET n += row.props RETURN row.idx AS idx, n"
+                result = FormatDBResult(self._execute_query(query, params={"rows": chunk}))
+                updated = {record[0]: result._format_value(record[1]) for record in result.records}
+            except Exception as e:
+                logger.info(f"update entity error: {e}")
+                updated = {}
+            idxs = [row["idx"] for row in chunk if row["idx"] in updated]
+            entities_by_idx = dict(zip(idxs, self._deserialize_instance_list([updated[idx] for idx in idxs])))
+            for row in chunk:
+                entity = entities_by_idx.get(row["idx"])
+                if entity is None:
+                    results[row["idx"]] = {"success": False, "data": updates[row["idx"]][1], "message": "update entity error"}
+                else:
+                    results[row["idx"]] = {"data": entity, "success": True, "message": ""}
+        return results
+
     def batch_update_node_properties(self, label: str, node_ids: Union[int, List[int]], properties: dict):
         """批量更新节点属性（参数化版本）"""
         validated_label = CQLValidator.validate_label(label) if label else ""
@@ -1252,19 +1473,21 @@ class FalkorDBClient:
             dst_query = f"MATCH p=(m{label_str})-[*]->(n{label_str}) WHERE ID(n) = {inst_id} RETURN p"
             query_params = None
 
-        try:
+        def load():
             src_objs = self._execute_query(src_query, params=query_params)
             dst_objs = self._execute_query(dst_query, params=query_params)
+            return dict(
+                src_result=self.format_topo(inst_id, src_objs, True),
+                dst_result=self.format_topo(inst_id, dst_objs, False),
+            )
+
+        try:
+            return get_cached_topo("full", (label, inst_id), load)
         except Exception as e:
             logger.error(f"Query topo failed: {e}")
             # 如果复杂查询失败，使用简单的直接关系查询
             return {}
 
-        return dict(
-            src_result=self.format_topo(inst_id, src_objs, True),
-            dst_result=self.format_topo(inst_id, dst_objs, False),
-        )
-
     @staticmethod
     def get_topo_config() -> dict:
         try:
@@ -1392,13 +1615,16 @@ class FalkorDBClient:
             src_query = f"MATCH p=(n{label_str})-[*1..{probe_depth}]->(m{label_str}) WHERE ID(n) = {inst_id} RETURN p"
             dst_query = f"MATCH p=(m{label_str})-[*1..{probe_depth}]->(n{label_str}) WHERE ID(n) = {inst_id} RETURN p"
 
-        src_objs = self._execute_query(src_query, params=query_params)
-        dst_objs = self._execute_query(dst_query, params=query_params)
+        def load():
+            src_objs = self._execute_query(src_query, params=query_params)
+            dst_objs = self._execute_query(dst_query, params=query_params)
+            return dict(
+                src_result=self.format_topo_lite(inst_id, src_objs, True, depth=depth, exclude_ids=exclude_ids),
+                dst_result=self.format_topo_lite(inst_id, dst_objs, False, depth=depth, exclude_ids=exclude_ids),
+            )
 
-        return dict(
-            src_result=self.format_topo_lite(inst_id, src_objs, True, depth=depth, exclude_ids=exclude_ids),
-            dst_result=self.format_topo_lite(inst_id, dst_objs, False, depth=depth, exclude_ids=exclude_ids),
-        )
+        exclude_key = ",".join(sorted(str(value) for value in exclude_ids or []))
+        return get_cached_topo("lite", (label, inst_id, depth, exclude_key), load)
 
     def query_network_topo(self, inst_id: int, belong_asst_id: str):
         """网络拓扑：以设备为中心，查其接口直连的对端设备。返回扁平行列表。
@@ -1440,9 +1666,9 @@ class FalkorDBClient:
             rows.append({k: row[idx] for idx, k in enumerate(keys)})
         return rows
 
-    def format_topo(self, start_id, objs, entity_is_src=True):
-        """格式化拓扑数据"""
-
+    @staticmethod
+    def _collect_topo_elements(objs):
+        """从路径查询结果中分离出点（按 ID 去重）与线（去除自己指向自己的边）"""
         # 修复 FalkorDB QueryResult 对象检查方式
         all_results = objs.result_set
 
@@ -1465,47 +1691,43 @@ class FalkorDBClient:
                         **props,
                     )
 
-        edges = list(edge_map.values())
-        # 去除自己指向自己的边
-        edges = [edge for edge in edges if edge["src_inst_id"] != edge["dst_inst_id"]]
-        entities = list(entity_map.values())
+        edges = [edge for edge in edge_map.values() if edge.get("src_inst_id") != edge.get("dst_inst_id")]
+        return entity_map, edges
+
+    def format_topo(self, start_id, objs, entity_is_src=True):
+        """格式化拓扑数据"""
+        entity_map, edges = self._collect_topo_elements(objs)
 
         # 检查起始实体是否存在
         if start_id not in entity_map:
             return {}
 
-        result = self.create_node(entity_map[start_id], edges, entities, entity_is_src)
-        return result
+        return TopoTree(entity_map.values(), edges, entity_is_src).build(start_id, self._topo_node)
 
-    def create_node(self, entity, edges, entities, entity_is_src=True):
-        """entity作为目标"""
-        node = {
+    @staticmethod
+    def _topo_node(entity):
+        return {
             "_id": entity["_id"],
             "model_id": entity.get("model_id"),
             "inst_name": entity.get("inst_name"),
             "children": [],
         }
 
-        if entity_is_src:
-            entity_key, child_entity_key = "src", "dst"
-        else:
-            entity_key, child_entity_key = "dst", "src"
-
-        for edge in edges:
-            if edge[f"{entity_key}_inst_id"] == entity["_id"]:
-                child_entity = self.find_entity_by_id(edge[f"{child_entity_key}_inst_id"], entities)
-                if child_entity:
-                    child_node = self.create_node(child_entity, edges, entities, entity_is_src)
-                    child_node["model_asst_id"] = edge["model_asst_id"]
-                    child_node["asst_id"] = edge["asst_id"]
-                    node["children"].append(child_node)
-        return node
+    @staticmethod
+    def _topo_node_lite(entity):
+        return {
+            "_id": entity.get("_id"),
+            "model_id": entity.get("model_id"),
+            "inst_name": entity.get("inst_name") or entity.get("ip_addr") or str(entity.get("_id")),
+            "children": [],
+        }
+
+    def create_node(self, entity, edges, entities, entity_is_src=True):
+        """entity作为目标"""
+        return TopoTree(entities, edges, entity_is_src).build(entity["_id"], self._topo_node)
 
     def format_topo_lite(self, start_id, objs, entity_is_src=True, depth: int = 3, exclude_ids=None):
         """格式化拓扑数据：限制层级并支持排除父节点集合"""
-
-        all_results = objs.result_set
-
         exclude_id_set = set()
         for value in exclude_ids or []:
             try:
@@ -1514,43 +1736,18 @@ class FalkorDBClient:
                 continue
         exclude_id_set.discard(start_id)
 
-        edge_map = {}
-        entity_map = {}
-
-        for obj in all_results:
-            for element in obj:
-                nodes = getattr(element, "_nodes", [])
-                relationships = getattr(element, "_edges", [])
-                for node in nodes:
-                    props = {k: v for k, v in node.properties.items() if k != "_id"}
-                    entity_map[node.id] = dict(_id=node.id, _label=node.labels[0], **props)
-                for relationship in relationships:
-                    props = {k: v for k, v in relationship.properties.items() if k != "_id"}
-                    edge_map[relationship.id] = dict(
-                        _id=relationship.id,
-                        _label=relationship.relation,
-                        **props,
-                    )
-
-        edges = list(edge_map.values())
-        edges = [edge for edge in edges if edge.get("src_inst_id") != edge.get("dst_inst_id")]
+        entity_map, edges = self._collect_topo_elements(objs)
 
         if exclude_id_set:
             for node_id in exclude_id_set:
                 entity_map.pop(node_id, None)
             edges = [edge for edge in edges if edge.get("src_inst_id") not in exclude_id_set and edge.get("dst_inst_id") not in exclude_id_set]
 
-        entities = list(entity_map.values())
         if start_id not in entity_map:
             return {}
 
-        return self.create_node_lite(
-            entity_map[start_id],
-            edges,
-            entities,
-            entity_is_src,
-            level=1,
-            max_depth=max(1, int(depth)),
+        return TopoTree(entity_map.values(), edges, entity_is_src).build(
+            start_id, self._topo_node_lite, max_depth=max(1, int(depth)), mark_has_more=True
         )
 
     def create_node_lite(
@@ -1562,38 +1759,9 @@ class FalkorDBClient:
         level: int = 1,
         max_depth: int = 3,
     ):
-        node = {
-            "_id": entity.get("_id"),
-            "model_id": entity.get("model_id"),
-            "inst_name": entity.get("inst_name") or entity.get("ip_addr") or str(entity.get("_id")),
-            "children": [],
-        }
-
-        if entity_is_src:
-            entity_key, child_entity_key = "src", "dst"
-        else:
-            entity_key, child_entity_key = "dst", "src"
-
-        if level >= max_depth:
-            node["has_more"] = any(edge.get(f"{entity_key}_inst_id") == entity.get("_id") for edge in edges)
-            return node
-
-        for edge in edges:
-            if edge.get(f"{entity_key}_inst_id") == entity.get("_id"):
-                child_entity = self.find_entity_by_id(edge.get(f"{child_entity_key}_inst_id"), entities)
-                if child_entity:
-                    child_node = self.create_node_lite(
-                        child_entity,
-                        edges,
-                        entities,
-                        entity_is_src,
-                        level=level + 1,
-                        max_depth=max_depth,
-                    )
-                    child_node["model_asst_id"] = edge.get("model_asst_id")
-                    child_node["asst_id"] = edge.get("asst_id")
-                    node["children"].append(child_node)
-        return node
+        return TopoTree(entities, edges, entity_is_src).build(
+            entity.get("_id"), self._topo_node_lite, max_depth=max(1, max_depth - level + 1), mark_has_more=True
+        )
 
     def find_entity_by_id(self, entity_id, entities):
         """根据ID找实体"""
@@ -2085,33 +2253,16 @@ class FalkorDBClient:
             for item in exist_items:
                 item_key = tuple(item.get(k) for k in unique_key if k in item)
                 item_map[item_key] = item
+            updates = []
             for properties_key, properties in properties_map.items():
                 node = item_map.get(properties_key)
                 if node:
-                    # 节点更新
-                    try:
-                        results = self.batch_update_entity_properties(
-                            label=label,
-                            entity_ids=[node.get("_id")],
-                            properties=properties,
-                            check_attr_map=check_attr_map,
-                            attrs=attrs,
-                        )
-                        results["data"] = results["data"][0]
-                        update_results.append(results)
-                    except Exception as e:
-                        logger.info(f"update entity error: {e}")
-                        update_results.append(
-                            {
-                                "success": False,
-                                "data": properties,
-                                "message": "update entity error",
-                            }
-                        )
-
+                    # 节点更新：统一按块批量写入
+                    updates.append((node.get("_id"), properties))
                 else:
                     # 暂存统一新增
                     add_nodes.append(properties)
+            update_results = self.batch_update_entities(label, updates, check_attr_map, attrs) if updates else []
         else:
             add_nodes = properties_list
         add_results = self.batch_create_entity(
@@ -8,7 +8,8 @@ from neo4j.graph import Path
 
 from apps.cmdb.constants.constants import INSTANCE, ModelConstraintKey
 from apps.cmdb.graph.format_type import FORMAT_TYPE_PARAMS, ParameterCollector
-from apps.cmdb.services.unique_rule import raise_unique_rule_conflict_if_needed
+from apps.cmdb.graph.topo_tree import TopoTree
+from apps.cmdb.services.unique_rule import UniqueIndex, raise_unique_rule_conflict_if_needed
 from apps.core.exceptions.base_app_exception import BaseAppException
 from apps.core.logger import cmdb_logger as logger
 
@@ -16,6 +17,9 @@ load_dotenv()
 
 
 class Neo4jClient:
+    # 批量写入每条 UNWIND 语句携带的行数
+    BULK_WRITE_CHUNK_SIZE = int(os.getenv("NEO4J_BULK_WRITE_CHUNK_SIZE", "500"))
+
     def __init__(self):
         self.driver = GraphDatabase.driver(
             os.getenv("NEO4J_URI"),
@@ -163,6 +167,24 @@ class Neo4jClient:
         operator: str = None,
         attrs: list = None,
     ):
+        properties = self._prepare_entity(label, properties, check_attr_map, exist_items, operator, attrs)
+
+        # 创建实体
+        properties_str = self.format_properties(properties)
+        entity = self.session.run(f"CREATE (n:{label} {properties_str}) RETURN n").single()
+
+        return self.entity_to_dict(entity)
+
+    def _prepare_entity(
+        self,
+        label: str,
+        properties: dict,
+        check_attr_map: dict,
+        exist_items: list,
+        operator: str = None,
+        attrs: list = None,
+    ):
+        """校验待创建实体并返回最终写入的属性"""
         # 校验必填项标签非空
         if not label:
             raise BaseAppException("label is empty")
@@ -192,11 +214,7 @@ class Neo4jClient:
         if operator:
             properties.update(_creator=operator)
 
-        # 创建实体
-        properties_str = self.format_properties(properties)
-        entity = self.session.run(f"CREATE (n:{label} {properties_str}) RETURN n").single()
-
-        return self.entity_to_dict(entity)
+        return properties
 
     def create_edge(
         self,
@@ -261,18 +279,63 @@ class Neo4jClient:
         operator: str = None,
         attrs: list = None,
     ):
-        """批量创建实体"""
-        results = []
+        """
+        批量创建实体
+
+        先逐条校验，再把校验通过的实体按块以 UNWIND 一次写入；某块写入调用失败时该块退回逐条写入，
+        写入成功后（已落库）的结果转换或条数不符不再退回，未返回的行直接记为失败，避免重复建点。
+        """
+        results = [None] * len(properties_list)
+        # 唯一规则索引整批只构建一次，校验通过的实体以占位形式增量加入，写入成功后补全 _id
+        unique_index = UniqueIndex.wrap(exist_items)
+        pending = []
         for index, properties in enumerate(properties_list):
-            result = {}
             try:
-                entity = self._create_entity(label, properties, check_attr_map, exist_items, operator, attrs)
-                result.update(data=entity, success=True, message="")
-                exist_items.append(entity)
+                prepared = self._prepare_entity(label, properties, check_attr_map, unique_index, operator, attrs)
             except Exception as e:
-                message = f"article {index + 1} data, {e}"
-                result.update(message=message, success=False, data=properties)
-            results.append(result)
+                results[index] = {"message": f"article {index + 1} data, {e}", "success": False, "data": properties}
+                continue
+            placeholder = dict(prepared)
+            unique_index.append(placeholder)
+            pending.append((index, prepared, placeholder))
+
+        for start in range(0, len(pending), self.BULK_WRITE_CHUNK_SIZE):
+            chunk = pending[start : start + self.BULK_WRITE_CHUNK_SIZE]
+            entities, bulk_error = None, None
+            try:
+                records = list(
+                    self.session.run(
+                        f"UNWIND $rows AS row CREATE (n:{label}) SET n += row.props RETURN n, row.idx AS idx",
+                        rows=[{"idx": position, "props": prepared} for position, (_, prepared, _) in enumerate(chunk)],
+                    )
+                )
+            except Exception as e:
+                logger.warning(f"[batch_create_entity] 批量写入失败，退回逐条写入: {e}")
+            else:
+                try:
+                    entities = {record["idx"]: self.entity_to_dict(record) for record in records}
+                    bulk_error = f"bulk create returned {len(entities)} of {len(chunk)} entities"
+                except Exception as e:
+                    entities, bulk_error = {}, e
+                if len(entities) != len(chunk):
+                    logger.warning(f"[batch_create_entity] 批量写入结果不完整: {bulk_error}")
+            for position, (index, prepared, placeholder) in enumerate(chunk):
+                if entities is not None and position not in entities:
+                    # 写入结果未知（可能已落库），保留占位以免批内后续行与之重复
+                    results[index] = {"message": f"article {index + 1} data, {bulk_error}", "success": False, "data": properties_list[index]}
+                    continue
+                try:
+                    if entities is not None:
+                        entity = entities[position]
+                    else:
+                        properties_str = self.format_properties(prepared)
+                        entity = self.entity_to_dict(self.session.run(f"CREATE (n:{label} {properties_str}) RETURN n").single())
+                except Exception as e:
+                    unique_index.remove(placeholder)
+                    results[index] = {"message": f"article {index + 1} data, {e}", "success": False, "data": properties_list[index]}
+                    continue
+                placeholder.update(entity)
+                results[index] = {"data": entity, "success": True, "message": ""}
         return results
 
     def batch_create_edge(
@@ -283,19 +346,78 @@ class Neo4jClient:
         edge_list: list,
         check_asst_key: str,
     ):
-        """批量创建边"""
-        results = []
+        """
+        批量创建边
+
+        存在性校验与写入均按块以 UNWIND 执行，批内重复的边按顺序视为已存在；某块校验或写入调用失败时
+        该块退回逐条创建，写入成功后的结果转换失败则整块记为失败，不再重复创建。
+        """
+        if not label:
+            return [{"message": f"article {index + 1} data, label is empty", "success": False} for index in range(len(edge_list))]
+
+        results = [None] * len(edge_list)
+        rows = []
+        seen = set()
         for index, edge_info in enumerate(edge_list):
-            result = {}
             try:
-                a_id = edge_info["src_id"]
-                b_id = edge_info["dst_id"]
-                edge = self._create_edge(label, a_id, a_label, b_id, b_label, edge_info, check_asst_key)
-                result.update(data=edge, success=True)
+                src_id, dst_id = edge_info["src_id"], edge_info["dst_id"]
+                check_asst_val = edge_info.get(check_asst_key)
+                edge_key = (frozenset((src_id, dst_id)), json.dumps(check_asst_val, sort_keys=True, default=str))
+                if edge_key in seen:
+                    raise BaseAppException("edge already exists")
+                seen.add(edge_key)
+            except Exception as e:
+                results[index] = {"message": f"article {index + 1} data, {e}", "success": False}
+                continue
+            rows.append({"idx": index, "src": src_id, "dst": dst_id, "check_val": check_asst_val, "props": edge_info})
+
+        check_query = (
+            f"UNWIND $rows AS row MATCH (a:{a_label})-[e]-(b:{b_label}) "
+            f"WHERE id(a) = row.src AND id(b) = row.dst AND e.{check_asst_key} = row.check_val "
+            "RETURN DISTINCT row.idx AS idx"
+        )
+        create_query = (
+            f"UNWIND $rows AS row MATCH (a:{a_label}) WHERE id(a) = row.src "
+            f"WITH a, row MATCH (b:{b_label}) WHERE id(b) = row.dst "
+            f"CREATE (a)-[e:{label}]->(b) SET e += row.props RETURN e, row.idx AS idx"
+        )
+        for start in range(0, len(rows), self.BULK_WRITE_CHUNK_SIZE):
+            chunk = rows[start : start + self.BULK_WRITE_CHUNK_SIZE]
+            try:
+                existed = {record["idx"] for record in self.session.run(check_query, rows=chunk)}
+                for row in chunk:
+                    if row["idx"] in existed:
+                        results[row["idx"]] = {"message": f"article {row['idx'] + 1} data, edge already exists", "success": False}
+                chunk = [row for row in chunk if row["idx"] not in existed]
+                if not chunk:
+                    continue
+                records = list(self.session.run(create_query, rows=chunk))
             except Exception as e:
-                message = f"article {index + 1} data, {e}"
-                result.update(message=message, success=False)
-            results.append(result)
+                logger.warning(f"[batch_create_edge] 批量写入失败，退回逐条创建: {e}")
+                for row in chunk:
+                    if results[row["idx"]] is not None:
+                        continue
+                    edge_info = edge_list[row["idx"]]
+                    try:
+                        edge = self._create_edge(label, row["src"], a_label, row["dst"], b_label, edge_info, check_asst_key)
+                        results[row["idx"]] = {"data": edge, "success": True}
+                    except Exception as err:
+                        results[row["idx"]] = {"message": f"article {row['idx'] + 1} data, {err}", "success": False}
+                continue
+            try:
+                edges = {record["idx"]: self.edge_to_dict(record) for record in records}
+            except Exception as e:
+                # 边已落库，退回逐条会误报 "edge already exists"
+                logger.warning(f"[batch_create_edge] 批量写入结果转换失败: {e}")
+                for row in chunk:
+                    results[row["idx"]] = {"message": f"article {row['idx'] + 1} data, {e}", "success": False}
+                continue
+            for row in chunk:
+                if row["idx"] in edges:
+                    results[row["idx"]] = {"data": edges[row["idx"]], "success": True}
+                else:
+                    # 端点不存在时未创建任何边，与逐条创建一样记为失败
+                    results[row["idx"]] = {"message": f"article {row['idx'] + 1} data, src or dst entity not found", "success": False}
         return results
 
     def format_search_params(self, params: list, param_type: str = "AND", collector: ParameterCollector = None):
@@ -543,6 +665,45 @@ class Neo4jClient:
         nodes = self.batch_update_node_properties(label, entity_ids, properties)
         return {"data": self.entity_to_list(nodes), "success": True, "message": ""}
 
+    def batch_update_entities(self, label: str, updates: list, check_attr_map: dict):
+        """
+        按实体逐个设置不同属性的批量更新
+
+        Args:
+            updates: [(实体ID, 属性字典)]
+
+        逐条校验后按块以 ``UNWIND $rows AS row MATCH (n) WHERE id(n) = row.id SET n += row.props`` 写入，
+        返回与 updates 顺序一致的逐条结果。
+        """
+        results = [None] * len(updates)
+        rows = []
+        for index, (entity_id, properties) in enumerate(updates):
+            try:
+                self.check_required_attr(properties, check_attr_map.get("is_required", {}), is_update=True)
+                editable = self.get_editable_attr(properties, check_attr_map.get("editable", {}))
+                if not editable:
+                    raise BaseAppException("properties is empty")
+                rows.append({"idx": index, "id": entity_id, "props": editable})
+            except Exception as e:
+                logger.info(f"update entity error: {e}")
+                results[index] = {"success": False, "data": properties, "message": "update entity error"}
+
+        label_str = f":{label}" if label else ""
+        query = f"UNWIND $rows AS row MATCH (n{label_str}) WHERE id(n) = row.id SET n += row.props RETURN n, row.idx AS idx"
+        for start in range(0, len(rows), self.BULK_WRITE_CHUNK_SIZE):
+            chunk = rows[start : start + self.BULK_WRITE_CHUNK_SIZE]
+            try:
+                updated = {record["idx"]: self.entity_to_dict(record) for record in self.session.run(query, rows=chunk)}
+            except Exception as e:
+                logger.info(f"update entity error: {e}")
+                updated = {}
+            for row in chunk:
+                if row["idx"] in updated:
+                    results[row["idx"]] = {"data": updated[row["idx"]], "success": True, "message": ""}
+                else:
+                    results[row["idx"]] = {"success": False, "data": updates[row["idx"]][1], "message": "update entity error"}
+        return results
+
     def batch_update_node_properties(self, label: str, node_ids: Union[int, List[int]], properties: dict):
         """批量更新节点属性"""
         label_str = f":{label}" if label else ""
@@ -651,6 +812,33 @@ class Neo4jClient:
                 "peer_id", "peer_name", "peer_model", "rel_id"]
         return [{k: record[k] for k in keys} for record in objs]
 
+    @staticmethod
+    def _collect_topo_elements(objs):
+        """从路径查询结果中分离出点（按 ID 去重）与线（去除自己指向自己的边）"""
+        edge_map = {}
+        entity_map = {}
+        for obj in objs:
+            for element in obj:
+                if not isinstance(element, Path):
+                    continue
+                # 分离出路径中的点和线
+                for node in element.nodes:
+                    entity_map[node.id] = dict(_id=node.id, _label=list(node.labels)[0], **node._properties)
+                for relationship in element.relationships:
+                    edge_map[relationship.id] = dict(_id=relationship.id, _label=relationship.type, **relationship._properties)
+
+        edges = [edge for edge in edge_map.values() if edge["src_inst_id"] != edge["dst_inst_id"]]
+        return entity_map, edges
+
+    @staticmethod
+    def _topo_node(entity):
+        return {
+            "_id": entity["_id"],
+            "model_id": entity["model_id"],
+            "inst_name": entity["inst_name"],
+            "children": [],
+        }
+
     def format_topo_lite(self, start_id, objs, entity_is_src=True, depth: int = 3, exclude_ids=None):
         if objs.peek() is None:
             return {}
@@ -663,65 +851,23 @@ class Neo4jClient:
                 continue
         exclude_id_set.discard(start_id)
 
-        edge_map = {}
-        entity_map = {}
-        for obj in objs:
-            for element in obj:
-                if not isinstance(element, Path):
-                    continue
-                nodes = element.nodes
-                relationships = element.relationships
-                for node in nodes:
-                    entity_map[node.id] = dict(_id=node.id, _label=list(node.labels)[0], **node._properties)
-                for relationship in relationships:
-                    edge_map[relationship.id] = dict(_id=relationship.id, _label=relationship.type, **relationship._properties)
-
-        edges = list(edge_map.values())
-        edges = [edge for edge in edges if edge["src_inst_id"] != edge["dst_inst_id"]]
+        entity_map, edges = self._collect_topo_elements(objs)
         if exclude_id_set:
             for node_id in exclude_id_set:
                 entity_map.pop(node_id, None)
             edges = [edge for edge in edges if edge["src_inst_id"] not in exclude_id_set and edge["dst_inst_id"] not in exclude_id_set]
-        entities = list(entity_map.values())
         if start_id not in entity_map:
             return {}
 
-        return self.create_node_lite(entity_map[start_id], edges, entities, entity_is_src, level=1, max_depth=depth)
+        return TopoTree(entity_map.values(), edges, entity_is_src).build(
+            start_id, self._topo_node, max_depth=depth, mark_has_more=True
+        )
 
     def create_node_lite(self, entity, edges, entities, entity_is_src=True, level: int = 1, max_depth: int = 3):
-        node = {
-            "_id": entity["_id"],
-            "model_id": entity["model_id"],
-            "inst_name": entity["inst_name"],
-            "children": [],
-        }
-
-        if entity_is_src:
-            entity_key, child_entity_key = "src", "dst"
-        else:
-            entity_key, child_entity_key = "dst", "src"
-
-        if level >= max_depth:
-            # 只在达到最大层级时返回 has_more，用于前端展示“+”
-            node["has_more"] = any(edge.get(f"{entity_key}_inst_id") == entity["_id"] for edge in edges)
-            return node
-
-        for edge in edges:
-            if edge.get(f"{entity_key}_inst_id") == entity["_id"]:
-                child_entity = self.find_entity_by_id(edge.get(f"{child_entity_key}_inst_id"), entities)
-                if child_entity:
-                    child_node = self.create_node_lite(
-                        child_entity,
-                        edges,
-                        entities,
-                        entity_is_src,
-                        level=level + 1,
-                        max_depth=max_depth,
-                    )
-                    child_node["model_asst_id"] = edge.get("model_asst_id")
-                    child_node["asst_id"] = edge.get("asst_id")
-                    node["children"].append(child_node)
-        return node
+        # 只在达到最大层级时返回 has_more，用于前端展示“+”
+        return TopoTree(entities, edges, entity_is_src).build(
+            entity["_id"], self._topo_node, max_depth=max(1, max_depth - level + 1), mark_has_more=True
+        )
 
     @staticmethod
     def get_topo_config() -> dict:
@@ -826,27 +972,8 @@ class Neo4jClient:
         if objs.peek() is None:
             return {}
 
-        edge_map = {}
-        entity_map = {}
-        for obj in objs:
-            for element in obj:
-                if not isinstance(element, Path):
-                    continue
-                # 分离出路径中的点和线
-                nodes = element.nodes  # 获取所有节点
-                relationships = element.relationships  # 获取所有关系
-                for node in nodes:
-                    entity_map[node.id] = dict(_id=node.id, _label=list(node.labels)[0], **node._properties)
-                for relationship in relationships:
-                    edge_map[relationship.id] = dict(_id=relationship.id, _label=relationship.type, **relationship._properties)
-
-        edges = list(edge_map.values())
-        # 去除自己指向自己的边
-        edges = [edge for edge in edges if edge["src_inst_id"] != edge["dst_inst_id"]]
-        entities = list(entity_map.values())
-
-        result = self.create_node(entity_map[start_id], edges, entities, entity_is_src, level=1)
-        return result
+        entity_map, edges = self._collect_topo_elements(objs)
+        return TopoTree(entity_map.values(), edges, entity_is_src).build(start_id, self._topo_node)
 
     def create_node(
         self,
@@ -857,36 +984,7 @@ class Neo4jClient:
         level: int = 1,
     ):
         """entity作为目标"""
-        node = {
-            "_id": entity["_id"],
-            "model_id": entity["model_id"],
-            "inst_name": entity["inst_name"],
-            "children": [],
-        }
-
-        if entity_is_src:
-            entity_key, child_entity_key = "src", "dst"
-        else:
-            entity_key, child_entity_key = "dst", "src"
-
-        for edge in edges:
-            if edge[f"{entity_key}_inst_id"] == entity["_id"]:
-                child_id = edge[f"{child_entity_key}_inst_id"]
-                child_entity = self.find_entity_by_id(child_id, entities)
-                if child_entity:
-                    child_node = self.create_node(
-                        child_entity,
-                        edges,
-                        entities,
-                        entity_is_src,
-                        level=level + 1,
-                    )
-                    child_node["model_asst_id"] = edge["model_asst_id"]
-                    child_node["asst_id"] = edge["asst_id"]
-                    node["children"].append(child_node)
-        if level == 3:
-            node["has_more"] = len(node["children"]) > 0
-        return node
+        return TopoTree(entities, edges, entity_is_src).build(entity["_id"], self._topo_node)
 
     def find_entity_by_id(self, entity_id, entities):
         """根据ID找实体"""
@@ -1038,23 +1136,16 @@ class Neo4jClient:
             for item in exist_items:
                 item_key = tuple(item.get(k) for k in unique_key if k in item)
                 item_map[item_key] = item
+            updates = []
             for properties_key, properties in properties_map.items():
                 node = item_map.get(properties_key)
                 if node:
-                    # 节点更新
-                    try:
-                        results = self.batch_update_entity_properties(
-                            label=label, entity_ids=[node.get("_id")], properties=properties, check_attr_map=check_attr_map
-                        )
-                        results["data"] = results["data"][0]
-                        update_results.append(results)
-                    except Exception as e:
-                        logger.info(f"update entity error: {e}")
-                        update_results.append({"success": False, "data": properties, "message": "update entity error"})
-
+                    # 节点更新：统一按块批量写入
+                    updates.append((node.get("_id"), properties))
                 else:
                     # 暂存统一新增
                     add_nodes.append(properties)
+            update_results = self.batch_update_entities(label, updates, check_attr_map) if updates else []
         else:
             add_nodes = properties_list
         add_results = self.batch_create_entity(
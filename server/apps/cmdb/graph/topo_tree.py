@@ -0,0 +1,115 @@
+# -- coding: utf-8 --
+"""实例拓扑树组装与结果缓存。
+
+拓扑查询返回的是若干条路径，需要把其中的点、边组装为以起始实例为根的树。
+按 (父实例 → 边列表) 建立邻接索引、实体按 ID 建立字典后迭代 BFS 组装，整体 O(N + E)；
+每个实例只展开一次（环路回边与多父实例的重复出现只保留关联、不重复展开子树），
+不受递归深度限制。
+
+FalkorDB 客户端在每次写查询后递增全局图版本号，拓扑结果可按 (根实例, 查询参数, 图版本) 缓存，
+由 CMDB_TOPO_CACHE_TTL（秒，默认 0 即不缓存）开启。
+"""
+
+import os
+import re
+import uuid
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional
+
+from django.core.cache import cache
+
+TOPO_CACHE_TTL = int(os.getenv("CMDB_TOPO_CACHE_TTL", "0"))
+GRAPH_VERSION_KEY = "cmdb:graph:version"
+TOPO_CACHE_KEY_PREFIX = "cmdb:topo:"
+
+_WRITE_QUERY_RE = re.compile(r"\b(CREATE|MERGE|SET|DELETE|REMOVE)\b", re.IGNORECASE)
+
+
+def is_write_query(query: str) -> bool:
+    return bool(_WRITE_QUERY_RE.search(query or ""))
+
+
+def bump_graph_version() -> None:
+    """图数据变更后递增全局版本，使已缓存的拓扑结果失效"""
+    if TOPO_CACHE_TTL > 0:
+        cache.set(GRAPH_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def get_cached_topo(kind: str, params: tuple, loader: Callable[[], dict]) -> dict:
+    """按 (类型, 查询参数, 图版本) 读取拓扑缓存，未命中时调用 loader 并回填"""
+    if TOPO_CACHE_TTL <= 0:
+        return loader()
+    version = cache.get(GRAPH_VERSION_KEY) or "0"
+    key = f"{TOPO_CACHE_KEY_PREFIX}{kind}:{version}:" + ":".join(str(param) for param in params)
+    result = cache.get(key)
+    if result is None:
+        result = loader()
+        cache.set(key, result, TOPO_CACHE_TTL)
+    return result
+
+
+class TopoTree:
+    """
+    拓扑树组装器
+
+    Args:
+        entities: 拓扑中的实体（含 _id）
+        edges: 拓扑中的边（含 src_inst_id / dst_inst_id）
+        entity_is_src: True 表示沿 src → dst 方向展开，False 表示沿 dst → src 方向展开
+    """
+
+    def __init__(self, entities: Iterable[dict], edges: Iterable[dict], entity_is_src: bool = True):
+        self.entities: Dict = {entity["_id"]: entity for entity in entities}
+        entity_key, self.child_key = ("src_inst_id", "dst_inst_id") if entity_is_src else ("dst_inst_id", "src_inst_id")
+        self.adjacency: Dict[object, List[dict]] = {}
+        for edge in edges:
+            self.adjacency.setdefault(edge.get(entity_key), []).append(edge)
+
+    def has_children(self, entity_id) -> bool:
+        return bool(self.adjacency.get(entity_id))
+
+    def build(
+        self,
+        start_id,
+        node_factory: Callable[[dict], dict],
+        max_depth: Optional[int] = None,
+        mark_has_more: bool = False,
+    ) -> dict:
+        """
+        从 start_id 出发 BFS 组装拓扑树
+
+        Args:
+            node_factory: 实体 → 树节点（需包含 children 列表）
+            max_depth: 最大层级（根为第 1 层），None 表示不限
+            mark_has_more: 到达层级上限的节点是否标记 has_more；
+                已在别处展开的重复出现节点（环路回边、多父实例）两种模式下都会标记 has_more
+        """
+        root_entity = self.entities.get(start_id)
+        if root_entity is None:
+            return {}
+
+        root = node_factory(root_entity)
+        expanded = {start_id}
+        queue = deque([(root, start_id, 1)])
+        while queue:
+            node, entity_id, level = queue.popleft()
+            if max_depth is not None and level >= max_depth:
+                if mark_has_more:
+                    node["has_more"] = self.has_children(entity_id)
+                continue
+            for edge in self.adjacency.get(entity_id, []):
+                child_id = edge.get(self.child_key)
+                child_entity = self.entities.get(child_id)
+                if child_entity is None:
+                    continue
+                child = node_factory(child_entity)
+                child["model_asst_id"] = edge.get("model_asst_id")
+                child["asst_id"] = edge.get("asst_id")
+                node["children"].append(child)
+                if child_id in expanded:
+                    # 环路回边或多父实例：只保留关联并标记 has_more，子树已在首次出现处展开
+                    child["has_more"] = self.has_children(child_id)
+                    continue
+                expanded.add(child_id)
+                queue.append((child, child_id, level + 1))
+        return root
@@ -167,6 +167,137 @@ def _build_rule_signature(
     return tuple(_normalize_compare_value(item.get(field_id)) for field_id in field_ids)
 
 
+def _hashable_value(value: Any) -> Any:
+    """唯一属性索引键：可哈希值直接使用（与 == 比较语义一致），容器类型序列化为字符串。"""
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return ("__unhashable__", _normalize_compare_value(value))
+
+
+class UniqueIndex:
+    """
+    模型实例唯一性索引。
+
+    按需为单字段唯一属性（属性 → 值 → 实例）与唯一规则（字段组合签名 → 实例）建立哈希索引，
+    同一批次内只构建一次，之后随 append / discard 增量维护，替代逐行全量扫描 exist_items。
+    底层实例列表与调用方共享，append 后调用方持有的列表同步可见。
+    """
+
+    def __init__(self, exist_items: list[dict[str, Any]] | None = None):
+        self._items = exist_items if isinstance(exist_items, list) else list(exist_items or [])
+        self._discarded: set[int] = set()
+        self._attr_index: dict[str, dict[Any, list[dict[str, Any]]]] = {}
+        self._rule_index: dict[tuple[tuple[str, ...], bool], dict[tuple[str, ...], list[dict[str, Any]]]] = {}
+        self._by_id: dict[Any, list[dict[str, Any]]] | None = None
+
+    @classmethod
+    def wrap(cls, exist_items) -> "UniqueIndex":
+        return exist_items if isinstance(exist_items, cls) else cls(exist_items)
+
+    def __iter__(self):
+        return (item for item in self._items if id(item) not in self._discarded)
+
+    def __len__(self) -> int:
+        return len(self._items) - len(self._discarded)
+
+    def append(self, item: dict[str, Any]) -> None:
+        if id(item) in self._discarded:
+            self._discarded.discard(id(item))
+        else:
+            self._items.append(item)
+        if self._by_id is not None:
+            self._by_id.setdefault(item.get("_id"), []).append(item)
+        for attr, value_map in self._attr_index.items():
+            self._index_attr(value_map, attr, item)
+        for (field_ids, skip_falsy_values), signature_map in self._rule_index.items():
+            self._index_signature(signature_map, field_ids, skip_falsy_values, item)
+
+    def discard(self, instance_id) -> list[dict[str, Any]]:
+        """从索引中移除指定 _id 的实例，返回被移除的实例（可再次 append 恢复）。"""
+        if self._by_id is None:
+            self._by_id = {}
+            for item in self:
+                self._by_id.setdefault(item.get("_id"), []).append(item)
+        removed = self._by_id.pop(instance_id, [])
+        for item in removed:
+            self._discarded.add(id(item))
+            self._unindex(item)
+        return removed
+
+    def remove(self, item: dict[str, Any]) -> None:
+        """按对象移除单个实例并从底层列表删除（如批量写入失败、尚无 _id 的占位实例）。"""
+        for position in range(len(self._items) - 1, -1, -1):
+            if self._items[position] is item:
+                del self._items[position]
+                break
+        else:
+            return
+        if id(item) in self._discarded:
+            self._discarded.discard(id(item))
+            return
+        if self._by_id is not None:
+            self._remove_from_bucket(self._by_id, item.get("_id"), item)
+        self._unindex(item)
+
+    def _unindex(self, item: dict[str, Any]) -> None:
+        for attr, value_map in self._attr_index.items():
+            value = item.get(attr)
+            if value:
+                self._remove_from_bucket(value_map, _hashable_value(value), item)
+        for (field_ids, skip_falsy_values), signature_map in self._rule_index.items():
+            signature = _build_rule_signature(item, list(field_ids), skip_falsy_values=skip_falsy_values)
+            if signature is not None:
+                self._remove_from_bucket(signature_map, signature, item)
+
+    @staticmethod
+    def _remove_from_bucket(buckets, key, item) -> None:
+        bucket = buckets.get(key)
+        if not bucket:
+            return
+        bucket[:] = [exist_item for exist_item in bucket if exist_item is not item]
+        if not bucket:
+            del buckets[key]
+
+    @staticmethod
+    def _index_attr(value_map, attr, item) -> None:
+        value = item.get(attr)
+        if value:
+            value_map.setdefault(_hashable_value(value), []).append(item)
+
+    @staticmethod
+    def _index_signature(signature_map, field_ids, skip_falsy_values, item) -> None:
+        signature = _build_rule_signature(item, list(field_ids), skip_falsy_values=skip_falsy_values)
+        if signature is not None:
+            signature_map.setdefault(signature, []).append(item)
+
+    def find_attr(self, attr: str, value: Any) -> list[dict[str, Any]]:
+        """返回该属性值（非空）相同的已有实例"""
+        if not value:
+            return []
+        value_map = self._attr_index.get(attr)
+        if value_map is None:
+            value_map = {}
+            for item in self:
+                self._index_attr(value_map, attr, item)
+            self._attr_index[attr] = value_map
+        return value_map.get(_hashable_value(value), [])
+
+    def signature_map(
+        self, field_ids: list[str], *, skip_falsy_values: bool = False
+    ) -> dict[tuple[str, ...], list[dict[str, Any]]]:
+        """返回唯一规则字段组合签名 → 已有实例 的索引"""
+        key = (tuple(field_ids), skip_falsy_values)
+        signature_map = self._rule_index.get(key)
+        if signature_map is None:
+            signature_map = {}
+            for item in self:
+                self._index_signature(signature_map, key[0], skip_falsy_values, item)
+            self._rule_index[key] = signature_map
+        return signature_map
+
+
 def _get_attr_name(attrs_by_id: dict[str, dict[str, Any]], field_id: str) -> str:
     return str(attrs_by_id.get(field_id, {}).get("attr_name") or field_id)
 
@@ -222,19 +353,10 @@ def collect_unique_rule_conflicts(
 ) -> list[UniqueRuleConflict]:
     conflicts: list[UniqueRuleConflict] = []
     excluded_ids = exclude_instance_ids or set()
-    filtered_exist_items = [item for item in exist_items if int(item.get("_id", -1)) not in excluded_ids]
+    unique_index = UniqueIndex.wrap(exist_items)
 
     for rule in rules:
-        exist_map: dict[tuple[str, ...], list[dict[str, Any]]] = {}
-        for exist_item in filtered_exist_items:
-            signature = _build_rule_signature(
-                exist_item,
-                rule.field_ids,
-                skip_falsy_values=skip_falsy_values,
-            )
-            if signature is None:
-                continue
-            exist_map.setdefault(signature, []).append(exist_item)
+        exist_map = unique_index.signature_map(rule.field_ids, skip_falsy_values=skip_falsy_values)
 
         batch_map: dict[tuple[str, ...], list[dict[str, Any]]] = {}
         for item_index, item in enumerate(items):
@@ -246,6 +368,10 @@ def collect_unique_rule_conflicts(
             if signature is None:
                 continue
             matched_exist_items = exist_map.get(signature, [])
+            if excluded_ids and matched_exist_items:
+                matched_exist_items = [
+                    exist_item for exist_item in matched_exist_items if int(exist_item.get("_id", -1)) not in excluded_ids
+                ]
             if matched_exist_items:
                 conflicts.append(
                     _build_conflict(
@@ -288,6 +414,7 @@ def collect_instance_unique_conflicts(
     exclude_instance_ids: set[int] | None = None,
 ) -> list[UniqueRuleConflict]:
     """复用统一比较器检查实例单字段唯一约束及模型组合唯一规则。"""
+    exist_items = UniqueIndex.wrap(exist_items)
     attrs_by_id = dict(check_attr_map.get("attrs_by_id") or {})
     single_field_rules = []
     for order, (field_id, field_name) in enumerate(
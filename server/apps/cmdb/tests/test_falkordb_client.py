@@ -9,6 +9,7 @@ import threading
 import pytest
 
 from apps.cmdb.graph.falkordb import FalkorDBClient, FalkorDBConnectionPool
+from apps.cmdb.graph.falkordb_format import FormatDBResult
 from apps.core.exceptions.base_app_exception import BaseAppException
 
 
@@ -374,8 +375,7 @@ def test_batch_update_node_properties_empty_props_raises():
 
 
 def test_batch_create_entity_mixed_results():
-    created = FakeNode(1, ["instance"], {"inst_name": "ok"})
-    c = _client(_entity_result([created]))
+    c = _client(_bulk_entity_graph(start_id=1))
     results = c.batch_create_entity(
         label="instance",
         properties_list=[{"inst_name": "ok"}, {"inst_name": ""}],
@@ -571,10 +571,10 @@ def test_batch_create_edge_mixed():
     created_edge = FakeNode(1, ["connects"], {})  # edge_to_dict reads .properties via FormatDBResult
 
     def result(cql, params):
-        if "COUNT(e)" in cql:
-            return FakeResultSet([("count", "count")], [[0]])
-        # create edge returns edge node
-        return FakeResultSet([("edge", "e")], [[FakeRelEdge(1, "connects", {"model_asst_id": "c"})]])
+        if "RETURN DISTINCT row.idx" in cql:
+            return FakeResultSet([("idx", "idx")], [])
+        # create edge returns (row.idx, edge)
+        return FakeResultSet([("idx", "idx"), ("edge", "e")], [[0, FakeRelEdge(1, "connects", {"model_asst_id": "c"})]])
 
     # edge_to_dict uses entity_to_dict which reads .properties; FakeRelEdge has .properties
     c = _client(result)
@@ -593,6 +593,158 @@ def test_batch_update_entity_properties():
     assert out["data"][0]["_id"] == 1
 
 
+def _bulk_entity_graph(start_id=100):
+    """UNWIND 建点：按 rows 顺序返回 (row.idx, 新节点)"""
+    ids = iter(range(start_id, start_id + 10000))
+
+    def result(cql, params):
+        rows = params["rows"]
+        return FakeResultSet(
+            [("idx", "idx"), ("node", "n")], [[row["idx"], FakeNode(next(ids), ["instance"], dict(row["props"]))] for row in rows]
+        )
+
+    return result
+
+
+def test_batch_create_entity_writes_chunks_with_unwind(monkeypatch):
+    monkeypatch.setattr(FalkorDBClient, "BULK_WRITE_CHUNK_SIZE", 2)
+    c = _client(_bulk_entity_graph())
+    exist_items = [{"_id": 1, "sn": "A"}]
+    results = c.batch_create_entity(
+        label="instance",
+        properties_list=[{"sn": "B"}, {"sn": "A"}, {"sn": "C"}, {"sn": "B"}, {"sn": "D"}],
+        check_attr_map={"is_only": {"sn": "序列号"}, "is_required": {}},
+        exist_items=exist_items,
+        operator="admin",
+    )
+
+    assert [r["success"] for r in results] == [True, False, True, False, True]
+    assert [r["data"]["_id"] for r in results if r["success"]] == [100, 101, 102]
+    assert results[0]["data"]["_creator"] == "admin"
+    assert "序列号" in results[3]["message"]
+    assert [len(params["rows"]) for cql, params in c._graph.calls] == [2, 1]
+    assert all(cql.startswith("UNWIND $rows") for cql, _ in c._graph.calls)
+    assert [item.get("_id") for item in exist_items] == [1, 100, 101, 102]
+
+
+def test_batch_create_entity_falls_back_per_row_when_chunk_fails(monkeypatch):
+    def result(cql, params):
+        if cql.startswith("UNWIND"):
+            raise RuntimeError("bulk rejected")
+        if params["props"]["sn"] == "bad":
+            raise RuntimeError("row rejected")
+        return _entity_result([FakeNode(7, ["instance"], dict(params["props"]))])
+
+    c = _client(result)
+    # 查询失败后客户端会丢弃连接并重连
+    monkeypatch.setattr(FalkorDBConnectionPool, "invalidate", lambda self: None)
+    monkeypatch.setattr(c, "connect", lambda: setattr(c, "_graph", FakeGraph(result)) or True)
+    exist_items = []
+    results = c.batch_create_entity(
+        label="instance",
+        properties_list=[{"sn": "ok"}, {"sn": "bad"}],
+        check_attr_map={"is_only": {"sn": "序列号"}, "is_required": {}},
+        exist_items=exist_items,
+    )
+
+    assert [r["success"] for r in results] == [True, False]
+    assert "row rejected" in results[1]["message"]
+    assert exist_items == [{"sn": "ok", "_id": 7, "_labels": "instance"}]
+
+
+def test_batch_create_entity_reports_missing_rows_without_reinserting():
+    def result(cql, params):
+        # 写入已提交，但只返回了第 1 条
+        return FakeResultSet([("idx", "idx"), ("node", "n")], [[0, FakeNode(100, ["instance"], dict(params["rows"][0]["props"]))]])
+
+    c = _client(result)
+    exist_items = []
+    results = c.batch_create_entity(
+        label="instance",
+        properties_list=[{"sn": "A"}, {"sn": "B"}, {"sn": "B"}],
+        check_attr_map={"is_only": {"sn": "序列号"}, "is_required": {}},
+        exist_items=exist_items,
+    )
+
+    assert [r["success"] for r in results] == [True, False, False]
+    assert "bulk create returned 1 of 2 entities" in results[1]["message"]
+    assert "序列号" in results[2]["message"]
+    # 不退回逐条写入；未返回的行可能已落库，占位保留在唯一性索引中
+    assert len(c._graph.calls) == 1
+    assert [item.get("_id") for item in exist_items] == [100, None]
+
+
+def test_batch_create_edge_does_not_recreate_after_committed_write(monkeypatch):
+    def result(cql, params):
+        if "RETURN DISTINCT row.idx" in cql:
+            return FakeResultSet([("idx", "idx")], [])
+        return FakeResultSet([("idx", "idx"), ("edge", "e")], [[row["idx"], object()] for row in params["rows"]])
+
+    c = _client(result)
+    monkeypatch.setattr(FormatDBResult, "_format_value", lambda self, value: 1 / 0)
+    edges = [{"src_id": 1, "dst_id": 2, "model_asst_id": "c"}]
+    results = c.batch_create_edge("connects", "instance", "instance", edges, "model_asst_id")
+
+    assert results[0]["success"] is False
+    assert "edge already exists" not in results[0]["message"]
+    assert len(c._graph.calls) == 2
+
+
+def test_batch_create_edge_checks_and_creates_in_bulk():
+    def result(cql, params):
+        if "RETURN DISTINCT row.idx" in cql:
+            return FakeResultSet([("idx", "idx")], [[row["idx"]] for row in params["rows"] if row["dst"] == 3])
+        # 第 3 条的端点不存在，不返回
+        return FakeResultSet(
+            [("idx", "idx"), ("edge", "e")],
+            [[row["idx"], FakeRelEdge(50 + row["idx"], "connects", dict(row["props"]))] for row in params["rows"] if row["dst"] != 4],
+        )
+
+    c = _client(result)
+    edges = [
+        {"src_id": 1, "dst_id": 2, "model_asst_id": "c"},
+        {"src_id": 1, "dst_id": 3, "model_asst_id": "c"},
+        {"src_id": 2, "dst_id": 1, "model_asst_id": "c"},
+        {"src_id": 1, "dst_id": 4, "model_asst_id": "c"},
+        {"dst_id": 5},
+    ]
+    results = c.batch_create_edge("connects", "instance", "instance", edges, "model_asst_id")
+
+    assert [r["success"] for r in results] == [True, False, False, True, False]
+    assert results[0]["data"]["_id"] == 50
+    assert "edge already exists" in results[1]["message"]
+    assert "edge already exists" in results[2]["message"]
+    assert results[3]["data"] == {}
+    assert "src_id" in results[4]["message"]
+    assert len(c._graph.calls) == 2
+    assert "WHERE ID(a) = row.src" in c._graph.calls[1][0]
+
+
+def test_batch_save_entity_updates_in_one_query():
+    def result(cql, params):
+        if "MATCH (n" in cql:
+            return FakeResultSet(
+                [("idx", "idx"), ("node", "n")],
+                [[row["idx"], FakeNode(row["id"], ["instance"], dict(row["props"]))] for row in params["rows"] if row["id"] != 2],
+            )
+        return _bulk_entity_graph()(cql, params)
+
+    c = _client(result)
+    exist_items = [{"_id": 1, "inst_name": "h1"}, {"_id": 2, "inst_name": "h2"}]
+    add_results, update_results = c.batch_save_entity(
+        label="instance",
+        properties_list=[{"inst_name": "h1", "desc": "x"}, {"inst_name": "h2", "desc": "y"}, {"inst_name": "h3"}],
+        check_attr_map={"is_only": {"inst_name": "名称"}, "is_required": {}, "editable": {"desc": "描述"}},
+        exist_items=exist_items,
+    )
+
+    assert update_results[0] == {"data": {"desc": "x", "_id": 1, "_labels": "instance"}, "success": True, "message": ""}
+    assert update_results[1]["success"] is False
+    assert add_results[0]["success"] is True
+    update_calls = [params for cql, params in c._graph.calls if "MATCH (n" in cql]
+    assert len(update_calls) == 1 and len(update_calls[0]["rows"]) == 2
+
+
 # --------------------------------------------------------------------------
 # set_edge_properties
 # --------------------------------------------------------------------------
@@ -701,8 +853,7 @@ def test_full_text_by_model_bad_page(patch_exclude):
 
 
 def test_batch_save_entity_create_only():
-    created = FakeNode(1, ["instance"], {"inst_name": "new"})
-    c = _client(_entity_result([created]))
+    c = _client(_bulk_entity_graph(start_id=1))
     result = c.batch_save_entity(
         label="instance",
         properties_list=[{"inst_name": "new"}],
@@ -293,6 +293,81 @@ def test_create_entity_required_missing():
         )
 
 
+class FakeRecord(tuple):
+    """neo4j Record：支持下标与按列名访问。"""
+
+    def __new__(cls, values, keys):
+        record = super().__new__(cls, values)
+        record._keys = keys
+        return record
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return tuple.__getitem__(self, self._keys.index(key))
+        return tuple.__getitem__(self, key)
+
+
+class BulkSession(FakeSession):
+    def run(self, query, *args, **kwargs):
+        self.calls.append((query, kwargs))
+        rows = kwargs.get("rows", [])
+        if "RETURN DISTINCT row.idx" in query:
+            return FakeRunResult([FakeRecord((row["idx"],), ["idx"]) for row in rows if row["dst"] == 3])
+        if "CREATE (a)-" in query:
+            return FakeRunResult([FakeRecord((FakeRel(60 + row["idx"], "connects", row["props"]), row["idx"]), ["e", "idx"]) for row in rows])
+        return FakeRunResult([FakeRecord((FakeNode(100 + i, ["instance"], dict(row["props"])), row["idx"]), ["n", "idx"]) for i, row in enumerate(rows)])
+
+
+def test_batch_create_entity_and_edge_use_unwind(monkeypatch):
+    monkeypatch.setattr(Neo4jClient, "BULK_WRITE_CHUNK_SIZE", 10)
+    c = _client()
+    c.session = BulkSession()
+    exist_items = [{"_id": 1, "sn": "A"}]
+    results = c.batch_create_entity(
+        label="instance",
+        properties_list=[{"sn": "B"}, {"sn": "A"}, {"sn": "B"}, {"sn": "C"}],
+        check_attr_map={"is_only": {"sn": "序列号"}, "is_required": {}},
+        exist_items=exist_items,
+    )
+
+    assert [r["success"] for r in results] == [True, False, False, True]
+    assert [r["data"]["_id"] for r in results if r["success"]] == [100, 101]
+    assert len(c.session.calls) == 1 and c.session.calls[0][0].startswith("UNWIND $rows")
+    assert len(exist_items) == 3
+
+    c.session.calls.clear()
+    edges = [{"src_id": 1, "dst_id": 2, "asst": "c"}, {"src_id": 1, "dst_id": 3, "asst": "c"}, {"src_id": 2, "dst_id": 1, "asst": "c"}]
+    results = c.batch_create_edge("connects", "instance", "instance", edges, "asst")
+
+    assert [r["success"] for r in results] == [True, False, False]
+    assert results[0]["data"]["_id"] == 60
+    assert len(c.session.calls) == 2
+
+
+def test_batch_create_entity_and_edge_do_not_rewrite_after_commit(monkeypatch):
+    c = _client()
+    c.session = BulkSession()
+    exist_items = []
+    monkeypatch.setattr(Neo4jClient, "entity_to_dict", lambda self, data: 1 / 0)
+    results = c.batch_create_entity(
+        label="instance",
+        properties_list=[{"sn": "A"}],
+        check_attr_map={"is_only": {"sn": "序列号"}, "is_required": {}},
+        exist_items=exist_items,
+    )
+
+    assert results[0]["success"] is False
+    assert len(c.session.calls) == 1
+
+    c.session.calls.clear()
+    monkeypatch.setattr(Neo4jClient, "edge_to_dict", lambda self, data: 1 / 0)
+    results = c.batch_create_edge("connects", "instance", "instance", [{"src_id": 1, "dst_id": 2, "asst": "c"}], "asst")
+
+    assert results[0]["success"] is False
+    assert "edge already exists" not in results[0]["message"]
+    assert len(c.session.calls) == 2
+
+
 def test_batch_delete_entity():
     c = _client()
     c.batch_delete_entity("instance", [1, 2])
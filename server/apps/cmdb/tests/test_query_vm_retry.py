@@ -35,7 +35,7 @@ def _no_sleep():
 
 def test_query_retries_on_connection_error_then_succeeds():
     with mock.patch(
-        f"{MODULE}.requests.post",
+        f"{MODULE}.VictoriaMetricsClient.request",
         side_effect=[requests.ConnectionError("reset"), _ok_response()],
     ) as post:
         data = Collection().query("up", retries=3)
@@ -45,7 +45,7 @@ def test_query_retries_on_connection_error_then_succeeds():
 
 
 def test_query_applies_time_range_to_entire_union_expression():
-    with mock.patch(f"{MODULE}.requests.post", return_value=_ok_response()) as post:
+    with mock.patch(f"{MODULE}.VictoriaMetricsClient.request", return_value=_ok_response()) as post:
         Collection().query("metric_a or metric_b", retries=1)
 
     assert post.call_args.kwargs["data"]["query"] == (
@@ -55,7 +55,7 @@ def test_query_applies_time_range_to_entire_union_expression():
 
 def test_query_retries_on_5xx_then_succeeds():
     with mock.patch(
-        f"{MODULE}.requests.post",
+        f"{MODULE}.VictoriaMetricsClient.request",
         side_effect=[_bad_response(503), _ok_response()],
     ) as post:
         data = Collection().query("up", retries=3)
@@ -66,7 +66,7 @@ def test_query_retries_on_5xx_then_succeeds():
 
 def test_query_raises_after_exhausting_retries():
     with mock.patch(
-        f"{MODULE}.requests.post",
+        f"{MODULE}.VictoriaMetricsClient.request",
         side_effect=requests.ConnectionError("reset"),
     ) as post:
         with pytest.raises(Exception):
@@ -77,7 +77,7 @@ def test_query_raises_after_exhausting_retries():
 
 def test_query_does_not_retry_on_4xx():
     with mock.patch(
-        f"{MODULE}.requests.post",
+        f"{MODULE}.VictoriaMetricsClient.request",
         side_effect=[_bad_response(400, "bad request")],
     ) as post:
         with pytest.raises(Exception):
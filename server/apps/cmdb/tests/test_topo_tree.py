@@ -0,0 +1,146 @@
+"""拓扑树组装与拓扑缓存测试。
+
+关键不变量：环路不再无限递归、每个实例只展开一次；深链不受递归深度限制；
+lite 模式层级上限与 has_more 语义不变；图写入后拓扑缓存按版本失效。
+"""
+
+import time
+
+import pytest
+
+from apps.cmdb.graph import topo_tree
+from apps.cmdb.graph.falkordb import FalkorDBClient
+from apps.cmdb.graph.topo_tree import TopoTree
+
+
+def _entity(i):
+    return {"_id": i, "model_id": "host", "inst_name": f"h{i}"}
+
+
+def _edge(src, dst, asst="conn"):
+    return {"src_inst_id": src, "dst_inst_id": dst, "model_asst_id": asst, "asst_id": "a"}
+
+
+def _ids(node):
+    return [child["_id"] for child in node["children"]]
+
+
+def test_cycle_is_expanded_once():
+    tree = TopoTree([_entity(1), _entity(2), _entity(3)], [_edge(1, 2), _edge(2, 3), _edge(3, 1)])
+
+    root = tree.build(1, FalkorDBClient._topo_node)
+
+    assert _ids(root) == [2]
+    assert _ids(root["children"][0]) == [3]
+    back = root["children"][0]["children"][0]["children"][0]
+    assert back["_id"] == 1 and back["children"] == []
+    assert back["has_more"] is True
+
+
+def test_shared_child_keeps_both_edges_but_expands_once():
+    tree = TopoTree(
+        [_entity(i) for i in range(1, 5)], [_edge(1, 2), _edge(1, 3), _edge(2, 4, "x"), _edge(3, 4, "y"), _edge(4, 9)]
+    )
+
+    root = tree.build(1, FalkorDBClient._topo_node_lite, max_depth=5, mark_has_more=True)
+
+    first, second = root["children"]
+    assert first["children"][0]["model_asst_id"] == "x"
+    assert second["children"][0]["model_asst_id"] == "y"
+    # 4 的出边指向不在结果中的实体，两处均不展开子节点
+    assert first["children"][0]["children"] == [] and second["children"][0]["children"] == []
+    assert second["children"][0]["has_more"] is True
+
+
+def test_full_mode_marks_repeated_multi_parent_node_like_lite_mode():
+    entities = [_entity(i) for i in range(1, 6)]
+    edges = [_edge(1, 2), _edge(1, 3), _edge(2, 4), _edge(3, 4), _edge(4, 5)]
+
+    full = TopoTree(entities, edges).build(1, FalkorDBClient._topo_node)
+    lite = TopoTree(entities, edges).build(1, FalkorDBClient._topo_node_lite, max_depth=10, mark_has_more=True)
+
+    for root in (full, lite):
+        first, second = root["children"]
+        assert _ids(first["children"][0]) == [5]
+        assert "has_more" not in first["children"][0]
+        assert second["children"][0]["children"] == []
+        assert second["children"][0]["has_more"] is True
+
+
+def test_depth_limit_marks_has_more():
+    tree = TopoTree([_entity(1), _entity(2), _entity(3)], [_edge(1, 2), _edge(2, 3)], entity_is_src=False)
+
+    assert tree.build(3, FalkorDBClient._topo_node_lite, max_depth=2, mark_has_more=True) == {
+        "_id": 3,
+        "model_id": "host",
+        "inst_name": "h3",
+        "children": [
+            {"_id": 2, "model_id": "host", "inst_name": "h2", "children": [], "has_more": True, "model_asst_id": "conn", "asst_id": "a"}
+        ],
+    }
+
+
+def test_deep_chain_does_not_hit_recursion_limit():
+    size = 5000
+    client = FalkorDBClient()
+    entities = [_entity(i) for i in range(size)]
+    edges = [_edge(i, i + 1) for i in range(size - 1)]
+
+    node = client.create_node(entities[0], edges, entities)
+
+    depth = 1
+    while node["children"]:
+        node = node["children"][0]
+        depth += 1
+    assert depth == size
+
+
+@pytest.mark.slow
+def test_large_topology_assembles_in_linear_time():
+    size = 20000
+    entities = [_entity(i) for i in range(size)]
+    edges = [_edge(i // 4, i) for i in range(1, size)]
+
+    started = time.perf_counter()
+    root = TopoTree(entities, edges).build(0, FalkorDBClient._topo_node)
+    elapsed = time.perf_counter() - started
+
+    assert len(root["children"]) == 3
+    assert elapsed < 2
+
+
+class _CountingGraph:
+    def __init__(self):
+        self.calls = []
+
+    def query(self, cql, params=None):
+        self.calls.append(cql)
+        return type("R", (), {"result_set": [], "header": []})()
+
+
+@pytest.fixture
+def topo_cache(settings, monkeypatch):
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "topo-tree-test"}}
+    monkeypatch.setattr(topo_tree, "TOPO_CACHE_TTL", 60)
+    from django.core.cache import cache
+
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def test_topo_cache_is_invalidated_by_graph_writes(topo_cache):
+    client = FalkorDBClient()
+    client._client = object()
+    client._graph = _CountingGraph()
+
+    client.query_topo_lite("instance", 1, depth=2)
+    client.query_topo_lite("instance", 1, depth=2)
+    assert len(client._graph.calls) == 2
+
+    client.query_topo_lite("instance", 1, depth=3)
+    assert len(client._graph.calls) == 4
+
+    client._execute_query("MATCH (n) WHERE ID(n) = $id SET n.inst_name = $name RETURN n", {"id": 1, "name": "x"})
+    client.query_topo_lite("instance", 1, depth=2)
+    assert len(client._graph.calls) == 7
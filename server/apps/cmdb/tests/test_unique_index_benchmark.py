@@ -0,0 +1,72 @@
+"""CMDB 批量导入唯一性校验基准：逐行全量扫描 exist_items vs 整批共享 UniqueIndex。
+
+旧路径：每行创建都对全部已有实例逐个比较唯一属性、并为每条唯一规则重建签名映射；
+新路径：batch_create_entity 整批只构建一次哈希索引，新建实例增量加入。
+旧路径按样本行数计时后按行数线性外推。默认规模较小以便 CI 运行，完整规模：
+CMDB_BENCH_ROWS=100000 CMDB_BENCH_EXISTING=200000 uv run pytest apps/cmdb/tests/test_unique_index_benchmark.py -m slow -s
+"""
+
+import itertools
+import os
+import time
+
+import pytest
+
+from apps.cmdb.graph.falkordb import FalkorDBClient
+
+pytestmark = pytest.mark.slow
+
+ROWS = int(os.getenv("CMDB_BENCH_ROWS", "20000"))
+EXISTING = int(os.getenv("CMDB_BENCH_EXISTING", "50000"))
+LEGACY_SAMPLE_ROWS = int(os.getenv("CMDB_BENCH_LEGACY_SAMPLE", "10"))
+
+CHECK_ATTR_MAP = {
+    "is_only": {"inst_name": "名称", "sn": "序列号"},
+    "is_required": {"inst_name": "名称"},
+    "unique_rules": [{"rule_id": "r1", "order": 1, "field_ids": ["ip_addr", "cloud"]}],
+    "attrs_by_id": {"ip_addr": {"attr_name": "IP"}, "cloud": {"attr_name": "云区域"}},
+}
+
+
+def _host(i):
+    return {"inst_name": f"host-{i}", "sn": f"SN{i:08d}", "ip_addr": f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}", "cloud": "0"}
+
+
+def _client():
+    client = FalkorDBClient()
+    ids = itertools.count(10_000_000)
+    client._execute_query = lambda *args, **kwargs: None
+    client.entity_to_dict = lambda entity: {"_id": next(ids)}
+    client._bulk_insert_entities = lambda label, rows: rows
+    client._bulk_written_rows = lambda rows: {i: {**row, "_id": next(ids)} for i, row in enumerate(rows)}
+    return client
+
+
+def test_batch_import_uniqueness_benchmark():
+    existing = [dict(_host(i), _id=i) for i in range(EXISTING)]
+    # 新行与已有实例互不冲突，另插入 1% 与已有实例冲突的行
+    rows = [_host(EXISTING + i) if i % 100 else _host(i) for i in range(ROWS)]
+
+    client = _client()
+    started = time.perf_counter()
+    legacy_sample = rows[:LEGACY_SAMPLE_ROWS]
+    legacy_items = list(existing)
+    for properties in legacy_sample:
+        try:
+            # 直接传入 list：每行都重新全量扫描已有实例
+            legacy_items.append(client._create_entity("instance", properties, CHECK_ATTR_MAP, legacy_items))
+        except Exception:  # noqa
+            pass
+    legacy_elapsed = (time.perf_counter() - started) / len(legacy_sample) * ROWS
+
+    started = time.perf_counter()
+    results = client.batch_create_entity("instance", rows, CHECK_ATTR_MAP, list(existing))
+    indexed_elapsed = time.perf_counter() - started
+
+    failed = sum(1 for result in results if not result["success"])
+    print(
+        f"\n[unique index] rows={ROWS} existing={EXISTING} "
+        f"legacy(extrapolated)={legacy_elapsed:.1f}s indexed={indexed_elapsed:.2f}s failed={failed}"
+    )
+    assert failed == (ROWS + 99) // 100
+    assert indexed_elapsed < legacy_elapsed
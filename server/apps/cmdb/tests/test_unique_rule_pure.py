@@ -196,6 +196,72 @@ def test_raise_unique_rule_conflict_noop():
     ur.raise_unique_rule_conflict_if_needed([], [{"name": "a"}], [], {})
 
 
+# --------------------------------------------------------------------------
+# UniqueIndex
+# --------------------------------------------------------------------------
+
+
+def test_unique_index_attr_lookup_skips_falsy_and_tracks_appends():
+    exist_items = [{"_id": 1, "sn": "A"}, {"_id": 2, "sn": ""}, {"_id": 3, "tags": ["x", "y"]}]
+    index = ur.UniqueIndex(exist_items)
+
+    assert [i["_id"] for i in index.find_attr("sn", "A")] == [1]
+    assert index.find_attr("sn", "") == []
+    assert [i["_id"] for i in index.find_attr("tags", ["x", "y"])] == [3]
+
+    index.append({"_id": 4, "sn": "B"})
+    assert [i["_id"] for i in index.find_attr("sn", "B")] == [4]
+    # 与调用方共享底层列表
+    assert exist_items[-1]["_id"] == 4
+
+
+def test_unique_index_discard_and_restore():
+    index = ur.UniqueIndex([{"_id": 1, "sn": "A", "ip": "1.1.1.1"}, {"_id": 2, "sn": "B", "ip": "1.1.1.1"}])
+    rules = [ModelUniqueRule(rule_id="r1", order=1, field_ids=["ip"])]
+    index.find_attr("sn", "A")
+
+    removed = index.discard(1)
+    assert index.find_attr("sn", "A") == []
+    assert [i["_id"] for i in index.signature_map(["ip"])[ur._build_rule_signature({"ip": "1.1.1.1"}, ["ip"])]] == [2]
+    assert len(index) == 1
+
+    for item in removed:
+        index.append(item)
+    assert [i["_id"] for i in index.find_attr("sn", "A")] == [1]
+    assert len(ur.collect_unique_rule_conflicts(rules, [{"ip": "1.1.1.1"}], index, {})[0].exist_instance_ids) == 2
+
+
+def test_check_unique_attr_with_index_matches_list():
+    existing = [{"_id": 1, "sn": "A", "mac": "m1"}, {"_id": 2, "sn": "B", "mac": None}]
+    attrs = {"sn": "序列号", "mac": "MAC"}
+    for exist_items in (existing, ur.UniqueIndex(existing)):
+        FalkorDBClient.check_unique_attr({"sn": "C", "mac": None}, attrs, exist_items)
+        with pytest.raises(BaseAppException, match="序列号"):
+            FalkorDBClient.check_unique_attr({"sn": "B", "mac": "m2"}, attrs, exist_items)
+
+
+def test_batch_create_entity_builds_index_once(monkeypatch):
+    client = FalkorDBClient()
+    created = iter(range(100, 200))
+    monkeypatch.setattr(client, "_bulk_insert_entities", lambda label, rows: rows)
+    monkeypatch.setattr(client, "_bulk_written_rows", lambda rows: {i: {**row, "_id": next(created)} for i, row in enumerate(rows)})
+    exist_items = [{"_id": 1, "sn": "A"}]
+    built = []
+    original = ur.UniqueIndex.__init__
+
+    def _init(self, *args, **kwargs):
+        built.append(1)
+        original(self, *args, **kwargs)
+
+    monkeypatch.setattr(ur.UniqueIndex, "__init__", _init)
+    check_attr_map = {"is_only": {"sn": "序列号"}, "is_required": {}, "unique_rules": [], "attrs_by_id": {}}
+    results = client.batch_create_entity("instance", [{"sn": "B"}, {"sn": "A"}, {"sn": "C"}], check_attr_map, exist_items)
+
+    assert [r["success"] for r in results] == [True, False, True]
+    assert len(built) == 1
+    assert len(exist_items) == 3
+
+
 # --------------------------------------------------------------------------
 # _evaluate_field_selectability
 # --------------------------------------------------------------------------
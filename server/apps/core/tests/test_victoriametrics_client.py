@@ -0,0 +1,81 @@
+"""VictoriaMetrics 共享客户端测试 — 区间切分对齐、分段结果合并、同步/异步并发查询。"""
+
+import asyncio
+from unittest.mock import MagicMock
+
+import httpx
+
+from apps.core.utils.victoriametrics_client import (
+    AsyncVictoriaMetricsClient,
+    VictoriaMetricsClient,
+    get_session,
+    merge_range_results,
+    split_range,
+)
+
+
+def _matrix(*series):
+    return {"status": "success", "data": {"resultType": "matrix", "result": list(series)}}
+
+
+def test_split_range_is_step_aligned_without_gaps_or_overlap():
+    chunks = split_range(0, 3000, "10s", chunk_points=100)
+
+    assert chunks[0] == (0, 990)
+    assert all(nxt[0] - prev[1] == 10 for prev, nxt in zip(chunks, chunks[1:]))
+    assert chunks[-1][1] == 3000
+
+
+def test_split_range_keeps_short_or_unparseable_ranges():
+    assert split_range(0, 600, "1m", chunk_points=100) == [(0, 600)]
+    assert split_range("now-1h", "now", "1m", chunk_points=1) == [("now-1h", "now")]
+    assert split_range(0, 600, "abc", chunk_points=1) == [(0, 600)]
+
+
+def test_merge_range_results_joins_series_and_dedupes_timestamps():
+    merged = merge_range_results([
+        _matrix({"metric": {"a": "1"}, "values": [[1, "1"], [2, "2"]]}),
+        _matrix({"metric": {"a": "1"}, "values": [[2, "2"], [3, "3"]]}, {"metric": {"a": "2"}, "values": [[3, "9"]]}),
+    ])
+
+    assert merged["data"]["result"] == [
+        {"metric": {"a": "1"}, "values": [[1, "1"], [2, "2"], [3, "3"]]},
+        {"metric": {"a": "2"}, "values": [[3, "9"]]},
+    ]
+
+
+def test_merge_range_results_returns_failed_chunk():
+    error = {"status": "error", "error": "too many points"}
+    assert merge_range_results([_matrix(), error]) is error
+
+
+def test_sync_client_reuses_pooled_session():
+    assert VictoriaMetricsClient("http://vm").session is VictoriaMetricsClient("http://vm2").session is get_session()
+
+    session = MagicMock()
+    session.request.return_value.json.return_value = _matrix()
+    client = VictoriaMetricsClient("http://vm/", auth=("u", "p"), session=session)
+    client.query_range("/api/v1/query_range", "up", 0, 7140, "1m", chunk_points=60)
+
+    assert session.request.call_count == 2
+    assert session.request.call_args.args == ("GET", "http://vm/api/v1/query_range")
+    assert session.request.call_args.kwargs["auth"] == ("u", "p")
+
+
+def test_async_client_splits_and_merges_concurrently():
+    seen = []
+
+    def handler(request):
+        start, end = int(request.url.params["start"]), int(request.url.params["end"])
+        seen.append((start, end))
+        values = [[ts, "1"] for ts in range(start, end + 1, 60)]
+        return httpx.Response(200, json=_matrix({"metric": {"i": "a"}, "values": values}))
+
+    async def run():
+        async with AsyncVictoriaMetricsClient("http://vm", transport=httpx.MockTransport(handler)) as client:
+            return await client.query_range("/api/v1/query_range", "up", 0, 60 * 250, "1m", chunk_points=100)
+
+    result = asyncio.run(run())
+
+    assert len(seen) == 3
+    assert [v[0] for v in result["data"]["result"][0]["values"]] == list(range(0, 60 * 250 + 1, 60))
@@ -0,0 +1,253 @@
+"""
+VictoriaMetrics HTTP 客户端
+
+特性：
+1. 进程级共享连接池（keep-alive），避免每次查询新建 TCP/TLS 连接
+2. gzip 压缩响应
+3. 多查询并发扇出（结果顺序与请求一致）
+4. 长时间跨度的 query_range 按步长对齐切分为多段并发查询，再按序列合并
+5. 提供基于 httpx 的 asyncio 版本
+
+使用方式：
+    from apps.core.utils.victoriametrics_client import VictoriaMetricsClient
+
+    client = VictoriaMetricsClient("http://vm:8428", auth=("user", "pwd"))
+    data = client.query_range("/api/v1/query_range", "up", start, end, "5m")
+"""
+
+import asyncio
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+# 连接池大小需覆盖并发查询数，否则超出的连接用完即关，退化为短连接
+VM_POOL_SIZE = int(os.getenv("VICTORIAMETRICS_POOL_SIZE", "32"))
+VM_QUERY_CONCURRENCY = int(os.getenv("VICTORIAMETRICS_QUERY_CONCURRENCY", "8"))
+# query_range 单段最多的点数，超过后按步长对齐切分并发查询；<= 0 表示不切分
+VM_RANGE_CHUNK_POINTS = int(os.getenv("VICTORIAMETRICS_RANGE_CHUNK_POINTS", "1440"))
+
+DEFAULT_TIMEOUT = (3, 15)
+_STEP_PATTERN = re.compile(r"^(\d+)([smhdw]?)$")
+_STEP_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+_sessions: Dict[int, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(pool_size: Optional[int] = None) -> requests.Session:
+    """获取进程级共享的连接池会话（按连接池大小复用）"""
+    pool_size = pool_size or VM_POOL_SIZE
+    session = _sessions.get(pool_size)
+    if session is not None:
+        return session
+    with _sessions_lock:
+        session = _sessions.get(pool_size)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update({"Accept-Encoding": "gzip"})
+            _sessions[pool_size] = session
+        return session
+
+
+def parse_step_seconds(step) -> Optional[int]:
+    """把步长（整数秒或 5m/1h 等）解析为秒，无法解析时返回 None"""
+    if isinstance(step, (int, float)):
+        return int(step) if step > 0 else None
+    matched = _STEP_PATTERN.fullmatch(str(step or "").strip().lower())
+    if not matched:
+        return None
+    seconds = int(matched.group(1)) * _STEP_UNITS[matched.group(2)]
+    return seconds or None
+
+
+def split_range(start, end, step, chunk_points: Optional[int] = None) -> List[Tuple[Any, Any]]:
+    """
+    按步长对齐切分查询区间，相邻分段首尾相差一个步长，保证采样点不重不漏
+
+    起止时间或步长无法解析、或点数未超过单段上限时，原样返回 [(start, end)]。
+    """
+    chunk_points = VM_RANGE_CHUNK_POINTS if chunk_points is None else chunk_points
+    step_seconds = parse_step_seconds(step)
+    try:
+        start_value, end_value = float(start), float(end)
+    except (TypeError, ValueError):
+        return [(start, end)]
+    if chunk_points <= 0 or not step_seconds or end_value <= start_value:
+        return [(start, end)]
+    if (end_value - start_value) / step_seconds <= chunk_points:
+        return [(start, end)]
+
+    chunk_span = step_seconds * chunk_points
+    chunks = []
+    chunk_start = start_value
+    while chunk_start <= end_value:
+        chunk_end = min(chunk_start + chunk_span - step_seconds, end_value)
+        chunks.append((chunk_start, chunk_end))
+        chunk_start = chunk_end + step_seconds
+    if isinstance(start, int) and isinstance(end, int):
+        return [(int(begin), int(finish)) for begin, finish in chunks]
+    return chunks
+
+
+def merge_range_results(responses: Sequence[dict]) -> dict:
+    """按序列标签合并分段 query_range 结果，按时间戳去重排序；任一分段失败时返回该分段响应"""
+    if len(responses) == 1:
+        return responses[0]
+    for response in responses:
+        if response.get("status", "success") != "success":
+            return response
+
+    series: Dict[tuple, dict] = {}
+    points: Dict[tuple, Dict[Any, Any]] = {}
+    result_type = "matrix"
+    for response in responses:
+        data = response.get("data", {})
+        result_type = data.get("resultType", result_type)
+        for item in data.get("result", []):
+            key = tuple(sorted(item.get("metric", {}).items()))
+            if key not in series:
+                series[key] = {"metric": item.get("metric", {})}
+                points[key] = {}
+            for timestamp, value in item.get("values", []):
+                points[key][timestamp] = value
+
+    result = []
+    for key, item in series.items():
+        item["values"] = [[timestamp, value] for timestamp, value in sorted(points[key].items())]
+        result.append(item)
+    return {"status": "success", "data": {"resultType": result_type, "result": result}}
+
+
+class VictoriaMetricsClient:
+    """
+    VictoriaMetrics 同步客户端
+
+    Args:
+        host: 服务地址（不含 API 路径）
+        auth: Basic 认证 (用户名, 密码)，为空时不认证
+        verify: SSL 证书校验
+        timeout: 请求超时 (连接, 读取)
+        concurrency: 并发查询线程数
+    """
+
+    def __init__(
+        self,
+        host: str,
+        auth: Optional[Tuple[str, str]] = None,
+        verify: bool = True,
+        timeout=DEFAULT_TIMEOUT,
+        concurrency: Optional[int] = None,
+        session: Optional[requests.Session] = None,
+    ):
+        self.host = (host or "").rstrip("/")
+        self.auth = auth
+        self.verify = verify
+        self.timeout = timeout
+        self.concurrency = concurrency or VM_QUERY_CONCURRENCY
+        self.session = session or get_session()
+
+    def request(self, method: str, path: str, params=None, data=None, timeout=None) -> requests.Response:
+        return self.session.request(
+            method,
+            f"{self.host}{path}",
+            params=params,
+            data=data,
+            auth=self.auth,
+            verify=self.verify,
+            timeout=timeout or self.timeout,
+        )
+
+    def get_json(self, path: str, params: dict) -> dict:
+        response = self.request("GET", path, params=params)
+        response.raise_for_status()
+        return response.json()
+
+    def fan_out(self, calls: Sequence[Callable[[], Any]]) -> List[Any]:
+        """并发执行多个查询，结果顺序与 calls 一致；任一查询异常时抛出"""
+        if len(calls) <= 1 or self.concurrency <= 1:
+            return [call() for call in calls]
+        with ThreadPoolExecutor(max_workers=min(len(calls), self.concurrency)) as executor:
+            futures = [executor.submit(call) for call in calls]
+            return [future.result() for future in futures]
+
+    def query_many(self, path: str, params_list: Sequence[dict]) -> List[dict]:
+        """同一 API 的多组参数并发查询"""
+        return self.fan_out([lambda params=params: self.get_json(path, params) for params in params_list])
+
+    def query_range(self, path: str, query: str, start, end, step, chunk_points: Optional[int] = None) -> dict:
+        """范围查询，跨度过长时切分并发查询后合并"""
+        chunks = split_range(start, end, step, chunk_points)
+        responses = self.query_many(
+            path, [{"query": query, "start": chunk_start, "end": chunk_end, "step": step} for chunk_start, chunk_end in chunks]
+        )
+        return merge_range_results(responses)
+
+
+class AsyncVictoriaMetricsClient:
+    """
+    VictoriaMetrics asyncio 客户端（httpx 连接池）
+
+    需在同一事件循环内使用并在结束时 aclose()，或以 ``async with`` 方式使用。
+    """
+
+    def __init__(
+        self,
+        host: str,
+        auth: Optional[Tuple[str, str]] = None,
+        verify: bool = True,
+        timeout=DEFAULT_TIMEOUT,
+        concurrency: Optional[int] = None,
+        pool_size: Optional[int] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        connect_timeout, read_timeout = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+        pool_size = pool_size or VM_POOL_SIZE
+        self.concurrency = concurrency or VM_QUERY_CONCURRENCY
+        self.client = httpx.AsyncClient(
+            base_url=(host or "").rstrip("/"),
+            auth=auth,
+            verify=verify,
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            headers={"Accept-Encoding": "gzip"},
+            transport=transport,
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+    async def get_json(self, path: str, params: dict) -> dict:
+        response = await self.client.get(path, params=params)
+        response.raise_for_status()
+        return response.json()
+
+    async def query_many(self, path: str, params_list: Sequence[dict]) -> List[dict]:
+        semaphore = asyncio.Semaphore(max(1, self.concurrency))
+
+        async def _get(params):
+            async with semaphore:
+                return await self.get_json(path, params)
+
+        return list(await asyncio.gather(*[_get(params) for params in params_list]))
+
+    async def query_range(self, path: str, query: str, start, end, step, chunk_points: Optional[int] = None) -> dict:
+        chunks = split_range(start, end, step, chunk_points)
+        responses = await self.query_many(
+            path, [{"query": query, "start": chunk_start, "end": chunk_end, "step": step} for chunk_start, chunk_end in chunks]
+        )
+        return merge_range_results(responses)
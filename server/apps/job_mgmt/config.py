@@ -16,9 +16,15 @@ def _int_env(name: str, default: int) -> int:
         return default
 
 
-# 多目标执行时的并发上限（ExecutionTaskBaseService.MAX_WORKERS）
+# 多目标执行时的并发上限（ExecutionTaskBaseService.MAX_WORKERS），执行记录未指定 max_concurrency 时使用
 EXECUTION_MAX_WORKERS = _int_env("JOB_EXECUTION_MAX_WORKERS", 10)
 
+# 单次执行可指定的并发上限
+EXECUTION_MAX_CONCURRENCY_LIMIT = _int_env("JOB_EXECUTION_MAX_CONCURRENCY_LIMIT", 200)
+
+# 每秒最多启动的目标数（0 不限速），执行记录未指定 rate_limit 时使用
+EXECUTION_RATE_LIMIT = _int_env("JOB_EXECUTION_RATE_LIMIT", 0)
+
 # 并发策略 = queue 时，上次未完成的延迟重试间隔（秒）
 SCHEDULED_TASK_QUEUE_RETRY_COUNTDOWN = _int_env("JOB_SCHEDULED_TASK_QUEUE_RETRY_COUNTDOWN", 30)
 
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.27 on 2026-10-17 08:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_mgmt', '0012_jobexecution_callback_subject_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobexecution',
+            name='max_concurrency',
+            field=models.PositiveIntegerField(default=0, verbose_name='最大并发目标数'),
+        ),
+        migrations.AddField(
+            model_name='jobexecution',
+            name='rate_limit',
+            field=models.PositiveIntegerField(default=0, verbose_name='每秒最多启动目标数'),
+        ),
+    ]
@@ -57,6 +57,10 @@ class JobExecution(TimeInfo, MaintainerInfo):
     # 超时设置
     timeout = models.IntegerField(default=600, verbose_name="超时时间")
 
+    # 多目标调度（0 表示使用全局配置）
+    max_concurrency = models.PositiveIntegerField(default=0, verbose_name="最大并发目标数")
+    rate_limit = models.PositiveIntegerField(default=0, verbose_name="每秒最多启动目标数")
+
     # 执行时间
     started_at = models.DateTimeField(null=True, blank=True, verbose_name="开始时间")
     finished_at = models.DateTimeField(null=True, blank=True, verbose_name="结束时间")
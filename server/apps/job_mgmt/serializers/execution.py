@@ -2,6 +2,7 @@
 
 from rest_framework import serializers
 
+from apps.job_mgmt.config import EXECUTION_MAX_CONCURRENCY_LIMIT
 from apps.job_mgmt.models import JobExecution, Playbook, Script
 from apps.job_mgmt.services.script_normalize import normalize_script_line_endings
 from apps.job_mgmt.services.script_params_service import ScriptParamsService
@@ -75,6 +76,8 @@ class JobExecutionDetailSerializer(serializers.ModelSerializer):
             "files",
             "target_path",
             "timeout",
+            "max_concurrency",
+            "rate_limit",
             "started_at",
             "finished_at",
             "duration",
@@ -148,6 +151,12 @@ class QuickExecuteSerializer(serializers.Serializer):
     # 超时时间
     timeout = serializers.IntegerField(required=False, default=600, min_value=1, max_value=86400, help_text="超时时间（秒）")
 
+    # 多目标调度
+    max_concurrency = serializers.IntegerField(
+        required=False, default=0, min_value=0, max_value=EXECUTION_MAX_CONCURRENCY_LIMIT, help_text="最大并发目标数（0 使用全局配置）"
+    )
+    rate_limit = serializers.IntegerField(required=False, default=0, min_value=0, max_value=1000, help_text="每秒最多启动目标数（0 使用全局配置）")
+
     # 团队
     team = serializers.ListField(child=serializers.IntegerField(), required=False, default=list, help_text="团队ID列表")
 
@@ -210,6 +219,8 @@ class FileDistributionSerializer(serializers.Serializer):
         "target_path": "/etc/nginx/",
         "overwrite_strategy": "overwrite",
         "timeout": 600,
+        "max_concurrency": 0,
+        "rate_limit": 0,
         "team": [1]
     }
     """
@@ -225,4 +236,10 @@ class FileDistributionSerializer(serializers.Serializer):
     target_path = serializers.CharField(max_length=512, help_text="目标路径")
     overwrite_strategy = serializers.ChoiceField(choices=["overwrite", "skip"], default="overwrite", help_text="覆盖策略：overwrite=覆盖已存在文件, skip=跳过已存在文件")
     timeout = serializers.IntegerField(required=False, default=600, min_value=1, max_value=86400, help_text="超时时间（秒）")
+
+    # 多目标调度
+    max_concurrency = serializers.IntegerField(
+        required=False, default=0, min_value=0, max_value=EXECUTION_MAX_CONCURRENCY_LIMIT, help_text="最大并发目标数（0 使用全局配置）"
+    )
+    rate_limit = serializers.IntegerField(required=False, default=0, min_value=0, max_value=1000, help_text="每秒最多启动目标数（0 使用全局配置）")
     team = serializers.ListField(child=serializers.IntegerField(), required=False, default=list, help_text="团队ID列表")
@@ -2,13 +2,14 @@
 
 import os
 import re
-from typing import List
+from typing import Dict, List, Optional, Sequence, Tuple
 
 from django.core.cache import cache
 
 from apps.core.logger import job_logger as logger
 from apps.job_mgmt.constants import DangerousLevel, MatchType
 from apps.job_mgmt.models import DangerousPath, DangerousRule
+from apps.job_mgmt.utils.aho_corasick import AhoCorasick
 
 # 规则缓存 TTL（秒），进程启动时从环境变量读取，修改后需重启服务生效；默认 120s
 _RULES_CACHE_TTL = int(os.getenv("DANGEROUS_RULES_CACHE_TTL", "120"))
@@ -17,6 +18,13 @@ _RULES_CACHE_TTL = int(os.getenv("DANGEROUS_RULES_CACHE_TTL", "120"))
 _CMD_RULES_CACHE_KEY = "dangerous_checker:cmd_rules"
 _PATH_RULES_CACHE_KEY = "dangerous_checker:path_rules"
 
+_CMD_REGEX_FLAGS = re.MULTILINE | re.IGNORECASE
+
+# 带参数的转义（\x41、\u4e00、\N{...}、\0、反向引用），无法按单字符解析
+_ESCAPES_WITH_ARGS = frozenset("xuUN0123456789")
+# 合法的 {m,n} 量词；不满足该形式的 "{" 按 Python re 语义是普通字符
+_QUANTIFIER_RE = re.compile(r"\{(?!\})\d*(?:,\d*)?\}")
+
 
 def _get_cmd_rules() -> list:
     """获取启用的命令规则（带缓存）。
@@ -50,6 +58,181 @@ def _get_path_rules() -> list:
     return rules
 
 
+def _skip_bracketed(pattern: str, i: int) -> int:
+    """跳过从 pattern[i]（"(" 或 "["）开始的分组 / 字符集，返回其后位置；不闭合返回 -1。"""
+    depth = 0
+    n = len(pattern)
+    while i < n:
+        ch = pattern[i]
+        if ch == "\\":
+            i += 2
+            continue
+        if ch == "[":
+            i += 1
+            if i < n and pattern[i] == "^":
+                i += 1
+            if i < n and pattern[i] == "]":
+                i += 1
+            while i < n and pattern[i] != "]":
+                i += 2 if pattern[i] == "\\" else 1
+            i += 1
+            if depth == 0:
+                return i
+            continue
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return -1
+
+
+def required_literal(pattern: str) -> str:
+    """正则任意匹配都必须包含的最长字面量（小写 ASCII），无法确定时返回空串。
+
+    只分析顶层序列：分组 / 字符集 / 元字符 / 非 ASCII 字符打断字面量，
+    被 ``* ? {m,n}`` 修饰的字符不计入（不构成合法量词的 ``{`` 按普通字符处理）；
+    带参数的转义（``\\x41``、反向引用等）之后的字面量不计入，但仍扫描到末尾；
+    顶层存在 ``|`` 或 verbose 模式时返回空串。
+    """
+    try:
+        if re.compile(pattern).flags & re.VERBOSE:
+            return ""
+    except re.error:
+        return ""
+
+    runs: List[str] = []
+    current: List[str] = []
+    # 遇到带参数转义时已收集的字面量段数；其参数长度不定，之后的字面量不可信
+    sealed: Optional[int] = None
+
+    def flush():
+        if current:
+            runs.append("".join(current))
+            current.clear()
+
+    i, n = 0, len(pattern)
+    while i < n:
+        ch = pattern[i]
+        if ch == "\\":
+            nxt = pattern[i + 1] if i + 1 < n else ""
+            if nxt in _ESCAPES_WITH_ARGS:
+                flush()
+                if sealed is None:
+                    sealed = len(runs)
+            elif nxt.isascii() and not nxt.isalnum():
+                current.append(nxt.lower())
+            else:
+                flush()
+            i += 2
+        elif ch in "([":
+            flush()
+            i = _skip_bracketed(pattern, i)
+            if i < 0:
+                return ""
+        elif ch == "|":
+            return ""
+        elif ch == "{" and not _QUANTIFIER_RE.match(pattern, i):
+            current.append(ch)
+            i += 1
+        elif ch in "*?{":
+            if current:
+                current.pop()
+            flush()
+            i = _QUANTIFIER_RE.match(pattern, i).end() if ch == "{" else i + 1
+        elif ch == "+" or ch in ".^$)":
+            flush()
+            i += 1
+        elif ch.isascii():
+            current.append(ch.lower())
+            i += 1
+        else:
+            flush()
+            i += 1
+    flush()
+    return max(runs[:sealed], key=len, default="")
+
+
+class CompiledCommandRules:
+    """命令规则集的预编译结果，单次扫描脚本得到每条规则的命中内容。
+
+    匹配语义与 DangerousChecker._match_pattern 逐条调用一致：
+    1. 包含匹配（忽略大小写）：所有 pattern 小写后并入一个 Aho-Corasick 自动机，一次扫描得到全部命中规则
+    2. 未包含命中的规则走正则 findall，各 pattern 只编译一次。每条正则提取一个必含字面量，
+       并入第二个自动机；ASCII 脚本中必含字面量未出现的正则不可能匹配，直接跳过
+    非法正则在编译时告警一次并忽略。
+    """
+
+    def __init__(self, patterns: Sequence[str]):
+        self.patterns = list(patterns)
+        self.literals = AhoCorasick([p.lower() for p in self.patterns])
+        self.regexes: List[Optional[re.Pattern]] = []
+        required: Dict[int, str] = {}
+        for index, pattern in enumerate(self.patterns):
+            try:
+                self.regexes.append(re.compile(pattern, _CMD_REGEX_FLAGS))
+            except re.error as e:
+                logger.warning(f"Invalid regex pattern: {pattern}, error: {e}")
+                self.regexes.append(None)
+                continue
+            literal = required_literal(pattern)
+            if literal:
+                required[index] = literal
+        self.prefiltered = list(required)
+        self.required = AhoCorasick(list(required.values()))
+
+    def match(self, content: str, indices: Sequence[int]) -> Dict[int, List[str]]:
+        """返回 indices 中命中规则的 {下标: 命中内容列表}，顺序与 indices 一致。"""
+        lowered = content.lower()
+        literal_hits = self.literals.find_all(lowered)
+
+        # 非 ASCII 文本存在 Unicode 大小写折叠特例（如 ſ / K），不做必含字面量过滤
+        skipped = set()
+        if content.isascii():
+            present = self.required.find_all(lowered)
+            skipped = {index for k, index in enumerate(self.prefiltered) if k not in present}
+
+        matches = {}
+        for index in indices:
+            if index in literal_hits:
+                matches[index] = [self.patterns[index]]
+                continue
+            regex = self.regexes[index]
+            if regex is None or index in skipped:
+                continue
+            found = []
+            for match in regex.findall(content):
+                matched_content = match if isinstance(match, str) else match[0] if match else ""
+                if matched_content:
+                    found.append(matched_content)
+            if found:
+                matches[index] = found
+        return matches
+
+
+# 进程内缓存的预编译命令规则：(pattern 元组, 预编译结果)
+# 规则列表来自 Django cache（信号失效 / TTL 刷新），pattern 元组变化即重建
+_compiled_cmd_rules: Optional[Tuple[tuple, CompiledCommandRules]] = None
+
+
+def _get_compiled_cmd_rules(rules: list) -> CompiledCommandRules:
+    global _compiled_cmd_rules
+    key = tuple(r["pattern"] for r in rules)
+    cached = _compiled_cmd_rules
+    if cached is None or cached[0] != key:
+        cached = (key, CompiledCommandRules(key))
+        _compiled_cmd_rules = cached
+    return cached[1]
+
+
+def clear_compiled_cmd_rules() -> None:
+    """丢弃本进程的预编译命令规则（规则变更信号中调用）。"""
+    global _compiled_cmd_rules
+    _compiled_cmd_rules = None
+
+
 class DangerousCheckResult:
     """危险检查结果"""
 
@@ -183,6 +366,7 @@ class DangerousChecker:
 
         规则集从缓存读取（TTL 由 DANGEROUS_RULES_CACHE_TTL 环境变量控制，默认 120s），
         规则变更时通过 post_save/post_delete 信号主动失效，避免每次执行都打 DB。
+        规则集预编译后按进程缓存（见 CompiledCommandRules），脚本只扫描一次。
 
         Args:
             script_content: 脚本内容
@@ -194,15 +378,17 @@ class DangerousChecker:
         result = DangerousCheckResult()
 
         rules = _get_cmd_rules()
+        compiled = _get_compiled_cmd_rules(rules)
 
         # 按组织过滤（空列表表示全局规则）
+        indices = range(len(rules))
         if team:
-            rules = [r for r in rules if not r["team"] or bool(set(r["team"]) & set(team))]
+            team_set = set(team)
+            indices = [i for i in indices if not rules[i]["team"] or bool(set(rules[i]["team"]) & team_set)]
 
-        for rule in rules:
-            matches = DangerousChecker._match_pattern(rule["pattern"], script_content)
+        for index, matches in compiled.match(script_content, indices).items():
             for matched_content in matches:
-                result.add_match(rule, matched_content)
+                result.add_match(rules[index], matched_content)
 
         return result
 
@@ -6,13 +6,14 @@ from django.utils import timezone
 
 from apps.core.logger import job_logger as logger
 from apps.core.mixinx import EncryptMixin
-from apps.job_mgmt.config import EXECUTION_MAX_WORKERS
+from apps.job_mgmt.config import EXECUTION_MAX_WORKERS, EXECUTION_RATE_LIMIT
 from apps.job_mgmt.constants import CredentialSource, ExecutionStatus, ExecutorDriver, OSType, ScriptType, SSHCredentialType, TargetSource
 from apps.job_mgmt.models import JobExecution, Target
 from apps.job_mgmt.services.callback_service import send_callback
 from apps.job_mgmt.services.execution_stream_service import build_stream_topic
 from apps.job_mgmt.services.script_normalize import normalize_script_line_endings
 from apps.job_mgmt.services.shell_utils import ANSIBLE_SHELL_EXECUTABLES, build_heredoc_command, parse_shebang
+from apps.job_mgmt.services.target_scheduler import run_sliding_window
 from apps.rpc.ansible import AnsibleExecutor
 from apps.rpc.node_mgmt import NodeMgmt
 from apps.rpc.sensitive import sanitize_sensitive_data
@@ -21,6 +22,7 @@ from config.components.nats import NATS_NAMESPACE
 
 class ExecutionTaskBaseService(object):
     MAX_WORKERS = EXECUTION_MAX_WORKERS
+    RATE_LIMIT = EXECUTION_RATE_LIMIT
 
     def __init__(self, execution_id: int, task_name: str):
         self.execution_id = execution_id
@@ -101,6 +103,24 @@ class ExecutionTaskBaseService(object):
         except Exception:
             return False
 
+    def run_targets(self, execution: JobExecution, target_list: list, fn, on_done) -> bool:
+        """以滑动窗口并发执行各目标，返回是否因取消而停止提交剩余目标。
+
+        并发数与启动速率优先取执行记录的 max_concurrency / rate_limit，未指定（0）时使用全局配置；
+        每个目标完成后检查一次取消状态，取消后不再提交新目标（不依赖 future.cancel 竞速）。
+        """
+        max_concurrency = getattr(execution, "max_concurrency", 0)
+        rate_limit = getattr(execution, "rate_limit", 0)
+        return run_sliding_window(
+            target_list,
+            fn,
+            on_done,
+            max_workers=max_concurrency if isinstance(max_concurrency, int) and max_concurrency > 0 else self.MAX_WORKERS,
+            rate_limit=rate_limit if isinstance(rate_limit, int) and rate_limit > 0 else self.RATE_LIMIT,
+            should_stop=lambda: self.is_cancelled(execution.id),
+            thread_name_prefix=self.task_name,
+        )
+
     @staticmethod
     def update_execution_counts(execution: JobExecution):
         """重算 success_count / failed_count 并保存。
@@ -192,6 +192,8 @@ class ExecutionService:
                 playbook_version=playbook.version,
                 params=params,
                 timeout=timeout,
+                max_concurrency=data.get("max_concurrency", 0),
+                rate_limit=data.get("rate_limit", 0),
                 total_count=len(target_list),
                 target_source=target_source,
                 target_list=target_list,
@@ -214,6 +216,8 @@ class ExecutionService:
                 script_type=script_type,
                 script_content=script_content,
                 timeout=timeout,
+                max_concurrency=data.get("max_concurrency", 0),
+                rate_limit=data.get("rate_limit", 0),
                 total_count=len(target_list),
                 target_source=target_source,
                 target_list=target_list,
@@ -246,6 +250,8 @@ class ExecutionService:
             target_path=target_path,
             overwrite_strategy=data.get("overwrite_strategy", DEFAULT_OVERWRITE_STRATEGY),
             timeout=data.get("timeout", DEFAULT_TIMEOUT),
+            max_concurrency=data.get("max_concurrency", 0),
+            rate_limit=data.get("rate_limit", 0),
             total_count=len(target_list),
             target_source=target_source,
             target_list=target_list,
@@ -287,6 +293,8 @@ class ExecutionService:
                 target_path=original.target_path,
                 overwrite_strategy=original.overwrite_strategy,
                 timeout=original.timeout,
+                max_concurrency=original.max_concurrency,
+                rate_limit=original.rate_limit,
                 total_count=len(target_list),
                 target_source=original.target_source,
                 target_list=target_list,
@@ -307,6 +315,8 @@ class ExecutionService:
                 playbook_version=original.playbook.version,
                 params=original.params,
                 timeout=original.timeout,
+                max_concurrency=original.max_concurrency,
+                rate_limit=original.rate_limit,
                 total_count=len(target_list),
                 target_source=original.target_source,
                 target_list=target_list,
@@ -332,6 +342,8 @@ class ExecutionService:
                 script_type=original.script_type,
                 script_content=script_content,
                 timeout=original.timeout,
+                max_concurrency=original.max_concurrency,
+                rate_limit=original.rate_limit,
                 total_count=len(target_list),
                 target_source=original.target_source,
                 target_list=target_list,
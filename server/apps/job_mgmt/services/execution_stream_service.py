@@ -26,6 +26,24 @@ def format_sse_event(payload: dict) -> str:
     return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
 
 
+def expand_stream_frame(payload: dict) -> list:
+    """把 agent 的合帧事件展开为逐行事件；非合帧事件（旧版逐行 / done / error）原样返回。
+
+    ansible-executor 按条数 / 字节 / 时间间隔把多行合成一帧 `{"lines": [...], "dropped": n, ...}`，
+    过载丢弃的行数随下一帧带上，这里补一条提示行，SSE 消费端仍只看到逐行事件。
+    """
+    lines = payload.get("lines")
+    if not isinstance(lines, list):
+        return [payload]
+    base = {k: v for k, v in payload.items() if k not in ("lines", "dropped", "seq")}
+    events = []
+    dropped = payload.get("dropped") or 0
+    if dropped:
+        events.append({**base, "line": f"...（输出过多，已丢弃 {dropped} 行）...", "dropped": dropped})
+    events.extend({**base, "line": line} for line in lines)
+    return events
+
+
 def parse_target_key(subject: str, execution_id) -> str:
     """从主题 `job.stream.{id}.{target_key}` 中提取 target_key。"""
     prefix = f"job.stream.{execution_id}."
@@ -97,9 +115,10 @@ async def stream_execution_events(execution_id, target_keys, message_source=None
     count = 0
     completed = False
     try:
-        async for payload in message_source:
-            count += 1
-            yield aggregator.process(payload)
+        async for frame in message_source:
+            for payload in expand_stream_frame(frame):
+                count += 1
+                yield aggregator.process(payload)
             if aggregator.is_complete():
                 completed = True
                 break
@@ -1,6 +1,5 @@
 import os
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from django.utils import timezone
 
@@ -51,30 +50,22 @@ class FileDistributionRunner(ExecutionTaskBaseService):
         task_name: str,
     ):
         results = []
-        workers = min(self.MAX_WORKERS, len(target_list)) or 1
-        for batch_start in range(0, len(target_list), workers):
-            batch = target_list[batch_start : batch_start + workers]
-            with ThreadPoolExecutor(max_workers=len(batch)) as pool:
-                futures = {
-                    pool.submit(
-                        self.distribute_file_to_target, t, execution.target_source, files, target_path, execution.timeout, overwrite, execution.id
-                    ): t
-                    for t in batch
-                }
-                for future in as_completed(futures):
-                    target_info = futures[future]
-                    try:
-                        result = future.result()
-                        results.append(result)
-                        logger.info(f"[{task_name}] 目标 {target_info.get('name')} 分发完成: status={result['status']}")
-                    except Exception as e:
-                        logger.exception(f"[{task_name}] 目标 {target_info.get('name')} 分发异常: {e}")
-                        results.append(self.build_target_failed_result(target_info, str(e)))
-
-            # 本批完成后检查是否已取消，取消则不再提交后续批次（不依赖 future.cancel 竞速）
-            if self.is_cancelled(execution.id):
-                logger.info(f"[{task_name}] 检测到取消，停止提交剩余目标: execution_id={execution.id}")
-                break
+
+        def distribute(target_info):
+            return self.distribute_file_to_target(target_info, execution.target_source, files, target_path, execution.timeout, overwrite, execution.id)
+
+        def on_done(target_info, future):
+            try:
+                result = future.result()
+                results.append(result)
+                logger.info(f"[{task_name}] 目标 {target_info.get('name')} 分发完成: status={result['status']}")
+            except Exception as e:
+                logger.exception(f"[{task_name}] 目标 {target_info.get('name')} 分发异常: {e}")
+                results.append(self.build_target_failed_result(target_info, str(e)))
+
+        # 滑动窗口并发分发；取消后不再提交剩余目标（不依赖 future.cancel 竞速）
+        if self.run_targets(execution, target_list, distribute, on_done):
+            logger.info(f"[{task_name}] 检测到取消，已停止提交剩余目标: execution_id={execution.id}")
         return results
 
     def _handle_distribution_path_blocked(self, execution: JobExecution, target_list: list, task_name: str) -> bool:
@@ -0,0 +1,76 @@
+"""多目标执行的滑动窗口调度。
+
+原实现按 MAX_WORKERS 切批、每批新建线程池并等待批内最慢目标，
+少数目标超时会让整体耗时退化为 (目标数 / 并发数) × timeout。
+这里改为单个线程池 + 滑动窗口：任一目标完成即补位提交下一个，
+并发上限与启动速率按执行记录配置；取消后不再提交新目标（已提交的目标自行检查取消）。
+"""
+
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Iterable, Optional
+
+_EXHAUSTED = object()
+
+
+def run_sliding_window(
+    targets: Iterable[dict],
+    fn: Callable[[dict], Any],
+    on_done: Callable[[dict, Future], None],
+    *,
+    max_workers: int,
+    rate_limit: float = 0,
+    should_stop: Optional[Callable[[], bool]] = None,
+    thread_name_prefix: str = "job-target",
+) -> bool:
+    """以滑动窗口并发执行 fn(target)。
+
+    Args:
+        targets: 目标列表，按顺序提交
+        fn: 单目标执行函数，在线程池中运行
+        on_done: 目标完成回调 on_done(target, future)，在调度线程中按完成顺序调用
+        max_workers: 同时执行的目标数上限
+        rate_limit: 每秒最多启动的目标数，<= 0 表示不限速
+        should_stop: 每个目标完成后调用，返回 True 时停止提交剩余目标（已提交的照常等待完成）
+        thread_name_prefix: 线程名前缀
+
+    Returns:
+        是否因 should_stop 提前停止提交
+    """
+    targets = list(targets)
+    if not targets:
+        return False
+
+    workers = max(1, min(max_workers, len(targets)))
+    interval = 1.0 / rate_limit if rate_limit and rate_limit > 0 else 0.0
+    pending = iter(targets)
+    in_flight = {}
+    stopped = False
+    next_start = time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=thread_name_prefix) as pool:
+
+        def fill() -> None:
+            nonlocal next_start
+            while len(in_flight) < workers:
+                target = next(pending, _EXHAUSTED)
+                if target is _EXHAUSTED:
+                    return
+                if interval:
+                    delay = next_start - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                    next_start = max(next_start, time.monotonic()) + interval
+                in_flight[pool.submit(fn, target)] = target
+
+        fill()
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                on_done(in_flight.pop(future), future)
+            if not stopped and should_stop is not None and should_stop():
+                stopped = True
+            if not stopped:
+                fill()
+
+    return stopped
@@ -8,6 +8,7 @@ from apps.job_mgmt.models import DangerousPath, DangerousRule
 from apps.job_mgmt.services.dangerous_checker import (
     _CMD_RULES_CACHE_KEY,
     _PATH_RULES_CACHE_KEY,
+    clear_compiled_cmd_rules,
 )
 
 
@@ -15,6 +16,7 @@ from apps.job_mgmt.services.dangerous_checker import (
 def invalidate_cmd_rules_cache(sender, **kwargs):
     """DangerousRule 新增/修改/删除时失效命令规则缓存。"""
     cache.delete(_CMD_RULES_CACHE_KEY)
+    clear_compiled_cmd_rules()
 
 
 @receiver([post_save, post_delete], sender=DangerousPath)
@@ -207,3 +207,212 @@ class TestPathRulesCache:
         mock_cache.get.assert_called_with(_PATH_RULES_CACHE_KEY)
         mock_model.objects.filter.assert_not_called()
         assert result.has_forbidden is True
+
+
+class TestAhoCorasick:
+    def test_找出全部出现的pattern含重叠与前缀(self):
+        from apps.job_mgmt.utils.aho_corasick import AhoCorasick
+
+        ac = AhoCorasick(["rm", "rm -rf", "-rf /", "he", "she", "hers", "missing", ""])
+        assert ac.find_all("sudo rm -rf / ; ushers") == {0, 1, 2, 3, 4, 5, 7}
+
+    def test_无命中(self):
+        from apps.job_mgmt.utils.aho_corasick import AhoCorasick
+
+        assert AhoCorasick(["shutdown", "reboot"]).find_all("echo hello") == set()
+
+
+class TestCompiledCommandRules:
+    """预编译规则集与逐条 _match_pattern 结果一致。"""
+
+    PATTERNS = [
+        "rm -rf",
+        r"rm\s+-[rf]+",
+        r"chmod\s+(7)(7)7",
+        "[unclosed",
+        r"(\w+)\s+\1",
+        r"(?i)mkfs\.\w+",
+        r"^shutdown",
+        "DD IF=",
+        "",
+        r"curl .*\| *(ba)?sh",
+    ]
+    SCRIPTS = [
+        "echo hello",
+        "sudo rm   -rf /tmp\nchmod 777 /etc",
+        "dd if=/dev/zero of=/dev/sda\nshutdown -h now",
+        "echo echo done; mkfs.ext4 /dev/sdb",
+        "curl http://x | bash\nRM -RF /",
+        "",
+    ]
+
+    @staticmethod
+    def _expected(patterns, script, indices):
+        expected = {}
+        for i in indices:
+            matches = DangerousChecker._match_pattern(patterns[i], script)
+            if matches:
+                expected[i] = matches
+        return expected
+
+    def test_与逐条匹配一致(self):
+        from apps.job_mgmt.services.dangerous_checker import CompiledCommandRules
+
+        compiled = CompiledCommandRules(self.PATTERNS)
+        indices = list(range(len(self.PATTERNS)))
+        for script in self.SCRIPTS:
+            assert compiled.match(script, indices) == self._expected(self.PATTERNS, script, indices)
+
+    def test_仅返回指定规则(self):
+        from apps.job_mgmt.services.dangerous_checker import CompiledCommandRules
+
+        compiled = CompiledCommandRules(self.PATTERNS)
+        script = self.SCRIPTS[1]
+        assert compiled.match(script, [1, 2]) == self._expected(self.PATTERNS, script, [1, 2])
+
+    @pytest.mark.parametrize(
+        "pattern, expected",
+        [
+            (r"rm\s+-rf", "-rf"),
+            (r"curl .*\| *(ba)?sh", "curl "),
+            (r"mkfs\.\w+", "mkfs."),
+            (r"DD IF=/dev/zero", "dd if=/dev/zero"),
+            (r"abcd?e", "abc"),
+            (r"ab+cd", "ab"),
+            (r"x{2,3}yz", "yz"),
+            (r"shutdown|reboot", ""),
+            (r"[abc]+", ""),
+            (r"(?x) rm  -rf", ""),
+            (r"\x41BC", ""),
+            (r"{|}w", ""),
+            (r":(){ :|:& };:", ""),
+            (r"a{}bc", "a{}bc"),
+            (r"ab{x}cd", "ab{x}cd"),
+            (r"abc{,2}de", "ab"),
+            (r"ab{2,}cd", "cd"),
+            (r"shutdown\x20-h|reboot", ""),
+            (r"(dd)\s+if=\1|mkfs", ""),
+            (r"shutdown\x20-h now", "shutdown"),
+            (r"(dd)\s+if=\1 of=", "if="),
+        ],
+    )
+    def test_必含字面量提取(self, pattern, expected):
+        from apps.job_mgmt.services.dangerous_checker import required_literal
+
+        assert required_literal(pattern) == expected
+
+    @pytest.mark.parametrize(
+        "pattern, script",
+        [(r"{|}w", "1{2."), (r":(){ :|:& };:", ":|:& };:"), (r":(){ :|:& };:", ":{ :")],
+    )
+    def test_非量词花括号不丢失顶层分支(self, pattern, script):
+        import re
+
+        from apps.job_mgmt.services.dangerous_checker import CompiledCommandRules, DangerousChecker, required_literal
+
+        assert re.search(pattern, script)
+        assert required_literal(pattern).lower() in script.lower()
+        # ":(){ ... }" 的捕获组为空串，逐条匹配同样不计命中；这里只要求与逐条匹配一致
+        expected = DangerousChecker._match_pattern(pattern, script)
+        assert CompiledCommandRules([pattern]).match(script, [0]) == ({0: expected} if expected else {})
+
+    def test_随机规则的必含字面量必在命中文本中(self):
+        import random
+        import re
+
+        from apps.job_mgmt.services.dangerous_checker import required_literal
+
+        rng = random.Random(22)
+        atoms = ["a", "b", "ab", " ", "|", "(a|b)", "(b)", "[ab]", "*", "?", "+", "{2}", "{", "}", ".", "^", "$"]
+        atoms += [r"\x61", r"\u0062", r"\N{LATIN SMALL LETTER A}", r"\0", r"\1", r"\s", r"\d", r"\.", r"\|"]
+        alphabet = ["a", "b", "A", "B", " ", ".", "|", "{", "}", "1", "\n", "\0"]
+        for _ in range(2000):
+            pattern = "".join(rng.choice(atoms) for _ in range(rng.randint(1, 6)))
+            try:
+                regex = re.compile(pattern, re.MULTILINE | re.IGNORECASE)
+            except re.error:
+                continue
+            literal = required_literal(pattern)
+            for _ in range(20):
+                script = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+                if regex.search(script):
+                    assert literal in script.lower(), (pattern, script, literal)
+
+    def test_随机规则与脚本结果一致(self):
+        import random
+
+        from apps.job_mgmt.services.dangerous_checker import CompiledCommandRules
+
+        rng = random.Random(7)
+        atoms = ["rm", " ", "-rf", r"\s+", r"\w*", "d?", "(ab|cd)", "[xy]", "x{2}", r"\.", ".", "+", "|", "K", "ſ"]
+        patterns = ["".join(rng.choice(atoms) for _ in range(rng.randint(1, 5))) for _ in range(200)]
+        alphabet = ["rm", " ", "-rf", "ab", "cd", "xx", "y", ".", "d", "\n", "K", "k", "s", "ſ", "RM"]
+        compiled = CompiledCommandRules(patterns)
+        indices = list(range(len(patterns)))
+        for _ in range(50):
+            script = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+            assert compiled.match(script, indices) == self._expected(patterns, script, indices)
+
+    def test_规则变化时重建预编译结果(self):
+        from apps.job_mgmt.services import dangerous_checker
+
+        dangerous_checker.clear_compiled_cmd_rules()
+        first = dangerous_checker._get_compiled_cmd_rules([_rule_dict(DangerousLevel.FORBIDDEN, "a")])
+        same = dangerous_checker._get_compiled_cmd_rules([_rule_dict(DangerousLevel.CONFIRM, "a")])
+        changed = dangerous_checker._get_compiled_cmd_rules([_rule_dict(DangerousLevel.FORBIDDEN, "b")])
+
+        assert first is same
+        assert changed is not first
+
+    def test_check_command_按规则顺序报告(self):
+        rules = [
+            _rule_dict(DangerousLevel.CONFIRM, pattern=r"chmod\s+777", name="chmod", rid=1),
+            _rule_dict(DangerousLevel.FORBIDDEN, pattern="rm -rf", name="rm", rid=2),
+            _rule_dict(DangerousLevel.FORBIDDEN, pattern="mkfs", name="mkfs", rid=3, team=[9]),
+        ]
+        mock_cache = MagicMock()
+        mock_cache.get.return_value = rules
+        with patch("apps.job_mgmt.services.dangerous_checker.cache", mock_cache):
+            result = DangerousChecker.check_command("chmod 777 /\nrm -rf /\nmkfs /dev/sda", team=[1])
+
+        assert [m["rule_id"] for m in result.warnings] == [1]
+        assert [m["rule_id"] for m in result.forbidden] == [2]
+        assert result.warnings[0]["matched_content"] == "chmod 777"
+
+
+@pytest.mark.slow
+def test_预编译规则集基准():
+    """300 条规则（1/3 为正则）× 约 130KB 脚本：预编译规则集 vs 逐条 _match_pattern。"""
+    import random
+    import re
+    import time
+
+    from apps.job_mgmt.services.dangerous_checker import CompiledCommandRules
+
+    rng = random.Random(0)
+    words = ["rm", "-rf", "chmod", "777", "dd", "mkfs", "shutdown", "reboot", "kill", "-9", "iptables", "-F", "useradd"]
+    patterns = []
+    for i in range(300):
+        literal = " ".join(rng.choice(words) for _ in range(3)) + f" x{i}"
+        patterns.append(literal if i % 3 else re.escape(literal).replace(r"\ ", r"\s+"))
+    lines = [" ".join(rng.choice(words + ["echo", "cat", "/var/log", "$HOME"]) for _ in range(8)) for _ in range(3000)]
+    script = "\n".join(lines + ["rm -rf / x3", "chmod 777 dd x7"])
+    indices = list(range(len(patterns)))
+
+    compiled = CompiledCommandRules(patterns)
+    started = time.perf_counter()
+    fast = compiled.match(script, indices)
+    fast_elapsed = time.perf_counter() - started
+
+    re.purge()
+    started = time.perf_counter()
+    slow = {}
+    for i, pattern in enumerate(patterns):
+        matches = DangerousChecker._match_pattern(pattern, script)
+        if matches:
+            slow[i] = matches
+    slow_elapsed = time.perf_counter() - started
+
+    print(f"\ncompiled={fast_elapsed * 1000:.1f}ms per-rule={slow_elapsed * 1000:.1f}ms")
+    assert fast == slow
+    assert fast_elapsed < slow_elapsed
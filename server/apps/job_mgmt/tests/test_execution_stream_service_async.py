@@ -92,3 +92,17 @@ def test_stream_events_uses_default_source_when_none(monkeypatch):
     monkeypatch.setattr(svc, "_default_message_source", _fake_default)
     chunks = _collect(svc.stream_execution_events(1, ["a"]))
     assert chunks[-1] == "data: [DONE]\n\n"
+
+
+def test_stream_events_expands_agent_frames_into_lines():
+    source = _fake_source([
+        {"target_key": "ansible", "stream": "stdout", "lines": ["l1", "l2"], "seq": 0, "dropped": 0},
+        {"target_key": "ansible", "stream": "stdout", "lines": ["l3"], "seq": 1, "dropped": 0},
+        {"target_key": "ansible", "type": svc.DONE_TYPE, "status": "success"},
+    ])
+    chunks = _collect(svc.stream_execution_events(1, ["ansible"], message_source=source))
+
+    payloads = _payloads(chunks)
+    assert [p["line"] for p in payloads if "line" in p] == ["l1", "l2", "l3"]
+    assert all("lines" not in p for p in payloads)
+    assert chunks[-1] == "data: [DONE]\n\n"
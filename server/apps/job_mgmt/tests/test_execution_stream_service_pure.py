@@ -65,3 +65,34 @@ def test_aggregator_unknown_done_target_is_ignored_safely():
 def test_aggregator_empty_targets_is_immediately_complete():
     agg = svc.ExecutionStreamAggregator([])
     assert agg.is_complete() is True
+
+
+def test_expand_stream_frame_passes_through_line_event():
+    payload = {"target_key": "a", "stream": "stdout", "line": "x"}
+    assert svc.expand_stream_frame(payload) == [payload]
+
+
+def test_expand_stream_frame_passes_through_done_sentinel():
+    payload = {"target_key": "a", "type": svc.DONE_TYPE, "status": "success"}
+    assert svc.expand_stream_frame(payload) == [payload]
+
+
+def test_expand_stream_frame_splits_lines_keeping_envelope():
+    frame = {"execution_id": "1", "target_key": "ansible", "stream": "stdout", "lines": ["l1", "l2"],
+             "seq": 3, "dropped": 0, "timestamp": "t"}
+    assert svc.expand_stream_frame(frame) == [
+        {"execution_id": "1", "target_key": "ansible", "stream": "stdout", "timestamp": "t", "line": "l1"},
+        {"execution_id": "1", "target_key": "ansible", "stream": "stdout", "timestamp": "t", "line": "l2"},
+    ]
+
+
+def test_expand_stream_frame_reports_dropped_lines_first():
+    frame = {"target_key": "ansible", "stream": "stdout", "lines": ["after"], "dropped": 42}
+    events = svc.expand_stream_frame(frame)
+    assert events[0]["dropped"] == 42
+    assert "42" in events[0]["line"]
+    assert events[1] == {"target_key": "ansible", "stream": "stdout", "line": "after"}
+
+
+def test_expand_stream_frame_empty_frame_without_drops_yields_nothing():
+    assert svc.expand_stream_frame({"target_key": "a", "lines": [], "dropped": 0}) == []
@@ -0,0 +1,113 @@
+"""多目标滑动窗口调度测试
+
+覆盖：
+1. 慢目标不阻塞其余目标：任一目标完成即补位
+2. 并发上限 / 启动速率限制
+3. should_stop 后不再提交剩余目标，已提交的照常回调
+4. run_targets 按执行记录的 max_concurrency / rate_limit 覆盖全局配置
+"""
+
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from apps.job_mgmt.services.script_execution_runner import ScriptExecutionRunner
+from apps.job_mgmt.services.target_scheduler import run_sliding_window
+
+pytestmark = pytest.mark.unit
+
+
+def _targets(n):
+    return [{"target_id": i, "name": f"h{i}"} for i in range(1, n + 1)]
+
+
+class _Tracker:
+    def __init__(self, durations=None):
+        self.durations = durations or {}
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+        self.started = []
+        self.done = []
+
+    def fn(self, target):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+            self.started.append((target["target_id"], time.monotonic()))
+        time.sleep(self.durations.get(target["target_id"], 0.01))
+        with self.lock:
+            self.running -= 1
+        return target["target_id"]
+
+    def on_done(self, target, future):
+        self.done.append(future.result())
+
+
+class TestSlidingWindow:
+    def test_slow_target_does_not_block_window(self):
+        # 2 并发，目标 1 很慢：分批实现需 ≥ 0.5s × 2 批，滑动窗口由另一槽位跑完其余目标
+        tracker = _Tracker({1: 0.5})
+        started = time.monotonic()
+        stopped = run_sliding_window(_targets(6), tracker.fn, tracker.on_done, max_workers=2)
+        elapsed = time.monotonic() - started
+
+        assert stopped is False
+        assert sorted(tracker.done) == [1, 2, 3, 4, 5, 6]
+        assert tracker.done[-1] == 1
+        assert elapsed < 0.9
+
+    def test_respects_max_workers(self):
+        tracker = _Tracker()
+        run_sliding_window(_targets(20), tracker.fn, tracker.on_done, max_workers=3)
+
+        assert tracker.peak <= 3
+        assert len(tracker.done) == 20
+
+    def test_rate_limit_spaces_starts(self):
+        tracker = _Tracker()
+        run_sliding_window(_targets(5), tracker.fn, tracker.on_done, max_workers=5, rate_limit=20)
+
+        starts = sorted(t for _, t in tracker.started)
+        assert starts[-1] - starts[0] >= 4 / 20 * 0.9
+
+    def test_stop_halts_submission(self):
+        tracker = _Tracker()
+        stopped = run_sliding_window(_targets(10), tracker.fn, tracker.on_done, max_workers=2, should_stop=lambda: True)
+
+        assert stopped is True
+        # 首个目标完成即停止提交，已提交的目标照常回调
+        assert sorted(tracker.done) == [1, 2]
+
+    def test_empty_targets(self):
+        on_done = MagicMock()
+        assert run_sliding_window([], MagicMock(), on_done, max_workers=4) is False
+        on_done.assert_not_called()
+
+
+class TestRunTargetsConfig:
+    def _run(self, monkeypatch, **execution_fields):
+        captured = {}
+
+        def fake_window(targets, fn, on_done, **kwargs):
+            captured.update(kwargs)
+            return False
+
+        monkeypatch.setattr("apps.job_mgmt.services.execution_base_service.run_sliding_window", fake_window)
+        monkeypatch.setattr(ScriptExecutionRunner, "MAX_WORKERS", 7)
+        monkeypatch.setattr(ScriptExecutionRunner, "RATE_LIMIT", 3)
+        execution = MagicMock(id=1, **execution_fields)
+        ScriptExecutionRunner(1).run_targets(execution, _targets(2), MagicMock(), MagicMock())
+        return captured
+
+    def test_execution_overrides_global(self, monkeypatch):
+        captured = self._run(monkeypatch, max_concurrency=50, rate_limit=10)
+        assert captured["max_workers"] == 50
+        assert captured["rate_limit"] == 10
+
+    def test_zero_falls_back_to_global(self, monkeypatch):
+        captured = self._run(monkeypatch, max_concurrency=0, rate_limit=0)
+        assert captured["max_workers"] == 7
+        assert captured["rate_limit"] == 3
@@ -0,0 +1,100 @@
+"""多模式字符串匹配（Aho-Corasick）。
+
+纯函数 / 纯数据结构，无 Django 依赖。危险命令检查用它一次扫描脚本，
+找出所有作为子串出现的规则 pattern，代替"每条规则各扫描一遍脚本"。
+
+纯 Python 自动机逐字符推进，长脚本上单遍扫描仍有解释器开销，因此额外构造
+一条按前缀树展开的正则作为 C 层预过滤：找不到任何 pattern 时直接返回，
+找到时从最左命中位置起再跑自动机（此前不可能有 pattern 出现）。
+"""
+
+from __future__ import annotations
+
+import re
+from collections import deque
+from typing import Iterable, Optional
+
+
+def _trie_regex(patterns: Iterable[str]) -> Optional[re.Pattern]:
+    """把 pattern 集合按前缀树展开为正则（公共前缀只比较一次），仅用于判断是否存在命中。"""
+    trie: dict = {}
+    for pattern in patterns:
+        node = trie
+        for ch in pattern:
+            node = node.setdefault(ch, {})
+        node[""] = None
+
+    def build(node: dict) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    try:
+        return re.compile(build(trie)) if trie else None
+    except (re.error, RecursionError):
+        return None
+
+
+class AhoCorasick:
+    """Aho-Corasick 自动机：find_all 返回在文本中出现过的 pattern 下标集合。
+
+    空 pattern 视为处处出现（与 ``"" in text`` 一致）。
+    """
+
+    def __init__(self, patterns: list[str]):
+        self.patterns = list(patterns)
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._output: list[tuple[int, ...]] = [()]
+        self._always = tuple(i for i, p in enumerate(self.patterns) if not p)
+
+        for index, pattern in enumerate(self.patterns):
+            if not pattern:
+                continue
+            state = 0
+            for ch in pattern:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                state = nxt
+            self._output[state] += (index,)
+
+        # BFS 构造失败指针，输出沿失败链合并
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                self._output[child] += self._output[self._fail[child]]
+
+        self._prefilter = _trie_regex(p for p in self.patterns if p)
+
+    def find_all(self, text: str) -> set[int]:
+        found = set(self._always)
+        start = 0
+        if self._prefilter is not None:
+            first = self._prefilter.search(text)
+            if first is None:
+                return found
+            start = first.start()
+
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for ch in text[start:]:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if output[state]:
+                found.update(output[state])
+        return found
@@ -4,6 +4,8 @@
 # @Author: GitHub Copilot
 from celery.schedules import crontab
 
+from apps.monitor.constants.alert_policy import AlertConstants
+
 CELERY_BEAT_SCHEDULE = {
     'sync_instance_and_group': {
         'task': 'apps.monitor.tasks.grouping_rule.sync_instance_and_group',
@@ -15,3 +17,9 @@ CELERY_BEAT_SCHEDULE = {
     },
 }
 
+
+if AlertConstants.BATCH_SCAN_ENABLED:
+    CELERY_BEAT_SCHEDULE['scan_due_policies'] = {
+        'task': 'apps.monitor.tasks.monitor_policy.scan_due_policies_task',
+        'schedule': crontab(minute='*'),  # 每分钟扫描一次到期策略
+    }
@@ -1,3 +1,6 @@
+import os
+
+
 class AlertConstants:
     """告警相关常量"""
 
@@ -6,6 +9,13 @@ class AlertConstants:
     MAX_BACKFILL_SECONDS = (
         24 * 3600
     )  # 最大补偿时间范围（秒），超过此范围的历史数据不再补偿
+    # 补偿多个周期时合并为一次范围查询并复用扫描上下文；关闭后逐周期完整扫描
+    BACKFILL_SINGLE_QUERY = os.getenv("MONITOR_POLICY_BACKFILL_SINGLE_QUERY", "true").lower() == "true"
+
+    # 批量扫描：开启后由 scan_due_policies_task 每分钟统一扫描到期策略，相同的指标查询跨策略只执行一次
+    BATCH_SCAN_ENABLED = os.getenv("MONITOR_POLICY_BATCH_SCAN", "false").lower() == "true"
+    # 判断策略到期时容忍的调度抖动（秒），避免上次扫描时间略晚于整分导致顺延一个调度周期
+    BATCH_SCAN_DUE_TOLERANCE_SECONDS = 30
 
     # 阈值对比方法
     THRESHOLD_METHODS = {
@@ -278,13 +278,15 @@ class InstanceConfigService:
         if not config_objs:
             return result
 
+        base_ids = [config_obj.id for config_obj in config_objs if not config_obj.is_child]
+        child_ids = [config_obj.id for config_obj in config_objs if config_obj.is_child]
+        configs, child_configs = NodeMgmt().get_configs_and_child_configs_by_ids(base_ids, child_ids)
+        config_map = {config["id"]: config for config in configs}
+        child_config_map = {config["id"]: config for config in child_configs}
+
         for config_obj in config_objs:
             content_key = "content" if config_obj.is_child else "config_template"
-            if config_obj.is_child:
-                configs = NodeMgmt().get_child_configs_by_ids([config_obj.id])
-            else:
-                configs = NodeMgmt().get_configs_by_ids([config_obj.id])
-            config = configs[0]
+            config = (child_config_map if config_obj.is_child else config_map)[config_obj.id]
             if config_obj.file_type == "toml":
                 config["content"] = ConfigFormat.toml_to_dict(config[content_key])
             elif config_obj.file_type == "yaml":
@@ -858,17 +860,20 @@ class InstanceConfigService:
             if base_config and child_config and base_config.monitor_instance_id != child_config.monitor_instance_id:
                 raise BaseAppException("基础配置与子配置不属于同一监控实例")
 
-        if base_info:
-            config_obj = config_map.get(base_info["id"])
-            if config_obj:
-                content = ConfigFormat.json_to_yaml(base_info["content"])
-                env_config = base_info.get("env_config")
-                NodeMgmt().update_config_content(base_info["id"], content, env_config)
-
-        if child_info:
-            config_obj = config_map.get(child_info["id"])
-            if not config_obj:
-                return
-            env_config = child_info.get("env_config")
-            content = ConfigFormat.json_to_toml(child_info["content"]) if child_info else None
-            NodeMgmt().update_child_config_content(child_info["id"], content, env_config)
+        base_update = None
+        if base_info and config_map.get(base_info["id"]):
+            base_update = {
+                "id": base_info["id"],
+                "content": ConfigFormat.json_to_yaml(base_info["content"]),
+                "env_config": base_info.get("env_config"),
+            }
+
+        child_update = None
+        if child_info and config_map.get(child_info["id"]):
+            child_update = {
+                "id": child_info["id"],
+                "content": ConfigFormat.json_to_toml(child_info["content"]),
+                "env_config": child_info.get("env_config"),
+            }
+
+        NodeMgmt().update_config_contents(base_update, child_update)
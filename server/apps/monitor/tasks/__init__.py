@@ -1,3 +1,3 @@
 from apps.monitor.tasks.collect_detect import run_collect_detect_task
 from apps.monitor.tasks.grouping_rule import sync_instance_and_group
-from apps.monitor.tasks.monitor_policy import scan_policy_task
+from apps.monitor.tasks.monitor_policy import scan_due_policies_task, scan_policy_task
@@ -9,6 +9,7 @@ from apps.core.exceptions.base_app_exception import BaseAppException
 from apps.monitor.models import MonitorPolicy
 from apps.core.logger import celery_logger as logger
 from apps.monitor.tasks.services.policy_scan import MonitorPolicyScan
+from apps.monitor.tasks.services.policy_scan.query_planner import MetricQueryPlanner
 from apps.monitor.tasks.utils.policy_methods import period_to_seconds
 from apps.monitor.constants.alert_policy import AlertConstants
 
@@ -20,6 +21,37 @@ def _run_scan_and_record_success(policy_obj, scan_time):
     MonitorPolicy.objects.filter(id=policy_obj.id).update(last_run_time=scan_time)
 
 
+def _run_backfill_and_record_success(policy_obj, scan_times):
+    """补偿多个周期：复用同一扫描上下文、整个缺口只查询一次，每个周期成功后推进水位"""
+
+    def record_success(scan_time):
+        MonitorPolicy.objects.filter(id=policy_obj.id).update(last_run_time=scan_time)
+
+    MonitorPolicyScan(policy_obj).run_backfill(scan_times, on_step_success=record_success)
+
+
+def _plan_scan_times(policy_obj, current_time):
+    """计算本次需要扫描的时间点：首次执行或间隔不足两个周期时只扫描当前时间，否则按周期补偿"""
+    if not policy_obj.last_run_time:
+        return [current_time]
+
+    period_seconds = period_to_seconds(policy_obj.period)
+    gap_seconds = (current_time - policy_obj.last_run_time).total_seconds()
+
+    gap_seconds = min(gap_seconds, AlertConstants.MAX_BACKFILL_SECONDS)
+
+    backfill_count = int(gap_seconds // period_seconds)
+
+    if backfill_count <= 1:
+        return [current_time]
+
+    backfill_count = min(backfill_count, AlertConstants.MAX_BACKFILL_COUNT)
+    return [
+        policy_obj.last_run_time + timedelta(seconds=period_seconds * (i + 1))
+        for i in range(backfill_count)
+    ]
+
+
 @shared_task(base=Singleton, raise_on_duplicate=False)
 def scan_policy_task(policy_id):
     """扫描监控策略
@@ -49,30 +81,26 @@ def scan_policy_task(policy_id):
             )
             return {"success": True, "duration": duration, "message": "策略未启用"}
 
+        if AlertConstants.BATCH_SCAN_ENABLED:
+            duration = time.time() - start_time
+            logger.info(f"监控策略 [{policy_id}] 已启用批量扫描，由批量任务统一执行")
+            return {"success": True, "duration": duration, "message": "批量扫描模式"}
+
         current_time = datetime.now(timezone.utc)
 
         if not policy_obj.last_run_time:
             logger.info(f"监控策略 [{policy_id}] 首次执行，扫描时间点: {current_time}")
-            _run_scan_and_record_success(policy_obj, current_time)
-        else:
-            period_seconds = period_to_seconds(policy_obj.period)
-            gap_seconds = (current_time - policy_obj.last_run_time).total_seconds()
-
-            gap_seconds = min(gap_seconds, AlertConstants.MAX_BACKFILL_SECONDS)
+        scan_times = _plan_scan_times(policy_obj, current_time)
+        backfill_count = len(scan_times)
+        if backfill_count > 1:
+            logger.info(f"监控策略 [{policy_id}] 需要补偿 {backfill_count} 个周期")
 
-            backfill_count = int(gap_seconds // period_seconds)
-
-            if backfill_count <= 1:
-                _run_scan_and_record_success(policy_obj, current_time)
-            else:
-                backfill_count = min(backfill_count, AlertConstants.MAX_BACKFILL_COUNT)
-                logger.info(f"监控策略 [{policy_id}] 需要补偿 {backfill_count} 个周期")
-
-                for i in range(backfill_count):
-                    scan_time = policy_obj.last_run_time + timedelta(
-                        seconds=period_seconds
-                    )
-                    _run_scan_and_record_success(policy_obj, scan_time)
+        if backfill_count > 1 and AlertConstants.BACKFILL_SINGLE_QUERY:
+            _run_backfill_and_record_success(policy_obj, scan_times)
+        else:
+            for i, scan_time in enumerate(scan_times):
+                _run_scan_and_record_success(policy_obj, scan_time)
+                if backfill_count > 1:
                     logger.debug(
                         f"监控策略 [{policy_id}] 完成第 {i + 1}/{backfill_count} 次补偿"
                     )
@@ -96,6 +124,126 @@ def scan_policy_task(policy_id):
         raise
 
 
+def _is_policy_due(policy_obj, current_time):
+    """策略是否到达扫描周期（容忍调度抖动）"""
+    if not policy_obj.last_run_time:
+        return True
+    try:
+        period_seconds = period_to_seconds(policy_obj.period)
+    except BaseAppException as e:
+        logger.error(f"监控策略 [{policy_obj.id}] 周期配置无效，跳过批量扫描: {e}")
+        return False
+    gap_seconds = (current_time - policy_obj.last_run_time).total_seconds()
+    return gap_seconds + AlertConstants.BATCH_SCAN_DUE_TOLERANCE_SECONDS >= period_seconds
+
+
+def _prefetch_shared_metrics(planner, scans):
+    """为本轮各策略预取聚合查询；不满足前置条件的策略留给扫描流程按原逻辑处理"""
+    services = []
+    for scan in scans:
+        if scan.policy.source and not scan.instances_map:
+            continue
+        try:
+            scan.metric_query_service.set_monitor_obj_instance_key()
+        except Exception:  # noqa
+            continue
+        services.append(scan.metric_query_service)
+    return planner.prefetch(services)
+
+
+def scan_policies_batch(policies, current_time):
+    """批量扫描监控策略，同一轮中相同的指标查询只执行一次
+
+    各策略按 _plan_scan_times 计算扫描时间点，第 N 轮扫描所有策略的第 N 个时间点；
+    同一轮中 (查询语句, 起止时间, 步长) 相同的聚合查询共享一次 VictoriaMetrics 查询，
+    单个策略失败只终止该策略后续的补偿，不影响其他策略。
+
+    Returns:
+        dict: {"scans": 扫描次数, "failed": 失败的策略ID列表, "queries": 实际查询次数, "groups": 查询分组统计}
+    """
+    plans = [(policy_obj, _plan_scan_times(policy_obj, current_time)) for policy_obj in policies]
+    failed = set()
+    scan_count = 0
+    groups = []
+
+    rounds = max((len(scan_times) for _, scan_times in plans), default=0)
+    for round_index in range(rounds):
+        planner = MetricQueryPlanner()
+        scans = []
+        for policy_obj, scan_times in plans:
+            if round_index >= len(scan_times) or policy_obj.id in failed:
+                continue
+            policy_obj.last_run_time = scan_times[round_index]
+            try:
+                scans.append(MonitorPolicyScan(policy_obj, planner))
+            except Exception as e:
+                failed.add(policy_obj.id)
+                logger.error(f"监控策略 [{policy_obj.id}] 批量扫描初始化失败: {e}", exc_info=True)
+
+        round_start = time.time()
+        shared = _prefetch_shared_metrics(planner, scans)
+        prefetch_duration = time.time() - round_start
+
+        for scan in scans:
+            policy_obj = scan.policy
+            try:
+                scan.run()
+                MonitorPolicy.objects.filter(id=policy_obj.id).update(last_run_time=policy_obj.last_run_time)
+                scan_count += 1
+            except Exception as e:
+                failed.add(policy_obj.id)
+                logger.error(f"监控策略 [{policy_obj.id}] 批量扫描失败: {e}", exc_info=True)
+
+        summary = planner.summary()
+        groups.extend(summary)
+        logger.info(
+            f"批量扫描第 {round_index + 1}/{rounds} 轮完成: 策略 {len(scans)} 个，"
+            f"共享查询分组 {len(shared)} 个，实际查询 {len(summary)} 次，"
+            f"预取耗时: {prefetch_duration:.2f}s，总耗时: {time.time() - round_start:.2f}s"
+        )
+        for item in summary[:5]:
+            logger.debug(
+                f"批量扫描查询分组: policies={item['policies']}, series={item['series']}, "
+                f"耗时: {item['duration']:.3f}s, query={item['query']}"
+            )
+
+    return {"scans": scan_count, "failed": sorted(failed), "queries": len(groups), "groups": groups}
+
+
+@shared_task(base=Singleton, raise_on_duplicate=False)
+def scan_due_policies_task():
+    """批量扫描所有到期的监控策略（MONITOR_POLICY_BATCH_SCAN 开启时由 beat 每分钟调度）
+
+    Returns:
+        dict: 执行结果 {"success": bool, "duration": float, "policies": int, "scans": int, "failed": list, "queries": int}
+    """
+    start_time = time.time()
+    current_time = datetime.now(timezone.utc)
+
+    policies = [
+        policy_obj
+        for policy_obj in MonitorPolicy.objects.filter(enable=True).select_related("monitor_object").order_by("id")
+        if _is_policy_due(policy_obj, current_time)
+    ]
+    if not policies:
+        return {"success": True, "duration": time.time() - start_time, "policies": 0, "scans": 0, "failed": [], "queries": 0}
+
+    result = scan_policies_batch(policies, current_time)
+    duration = time.time() - start_time
+    logger.info(
+        f"批量扫描完成: 策略 {len(policies)} 个，扫描 {result['scans']} 次，失败 {len(result['failed'])} 个，"
+        f"实际查询 {result['queries']} 次，耗时: {duration:.2f}s"
+    )
+    return {
+        "success": True,
+        "duration": duration,
+        "policies": len(policies),
+        "scans": result["scans"],
+        "failed": result["failed"],
+        "queries": result["queries"],
+    }
+
+
 @shared_task(base=Singleton, raise_on_duplicate=False)
 def retry_alert_center_lifecycle_notify_task():
     """补偿任务：重试推送到告警中心失败的告警通知（每5分钟执行，每次最多处理200条）"""
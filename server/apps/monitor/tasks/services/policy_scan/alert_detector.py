@@ -6,7 +6,7 @@ from django.db.models import F
 
 from apps.monitor.models import MonitorAlert
 from apps.monitor.services.alert_lifecycle_notify import AlertLifecycleNotifier
-from apps.monitor.tasks.utils.policy_calculate import vm_to_dataframe, calculate_alerts
+from apps.monitor.tasks.utils.policy_calculate import calculate_alerts_columnar
 from apps.monitor.utils.dimension import (
     build_dimensions,
     extract_monitor_instance_id,
@@ -38,10 +38,6 @@ class AlertDetector:
         vm_data = self.metric_query_service.convert_metric_values(vm_data)
 
         group_by_keys = self._get_group_by_keys()
-        df = vm_to_dataframe(
-            vm_data.get("data", {}).get("result", []),
-            group_by_keys,
-        )
 
         template_context = {
             "monitor_object": self.policy.monitor_object.name if self.policy.monitor_object else "",
@@ -57,9 +53,9 @@ class AlertDetector:
         thresholds = self.metric_query_service.convert_thresholds(
             self.policy.threshold
         )
-        alert_events, info_events = calculate_alerts(
+        alert_events, info_events = calculate_alerts_columnar(
             self.policy.alert_name,
-            df,
+            vm_data.get("data", {}).get("result", []),
             thresholds,
             template_context,
             n=trigger_count,
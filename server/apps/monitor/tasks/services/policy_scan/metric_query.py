@@ -8,7 +8,14 @@ from apps.core.exceptions.base_app_exception import BaseAppException
 from apps.monitor.expression.conditions import compile_filter_to_query
 from apps.monitor.expression.query import build_formula_query
 from apps.monitor.models import Metric
-from apps.monitor.tasks.utils.policy_methods import METHOD, period_to_seconds, query_formula_policy_metrics
+from apps.monitor.tasks.services.policy_scan.query_planner import MetricQueryRequest
+from apps.monitor.tasks.utils.policy_methods import (
+    METHOD,
+    build_formula_policy_query,
+    build_policy_query,
+    period_to_seconds,
+    query_formula_policy_metrics,
+)
 from apps.monitor.utils.dimension import parse_instance_id
 from apps.monitor.utils.victoriametrics_api import VictoriaMetricsAPI
 from apps.monitor.utils.unit_converter import UnitConverter
@@ -35,15 +42,17 @@ class MetricQueryService:
     - 单位转换
     """
 
-    def __init__(self, policy, instances_map: dict):
+    def __init__(self, policy, instances_map: dict, planner=None):
         """初始化指标查询服务
 
         Args:
             policy: 监控策略对象
             instances_map: 实例ID到实例名称的映射
+            planner: 批量扫描时跨策略共享的查询规划器，为空时逐策略查询
         """
         self.policy = policy
         self.instances_map = instances_map
+        self.planner = planner
         self.instance_id_keys = None
         self.metric = None
         self.compiled_formula = None
@@ -148,11 +157,12 @@ class MetricQueryService:
         Raises:
             BaseAppException: 算法方法无效时抛出
         """
+        if self.planner is not None:
+            request = self.build_aggregation_request(period, points)
+            return self.planner.fetch(request, self.policy.id)
+
         # 计算查询时间范围
-        end_timestamp = int(self.policy.last_run_time.timestamp())
-        period_seconds = period_to_seconds(period)
-        points = max(1, int(points or 1))
-        start_timestamp = end_timestamp - period_seconds * points
+        end_timestamp, start_timestamp = self._aggregation_range(period, points)
 
         # 准备查询参数
         query = self.format_pmq()
@@ -182,6 +192,36 @@ class MetricQueryService:
             getattr(self.policy, "group_algorithm", None),
         )
 
+    def _aggregation_range(self, period, points=1):
+        end_timestamp = int(self.policy.last_run_time.timestamp())
+        period_seconds = period_to_seconds(period)
+        points = max(1, int(points or 1))
+        return end_timestamp, end_timestamp - period_seconds * points
+
+    def build_aggregation_request(self, period, points=1):
+        """构建聚合查询请求（最终查询语句与时间范围），与 query_aggregation_metrics 的查询一致
+
+        Returns:
+            MetricQueryRequest: 可作为跨策略共享查询的分组键
+        """
+        end_timestamp, start_timestamp = self._aggregation_range(period, points)
+        query = self.format_pmq()
+        step = self.format_period(period, points)
+
+        if self.policy.query_condition.get("type") == "formula":
+            query = build_formula_policy_query(self.policy.algorithm, query, step)
+        else:
+            if self.policy.algorithm not in METHOD:
+                raise BaseAppException(f"invalid algorithm method: {self.policy.algorithm}")
+            query = build_policy_query(
+                self.policy.algorithm,
+                query,
+                step,
+                ",".join(self.get_result_group_by()),
+                getattr(self.policy, "group_algorithm", None),
+            )
+        return MetricQueryRequest(query=query, start=start_timestamp, end=end_timestamp, step=step)
+
     def query_raw_metrics(self, period, points=1):
         """查询原始指标数据(不进行聚合)
 
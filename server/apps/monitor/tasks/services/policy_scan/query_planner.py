@@ -0,0 +1,197 @@
+"""跨策略共享的指标查询规划器
+
+大量策略基于同一指标（如不同组织的 CPU 使用率）时，逐策略扫描会向 VictoriaMetrics 发出大量相同的 PromQL。
+批量扫描时先按 (最终查询语句, 起止时间, 步长) 对本轮所有策略的查询分组，每组只查询一次，
+结果按策略各自的实例范围（instances_map / 来源过滤）在 AlertDetector 中各自过滤。
+补偿扫描时由 RangeQueryPlanner 把连续多个周期的窗口合并为一次范围查询。
+"""
+
+import bisect
+import copy
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+
+from apps.core.utils.victoriametrics_client import parse_step_seconds
+from apps.monitor.constants.alert_policy import AlertConstants
+from apps.monitor.utils.victoriametrics_api import VictoriaMetricsAPI
+from apps.core.logger import celery_logger as logger
+
+
+@dataclass(frozen=True)
+class MetricQueryRequest:
+    """一次聚合查询的完整参数，同时作为分组键"""
+
+    query: str
+    start: int
+    end: int
+    step: str
+
+
+class MetricQueryPlanner:
+    """指标查询规划器
+
+    - prefetch: 收集各策略本轮需要的聚合查询，去重后每组只查询一次；
+    - fetch: 策略扫描时按请求取回结果（深拷贝，单位转换等会原地修改结果），
+      未预取的请求按需查询并同样缓存，失败的请求对同组所有策略抛出同一异常，不重复查询。
+    """
+
+    def __init__(self, api=None):
+        self.api = api or VictoriaMetricsAPI()
+        self._results = {}
+        self._errors = {}
+        self._consumers = defaultdict(set)
+        self.stats = {}
+
+    @staticmethod
+    def collect_requests(metric_query_service):
+        """按告警类型收集单个策略本轮需要的聚合查询"""
+        policy = metric_query_service.policy
+        enable_alerts = policy.enable_alerts or []
+        requests = []
+        if AlertConstants.THRESHOLD in enable_alerts:
+            trigger_count = getattr(policy, "trigger_count", 1) or 1
+            requests.append(metric_query_service.build_aggregation_request(policy.period, trigger_count))
+        if AlertConstants.NO_DATA in enable_alerts:
+            if policy.no_data_period and policy.source:
+                requests.append(metric_query_service.build_aggregation_request(policy.no_data_period))
+            if policy.no_data_recovery_period:
+                requests.append(metric_query_service.build_aggregation_request(policy.no_data_recovery_period))
+        return requests
+
+    def prefetch(self, metric_query_services):
+        """对一组策略的查询分组并逐组执行
+
+        Returns:
+            dict: {MetricQueryRequest: 共享该查询的策略数}
+        """
+        groups = defaultdict(set)
+        for service in metric_query_services:
+            try:
+                requests = self.collect_requests(service)
+            except Exception as e:
+                # 单个策略配置异常不影响其他策略，扫描时会按原流程报错
+                logger.warning(f"策略 {service.policy.id}: 构建聚合查询失败，跳过预取: {e}")
+                continue
+            for request in requests:
+                groups[request].add(service.policy.id)
+
+        for request, policy_ids in groups.items():
+            self._consumers[request].update(policy_ids)
+            self._execute(request)
+        return {request: len(policy_ids) for request, policy_ids in groups.items()}
+
+    def fetch(self, request, policy_id=None):
+        """取回请求结果，未预取时按需查询"""
+        if policy_id is not None:
+            self._consumers[request].add(policy_id)
+        if request not in self._results and request not in self._errors:
+            self._execute(request)
+        if request in self._errors:
+            raise self._errors[request]
+        return copy.deepcopy(self._results[request])
+
+    def _execute(self, request):
+        if request in self._results or request in self._errors:
+            return
+        started = time.perf_counter()
+        try:
+            self._results[request] = self.api.query_range(request.query, request.start, request.end, request.step)
+        except Exception as e:
+            self._errors[request] = e
+        duration = time.perf_counter() - started
+        self.stats[request] = {
+            "query": request.query,
+            "step": request.step,
+            "start": request.start,
+            "end": request.end,
+            "policies": len(self._consumers[request]),
+            "series": len(self._results.get(request, {}).get("data", {}).get("result", [])),
+            "duration": duration,
+            "error": str(self._errors[request]) if request in self._errors else "",
+        }
+        logger.debug(
+            f"共享指标查询完成: policies={len(self._consumers[request])}, step={request.step}, "
+            f"耗时: {duration:.3f}s, query={request.query}"
+        )
+
+    def summary(self):
+        """查询分组统计，按耗时降序"""
+        for request, item in self.stats.items():
+            item["policies"] = len(self._consumers[request])
+        return sorted(self.stats.values(), key=lambda item: item["duration"], reverse=True)
+
+
+class RangeQueryPlanner(MetricQueryPlanner):
+    """补偿扫描查询规划器
+
+    策略落后多个周期时，各扫描窗口的聚合查询只在起止时间上相差整数个步长，
+    将其合并为一次覆盖整个缺口的 query_range，再按窗口切片返回。
+    范围查询中每个点独立求值，切片结果与逐窗口查询一致；采样点无法对齐的窗口按需单独查询。
+    """
+
+    def __init__(self, api=None):
+        super().__init__(api)
+        # (查询语句, 步长, 起始时间对步长取余) → 覆盖请求
+        self._covering = {}
+        # 覆盖请求 → [(序列标签, 时间戳列表, 原始 values)]
+        self._series_index = {}
+
+    @staticmethod
+    def _align_key(request):
+        step_seconds = parse_step_seconds(request.step)
+        if not step_seconds:
+            return None
+        return request.query, request.step, request.start % step_seconds
+
+    def prefetch_windows(self, requests):
+        """合并多个窗口的请求并执行覆盖查询
+
+        Returns:
+            int: 覆盖查询次数
+        """
+        windows = defaultdict(list)
+        for request in requests:
+            key = self._align_key(request)
+            if key is not None:
+                windows[key].append(request)
+
+        for key, items in windows.items():
+            covering = MetricQueryRequest(
+                query=key[0],
+                start=min(item.start for item in items),
+                end=max(item.end for item in items),
+                step=key[1],
+            )
+            self._covering[key] = covering
+            self._execute(covering)
+        return len(windows)
+
+    def fetch(self, request, policy_id=None):
+        key = self._align_key(request)
+        covering = self._covering.get(key) if key is not None else None
+        if covering is None or request.start < covering.start or request.end > covering.end:
+            return super().fetch(request, policy_id)
+        if policy_id is not None:
+            self._consumers[covering].add(policy_id)
+        if covering in self._errors:
+            raise self._errors[covering]
+        return self._slice(covering, request.start, request.end)
+
+    def _slice(self, covering, start, end):
+        data = self._results[covering]
+        if covering not in self._series_index:
+            self._series_index[covering] = [
+                (item.get("metric", {}), [float(value[0]) for value in item.get("values", [])], item.get("values", []))
+                for item in data.get("data", {}).get("result", [])
+            ]
+
+        result = []
+        for metric, timestamps, values in self._series_index[covering]:
+            lo = bisect.bisect_left(timestamps, start)
+            hi = bisect.bisect_right(timestamps, end)
+            if lo < hi:
+                result.append({"metric": dict(metric), "values": [list(value) for value in values[lo:hi]]})
+        sliced = {key: value for key, value in data.items() if key != "data"}
+        sliced["data"] = {**data.get("data", {}), "result": result}
+        return sliced
@@ -13,6 +13,7 @@ from apps.monitor.tasks.services.policy_scan.alert_detector import AlertDetector
 from apps.monitor.tasks.services.policy_scan.event_alert_manager import (
     EventAlertManager,
 )
+from apps.monitor.tasks.services.policy_scan.query_planner import MetricQueryPlanner, RangeQueryPlanner
 from apps.monitor.tasks.services.policy_scan.snapshot_recorder import SnapshotRecorder
 from apps.core.logger import celery_logger as logger
 
@@ -20,13 +21,13 @@ from apps.core.logger import celery_logger as logger
 class MonitorPolicyScan:
     """监控策略扫描执行器 - 负责流程编排"""
 
-    def __init__(self, policy):
+    def __init__(self, policy, planner=None):
         self.policy = policy
         self.instances_map = self._build_instances_map()
         self.baselines_map = self._build_baselines_map()
         self.active_alerts = self._get_active_alerts()
 
-        self.metric_query_service = MetricQueryService(policy, self.instances_map)
+        self.metric_query_service = MetricQueryService(policy, self.instances_map, planner)
         self.alert_detector = AlertDetector(
             policy,
             self.instances_map,
@@ -153,6 +154,54 @@ class MonitorPolicyScan:
         if not self._pre_check():
             return
 
+        self._scan_once()
+
+    def run_backfill(self, scan_times, on_step_success=None):
+        """补偿扫描：复用同一扫描上下文按时间顺序扫描多个周期
+
+        实例映射、指标配置只构建一次；各周期的聚合查询合并为一次覆盖整个缺口的范围查询，
+        逐周期在内存中切片判定。告警状态在周期间延续，因此事件与告警仍按周期依次落库（每个周期内批量写入）。
+
+        Args:
+            scan_times: 按时间升序的扫描时间点
+            on_step_success: 每个周期扫描成功后的回调，参数为该周期的扫描时间
+        """
+        if not scan_times:
+            return
+        self.policy.last_run_time = scan_times[0]
+        if not self._pre_check():
+            if on_step_success:
+                on_step_success(scan_times[-1])
+            return
+
+        planner = RangeQueryPlanner()
+        requests = []
+        for scan_time in scan_times:
+            self.policy.last_run_time = scan_time
+            requests.extend(MetricQueryPlanner.collect_requests(self.metric_query_service))
+        queries = planner.prefetch_windows(requests)
+        logger.info(f"Policy {self.policy.id}: backfill {len(scan_times)} periods with {queries} range queries")
+
+        self.metric_query_service.planner = planner
+        try:
+            for scan_time in scan_times:
+                self.policy.last_run_time = scan_time
+                self._refresh_active_alerts()
+                self._scan_once()
+                if on_step_success:
+                    on_step_success(scan_time)
+        finally:
+            self.metric_query_service.planner = None
+
+    def _refresh_active_alerts(self):
+        """上一周期可能新建/恢复了告警，重新获取活动告警并同步到各子服务"""
+        self.active_alerts = self._get_active_alerts()
+        self.alert_detector.active_alerts = self.active_alerts
+        self.event_alert_manager.active_alerts = self.active_alerts
+        self.snapshot_recorder.active_alerts = self.active_alerts
+
+    def _scan_once(self):
+        """扫描 policy.last_run_time 对应的单个周期"""
         alert_events, info_events, no_data_events = self._collect_events()
 
         self._sync_baselines(alert_events, info_events)
@@ -190,6 +239,7 @@ class MonitorPolicyScan:
 
         if metric_instances:
             PolicyBaselineService(self.policy).sync(metric_instances)
+            self.baselines_map.update(metric_instances)
 
     def _pre_check(self):
         """前置检查"""
@@ -1,7 +1,8 @@
 import math
+from dataclasses import dataclass, field
 from string import Template
 
-import pandas as pd
+import numpy as np
 
 from apps.core.exceptions.base_app_exception import BaseAppException
 from apps.monitor.constants.alert_policy import AlertConstants
@@ -14,25 +15,6 @@ from apps.monitor.utils.dimension import (
 )
 
 
-def vm_to_dataframe(vm_data, instance_id_keys=None):
-    df = pd.json_normalize(vm_data, sep="_")
-
-    metric_cols = [col for col in df.columns if col.startswith("metric_")]
-
-    if instance_id_keys:
-        selected_cols = [
-            f"metric_{key}"
-            for key in instance_id_keys
-            if f"metric_{key}" in metric_cols
-        ]
-    else:
-        selected_cols = ["metric_instance_id"]
-
-    df["instance_id"] = df[selected_cols].apply(lambda row: tuple(row), axis=1)
-
-    return df
-
-
 def _format_value_with_unit(
     value: float, unit: str, enum_value_map: dict = None
 ) -> str:
@@ -58,8 +40,89 @@ def _parse_finite_float(value):
     return number
 
 
-def calculate_alerts(alert_name, df, thresholds, template_context=None, n=1):
-    alert_events, info_events = [], []
+@dataclass
+class VmSeriesBatch:
+    """VM 查询结果的列式表示，只保留末尾 n 个点均为有限数值的序列"""
+
+    instance_ids: list = field(default_factory=list)
+    metrics: list = field(default_factory=list)
+    values: list = field(default_factory=list)
+    matrix: np.ndarray = field(default_factory=lambda: np.empty((0, 0)))
+
+    def __len__(self):
+        return len(self.instance_ids)
+
+
+def parse_vm_series(vm_result, instance_id_keys=None, n=1) -> VmSeriesBatch:
+    """把 VM 查询结果直接解析为 (序列数, n) 数值矩阵
+
+    实例键只取结果中出现过的标签（未配置 instance_id_keys 时为 instance_id）；
+    个别序列缺失的标签在实例键元组中按 NaN 补齐。
+    """
+    if instance_id_keys:
+        present = set()
+        for item in vm_result:
+            present.update(item.get("metric", {}).keys())
+        keys = [key for key in instance_id_keys if key in present]
+    else:
+        keys = ["instance_id"]
+
+    batch = VmSeriesBatch()
+    rows = []
+    nan = float("nan")
+    for item in vm_result:
+        values = item.get("values", [])[-n:]
+        if len(values) < n:
+            continue
+        numeric_values = [_parse_finite_float(value[1]) for value in values]
+        if any(value is None for value in numeric_values):
+            continue
+        metric = item.get("metric", {})
+        batch.instance_ids.append(tuple(metric.get(key, nan) for key in keys))
+        batch.metrics.append(metric)
+        batch.values.append(values)
+        rows.append(numeric_values)
+    batch.matrix = np.array(rows, dtype=float).reshape(len(rows), n)
+    return batch
+
+
+def evaluate_threshold_levels(matrix, thresholds):
+    """对所有序列向量化判定阈值等级
+
+    阈值按等级权重从高到低依次比较，序列的 n 个点全部满足即命中，已命中更高等级的序列不再参与。
+
+    Returns:
+        tuple: (排序后的阈值列表, 每条序列命中的阈值下标数组，未命中为 -1)
+    """
+    sorted_thresholds = sorted(
+        thresholds,
+        key=lambda item: AlertConstants.LEVEL_WEIGHT.get(item.get("level"), 0),
+        reverse=True,
+    )
+    level_index = np.full(len(matrix), -1, dtype=int)
+    for index, threshold_info in enumerate(sorted_thresholds):
+        pending = level_index < 0
+        if not pending.any():
+            break
+        method = AlertConstants.THRESHOLD_METHODS.get(threshold_info["method"])
+        if not method:
+            raise BaseAppException(
+                f"Invalid threshold method: {threshold_info['method']}"
+            )
+        hit = np.all(method(matrix, threshold_info["value"]), axis=1) & pending
+        level_index[hit] = index
+    return sorted_thresholds, level_index
+
+
+def calculate_alerts_columnar(alert_name, vm_result, thresholds, template_context=None, n=1):
+    """按阈值计算告警，输入为 VM 查询结果列表，返回 (告警事件, info 事件)
+
+    阈值判定在数值矩阵上一次完成，只有命中阈值的序列渲染告警内容；
+    未命中的序列生成 info 事件（恢复计数、基准同步与快照依赖）。
+
+    raw_data 为该序列自身的标签（metric_<label>）加 values、instance_id，
+    不再像原 DataFrame 实现那样为其它序列才有的标签补 NaN 键（NaN 也无法写入 JSON 字段）。
+    """
     template_context = template_context or {}
     instances_map = template_context.get("instances_map", {})
     instance_id_keys = template_context.get("instance_id_keys", [])
@@ -68,86 +131,28 @@ def calculate_alerts(alert_name, df, thresholds, template_context=None, n=1):
     dimension_name_map = template_context.get("dimension_name_map", {})
     monitor_instance_id_key = template_context.get("monitor_instance_id_key")
 
-    for _, row in df.iterrows():
-        instance_id_tuple = row["instance_id"]
-        metric_instance_id = str(instance_id_tuple)
+    batch = parse_vm_series(vm_result, instance_id_keys, n)
+    if not len(batch):
+        return [], []
+    sorted_thresholds, level_index = evaluate_threshold_levels(batch.matrix, thresholds)
 
+    alert_events, info_events = [], []
+    sub_dimension_keys = [k for k in instance_id_keys if k != "instance_id"]
+    template = Template(alert_name)
+    for i, instance_id_tuple in enumerate(batch.instance_ids):
+        metric_instance_id = str(instance_id_tuple)
         dimensions = build_dimensions(instance_id_tuple, instance_id_keys)
         monitor_instance_id = _extract_monitor_instance_id_by_key(
             instance_id_tuple,
             instance_id_keys,
             monitor_instance_id_key,
         )
-        resource_name = instances_map.get(monitor_instance_id, monitor_instance_id)
-        dimension_str = format_dimension_str(dimensions, instance_id_keys)
-        display_name = (
-            f"{resource_name} - {dimension_str}" if dimension_str else resource_name
-        )
-        sub_dimension_keys = [k for k in instance_id_keys if k != "instance_id"]
-        dimension_value = format_dimension_value(
-            dimensions,
-            ordered_keys=sub_dimension_keys,
-            name_map=dimension_name_map,
-        )
-
-        values = row["values"][-n:]
-        if len(values) < n:
-            continue
-        numeric_values = [_parse_finite_float(value[1]) for value in values]
-        if any(value is None for value in numeric_values):
-            continue
-
-        raw_data = row.to_dict()
+        values = batch.values[i]
+        raw_data = {f"metric_{key}": value for key, value in batch.metrics[i].items()}
         raw_data["values"] = values
+        raw_data["instance_id"] = instance_id_tuple
 
-        alert_triggered = False
-        sorted_thresholds = sorted(
-            thresholds,
-            key=lambda item: AlertConstants.LEVEL_WEIGHT.get(item.get("level"), 0),
-            reverse=True,
-        )
-        for threshold_info in sorted_thresholds:
-            method = AlertConstants.THRESHOLD_METHODS.get(threshold_info["method"])
-            if not method:
-                raise BaseAppException(
-                    f"Invalid threshold method: {threshold_info['method']}"
-                )
-
-            if all(method(value, threshold_info["value"]) for value in numeric_values):
-                alert_value = numeric_values[-1]
-                formatted_value = _format_value_with_unit(
-                    alert_value, display_unit, enum_value_map
-                )
-                context = {
-                    **raw_data,
-                    "monitor_object": template_context.get("monitor_object", ""),
-                    "instance_name": display_name,
-                    "resource_name": resource_name,
-                    "metric_name": template_context.get("metric_name", ""),
-                    "level": threshold_info["level"],
-                    "value": formatted_value,
-                    "dimension_value": dimension_value,
-                }
-                context.update(build_metric_template_vars(dimensions))
-
-                template = Template(alert_name)
-                content = template.safe_substitute(context)
-
-                event = {
-                    "metric_instance_id": metric_instance_id,
-                    "monitor_instance_id": monitor_instance_id,
-                    "dimensions": dimensions,
-                    "value": alert_value,
-                    "timestamp": values[-1][0],
-                    "level": threshold_info["level"],
-                    "content": content,
-                    "raw_data": raw_data,
-                }
-                alert_events.append(event)
-                alert_triggered = True
-                break
-
-        if not alert_triggered:
+        if level_index[i] < 0:
             info_events.append(
                 {
                     "metric_instance_id": metric_instance_id,
@@ -160,6 +165,43 @@ def calculate_alerts(alert_name, df, thresholds, template_context=None, n=1):
                     "raw_data": raw_data,
                 }
             )
+            continue
+
+        threshold_info = sorted_thresholds[level_index[i]]
+        resource_name = instances_map.get(monitor_instance_id, monitor_instance_id)
+        dimension_str = format_dimension_str(dimensions, instance_id_keys)
+        display_name = (
+            f"{resource_name} - {dimension_str}" if dimension_str else resource_name
+        )
+        alert_value = float(batch.matrix[i, -1])
+        context = {
+            **raw_data,
+            "monitor_object": template_context.get("monitor_object", ""),
+            "instance_name": display_name,
+            "resource_name": resource_name,
+            "metric_name": template_context.get("metric_name", ""),
+            "level": threshold_info["level"],
+            "value": _format_value_with_unit(alert_value, display_unit, enum_value_map),
+            "dimension_value": format_dimension_value(
+                dimensions,
+                ordered_keys=sub_dimension_keys,
+                name_map=dimension_name_map,
+            ),
+        }
+        context.update(build_metric_template_vars(dimensions))
+
+        alert_events.append(
+            {
+                "metric_instance_id": metric_instance_id,
+                "monitor_instance_id": monitor_instance_id,
+                "dimensions": dimensions,
+                "value": alert_value,
+                "timestamp": values[-1][0],
+                "level": threshold_info["level"],
+                "content": template.safe_substitute(context),
+                "raw_data": raw_data,
+            }
+        )
 
     return alert_events, info_events
 
@@ -136,9 +136,10 @@ class TestGetConfigContent:
     def test_child_toml_config(self, mocker):
         cfg = self._mk_config(is_child=True, file_type="toml")
         node = mocker.patch("apps.monitor.services.node_mgmt.NodeMgmt")
-        node.return_value.get_child_configs_by_ids.return_value = [
-            {"id": cfg.id, "content": '[[inputs.snmp]]\nagents=["x"]'}
-        ]
+        node.return_value.get_configs_and_child_configs_by_ids.return_value = (
+            [],
+            [{"id": cfg.id, "content": '[[inputs.snmp]]\nagents=["x"]'}],
+        )
         out = SVC.get_config_content([cfg.id])
         assert "child" in out
         assert isinstance(out["child"]["content"], dict)
@@ -146,21 +147,68 @@ class TestGetConfigContent:
     def test_base_yaml_config(self, mocker):
         cfg = self._mk_config(is_child=False, file_type="yaml")
         node = mocker.patch("apps.monitor.services.node_mgmt.NodeMgmt")
-        node.return_value.get_configs_by_ids.return_value = [
-            {"id": cfg.id, "config_template": "key: value"}
-        ]
+        node.return_value.get_configs_and_child_configs_by_ids.return_value = (
+            [{"id": cfg.id, "config_template": "key: value"}],
+            [],
+        )
         out = SVC.get_config_content([cfg.id])
         assert "base" in out
         assert out["base"]["content"] == {"key": "value"}
+        node.return_value.get_configs_and_child_configs_by_ids.assert_called_once_with([cfg.id], [])
 
     def test_invalid_file_type_raises(self, mocker):
         cfg = self._mk_config(is_child=True, file_type="ini")
         node = mocker.patch("apps.monitor.services.node_mgmt.NodeMgmt")
-        node.return_value.get_child_configs_by_ids.return_value = [{"id": cfg.id, "content": "x"}]
+        node.return_value.get_configs_and_child_configs_by_ids.return_value = ([], [{"id": cfg.id, "content": "x"}])
         with pytest.raises(BaseAppException):
             SVC.get_config_content([cfg.id])
 
 
+class TestUpdateInstanceConfig:
+    def _mk_pair(self):
+        obj = MonitorObject.objects.create(name="UICObj", level="base")
+        plugin = MonitorPlugin.objects.create(name="UICPlugin")
+        inst = MonitorInstance.objects.create(id="('uic',)", name="uic", monitor_object=obj)
+        base = CollectConfig.objects.create(
+            id="uic-base", monitor_instance=inst, monitor_plugin=plugin,
+            collector="Telegraf", collect_type="snmp", config_type="base", file_type="yaml", is_child=False,
+        )
+        child = CollectConfig.objects.create(
+            id="uic-child", monitor_instance=inst, monitor_plugin=plugin,
+            collector="Telegraf", collect_type="snmp", config_type="child", file_type="toml", is_child=True,
+        )
+        return base, child
+
+    def test_base_and_child_sent_in_one_batch(self, mocker):
+        base, child = self._mk_pair()
+        node = mocker.patch("apps.monitor.services.node_mgmt.NodeMgmt")
+
+        SVC.update_instance_config(
+            {
+                "id": child.id,
+                "content": {"plugin": ["inputs", "snmp"], "config": {"a": 1}},
+                "env_config": {"k": "v"},
+            },
+            {"id": base.id, "content": {"key": "value"}},
+        )
+
+        node.return_value.update_config_contents.assert_called_once()
+        base_update, child_update = node.return_value.update_config_contents.call_args.args
+        assert base_update["id"] == base.id and "key: value" in base_update["content"]
+        assert child_update["id"] == child.id and "a = 1" in child_update["content"]
+        assert child_update["env_config"] == {"k": "v"}
+
+    def test_unknown_child_only_updates_base(self, mocker):
+        base, _ = self._mk_pair()
+        node = mocker.patch("apps.monitor.services.node_mgmt.NodeMgmt")
+
+        SVC.update_instance_config({"id": "missing", "content": {}}, {"id": base.id, "content": {}})
+
+        base_update, child_update = node.return_value.update_config_contents.call_args.args
+        assert base_update["id"] == base.id
+        assert child_update is None
+
+
 class TestEnsureInstanceAccess:
     def test_missing_instance_raises(self):
         with pytest.raises(BaseAppException):
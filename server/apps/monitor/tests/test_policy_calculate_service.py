@@ -1,12 +1,14 @@
-"""policy_calculate 测试 — VM 结果转 DataFrame 与阈值告警计算的真实逻辑。"""
+"""policy_calculate 测试 — VM 结果解析与阈值告警计算的真实逻辑。"""
+
+import time
 
 import pytest
 
 from apps.core.exceptions.base_app_exception import BaseAppException
 from apps.monitor.tasks.utils.policy_calculate import (
-    vm_to_dataframe,
     _format_value_with_unit,
-    calculate_alerts,
+    calculate_alerts_columnar,
+    parse_vm_series,
 )
 
 pytestmark = pytest.mark.unit
@@ -19,14 +21,15 @@ def _vm_rows():
     ]
 
 
-def test_vm_to_dataframe_default_instance_id_col():
-    df = vm_to_dataframe(_vm_rows())
-    assert list(df["instance_id"]) == [("h1",), ("h2",)]
+def test_parse_vm_series_default_instance_id_col():
+    batch = parse_vm_series(_vm_rows())
+    assert batch.instance_ids == [("h1",), ("h2",)]
 
 
-def test_vm_to_dataframe_with_instance_id_keys():
-    df = vm_to_dataframe(_vm_rows(), instance_id_keys=["instance_id", "device"])
-    assert list(df["instance_id"]) == [("h1", "eth0"), ("h2", "eth1")]
+def test_parse_vm_series_with_instance_id_keys():
+    batch = parse_vm_series(_vm_rows(), instance_id_keys=["instance_id", "device"], n=2)
+    assert batch.instance_ids == [("h1", "eth0"), ("h2", "eth1")]
+    assert batch.matrix.tolist() == [[10.0, 20.0], [1.0, 2.0]]
 
 
 def test_format_value_none_returns_na():
@@ -50,7 +53,7 @@ def test_format_value_without_unit():
 
 
 def test_calculate_alerts_triggers_above_threshold():
-    df = vm_to_dataframe(
+    series = (
         [
             {"metric": {"instance_id": "h1"}, "values": [[1, "90"], [2, "95"]]},
         ]
@@ -63,7 +66,7 @@ def test_calculate_alerts_triggers_above_threshold():
         "display_unit": "%",
         "instances_map": {"('h1',)": "主机1"},
     }
-    alerts, infos = calculate_alerts("$instance_name $value", df, thresholds, ctx, n=2)
+    alerts, infos = calculate_alerts_columnar("$instance_name $value", series, thresholds, ctx, n=2)
     assert len(alerts) == 1
     assert infos == []
     a = alerts[0]
@@ -74,14 +77,14 @@ def test_calculate_alerts_triggers_above_threshold():
 
 
 def test_calculate_alerts_below_threshold_goes_to_info():
-    df = vm_to_dataframe(
+    series = (
         [
             {"metric": {"instance_id": "h1"}, "values": [[1, "10"], [2, "20"]]},
         ]
     )
     thresholds = [{"method": ">", "value": 80, "level": "error"}]
     ctx = {"instance_id_keys": ["instance_id"]}
-    alerts, infos = calculate_alerts("x", df, thresholds, ctx, n=2)
+    alerts, infos = calculate_alerts_columnar("x", series, thresholds, ctx, n=2)
     assert alerts == []
     assert len(infos) == 1
     assert infos[0]["level"] == "info"
@@ -90,42 +93,42 @@ def test_calculate_alerts_below_threshold_goes_to_info():
 
 @pytest.mark.parametrize("bad_value", ["inf", "-inf", "nan"])
 def test_calculate_alerts_skips_non_finite_values(bad_value):
-    df = vm_to_dataframe(
+    series = (
         [
             {"metric": {"instance_id": "h1"}, "values": [[1, "90"], [2, bad_value]]},
         ]
     )
     thresholds = [{"method": ">", "value": 80, "level": "error"}]
-    alerts, infos = calculate_alerts("x", df, thresholds, {"instance_id_keys": ["instance_id"]}, n=2)
+    alerts, infos = calculate_alerts_columnar("x", series, thresholds, {"instance_id_keys": ["instance_id"]}, n=2)
 
     assert alerts == []
     assert infos == []
 
 
 def test_calculate_alerts_skips_rows_with_insufficient_values():
-    df = vm_to_dataframe(
+    series = (
         [
             {"metric": {"instance_id": "h1"}, "values": [[1, "90"]]},
         ]
     )
     thresholds = [{"method": ">", "value": 80, "level": "error"}]
-    alerts, infos = calculate_alerts("x", df, thresholds, {"instance_id_keys": ["instance_id"]}, n=3)
+    alerts, infos = calculate_alerts_columnar("x", series, thresholds, {"instance_id_keys": ["instance_id"]}, n=3)
     assert alerts == [] and infos == []
 
 
 def test_calculate_alerts_invalid_threshold_method_raises():
-    df = vm_to_dataframe(
+    series = (
         [
             {"metric": {"instance_id": "h1"}, "values": [[1, "90"], [2, "95"]]},
         ]
     )
     thresholds = [{"method": "~=", "value": 1, "level": "error"}]
     with pytest.raises(BaseAppException, match="Invalid threshold method"):
-        calculate_alerts("x", df, thresholds, {"instance_id_keys": ["instance_id"]}, n=2)
+        calculate_alerts_columnar("x", series, thresholds, {"instance_id_keys": ["instance_id"]}, n=2)
 
 
 def test_calculate_alerts_first_matching_threshold_wins():
-    df = vm_to_dataframe(
+    series = (
         [
             {"metric": {"instance_id": "h1"}, "values": [[1, "95"], [2, "96"]]},
         ]
@@ -134,6 +137,81 @@ def test_calculate_alerts_first_matching_threshold_wins():
         {"method": ">", "value": 90, "level": "error"},
         {"method": ">", "value": 80, "level": "warning"},
     ]
-    alerts, _ = calculate_alerts("x", df, thresholds, {"instance_id_keys": ["instance_id"]}, n=2)
+    alerts, _ = calculate_alerts_columnar("x", series, thresholds, {"instance_id_keys": ["instance_id"]}, n=2)
     assert len(alerts) == 1
     assert alerts[0]["level"] == "error"
+
+
+def _mixed_series(count):
+    series = []
+    for i in range(count):
+        values = [[t, str((i * 7 + t) % 100)] for t in range(1, 4)]
+        if i % 50 == 0:
+            values[-1][1] = "NaN"
+        series.append({"metric": {"instance_id": f"h{i}", "device": f"eth{i % 3}"}, "values": values})
+    series.append({"metric": {"instance_id": "short"}, "values": [[3, "99"]]})
+    return series
+
+
+def test_columnar_levels_and_raw_data():
+    thresholds = [
+        {"method": ">=", "value": 60, "level": "warning"},
+        {"method": ">", "value": 90, "level": "critical"},
+    ]
+    ctx = {
+        "instance_id_keys": ["instance_id", "device", "missing"],
+        "instances_map": {"('h3',)": "主机3"},
+        "monitor_instance_id_key": "instance_id",
+        "display_unit": "%",
+    }
+    series = _mixed_series(300)
+
+    alerts, infos = calculate_alerts_columnar("$instance_name $value $level", series, thresholds, ctx, n=2)
+
+    # NaN 末点与点数不足的序列被跳过
+    assert len(alerts) + len(infos) == 300 - 6
+    by_id = {event["metric_instance_id"]: event for event in alerts + infos}
+    assert by_id[str(("h3", "eth0"))]["level"] == "info"
+    assert by_id[str(("h9", "eth0"))]["level"] == "warning"
+    critical = by_id[str(("h13", "eth1"))]
+    assert critical["level"] == "critical"
+    assert critical["value"] == 94.0
+    assert critical["content"].endswith("94.00% critical")
+    # raw_data 只包含该序列自身的标签，不为缺失标签补 NaN 键
+    assert critical["raw_data"] == {
+        "metric_instance_id": "h13",
+        "metric_device": "eth1",
+        "values": [[2, "93"], [3, "94"]],
+        "instance_id": ("h13", "eth1"),
+    }
+    info = by_id[str(("h1", "eth1"))]
+    assert info["level"] == "info"
+    assert info["raw_data"] == {
+        "metric_instance_id": "h1",
+        "metric_device": "eth1",
+        "values": [[2, "9"], [3, "10"]],
+        "instance_id": ("h1", "eth1"),
+    }
+
+
+def test_columnar_invalid_threshold_method_raises():
+    with pytest.raises(BaseAppException):
+        calculate_alerts_columnar("x", _vm_rows(), [{"method": "??", "value": 1, "level": "error"}])
+
+
+def test_columnar_empty_result():
+    assert calculate_alerts_columnar("x", [], [{"method": ">", "value": 1, "level": "error"}]) == ([], [])
+
+
+@pytest.mark.slow
+def test_benchmark_columnar_50k_series():
+    series = _mixed_series(50000)
+    thresholds = [{"method": ">", "value": 95, "level": "critical"}]
+    ctx = {"instance_id_keys": ["instance_id", "device"]}
+
+    started = time.perf_counter()
+    alerts, infos = calculate_alerts_columnar("x", series, thresholds, ctx, n=3)
+    elapsed = time.perf_counter() - started
+
+    assert len(alerts) + len(infos) == 50000 - 1000
+    assert elapsed < 5
@@ -0,0 +1,245 @@
+"""跨策略共享指标查询与补偿范围查询规格测试。
+
+关键不变量：共享查询语句与逐策略查询完全一致；相同 (查询, 时间范围, 步长) 只查询一次，
+结果按各策略实例范围各自过滤、互不影响；查询失败对同组策略一致抛出且不重复查询；
+补偿扫描整个缺口只查询一次，按窗口切片的结果与逐窗口查询一致，告警状态在周期间延续。
+"""
+
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from apps.monitor.models import MonitorAlert, MonitorEvent, MonitorInstance
+from apps.monitor.models.monitor_object import MonitorObject
+from apps.monitor.models.monitor_policy import MonitorPolicy
+from apps.monitor.tasks.monitor_policy import scan_policies_batch, scan_policy_task
+from apps.monitor.tasks.services.policy_scan.metric_query import MetricQueryService
+from apps.monitor.tasks.services.policy_scan.query_planner import MetricQueryPlanner, RangeQueryPlanner
+from apps.monitor.tasks.services.policy_scan.scanner import MonitorPolicyScan
+
+LAST_RUN = datetime(2026, 1, 1, tzinfo=timezone.utc)
+PERIOD = {"type": "min", "value": 5}
+
+
+def _policy(policy_id=1, **kwargs):
+    base = dict(
+        id=policy_id,
+        query_condition={"type": "pmq", "query": "cpu_usage"},
+        collect_type="",
+        group_by=["instance_id"],
+        algorithm="max",
+        metric_unit="",
+        calculation_unit="",
+        period=PERIOD,
+        trigger_count=1,
+        enable_alerts=["threshold"],
+        no_data_period={},
+        no_data_recovery_period={},
+        source={},
+        last_run_time=LAST_RUN,
+    )
+    base.update(kwargs)
+    return SimpleNamespace(**base)
+
+
+class FakeAPI:
+    def __init__(self, result=None, error=None, latency=0.0):
+        self.calls = []
+        self.result = result if result is not None else {"data": {"result": []}}
+        self.error = error
+        self.latency = latency
+
+    def query_range(self, query, start, end, step):
+        self.calls.append((query, start, end, step))
+        if self.latency:
+            time.sleep(self.latency)
+        if self.error:
+            raise self.error
+        return self.result
+
+
+def test_shared_request_matches_per_policy_query(mocker):
+    query_range = mocker.patch(
+        "apps.monitor.tasks.utils.policy_methods.VictoriaMetricsAPI.query_range", return_value={}
+    )
+    service = MetricQueryService(_policy(group_algorithm="avg", algorithm="max_over_time"), {})
+
+    service.query_aggregation_metrics(PERIOD, 2)
+    request = service.build_aggregation_request(PERIOD, 2)
+
+    assert query_range.call_args.args == (request.query, request.start, request.end, request.step)
+
+
+def test_identical_queries_are_executed_once_and_copied_per_policy():
+    api = FakeAPI({"data": {"result": [{"metric": {"instance_id": "h1"}, "values": [[1, "5"]]}]}})
+    planner = MetricQueryPlanner(api)
+    services = [MetricQueryService(_policy(i), {}, planner) for i in range(1, 4)]
+    services.append(MetricQueryService(_policy(4, query_condition={"type": "pmq", "query": "mem_usage"}), {}, planner))
+
+    assert sorted(planner.prefetch(services).values()) == [1, 3]
+    first = services[0].query_aggregation_metrics(PERIOD)
+    first["data"]["result"][0]["values"][0][1] = "999"
+
+    assert services[1].query_aggregation_metrics(PERIOD)["data"]["result"][0]["values"][0][1] == "5"
+    assert len(api.calls) == 2
+    assert {item["policies"] for item in planner.summary()} == {1, 3}
+
+
+def test_failed_group_raises_for_each_policy_without_requerying():
+    api = FakeAPI(error=RuntimeError("vm down"))
+    planner = MetricQueryPlanner(api)
+    services = [MetricQueryService(_policy(i), {}, planner) for i in range(1, 3)]
+    planner.prefetch(services)
+
+    for service in services:
+        with pytest.raises(RuntimeError):
+            service.query_aggregation_metrics(PERIOD)
+    assert len(api.calls) == 1
+    assert planner.summary()[0]["error"] == "vm down"
+
+
+@pytest.mark.django_db
+def test_batch_scan_fans_out_one_query_by_policy_scope(mocker):
+    obj = MonitorObject.objects.create(name="BatchObj", level="base", instance_id_keys=["instance_id"])
+    for host in ("h1", "h2"):
+        MonitorInstance.objects.create(id=f"('{host}',)", name=host, monitor_object=obj)
+    policies = [
+        MonitorPolicy.objects.create(
+            monitor_object=obj,
+            name=f"p-{host}",
+            algorithm="max_over_time",
+            group_algorithm="max",
+            query_condition={"type": "pmq", "query": "cpu_usage"},
+            source={"type": "instance", "values": [f"('{host}',)"]},
+            group_by=["instance_id"],
+            period=PERIOD,
+            threshold=[{"method": ">", "value": 80, "level": "critical"}],
+            alert_name="$instance_name 超阈值",
+            enable_alerts=["threshold"],
+            last_run_time=datetime.now(timezone.utc) - timedelta(minutes=5),
+        )
+        for host in ("h1", "h2")
+    ]
+    series = [{"metric": {"instance_id": host}, "values": [[1, "95"]]} for host in ("h1", "h2")]
+    api = mocker.patch("apps.monitor.tasks.services.policy_scan.query_planner.VictoriaMetricsAPI").return_value
+    api.query_range.return_value = {"data": {"result": series}}
+    created = {}
+
+    def record(scan, events):
+        created[scan.policy.id] = {event["monitor_instance_id"] for event in events}
+        return [], []
+
+    mocker.patch.object(MonitorPolicyScan, "_create_events_alerts_and_notify", autospec=True, side_effect=record)
+
+    current_time = datetime.now(timezone.utc)
+    result = scan_policies_batch(policies, current_time)
+
+    assert api.query_range.call_count == 1
+    assert result["scans"] == 2 and result["failed"] == []
+    assert created == {policies[0].id: {"('h1',)"}, policies[1].id: {"('h2',)"}}
+    assert MonitorPolicy.objects.get(id=policies[0].id).last_run_time == current_time
+
+
+@pytest.mark.slow
+def test_benchmark_1k_policies_share_queries():
+    policy_count, metric_count, latency = 1000, 10, 0.002
+    policies = [
+        _policy(i, query_condition={"type": "pmq", "query": f"metric_{i % metric_count}"}) for i in range(policy_count)
+    ]
+
+    shared_api = FakeAPI(latency=latency)
+    planner = MetricQueryPlanner(shared_api)
+    started = time.perf_counter()
+    services = [MetricQueryService(policy, {}, planner) for policy in policies]
+    planner.prefetch(services)
+    for service in services:
+        service.query_aggregation_metrics(PERIOD)
+    shared_elapsed = time.perf_counter() - started
+
+    per_policy_api = FakeAPI(latency=latency)
+    started = time.perf_counter()
+    for policy in policies:
+        request = MetricQueryService(policy, {}).build_aggregation_request(PERIOD)
+        per_policy_api.query_range(request.query, request.start, request.end, request.step)
+    per_policy_elapsed = time.perf_counter() - started
+
+    assert len(shared_api.calls) == metric_count
+    assert len(per_policy_api.calls) == policy_count
+    assert shared_elapsed < per_policy_elapsed
+
+
+class RangeAPI(FakeAPI):
+    """按区间生成对齐步长的采样点，值为时间戳本身"""
+
+    def query_range(self, query, start, end, step):
+        self.calls.append((query, start, end, step))
+        values = [[ts, str(ts)] for ts in range(start, end + 1, 300)]
+        return {"status": "success", "data": {"resultType": "matrix", "result": [{"metric": {"instance_id": "h1"}, "values": values}]}}
+
+
+def test_range_planner_slices_match_per_window_queries():
+    api = RangeAPI()
+    planner = RangeQueryPlanner(api)
+    service = MetricQueryService(_policy(trigger_count=2), {}, planner)
+    scan_times = [LAST_RUN + timedelta(minutes=5 * i) for i in range(1, 6)]
+
+    requests = []
+    for scan_time in scan_times:
+        service.policy.last_run_time = scan_time
+        requests.extend(MetricQueryPlanner.collect_requests(service))
+    assert planner.prefetch_windows(requests) == 1
+
+    for request in requests:
+        assert planner.fetch(request) == RangeAPI().query_range(request.query, request.start, request.end, request.step)
+    assert len(api.calls) == 1
+
+
+def test_range_planner_queries_misaligned_window_separately():
+    api = RangeAPI()
+    planner = RangeQueryPlanner(api)
+    service = MetricQueryService(_policy(), {}, planner)
+    planner.prefetch_windows([service.build_aggregation_request(PERIOD)])
+
+    service.policy.last_run_time = LAST_RUN + timedelta(seconds=30)
+    service.query_aggregation_metrics(PERIOD)
+
+    assert len(api.calls) == 2
+
+
+@pytest.mark.django_db
+def test_backfill_issues_one_range_query_and_keeps_alert_state(mocker):
+    obj = MonitorObject.objects.create(name="BackfillObj", level="base", instance_id_keys=["instance_id"])
+    MonitorInstance.objects.create(id="('h1',)", name="h1", monitor_object=obj)
+    last_run_time = datetime.now(timezone.utc).replace(microsecond=0) - timedelta(minutes=16)
+    policy = MonitorPolicy.objects.create(
+        monitor_object=obj,
+        name="backfill",
+        algorithm="max_over_time",
+        group_algorithm="max",
+        query_condition={"type": "pmq", "query": "cpu_usage"},
+        source={"type": "instance", "values": ["('h1',)"]},
+        group_by=["instance_id"],
+        period=PERIOD,
+        threshold=[{"method": ">", "value": 80, "level": "critical"}],
+        alert_name="$instance_name 超阈值",
+        enable_alerts=["threshold"],
+        last_run_time=last_run_time,
+    )
+
+    def query_range(query, start, end, step):
+        values = [[ts, "95"] for ts in range(start, end + 1, 300)]
+        return {"status": "success", "data": {"result": [{"metric": {"instance_id": "h1"}, "values": values}]}}
+
+    api = mocker.patch("apps.monitor.tasks.services.policy_scan.query_planner.VictoriaMetricsAPI").return_value
+    api.query_range.side_effect = query_range
+    mocker.patch("apps.monitor.tasks.services.policy_scan.event_alert_manager.MonitorEventRawData.objects.bulk_create")
+
+    scan_policy_task(policy.id)
+
+    assert api.query_range.call_count == 1
+    assert MonitorAlert.objects.filter(policy_id=policy.id).count() == 1
+    assert MonitorEvent.objects.filter(policy_id=policy.id).count() == 3
+    policy.refresh_from_db()
+    assert policy.last_run_time == last_run_time + timedelta(minutes=15)
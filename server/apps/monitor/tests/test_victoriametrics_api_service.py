@@ -1,4 +1,4 @@
-"""VictoriaMetricsAPI 测试 — mock requests 边界,校验 URL/params/auth 入参与异常透传。"""
+"""VictoriaMetricsAPI 测试 — mock 共享连接池会话边界,校验 URL/params/auth 入参与异常透传。"""
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -18,42 +18,42 @@ def _resp(payload):
 
 def test_query_builds_path_and_params():
     api = VictoriaMetricsAPI()
-    with patch("apps.monitor.utils.victoriametrics_api.requests.get", return_value=_resp({"ok": 1})) as g:
+    with patch.object(api.client.session, "request", return_value=_resp({"ok": 1})) as g:
         out = api.query("cpu", step="1m", time=12345)
     assert out == {"ok": 1}
     args, kwargs = g.call_args
-    assert args[0].endswith("/api/v1/query")
+    assert args[0] == "GET" and args[1].endswith("/api/v1/query")
     assert kwargs["params"] == {"query": "cpu", "step": "1m", "time": 12345}
     assert kwargs["auth"] == (api.username, api.password)
 
 
 def test_query_omits_empty_step_and_time():
     api = VictoriaMetricsAPI()
-    with patch("apps.monitor.utils.victoriametrics_api.requests.get", return_value=_resp({})) as g:
+    with patch.object(api.client.session, "request", return_value=_resp({})) as g:
         api.query("cpu", step=None, time=None)
     assert g.call_args.kwargs["params"] == {"query": "cpu"}
 
 
 def test_query_range_builds_params():
     api = VictoriaMetricsAPI()
-    with patch("apps.monitor.utils.victoriametrics_api.requests.get", return_value=_resp({"r": []})) as g:
+    with patch.object(api.client.session, "request", return_value=_resp({"r": []})) as g:
         out = api.query_range("cpu", "s", "e", step="30s")
     assert out == {"r": []}
     args, kwargs = g.call_args
-    assert args[0].endswith("/api/v1/query_range")
+    assert args[1].endswith("/api/v1/query_range")
     assert kwargs["params"] == {"query": "cpu", "start": "s", "end": "e", "step": "30s"}
 
 
 def test_timeout_is_propagated():
     api = VictoriaMetricsAPI()
-    with patch("apps.monitor.utils.victoriametrics_api.requests.get", side_effect=requests.Timeout("boom")):
+    with patch.object(api.client.session, "request", side_effect=requests.Timeout("boom")):
         with pytest.raises(requests.Timeout):
             api.query("cpu")
 
 
 def test_request_exception_is_propagated():
     api = VictoriaMetricsAPI()
-    with patch("apps.monitor.utils.victoriametrics_api.requests.get", side_effect=requests.ConnectionError("x")):
+    with patch.object(api.client.session, "request", side_effect=requests.ConnectionError("x")):
         with pytest.raises(requests.RequestException):
             api.query_range("cpu", "s", "e")
 
@@ -62,6 +62,30 @@ def test_http_error_raised_via_raise_for_status():
     api = VictoriaMetricsAPI()
     r = MagicMock()
     r.raise_for_status.side_effect = requests.HTTPError("500")
-    with patch("apps.monitor.utils.victoriametrics_api.requests.get", return_value=r):
+    with patch.object(api.client.session, "request", return_value=r):
         with pytest.raises(requests.HTTPError):
             api.query("cpu")
+
+
+def test_query_range_splits_long_span_and_merges_series():
+    api = VictoriaMetricsAPI()
+
+    def fake_request(method, url, params=None, **kwargs):
+        values = [[ts, str(ts)] for ts in range(params["start"], params["end"] + 1, 60)]
+        return _resp({"status": "success", "data": {"resultType": "matrix", "result": [{"metric": {"i": "a"}, "values": values}]}})
+
+    with patch.object(api.client.session, "request", side_effect=fake_request) as g:
+        out = api.query_range("cpu", 0, 60 * 3000, step="1m")
+
+    assert g.call_count == 3
+    values = out["data"]["result"][0]["values"]
+    assert [v[0] for v in values] == list(range(0, 60 * 3000 + 1, 60))
+
+
+def test_query_many_keeps_order():
+    api = VictoriaMetricsAPI()
+    with patch.object(
+        api.client.session, "request", side_effect=lambda method, url, params=None, **kw: _resp({"q": params["query"]})
+    ):
+        out = api.query_many(["a", "b", "c"])
+    assert out == [{"q": "a"}, {"q": "b"}, {"q": "c"}]
@@ -1,6 +1,7 @@
 import requests
 
 from apps.core.logger import celery_logger as logger
+from apps.core.utils.victoriametrics_client import VictoriaMetricsClient
 from apps.monitor.constants.victoriametrics import VictoriaMetricsConstants
 
 
@@ -12,18 +13,17 @@ class VictoriaMetricsAPI:
         # 添加SSL验证配置，支持环境变量控制
         self.ssl_verify = VictoriaMetricsConstants.SSL_VERIFY
         self.timeout = VictoriaMetricsConstants.REQUEST_TIMEOUT
+        # 进程级共享连接池，查询间复用 keep-alive 连接
+        self.client = VictoriaMetricsClient(
+            self.host or "",
+            auth=(self.username, self.password),
+            verify=self.ssl_verify,
+            timeout=self.timeout,
+        )
 
-    def _do_get(self, api_path, params):
+    def _call(self, api_path, func, *args):
         try:
-            response = requests.get(
-                f"{self.host}{api_path}",
-                params=params,
-                auth=(self.username, self.password),
-                verify=self.ssl_verify,  # 添加SSL验证配置
-                timeout=self.timeout,
-            )
-            response.raise_for_status()
-            return response.json()
+            return func(*args)
         except requests.Timeout:
             logger.error(
                 "VictoriaMetrics request timed out",
@@ -46,6 +46,9 @@ class VictoriaMetricsAPI:
             )
             raise
 
+    def _do_get(self, api_path, params):
+        return self._call(api_path, self.client.get_json, api_path, params)
+
     def query(self, query, step="5m", time=None):
         params = {"query": query}
         if step:
@@ -55,10 +58,22 @@ class VictoriaMetricsAPI:
         return self._do_get("/api/v1/query", params)
 
     def query_range(self, query, start, end, step="5m"):
-        return self._do_get(
-            "/api/v1/query_range",
-            {"query": query, "start": start, "end": end, "step": step},
-        )
+        """范围查询，跨度超过 VICTORIAMETRICS_RANGE_CHUNK_POINTS 个点时切分并发查询后合并"""
+        api_path = "/api/v1/query_range"
+        return self._call(api_path, self.client.query_range, api_path, query, start, end, step)
+
+    def query_many(self, queries, step="5m", time=None):
+        """并发执行多个即时查询，结果顺序与 queries 一致"""
+        params_list = []
+        for query in queries:
+            params = {"query": query}
+            if step:
+                params["step"] = step
+            if time:
+                params["time"] = time
+            params_list.append(params)
+        api_path = "/api/v1/query"
+        return self._call(api_path, self.client.query_many, api_path, params_list)
 
     def labels(self, match=None):
         params = {}
@@ -0,0 +1,22 @@
+from django.core.management import BaseCommand
+
+from apps.opspilot.models import WikiKnowledgeBase
+from apps.opspilot.services.wiki.search_index_service import rebuild_search_index_locked
+
+
+class Command(BaseCommand):
+    help = "重建 Wiki 关键词倒排索引(存量数据回填)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--kb-id", type=int, action="append", dest="kb_ids", help="只重建指定知识库,可重复")
+
+    def handle(self, *args, **options):
+        knowledge_bases = WikiKnowledgeBase.objects.all()
+        if options.get("kb_ids"):
+            knowledge_bases = knowledge_bases.filter(id__in=options["kb_ids"])
+        for kb in knowledge_bases.iterator():
+            count = rebuild_search_index_locked(kb)
+            if count is None:
+                self.stdout.write(self.style.WARNING(f"知识库 {kb.id} 正在重建,跳过"))
+            else:
+                self.stdout.write(f"知识库 {kb.id} 已索引 {count} 个文档")
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.27 on 2026-10-17 07:38
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('opspilot', '0066_alter_chatapplication_unique_together_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WikiSearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Created Time')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated Time')),
+                ('kind', models.CharField(max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('title', models.CharField(blank=True, default='', max_length=255)),
+                ('snippet', models.TextField(blank=True, default='')),
+                ('length', models.IntegerField(default=0)),
+                ('knowledge_base', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='opspilot.wikiknowledgebase')),
+            ],
+            options={
+                'db_table': 'opspilot_wiki_search_document',
+                'unique_together': {('knowledge_base', 'kind', 'object_id')},
+            },
+        ),
+        migrations.CreateModel(
+            name='WikiSearchPosting',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('tf', models.IntegerField(default=0)),
+                ('title_tf', models.IntegerField(default=0)),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='postings', to='opspilot.wikisearchdocument')),
+                ('knowledge_base', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='opspilot.wikiknowledgebase')),
+            ],
+            options={
+                'db_table': 'opspilot_wiki_search_posting',
+                'indexes': [models.Index(fields=['knowledge_base', 'term'], name='opspilot_wi_knowled_968bb7_idx')],
+            },
+        ),
+    ]
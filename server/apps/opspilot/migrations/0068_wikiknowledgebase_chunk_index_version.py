@@ -0,0 +1,18 @@
+# Generated by Django 4.2.27 on 2026-10-17 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('opspilot', '0067_wiki_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='wikiknowledgebase',
+            name='chunk_index_version',
+            field=models.IntegerField(default=0),
+        ),
+    ]
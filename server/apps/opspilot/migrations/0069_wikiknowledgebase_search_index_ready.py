@@ -0,0 +1,24 @@
+# Generated by Django 4.2.27 on 2026-10-17 10:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('opspilot', '0068_wikiknowledgebase_chunk_index_version'),
+    ]
+
+    operations = [
+        # 存量知识库尚未回填倒排索引,置为 False;之后新建的知识库默认 True
+        migrations.AddField(
+            model_name='wikiknowledgebase',
+            name='search_index_ready',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AlterField(
+            model_name='wikiknowledgebase',
+            name='search_index_ready',
+            field=models.BooleanField(default=True),
+        ),
+    ]
@@ -23,6 +23,11 @@ class WikiKnowledgeBase(MaintainerInfo, TimeInfo):
     risk_rules = models.JSONField(default=dict)
     template_key = models.CharField(max_length=50, default="general")
     status = models.CharField(max_length=20, default="active")  # active / archived
+    # 块向量索引版本:有效块集合变化(分块重建、清空向量、页面发布/归档)时递增,索引按版本失效
+    chunk_index_version = models.IntegerField(default=0)
+    # 关键词倒排索引是否已全量构建:新建知识库无存量,由信号增量维护即完整;
+    # 索引上线前的存量知识库迁移为 False,只由全量重建置位,信号增量写入的单篇文档不代表存量已回填
+    search_index_ready = models.BooleanField(default=True)
 
     class Meta:
         db_table = "opspilot_wiki_knowledge_base"
@@ -153,6 +158,39 @@ class PageChunk(TimeInfo):
         ordering = ["page_id", "idx"]
 
 
+class WikiSearchDocument(TimeInfo):
+    """关键词倒排索引的文档:知识页面(标题+当前正文)或资料摘要(名称+摘要)。
+
+    length 为正文(资料摘要)词数,即 BM25 文档长度;snippet 供检索结果直接展示,查询时无需加载正文。
+    """
+
+    knowledge_base = models.ForeignKey(WikiKnowledgeBase, on_delete=models.CASCADE, related_name="+")
+    kind = models.CharField(max_length=20)  # page / material_summary
+    object_id = models.BigIntegerField()
+    title = models.CharField(max_length=255, blank=True, default="")
+    snippet = models.TextField(blank=True, default="")
+    length = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = "opspilot_wiki_search_document"
+        unique_together = ("knowledge_base", "kind", "object_id")
+
+
+class WikiSearchPosting(models.Model):
+    """倒排表:词项 → 文档。tf 为正文(资料摘要)词频,title_tf 为标题(资料名称)词频,打分时分字段加权。"""
+
+    # 冗余知识库,按 (知识库, 词项) 直接命中索引
+    knowledge_base = models.ForeignKey(WikiKnowledgeBase, on_delete=models.CASCADE, related_name="+")
+    document = models.ForeignKey(WikiSearchDocument, on_delete=models.CASCADE, related_name="postings")
+    term = models.CharField(max_length=64)
+    tf = models.IntegerField(default=0)
+    title_tf = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = "opspilot_wiki_search_posting"
+        indexes = [models.Index(fields=["knowledge_base", "term"])]
+
+
 class BuildRecord(MaintainerInfo, TimeInfo):
     knowledge_base = models.ForeignKey(WikiKnowledgeBase, on_delete=models.CASCADE, related_name="build_records")
     trigger = models.CharField(max_length=30, default="material")  # material / rebuild / material_update / material_delete
@@ -1,8 +1,8 @@
 """嵌入与混合检索基础(P6,无需 pgvector)。
 
-策略:**检索后重排(retrieve-then-rerank)**——关键词召回候选 → 对候选做向量相似度重排 →
-RRF 融合关键词序与语义序。只需对小候选集调用嵌入服务,无需存储向量或 pgvector 扩展;
-后续可用 pgvector 索引替换 in-Python 余弦以扩展规模。
+策略:页面分块嵌入在构建/更新时生成并落库(PageChunk.embedding),检索时经本地块向量索引
+(vector_index_service)做向量召回,与关键词召回 RRF 融合;知识库尚无块嵌入时退回
+**检索后重排(retrieve-then-rerank)**——关键词召回候选 → 对候选实时嵌入做相似度重排。无需 pgvector 扩展。
 
 嵌入调用走 EmbedProvider(OpenAI 兼容);cosine / rrf_fuse 为纯函数,便于测试。
 """
@@ -12,9 +12,11 @@ import math
 import re
 
 from django.db import transaction
+from django.utils import timezone
 from openai import OpenAI
 
 from apps.opspilot.models import KnowledgePage, PageChunk, PageVersion
+from apps.opspilot.services.wiki.vector_index_service import bump_chunk_index_version, filter_live_hits, get_chunk_index
 
 logger = logging.getLogger("opspilot")
 
@@ -102,7 +104,9 @@ def clear_page_vectors(page_ids):
     if not ids:
         return 0
     PageVersion.objects.filter(page_id__in=ids).update(embedding=[])
-    PageChunk.objects.filter(page_id__in=ids).update(embedding=[])
+    PageChunk.objects.filter(page_id__in=ids).update(embedding=[], updated_at=timezone.now())
+    # queryset.update 不触发信号,显式递增块向量索引版本
+    bump_chunk_index_version(KnowledgePage.objects.filter(id__in=ids).values_list("knowledge_base_id", flat=True).distinct())
     return len(ids)
 
 
@@ -160,6 +164,7 @@ def reindex_page_chunks(page, embed_provider, embed_fn=None):
     if not chunks:
         with transaction.atomic():
             PageChunk.objects.filter(page=page).delete()
+            bump_chunk_index_version([page.knowledge_base_id])
         return 0
     embed = embed_fn or (lambda texts: embed_texts(texts, embed_provider))
     vecs = embed([c["text"] for c in chunks])
@@ -180,6 +185,8 @@ def reindex_page_chunks(page, embed_provider, embed_fn=None):
                 for i, c in enumerate(chunks)
             ]
         )
+        # bulk_create / queryset.delete 不触发逐条信号,显式递增块向量索引版本
+        bump_chunk_index_version([page.knowledge_base_id])
     return len(chunks)
 
 
@@ -196,19 +203,23 @@ def reindex_chunks(knowledge_base, embed_fn=None):
 
 
 def chunk_semantic_search(knowledge_base, query, top_k=5, embed_fn=None):
-    """块级语义检索:query 嵌入 vs 已存块嵌入余弦,返回 [{page_id,title,heading_path,snippet,score}]。"""
+    """块级语义检索:query 嵌入经块向量索引召回,返回 [{page_id,title,heading_path,snippet,score}]。
+
+    只覆盖页面当前版本的块;知识库无块嵌入时不调用嵌入服务,直接返回 []。
+    """
+    index = get_chunk_index(knowledge_base)
+    if index is None:
+        return []
     embed = embed_fn or (lambda texts: embed_texts(texts, knowledge_base.embed_provider))
     qvecs = embed([query])
     if not qvecs or not qvecs[0]:
         return []
-    qv = qvecs[0]
+    hits = filter_live_hits(knowledge_base, index.search(qvecs[0], top_k))
+    chunks = PageChunk.objects.select_related("page").in_bulk([chunk_id for chunk_id, _, _ in hits])
     results = []
-    chunks = PageChunk.objects.filter(page__knowledge_base=knowledge_base, page__status="active").select_related("page")
-    for ch in chunks:
-        if not ch.embedding:
-            continue
-        score = cosine(qv, ch.embedding)
-        if score > 0:
+    for chunk_id, _, score in hits:
+        ch = chunks.get(chunk_id)
+        if ch is not None:
             results.append(
                 {
                     "page_id": ch.page_id,
@@ -1,7 +1,7 @@
 """检索与问答(P3 核心)。
 
-MVP 检索:对知识页面(标题+正文)与资料摘要做关键词匹配 + 简单打分,跨 DB 可用;
-pgvector 语义检索为后期可选增强(P6),不在此处。
+关键词检索:基于持久化倒排索引(search_index_service)做 BM25 打分,跨 DB 可用;
+scan_search 为逐条加载正文计数的原始实现,知识库索引全量回填完成前作为回退;pgvector 语义检索为后期可选增强(P6),不在此处。
 问答:检索 Top-N 页面 → metis chain 带页面上下文作答 → 返回引用页面,可追溯到资料。
 """
 
@@ -10,8 +10,10 @@ import re
 
 from apps.opspilot.metis.llm.chain.entity import BasicLLMRequest
 from apps.opspilot.metis.llm.common.llm_client_factory import LLMClientFactory
-from apps.opspilot.models import KnowledgePage, LLMModel, Material
+from apps.opspilot.models import KnowledgePage, LLMModel, Material, PageChunk
 from apps.opspilot.services.wiki.embedding_service import cosine, embed_texts, rrf_fuse
+from apps.opspilot.services.wiki.search_index_service import has_search_index, schedule_search_index_backfill, search_index
+from apps.opspilot.services.wiki.vector_index_service import filter_live_hits, get_chunk_index
 
 logger = logging.getLogger("opspilot")
 
@@ -53,7 +55,18 @@ def _keyword_explanation(score, terms, *texts):
 
 
 def search(knowledge_base, query, top_k=5):
-    """返回 [{kind, id, title, snippet, score}],kind ∈ {page, material_summary}。"""
+    """返回 [{kind, id, title, snippet, score}],kind ∈ {page, material_summary}。
+
+    只读:知识库倒排索引尚未全量构建(存量数据未回填)时退回全量扫描,并异步投递回填任务。
+    """
+    if has_search_index(knowledge_base):
+        return search_index(knowledge_base, query, top_k=top_k)
+    schedule_search_index_backfill(knowledge_base)
+    return scan_search(knowledge_base, query, top_k=top_k)
+
+
+def scan_search(knowledge_base, query, top_k=5):
+    """全量扫描版关键词检索:加载全部页面正文与资料摘要逐条计数打分。"""
     terms = _tokenize(query)
     results = []
 
@@ -92,54 +105,104 @@ def search(knowledge_base, query, top_k=5):
     return results[:top_k]
 
 
+def _key(item):
+    return f"{item['kind']}:{item['id']}"
+
+
+def _vector_recall(knowledge_base, index, query_vector, candidate_k):
+    """块向量召回并按页面聚合(取页面最相似块),返回 [{kind, id, title, snippet, score, explanation}]。"""
+    best = {}
+    for chunk_id, page_id, score in filter_live_hits(knowledge_base, index.search(query_vector, candidate_k * 3)):
+        if page_id not in best:
+            best[page_id] = (chunk_id, score)
+        if len(best) >= candidate_k:
+            break
+    if not best:
+        return []
+    chunks = PageChunk.objects.only("id", "idx", "text").in_bulk([chunk_id for chunk_id, _ in best.values()])
+    titles = dict(KnowledgePage.objects.filter(id__in=best.keys()).values_list("id", "title"))
+    results = []
+    for page_id, (chunk_id, score) in best.items():
+        chunk = chunks.get(chunk_id)
+        if chunk is None or page_id not in titles:
+            continue
+        results.append(
+            {
+                "kind": "page",
+                "id": page_id,
+                "title": titles[page_id],
+                "snippet": (chunk.text or "")[:300],
+                "score": score,
+                "explanation": {"matched_by": ["vector"], "chunk_index": chunk.idx, "vector_score": score},
+            }
+        )
+    return results
+
+
+def _rerank_candidates(candidates, query_vector, embed):
+    """无块向量索引时的回退:对关键词候选实时嵌入,按与查询的余弦重排。"""
+    cvecs = embed([f"{c['title']} {c['snippet']}" for c in candidates])
+    if not cvecs or len(cvecs) != len(candidates):
+        return None
+    vector_scores = {_key(c): cosine(query_vector, cvecs[i]) for i, c in enumerate(candidates)}
+    order = sorted(candidates, key=lambda c: vector_scores[_key(c)], reverse=True)
+    return [dict(c, score=vector_scores[_key(c)]) for c in order]
+
+
 def hybrid_search(knowledge_base, query, top_k=5, candidate_k=20, embed_fn=None):
-    """混合检索:关键词召回候选 → 语义重排 → RRF 融合。无嵌入/失败时回退关键词。
+    """混合检索:关键词召回 + 块向量召回 → RRF 融合。无嵌入/失败时回退关键词。
 
-    embed_fn(texts)->List[vector] 可注入以便测试;默认走知识库的 EmbedProvider。
+    向量召回走本地块向量索引(块嵌入在构建/更新时已落库),每次请求只嵌入查询本身;
+    知识库尚无块嵌入时退回对关键词候选实时嵌入重排。embed_fn(texts)->List[vector] 可注入以便测试;
+    默认走知识库的 EmbedProvider。
     """
     candidates = search(knowledge_base, query, top_k=candidate_k)
-    if not candidates:
+    index = get_chunk_index(knowledge_base)
+    if not candidates and index is None:
         return []
 
-    def _key(c):
-        return f"{c['kind']}:{c['id']}"
-
-    by_key = {_key(c): c for c in candidates}
-    kw_rank = [_key(c) for c in candidates]
-
     embed = embed_fn or (lambda texts: embed_texts(texts, knowledge_base.embed_provider))
     qvecs = embed([query])
-    cvecs = embed([f"{c['title']} {c['snippet']}" for c in candidates])
-    if not qvecs or not cvecs or len(cvecs) != len(candidates):
+    if not qvecs or not qvecs[0]:
         return candidates[:top_k]  # 无嵌入 → 回退关键词
 
-    qv = qvecs[0]
-    vector_scores = {i: cosine(qv, cvecs[i]) for i in range(len(candidates))}
-    order = sorted(range(len(candidates)), key=lambda i: vector_scores[i], reverse=True)
-    sem_rank = [_key(candidates[i]) for i in order]
+    if index is not None:
+        semantic = _vector_recall(knowledge_base, index, qvecs[0], candidate_k)
+    else:
+        semantic = _rerank_candidates(candidates, qvecs[0], embed)
+    if semantic is None:
+        return candidates[:top_k]
+
+    by_key = {_key(c): c for c in semantic}
+    by_key.update({_key(c): c for c in candidates})
+    kw_rank = [_key(c) for c in candidates]
+    sem_rank = [_key(c) for c in semantic]
     fused = rrf_fuse([kw_rank, sem_rank], top_k=top_k)
     keyword_ranks = {key: rank for rank, key in enumerate(kw_rank, start=1)}
     semantic_ranks = {key: rank for rank, key in enumerate(sem_rank, start=1)}
-    vector_score_by_key = {_key(candidates[i]): vector_scores[i] for i in range(len(candidates))}
+    semantic_by_key = {_key(c): c for c in semantic}
 
     results = []
     for key in fused:
         item = dict(by_key[key])
         explanation = dict(item.get("explanation") or {})
         matched_by = list(explanation.get("matched_by") or [])
-        if "keyword" not in matched_by:
+        if key in keyword_ranks and "keyword" not in matched_by:
             matched_by.append("keyword")
-        if "vector" not in matched_by:
+        if key in semantic_ranks and "vector" not in matched_by:
             matched_by.append("vector")
+        semantic_item = semantic_by_key.get(key)
         explanation.update(
             {
                 "matched_by": matched_by,
                 "keyword_rank": keyword_ranks.get(key),
                 "semantic_rank": semantic_ranks.get(key),
-                "vector_score": vector_score_by_key.get(key, 0),
+                "vector_score": semantic_item["score"] if semantic_item else 0,
                 "fusion": "rrf",
             }
         )
+        if semantic_item and "chunk_index" in (semantic_item.get("explanation") or {}):
+            explanation["chunk_index"] = semantic_item["explanation"]["chunk_index"]
         item["explanation"] = explanation
         results.append(item)
     return results
@@ -0,0 +1,227 @@
+"""关键词检索倒排索引(BM25)。
+
+知识页面(标题+当前版本正文)与资料摘要(名称+摘要)按词项写入倒排表,页面发布新版本、
+改标题/状态,资料摘要变化时由信号增量维护(见 signals/wiki_search_index_signal.py)。
+检索时只读取查询词项的倒排记录做 BM25 打分:正文按 BM25 做词频饱和与长度归一,标题词频单独饱和后
+按原关键词打分的权重(页面标题 ×5、资料名称 ×2)叠加,避免标题词频把正文差异全部饱和掉。
+Top-K 文档从索引文档表取标题与摘要片段,不加载正文。
+
+存量数据回填不在检索请求内进行:由 rebuild_wiki_search_index 命令或 wiki_rebuild_search_index_task
+异步任务持锁全量重建,完成后置位知识库的 search_index_ready;检索路径只读,未置位前(即使信号已增量
+写入部分文档)退回全量扫描并投递一次回填任务,避免只用不完整的倒排表检索。
+
+分词沿用 retrieval_service._tokenize 的思路:英文/数字按词,CJK 连续片段切二元组(bigram),
+文档与查询使用同一分词函数,保证词项一致。
+"""
+
+import heapq
+import logging
+import math
+import re
+from collections import Counter, defaultdict
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Avg, Count
+
+from apps.opspilot.models import KnowledgePage, Material, WikiKnowledgeBase, WikiSearchDocument, WikiSearchPosting
+
+logger = logging.getLogger("opspilot")
+
+KIND_PAGE = "page"
+KIND_MATERIAL_SUMMARY = "material_summary"
+
+# 与原关键词打分一致:页面标题 ×5,资料名称 ×2
+TITLE_WEIGHTS = {KIND_PAGE: 5, KIND_MATERIAL_SUMMARY: 2}
+SNIPPET_CHARS = 300
+MAX_TERM_LENGTH = 64
+
+# 同一知识库在该时长内至多投递一次回填任务
+BACKFILL_SCHEDULE_KEY = "opspilot:wiki_search_index:backfill:{}"
+BACKFILL_SCHEDULE_TTL = 600
+# 全量重建锁:串行化同一知识库的回填任务与管理命令
+REBUILD_LOCK_KEY = "opspilot:wiki_search_index:rebuild_lock:{}"
+REBUILD_LOCK_TTL = 1800
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TERM_RE = re.compile(r"[一-鿿]+|[a-z0-9_]+")
+
+
+def index_terms(text):
+    """切分为索引词项(可重复,用于词频):英文/数字按词,CJK 片段切二元组,单字片段保留单字。"""
+    terms = []
+    for tok in _TERM_RE.findall((text or "").lower()):
+        if "一" <= tok[0] <= "鿿":
+            if len(tok) == 1:
+                terms.append(tok)
+            else:
+                terms.extend(tok[i : i + 2] for i in range(len(tok) - 1))
+        elif len(tok) <= MAX_TERM_LENGTH:
+            terms.append(tok)
+    return terms
+
+
+def _write_document(knowledge_base_id, kind, object_id, title, snippet, body):
+    WikiSearchDocument.objects.filter(knowledge_base_id=knowledge_base_id, kind=kind, object_id=object_id).delete()
+    body_terms = index_terms(body)
+    tf = Counter(body_terms)
+    title_tf = Counter(index_terms(title))
+    if not tf and not title_tf:
+        return None
+    document = WikiSearchDocument.objects.create(
+        knowledge_base_id=knowledge_base_id,
+        kind=kind,
+        object_id=object_id,
+        title=(title or "")[:255],
+        snippet=snippet,
+        length=len(body_terms),
+    )
+    WikiSearchPosting.objects.bulk_create(
+        [
+            WikiSearchPosting(knowledge_base_id=knowledge_base_id, document=document, term=term, tf=tf[term], title_tf=title_tf[term])
+            for term in tf.keys() | title_tf.keys()
+        ]
+    )
+    return document
+
+
+def remove_document(knowledge_base_id, kind, object_id):
+    WikiSearchDocument.objects.filter(knowledge_base_id=knowledge_base_id, kind=kind, object_id=object_id).delete()
+
+
+@transaction.atomic
+def index_page(page):
+    """(重新)索引页面;非 active 页面从索引移除。"""
+    if page.status != "active":
+        remove_document(page.knowledge_base_id, KIND_PAGE, page.id)
+        return None
+    body = page.current_version.body if page.current_version_id else ""
+    return _write_document(page.knowledge_base_id, KIND_PAGE, page.id, page.title, (body or "")[:SNIPPET_CHARS], body)
+
+
+@transaction.atomic
+def index_material(material):
+    """(重新)索引资料摘要;无摘要的资料不参与检索。"""
+    if not material.ai_summary:
+        remove_document(material.knowledge_base_id, KIND_MATERIAL_SUMMARY, material.id)
+        return None
+    return _write_document(
+        material.knowledge_base_id,
+        KIND_MATERIAL_SUMMARY,
+        material.id,
+        material.name,
+        material.ai_summary[:SNIPPET_CHARS],
+        material.ai_summary,
+    )
+
+
+def rebuild_search_index(knowledge_base):
+    """全量重建知识库倒排索引并置位 search_index_ready,返回索引文档数。"""
+    with transaction.atomic():
+        WikiSearchDocument.objects.filter(knowledge_base=knowledge_base).delete()
+        count = 0
+        pages = KnowledgePage.objects.filter(knowledge_base=knowledge_base, status="active").select_related("current_version")
+        for page in pages.iterator():
+            count += 1 if index_page(page) else 0
+        for material in Material.objects.filter(knowledge_base=knowledge_base).exclude(ai_summary="").iterator():
+            count += 1 if index_material(material) else 0
+        WikiKnowledgeBase.objects.filter(id=knowledge_base.id).update(search_index_ready=True)
+    knowledge_base.search_index_ready = True
+    return count
+
+
+def rebuild_search_index_locked(knowledge_base):
+    """持锁全量重建,返回索引文档数;同一知识库已有重建在进行时跳过,返回 None。"""
+    key = REBUILD_LOCK_KEY.format(knowledge_base.id)
+    if not cache.add(key, 1, REBUILD_LOCK_TTL):
+        return None
+    try:
+        return rebuild_search_index(knowledge_base)
+    finally:
+        cache.delete(key)
+
+
+def has_search_index(knowledge_base):
+    """倒排索引是否已全量构建;读库而非实例字段,回填任务完成后无需重新加载知识库。"""
+    return WikiKnowledgeBase.objects.filter(id=knowledge_base.id, search_index_ready=True).exists()
+
+
+def has_indexable_content(knowledge_base):
+    return (
+        KnowledgePage.objects.filter(knowledge_base=knowledge_base, status="active").exists()
+        or Material.objects.filter(knowledge_base=knowledge_base).exclude(ai_summary="").exists()
+    )
+
+
+def schedule_search_index_backfill(knowledge_base):
+    """投递一次存量回填任务,返回是否投递。
+
+    无可索引内容的知识库不投递;BACKFILL_SCHEDULE_TTL 内重复调用不再投递;投递失败只记录日志,不影响检索。
+    """
+    if not has_indexable_content(knowledge_base):
+        return False
+    if not cache.add(BACKFILL_SCHEDULE_KEY.format(knowledge_base.id), 1, BACKFILL_SCHEDULE_TTL):
+        return False
+    from apps.opspilot.tasks import wiki_rebuild_search_index_task
+
+    try:
+        wiki_rebuild_search_index_task.delay(knowledge_base.id)
+    except Exception:  # noqa: BLE001
+        logger.exception("wiki 索引回填任务投递失败 kb=%s", knowledge_base.id)
+        return False
+    return True
+
+
+def search_index(knowledge_base, query, top_k=5):
+    """BM25 检索,返回 [{kind, id, title, snippet, score, explanation}],按分数降序。"""
+    terms = sorted(set(index_terms(query)))
+    if not terms:
+        return []
+    stats = WikiSearchDocument.objects.filter(knowledge_base=knowledge_base).aggregate(n=Count("id"), avg_length=Avg("length"))
+    total = stats["n"] or 0
+    if not total:
+        return []
+    avg_length = stats["avg_length"] or 1.0
+
+    postings = list(
+        WikiSearchPosting.objects.filter(knowledge_base=knowledge_base, term__in=terms).values_list(
+            "document_id", "term", "tf", "title_tf", "document__length", "document__kind"
+        )
+    )
+    df = Counter(posting[1] for posting in postings)
+    idf = {term: math.log(1 + (total - count + 0.5) / (count + 0.5)) for term, count in df.items()}
+
+    scores = defaultdict(float)
+    matched = defaultdict(list)
+    for document_id, term, tf, title_tf, length, kind in postings:
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length)
+        body_score = tf * (BM25_K1 + 1) / (tf + norm)
+        title_score = title_tf * (BM25_K1 + 1) / (title_tf + BM25_K1)
+        scores[document_id] += idf[term] * (body_score + TITLE_WEIGHTS.get(kind, 1) * title_score)
+        matched[document_id].append(term)
+
+    # 同分时先入库的文档靠前,结果稳定
+    top = heapq.nlargest(top_k, scores.items(), key=lambda item: (item[1], -item[0]))
+    documents = WikiSearchDocument.objects.in_bulk([document_id for document_id, _ in top])
+    results = []
+    for document_id, score in top:
+        document = documents.get(document_id)
+        if document is None:
+            continue
+        results.append(
+            {
+                "kind": document.kind,
+                "id": document.object_id,
+                "title": document.title,
+                "snippet": document.snippet,
+                "score": score,
+                "explanation": {
+                    "matched_by": ["keyword"],
+                    "keyword_score": score,
+                    "matched_terms": sorted(matched[document_id]),
+                },
+            }
+        )
+    return results
@@ -0,0 +1,334 @@
+"""知识库块级向量索引(本地文件 + NumPy)。
+
+PageChunk.embedding 在页面构建/更新时已生成并落库,检索时不再为候选实时调用嵌入服务:
+把知识库所有有效块的嵌入归一化为 float32 矩阵写入本地索引文件,查询只需嵌入问题本身,
+矩阵乘法一次算出全部相似度;块数超过 IVF_MIN_VECTORS 时用 k-means 粗聚类构建 IVF 倒排,
+查询只探测最近的 IVF_NPROBE 个簇。
+
+有效块 = 页面 active 且块属于页面当前版本。索引按指纹失效,指纹 = 来源(数据库实例 + 知识库 id + 创建时间)
++ 知识库的 chunk_index_version:页面发布新版本/归档/删除(信号,见 signals/wiki_vector_index_signal.py)、
+重建分块、清空向量(写入处显式递增)后版本变化;检索时只按主键读一行,不对全部块做聚合。
+来源不同的索引文件(其他部署/重建过的库里同 id 的知识库)一律不用。
+
+检索请求内不重建:版本落后时继续用同来源的旧索引(召回结果再按有效块过滤),并投递
+wiki_build_chunk_index_task 后台持锁重建;只有从未构建过(无可用旧索引)时才在请求内持锁构建一次,
+抢不到锁的并发请求直接返回 None 走回退逻辑。进程内按 LRU 缓存最近使用的 CHUNK_INDEX_CACHE_SIZE 个知识库索引。
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from collections import Counter, OrderedDict
+from functools import lru_cache
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+
+from apps.opspilot.models import PageChunk, WikiKnowledgeBase
+
+logger = logging.getLogger("opspilot")
+
+WIKI_VECTOR_INDEX_DIR = os.getenv("WIKI_VECTOR_INDEX_DIR", os.path.join(tempfile.gettempdir(), "wiki_vector_index"))
+# 块数达到该值才构建 IVF,小知识库精确检索更快也更准
+IVF_MIN_VECTORS = int(os.getenv("WIKI_VECTOR_IVF_MIN_VECTORS", "20000"))
+IVF_NPROBE = int(os.getenv("WIKI_VECTOR_IVF_NPROBE", "8"))
+IVF_TRAIN_ITERATIONS = 10
+# 进程内最多缓存的知识库索引数(LRU)
+CHUNK_INDEX_CACHE_SIZE = int(os.getenv("WIKI_VECTOR_INDEX_CACHE_SIZE", "32"))
+
+# 同一知识库同时至多排队一个后台重建任务;任务结束即清除,之后的版本变化可再次投递
+BUILD_SCHEDULE_KEY = "opspilot:wiki_chunk_index:build:{}"
+BUILD_SCHEDULE_TTL = 600
+# 构建锁:串行化同一知识库的后台重建与首次构建
+BUILD_LOCK_KEY = "opspilot:wiki_chunk_index:build_lock:{}"
+BUILD_LOCK_TTL = 1800
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _normalize(matrix):
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _train_ivf(vectors, iterations=IVF_TRAIN_ITERATIONS):
+    """球面 k-means:返回 (质心, 每个向量所属簇)。簇数取 √n。"""
+    count = len(vectors)
+    nlist = max(1, int(np.sqrt(count)))
+    rng = np.random.default_rng(0)
+    centroids = vectors[rng.choice(count, nlist, replace=False)].copy()
+    assign = np.zeros(count, dtype=np.int64)
+    for _ in range(iterations):
+        assign = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, vectors)
+        filled = np.bincount(assign, minlength=nlist) > 0
+        centroids[filled] = _normalize(sums[filled])
+    return centroids, assign
+
+
+class ChunkVectorIndex:
+    """块向量索引:vectors 为归一化 float32 矩阵;IVF 时按簇排序,offsets[i]:offsets[i+1] 为第 i 簇的行区间。"""
+
+    def __init__(self, fingerprint, vectors, chunk_ids, page_ids, centroids=None, offsets=None):
+        self.fingerprint = fingerprint
+        self.vectors = vectors
+        self.chunk_ids = chunk_ids
+        self.page_ids = page_ids
+        self.centroids = centroids
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.chunk_ids)
+
+    @classmethod
+    def empty(cls, fingerprint):
+        """无有效块嵌入时的空索引,落盘后表示"已按该指纹构建过",避免反复构建。"""
+        return cls(fingerprint, np.zeros((0, 0), dtype=np.float32), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+
+    @property
+    def dim(self):
+        return self.vectors.shape[1] if len(self.vectors) else 0
+
+    @classmethod
+    def build(cls, fingerprint, rows, ivf_min_vectors=None):
+        """rows: [(chunk_id, page_id, embedding)];维度与多数不一致的嵌入(更换过嵌入模型)被跳过。"""
+        rows = [row for row in rows if row[2]]
+        if not rows:
+            return None
+        dim = Counter(len(row[2]) for row in rows).most_common(1)[0][0]
+        rows = [row for row in rows if len(row[2]) == dim]
+        vectors = _normalize(np.asarray([row[2] for row in rows], dtype=np.float32))
+        chunk_ids = np.asarray([row[0] for row in rows], dtype=np.int64)
+        page_ids = np.asarray([row[1] for row in rows], dtype=np.int64)
+
+        ivf_min_vectors = IVF_MIN_VECTORS if ivf_min_vectors is None else ivf_min_vectors
+        if len(rows) < ivf_min_vectors:
+            return cls(fingerprint, vectors, chunk_ids, page_ids)
+        centroids, assign = _train_ivf(vectors)
+        order = np.argsort(assign, kind="stable")
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=len(centroids)))])
+        return cls(fingerprint, vectors[order], chunk_ids[order], page_ids[order], centroids, offsets)
+
+    def search(self, query_vector, top_k=20, nprobe=None):
+        """返回 [(chunk_id, page_id, score)],按余弦相似度降序,只保留正分。"""
+        if not len(self) or not query_vector or len(query_vector) != self.dim:
+            return []
+        query = _normalize(np.asarray(query_vector, dtype=np.float32))
+        if self.centroids is None:
+            rows = np.arange(len(self))
+            scores = self.vectors @ query
+        else:
+            nprobe = min(nprobe or IVF_NPROBE, len(self.centroids))
+            probe = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+            rows = np.concatenate([np.arange(self.offsets[c], self.offsets[c + 1]) for c in probe])
+            scores = self.vectors[rows] @ query
+        if not len(rows):
+            return []
+        top_k = min(top_k, len(rows))
+        best = np.argpartition(-scores, top_k - 1)[:top_k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [
+            (int(self.chunk_ids[rows[i]]), int(self.page_ids[rows[i]]), float(scores[i]))
+            for i in best
+            if scores[i] > 0
+        ]
+
+    def save(self, path):
+        """写临时文件后原子替换,并发读者不会读到半个文件。"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        arrays = {
+            "fingerprint": np.asarray(self.fingerprint),
+            "vectors": self.vectors,
+            "chunk_ids": self.chunk_ids,
+            "page_ids": self.page_ids,
+        }
+        if self.centroids is not None:
+            arrays.update(centroids=self.centroids, offsets=self.offsets)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".npz")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @staticmethod
+    def read_fingerprint(path):
+        """只读取索引文件里的指纹(npz 按成员惰性加载,不读向量)。"""
+        with np.load(path) as data:
+            return str(data["fingerprint"])
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(
+                str(data["fingerprint"]),
+                data["vectors"],
+                data["chunk_ids"],
+                data["page_ids"],
+                data["centroids"] if "centroids" in data else None,
+                data["offsets"] if "offsets" in data else None,
+            )
+
+
+def live_chunks(knowledge_base):
+    """参与检索的块:页面 active 且块属于页面当前版本(旧版本遗留块不参与)。"""
+    return PageChunk.objects.filter(
+        page__knowledge_base=knowledge_base,
+        page__status="active",
+        version_id=F("page__current_version_id"),
+    )
+
+
+def bump_chunk_index_version(knowledge_base_ids):
+    """有效块集合变化后递增知识库块向量索引版本,使各进程缓存与本地索引文件失效。"""
+    ids = {kb_id for kb_id in knowledge_base_ids if kb_id}
+    if ids:
+        WikiKnowledgeBase.objects.filter(id__in=ids).update(chunk_index_version=F("chunk_index_version") + 1)
+
+
+@lru_cache(maxsize=1)
+def _database_identity():
+    db = settings.DATABASES["default"]
+    raw = "|".join(str(db.get(key) or "") for key in ("ENGINE", "HOST", "PORT", "NAME"))
+    return hashlib.md5(raw.encode("utf-8")).hexdigest()[:12]
+
+
+def index_fingerprint(knowledge_base):
+    """索引指纹 = 来源 + "@v" + chunk_index_version;知识库不存在时返回 None。"""
+    row = WikiKnowledgeBase.objects.filter(pk=knowledge_base.pk).values_list("chunk_index_version", "created_at").first()
+    if row is None:
+        return None
+    version, created_at = row
+    created = created_at.timestamp() if created_at else 0
+    return f"{_database_identity()}:kb{knowledge_base.pk}:{created:.6f}@v{version or 0}"
+
+
+def _same_source(fingerprint, other):
+    return bool(fingerprint) and bool(other) and fingerprint.rpartition("@v")[0] == other.rpartition("@v")[0]
+
+
+def index_path(knowledge_base_id):
+    return os.path.join(WIKI_VECTOR_INDEX_DIR, f"kb_{knowledge_base_id}.npz")
+
+
+def _cache_get(knowledge_base_id):
+    with _cache_lock:
+        index = _cache.get(knowledge_base_id)
+        if index is not None:
+            _cache.move_to_end(knowledge_base_id)
+        return index
+
+
+def _cache_put(knowledge_base_id, index):
+    with _cache_lock:
+        _cache[knowledge_base_id] = index
+        _cache.move_to_end(knowledge_base_id)
+        while len(_cache) > CHUNK_INDEX_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def build_chunk_index(knowledge_base, fingerprint=None):
+    """从 PageChunk 全量构建并落盘,写入本进程缓存;无有效块嵌入时落盘空索引并返回 None。"""
+    fingerprint = fingerprint or index_fingerprint(knowledge_base)
+    rows = live_chunks(knowledge_base).values_list("id", "page_id", "embedding").order_by("id").iterator()
+    index = ChunkVectorIndex.build(fingerprint, rows) or ChunkVectorIndex.empty(fingerprint)
+    path = index_path(knowledge_base.id)
+    try:
+        index.save(path)
+    except OSError:
+        logger.exception("wiki 块向量索引写入失败 kb=%s path=%s", knowledge_base.id, path)
+    _cache_put(knowledge_base.id, index)
+    return index if len(index) else None
+
+
+def build_chunk_index_locked(knowledge_base):
+    """持锁构建,返回 (是否构建, 索引);同一知识库已有构建在进行时跳过,返回 (False, None)。"""
+    key = BUILD_LOCK_KEY.format(knowledge_base.id)
+    if not cache.add(key, 1, BUILD_LOCK_TTL):
+        return False, None
+    try:
+        return True, build_chunk_index(knowledge_base)
+    finally:
+        cache.delete(key)
+        cache.delete(BUILD_SCHEDULE_KEY.format(knowledge_base.id))
+
+
+def schedule_chunk_index_build(knowledge_base):
+    """投递一次后台重建任务,返回是否投递;已有任务排队或运行时不重复投递,投递失败只记录日志。"""
+    if not cache.add(BUILD_SCHEDULE_KEY.format(knowledge_base.id), 1, BUILD_SCHEDULE_TTL):
+        return False
+    from apps.opspilot.tasks import wiki_build_chunk_index_task
+
+    try:
+        wiki_build_chunk_index_task.delay(knowledge_base.id)
+    except Exception:  # noqa: BLE001
+        logger.exception("wiki 块向量索引重建任务投递失败 kb=%s", knowledge_base.id)
+        return False
+    return True
+
+
+def _load_index_file(knowledge_base_id, fingerprint, stale):
+    """读取本地索引文件:指纹与当前一致,或进程内尚无同来源旧索引且文件同来源时才整体加载。"""
+    path = index_path(knowledge_base_id)
+    if not os.path.exists(path):
+        return None
+    try:
+        file_fingerprint = ChunkVectorIndex.read_fingerprint(path)
+        if file_fingerprint == fingerprint or (stale is None and _same_source(file_fingerprint, fingerprint)):
+            return ChunkVectorIndex.load(path)
+    except Exception:  # noqa: BLE001
+        logger.warning("wiki 块向量索引文件损坏,忽略 kb=%s path=%s", knowledge_base_id, path)
+    return None
+
+
+def get_chunk_index(knowledge_base):
+    """取知识库块向量索引:进程缓存 → 本地文件;版本落后时返回同来源旧索引并投递后台重建。无可用索引时返回 None。
+
+    旧索引可能包含已失效的块,调用方需用 filter_live_hits 过滤召回结果。
+    """
+    fingerprint = index_fingerprint(knowledge_base)
+    if fingerprint is None:
+        return None
+    index = _cache_get(knowledge_base.id)
+    if index is not None and not _same_source(index.fingerprint, fingerprint):
+        index = None
+    if index is None or index.fingerprint != fingerprint:
+        loaded = _load_index_file(knowledge_base.id, fingerprint, index)
+        if loaded is not None:
+            index = loaded
+            _cache_put(knowledge_base.id, index)
+
+    if index is not None and index.fingerprint == fingerprint:
+        return index if len(index) else None
+    if index is not None and len(index):
+        schedule_chunk_index_build(knowledge_base)
+        return index
+    # 从未构建过(或旧索引为空):请求内持锁构建一次,并发请求不重复构建
+    _, index = build_chunk_index_locked(knowledge_base)
+    return index
+
+
+def filter_live_hits(knowledge_base, hits):
+    """过滤召回结果中已不再有效的块(旧索引在后台重建完成前仍可能命中它们)。"""
+    if not hits:
+        return []
+    live = set(live_chunks(knowledge_base).filter(id__in=[chunk_id for chunk_id, _, _ in hits]).values_list("id", flat=True))
+    return [hit for hit in hits if hit[0] in live]
+
+
+def search_chunks(knowledge_base, query_vector, top_k=20):
+    """块级向量召回,返回 [(chunk_id, page_id, score)]。"""
+    index = get_chunk_index(knowledge_base)
+    if index is None:
+        return []
+    return filter_live_hits(knowledge_base, index.search(query_vector, top_k))
@@ -6,3 +6,5 @@ OpsPilot 应用信号注册
 # 导入所有信号处理器以确保它们被注册
 # （旧知识库相关信号已随旧功能移除）
 from apps.opspilot.signals import wiki_material_signal  # noqa: F401,E402  资料删除清理 MinIO 文件
+from apps.opspilot.signals import wiki_search_index_signal  # noqa: F401,E402  页面/资料变化时维护关键词倒排索引
+from apps.opspilot.signals import wiki_vector_index_signal  # noqa: F401,E402  有效块变化时递增块向量索引版本
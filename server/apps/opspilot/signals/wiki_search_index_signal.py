@@ -0,0 +1,71 @@
+"""知识页面/资料变化时增量维护关键词倒排索引。
+
+页面发布新版本(current_version 变化)、改标题或状态,当前版本正文原地修改,资料名称/摘要变化时重建对应索引文档;
+页面、资料删除时移除索引文档(知识库删除时由外键级联清理)。索引失败只记录日志,不影响主流程。
+"""
+
+import logging
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.opspilot.models import KnowledgePage, Material, PageVersion
+from apps.opspilot.services.wiki.search_index_service import (
+    KIND_MATERIAL_SUMMARY,
+    KIND_PAGE,
+    index_material,
+    index_page,
+    remove_document,
+)
+
+logger = logging.getLogger("opspilot")
+
+_PAGE_FIELDS = {"title", "status", "current_version", "knowledge_base"}
+_MATERIAL_FIELDS = {"name", "ai_summary", "knowledge_base"}
+
+
+def _touches(update_fields, fields):
+    return update_fields is None or bool(fields & set(update_fields))
+
+
+@receiver(post_save, sender=KnowledgePage, dispatch_uid="wiki_search_index_page_save")
+def index_page_on_save(sender, instance, update_fields=None, **kwargs):
+    if not _touches(update_fields, _PAGE_FIELDS):
+        return
+    try:
+        index_page(instance)
+    except Exception:
+        logger.exception("wiki 页面倒排索引更新失败 page=%s", instance.pk)
+
+
+@receiver(post_save, sender=PageVersion, dispatch_uid="wiki_search_index_version_save")
+def index_page_on_current_version_save(sender, instance, created=False, update_fields=None, **kwargs):
+    # 新版本在页面切换 current_version 时索引;这里只处理当前版本正文的原地修改
+    if created or not instance.is_current or not _touches(update_fields, {"body"}):
+        return
+    try:
+        page = KnowledgePage.objects.select_related("current_version").get(pk=instance.page_id)
+        if page.current_version_id == instance.pk:
+            index_page(page)
+    except Exception:
+        logger.exception("wiki 页面倒排索引更新失败 version=%s", instance.pk)
+
+
+@receiver(post_delete, sender=KnowledgePage, dispatch_uid="wiki_search_index_page_delete")
+def remove_page_on_delete(sender, instance, **kwargs):
+    remove_document(instance.knowledge_base_id, KIND_PAGE, instance.pk)
+
+
+@receiver(post_save, sender=Material, dispatch_uid="wiki_search_index_material_save")
+def index_material_on_save(sender, instance, update_fields=None, **kwargs):
+    if not _touches(update_fields, _MATERIAL_FIELDS):
+        return
+    try:
+        index_material(instance)
+    except Exception:
+        logger.exception("wiki 资料摘要倒排索引更新失败 material=%s", instance.pk)
+
+
+@receiver(post_delete, sender=Material, dispatch_uid="wiki_search_index_material_delete")
+def remove_material_on_delete(sender, instance, **kwargs):
+    remove_document(instance.knowledge_base_id, KIND_MATERIAL_SUMMARY, instance.pk)
@@ -0,0 +1,41 @@
+"""有效块集合变化时递增知识库块向量索引版本(WikiKnowledgeBase.chunk_index_version)。
+
+页面发布新版本(current_version 变化)、状态变化、删除(级联删除块)与单条块保存时递增;
+分块重建与清空向量走批量写入(bulk_create / queryset.update 不触发信号),由 embedding_service 显式递增。
+"""
+
+import logging
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.opspilot.models import KnowledgePage, PageChunk
+from apps.opspilot.services.wiki.vector_index_service import bump_chunk_index_version
+
+logger = logging.getLogger("opspilot")
+
+_PAGE_FIELDS = {"status", "current_version", "knowledge_base"}
+
+
+def _bump(knowledge_base_id):
+    try:
+        bump_chunk_index_version([knowledge_base_id])
+    except Exception:
+        logger.exception("wiki 块向量索引版本递增失败 kb=%s", knowledge_base_id)
+
+
+@receiver(post_save, sender=KnowledgePage, dispatch_uid="wiki_vector_index_page_save")
+def bump_on_page_save(sender, instance, created=False, update_fields=None, **kwargs):
+    if created or (update_fields is not None and not _PAGE_FIELDS & set(update_fields)):
+        return
+    _bump(instance.knowledge_base_id)
+
+
+@receiver(post_delete, sender=KnowledgePage, dispatch_uid="wiki_vector_index_page_delete")
+def bump_on_page_delete(sender, instance, **kwargs):
+    _bump(instance.knowledge_base_id)
+
+
+@receiver(post_save, sender=PageChunk, dispatch_uid="wiki_vector_index_chunk_save")
+def bump_on_chunk_save(sender, instance, **kwargs):
+    _bump(KnowledgePage.objects.filter(pk=instance.page_id).values_list("knowledge_base_id", flat=True).first())
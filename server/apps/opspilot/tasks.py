@@ -6,7 +6,7 @@ from datetime import timedelta
 
 from celery import shared_task
 from django.core.exceptions import SynchronousOnlyOperation
-from django.db import close_old_connections, transaction
+from django.db import IntegrityError, close_old_connections, transaction
 from django.db.models import Q
 from django.utils import timezone
 from langchain_core.messages import HumanMessage, SystemMessage
@@ -1057,6 +1057,40 @@ def wiki_rebuild_kb_task(kb_id, llm_model_id=None, operator="", build_record_id=
     return rebuild_knowledge_base(kb, llm_model_id=llm_model_id, operator=operator, build=build).id
 
 
+@shared_task
+def wiki_rebuild_search_index_task(kb_id):
+    """关键词倒排索引存量回填(异步),同一知识库持锁串行。返回索引文档数;跳过或失败返回 None。"""
+    from apps.opspilot.models import WikiKnowledgeBase
+    from apps.opspilot.services.wiki.search_index_service import rebuild_search_index_locked
+
+    kb = WikiKnowledgeBase.objects.filter(id=kb_id).first()
+    if not kb:
+        logger.error("wiki 索引回填任务: 知识库不存在 id=%s", kb_id)
+        return None
+    try:
+        return rebuild_search_index_locked(kb)
+    except IntegrityError:
+        # 回填期间信号增量写入了同一文档,下次检索回退时会重新投递
+        logger.warning("wiki 索引回填任务: 与增量写入冲突,稍后重试 kb_id=%s", kb_id)
+        return None
+
+
+@shared_task
+def wiki_build_chunk_index_task(kb_id):
+    """块向量索引重建(异步),同一知识库持锁串行。返回索引块数;跳过返回 None。"""
+    from apps.opspilot.models import WikiKnowledgeBase
+    from apps.opspilot.services.wiki.vector_index_service import build_chunk_index_locked
+
+    kb = WikiKnowledgeBase.objects.filter(id=kb_id).first()
+    if not kb:
+        logger.error("wiki 块向量索引重建任务: 知识库不存在 id=%s", kb_id)
+        return None
+    built, index = build_chunk_index_locked(kb)
+    if not built:
+        return None
+    return len(index) if index is not None else 0
+
+
 @shared_task
 def wiki_batch_ingest_materials_task(material_ids, llm_model_id=None):
     """批量资料解析(异步):逐条摄取,汇总成功/失败统计。供 batch_create 端点或定时调度调用。
@@ -0,0 +1,221 @@
+"""关键词倒排索引测试:分词、增量维护(发布/改名/归档/删除)、BM25 排序与全量扫描实现的对照。"""
+
+import time
+
+import pytest
+
+
+def _kb(name="kb", **fields):
+    from apps.opspilot.models import WikiKnowledgeBase
+
+    return WikiKnowledgeBase.objects.create(name=name, team=[1], **fields)
+
+
+def _page(kb, title, body):
+    from apps.opspilot.services.wiki.page_service import create_manual_page
+
+    return create_manual_page(kb, page_type="concept", title=title, body=body, created_by="u")
+
+
+@pytest.fixture
+def locmem_cache(settings):
+    from django.core.cache import cache
+
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "wiki-search-index-test"}}
+    cache.clear()
+    yield cache
+    cache.clear()
+
+
+def _ids(results):
+    return [(r["kind"], r["id"]) for r in results]
+
+
+def test_index_terms_splits_cjk_bigrams_and_words():
+    from apps.opspilot.services.wiki.search_index_service import index_terms
+
+    assert index_terms("重启Nginx服务, 盘") == ["重启", "nginx", "服务", "盘"]
+    assert index_terms("CPU使用率") == ["cpu", "使用", "用率"]
+
+
+@pytest.mark.django_db
+def test_index_follows_page_lifecycle():
+    from apps.opspilot.services.wiki.page_service import _new_current_version
+    from apps.opspilot.services.wiki.search_index_service import search_index
+
+    kb = _kb()
+    page = _page(kb, "磁盘清理", "清理日志释放空间")
+    assert _ids(search_index(kb, "日志")) == [("page", page.id)]
+
+    _new_current_version(page, body="扩容数据盘", change_type="human_edit", created_by="u")
+    assert search_index(kb, "日志") == []
+    assert search_index(kb, "扩容")[0]["snippet"] == "扩容数据盘"
+
+    page.status = "archived"
+    page.save(update_fields=["status"])
+    assert search_index(kb, "扩容") == []
+
+
+@pytest.mark.django_db
+def test_index_follows_material_summary_and_delete():
+    from apps.opspilot.models import Material, WikiSearchDocument
+    from apps.opspilot.services.wiki.search_index_service import search_index
+
+    kb = _kb()
+    material = Material.objects.create(knowledge_base=kb, name="nginx手册", material_type="text")
+    assert search_index(kb, "nginx") == []
+
+    material.ai_summary = "nginx 配置说明"
+    material.save(update_fields=["ai_summary"])
+    hit = search_index(kb, "配置")[0]
+    assert (hit["kind"], hit["id"], hit["title"]) == ("material_summary", material.id, "nginx手册")
+
+    material.delete()
+    assert not WikiSearchDocument.objects.filter(knowledge_base=kb).exists()
+
+
+@pytest.mark.django_db
+def test_bm25_prefers_title_and_rare_terms():
+    from apps.opspilot.services.wiki.search_index_service import search_index
+
+    kb = _kb()
+    body_only = _page(kb, "运维手册", "重启服务前先检查服务状态")
+    title_hit = _page(kb, "重启服务", "执行 systemctl restart")
+    _page(kb, "其他", "服务端口说明")
+
+    results = search_index(kb, "重启 服务")
+
+    assert _ids(results)[:2] == [("page", title_hit.id), ("page", body_only.id)]
+    assert results[0]["explanation"]["matched_terms"] == ["服务", "重启"]
+    assert results[0]["explanation"]["keyword_score"] == results[0]["score"]
+
+
+@pytest.mark.django_db
+def test_search_without_index_falls_back_to_scan_and_schedules_backfill_once(locmem_cache):
+    from unittest import mock
+
+    from apps.opspilot.models import WikiSearchDocument
+    from apps.opspilot.services.wiki.retrieval_service import search
+
+    kb = _kb(search_index_ready=False)
+    page = _page(kb, "重启服务", "systemctl restart")
+    WikiSearchDocument.objects.filter(knowledge_base=kb).delete()
+
+    with mock.patch("apps.opspilot.tasks.wiki_rebuild_search_index_task.delay") as delay:
+        assert _ids(search(kb, "重启")) == [("page", page.id)]
+        assert _ids(search(kb, "重启")) == [("page", page.id)]
+
+    delay.assert_called_once_with(kb.id)
+    # 检索路径只读,不在请求内建索引
+    assert not WikiSearchDocument.objects.filter(knowledge_base=kb).exists()
+
+
+@pytest.mark.django_db
+def test_partially_indexed_knowledge_base_scans_until_backfilled(locmem_cache):
+    from unittest import mock
+
+    from apps.opspilot.models import KnowledgePage, WikiSearchDocument
+    from apps.opspilot.services.wiki.retrieval_service import search
+    from apps.opspilot.tasks import wiki_rebuild_search_index_task
+
+    kb = _kb(search_index_ready=False)
+    legacy = _page(kb, "数据库切换", "主从切换步骤")
+    # 模拟存量页面:上线前已存在,没有索引文档
+    WikiSearchDocument.objects.filter(knowledge_base=kb).delete()
+    _page(kb, "新页面", "主从切换演练")
+    assert WikiSearchDocument.objects.filter(knowledge_base=kb).count() == 1
+
+    with mock.patch("apps.opspilot.tasks.wiki_rebuild_search_index_task.delay") as delay:
+        assert legacy.id in {r["id"] for r in search(kb, "主从切换")}
+    delay.assert_called_once_with(kb.id)
+
+    wiki_rebuild_search_index_task(kb.id)
+    with mock.patch("apps.opspilot.services.wiki.retrieval_service.scan_search") as scan:
+        results = search(kb, "主从切换")
+    scan.assert_not_called()
+    assert {r["id"] for r in results} == set(KnowledgePage.objects.filter(knowledge_base=kb).values_list("id", flat=True))
+
+
+@pytest.mark.django_db
+def test_search_on_empty_knowledge_base_does_not_schedule_backfill(locmem_cache):
+    from unittest import mock
+
+    from apps.opspilot.services.wiki.retrieval_service import search
+
+    kb = _kb(search_index_ready=False)
+
+    with mock.patch("apps.opspilot.tasks.wiki_rebuild_search_index_task.delay") as delay:
+        assert search(kb, "重启") == []
+
+    delay.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_backfill_task_rebuilds_index_and_skips_when_locked(locmem_cache):
+    from apps.opspilot.models import WikiSearchDocument
+    from apps.opspilot.services.wiki.search_index_service import REBUILD_LOCK_KEY
+    from apps.opspilot.tasks import wiki_rebuild_search_index_task
+
+    kb = _kb()
+    _page(kb, "重启服务", "systemctl restart")
+    WikiSearchDocument.objects.filter(knowledge_base=kb).delete()
+
+    locmem_cache.add(REBUILD_LOCK_KEY.format(kb.id), 1, 60)
+    assert wiki_rebuild_search_index_task(kb.id) is None
+    assert not WikiSearchDocument.objects.filter(knowledge_base=kb).exists()
+
+    locmem_cache.delete(REBUILD_LOCK_KEY.format(kb.id))
+    assert wiki_rebuild_search_index_task(kb.id) == 1
+    assert WikiSearchDocument.objects.filter(knowledge_base=kb).count() == 1
+
+
+@pytest.mark.django_db
+def test_rebuild_command_backfills_selected_knowledge_bases(locmem_cache):
+    from django.core.management import call_command
+
+    from apps.opspilot.models import WikiSearchDocument
+
+    kb, other = _kb("kb"), _kb("other")
+    _page(kb, "重启服务", "systemctl restart")
+    _page(other, "扩容", "扩容数据盘")
+    WikiSearchDocument.objects.all().delete()
+
+    call_command("rebuild_wiki_search_index", "--kb-id", str(kb.id))
+
+    assert WikiSearchDocument.objects.filter(knowledge_base=kb).count() == 1
+    assert not WikiSearchDocument.objects.filter(knowledge_base=other).exists()
+
+
+@pytest.mark.slow
+@pytest.mark.django_db
+def test_benchmark_index_vs_scan():
+    from apps.opspilot.models import KnowledgePage, PageVersion
+    from apps.opspilot.services.wiki.retrieval_service import scan_search, search
+    from apps.opspilot.services.wiki.search_index_service import rebuild_search_index
+
+    kb = _kb()
+    filler = "部署 配置 监控 告警 日志 备份 " * 40
+    pages = KnowledgePage.objects.bulk_create(
+        [KnowledgePage(knowledge_base=kb, page_type="concept", title=f"页面{i}") for i in range(3000)]
+    )
+    versions = PageVersion.objects.bulk_create(
+        [
+            PageVersion(page=page, body=filler + ("数据库主从切换" if i % 100 == 0 else ""), change_type="human_edit", is_current=True)
+            for i, page in enumerate(pages)
+        ]
+    )
+    for page, version in zip(pages, versions):
+        page.current_version = version
+    KnowledgePage.objects.bulk_update(pages, ["current_version"])
+    rebuild_search_index(kb)
+
+    started = time.perf_counter()
+    indexed = search(kb, "主从切换", top_k=10)
+    index_elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    scanned = scan_search(kb, "主从切换", top_k=10)
+    scan_elapsed = time.perf_counter() - started
+
+    assert {r["id"] for r in indexed} == {r["id"] for r in scanned}
+    assert index_elapsed < scan_elapsed
@@ -0,0 +1,262 @@
+"""块向量索引测试:精确/IVF 检索、文件读写、随页面版本失效与后台重建,以及 hybrid_search 的向量召回融合。"""
+
+import math
+import time
+from collections import OrderedDict
+from unittest import mock
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _index_dir(tmp_path, monkeypatch):
+    from apps.opspilot.services.wiki import vector_index_service
+
+    monkeypatch.setattr(vector_index_service, "WIKI_VECTOR_INDEX_DIR", str(tmp_path))
+    monkeypatch.setattr(vector_index_service, "_cache", OrderedDict())
+
+
+@pytest.fixture
+def locmem_cache(settings):
+    from django.core.cache import cache
+
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "wiki-vector-index-test"}}
+    cache.clear()
+    yield cache
+    cache.clear()
+
+
+@pytest.fixture
+def build_delay(locmem_cache):
+    with mock.patch("apps.opspilot.tasks.wiki_build_chunk_index_task.delay") as delay:
+        yield delay
+
+
+def _kb():
+    from apps.opspilot.models import WikiKnowledgeBase
+
+    return WikiKnowledgeBase.objects.create(name="kb", team=[1])
+
+
+def _page(kb, title, body):
+    from apps.opspilot.services.wiki.page_service import create_manual_page
+
+    return create_manual_page(kb, page_type="concept", title=title, body=body, created_by="u")
+
+
+def _stub(texts):
+    """流量/切换相关 → [1, 0];其他 → [0.6, 0.8]"""
+    return [[1.0, 0.0] if ("流量" in t or "切换" in t) else [0.6, 0.8] for t in texts]
+
+
+def _clustered(count, dim=32, clusters=16, seed=1):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    return (centers[rng.integers(0, clusters, count)] + rng.normal(scale=0.1, size=(count, dim))).astype(np.float32)
+
+
+def test_exact_search_matches_cosine():
+    from apps.opspilot.services.wiki.embedding_service import cosine
+    from apps.opspilot.services.wiki.vector_index_service import ChunkVectorIndex
+
+    vectors = _clustered(200).tolist()
+    index = ChunkVectorIndex.build("fp", [(i, i // 4, v) for i, v in enumerate(vectors)])
+    query = vectors[7]
+
+    expected = sorted(range(200), key=lambda i: cosine(query, vectors[i]), reverse=True)[:5]
+    hits = index.search(query, top_k=5)
+
+    assert [chunk_id for chunk_id, _, _ in hits] == expected
+    assert hits[0][1] == 1 and hits[0][2] == pytest.approx(1.0, abs=1e-5)
+
+
+def test_build_skips_empty_and_mismatched_dims():
+    from apps.opspilot.services.wiki.vector_index_service import ChunkVectorIndex
+
+    index = ChunkVectorIndex.build("fp", [(1, 1, [1.0, 0.0]), (2, 1, []), (3, 2, [0.0, 1.0]), (4, 2, [1.0, 0.0, 0.0])])
+
+    assert list(index.chunk_ids) == [1, 3] and index.dim == 2
+    assert index.search([1.0, 0.0, 0.0]) == []
+    assert ChunkVectorIndex.build("fp", [(1, 1, [])]) is None
+
+
+def test_ivf_recall_and_file_round_trip(tmp_path):
+    from apps.opspilot.services.wiki.vector_index_service import ChunkVectorIndex
+
+    vectors = _clustered(4000)
+    index = ChunkVectorIndex.build("fp", [(i, i, v) for i, v in enumerate(vectors.tolist())], ivf_min_vectors=0)
+    assert index.centroids is not None
+
+    path = str(tmp_path / "kb.npz")
+    index.save(path)
+    loaded = ChunkVectorIndex.load(path)
+    assert loaded.fingerprint == "fp"
+
+    exact = ChunkVectorIndex.build("fp", [(i, i, v) for i, v in enumerate(vectors.tolist())])
+    recall = []
+    for query in vectors[:50]:
+        truth = {chunk_id for chunk_id, _, _ in exact.search(query.tolist(), 10)}
+        found = {chunk_id for chunk_id, _, _ in loaded.search(query.tolist(), 10)}
+        recall.append(len(truth & found) / 10)
+    assert sum(recall) / len(recall) >= 0.9
+
+
+@pytest.mark.django_db
+def test_index_follows_page_versions(build_delay):
+    from apps.opspilot.services.wiki.embedding_service import reindex_page_chunks
+    from apps.opspilot.services.wiki.page_service import _new_current_version
+    from apps.opspilot.services.wiki.vector_index_service import filter_live_hits, get_chunk_index
+    from apps.opspilot.tasks import wiki_build_chunk_index_task
+
+    kb = _kb()
+    page = _page(kb, "主从切换", "# 步骤\n先切换流量")
+    reindex_page_chunks(page, None, embed_fn=_stub)
+    # 从未构建过:请求内持锁构建一次
+    first = get_chunk_index(kb)
+    assert len(first) == 1 and get_chunk_index(kb) is first
+    build_delay.assert_not_called()
+
+    # 发布新版本但块尚未重建:继续用旧索引并投递后台重建,旧版本的块在召回时被过滤
+    _new_current_version(page, body="# 步骤\n无关内容", change_type="human_edit", created_by="u")
+    assert get_chunk_index(kb) is first
+    assert get_chunk_index(kb) is first
+    assert filter_live_hits(kb, first.search([1.0, 0.0])) == []
+    build_delay.assert_called_once_with(kb.id)
+
+    reindex_page_chunks(page, None, embed_fn=_stub)
+    assert wiki_build_chunk_index_task(kb.id) == 1
+    rebuilt = get_chunk_index(kb)
+    assert rebuilt is not first
+    assert filter_live_hits(kb, rebuilt.search([0.0, 1.0]))[0][1] == page.id
+
+
+@pytest.mark.django_db
+def test_chunk_index_version_bumps_on_live_chunk_changes(build_delay, django_assert_num_queries):
+    from apps.opspilot.services.wiki.embedding_service import clear_page_vectors, reindex_page_chunks
+    from apps.opspilot.services.wiki.vector_index_service import get_chunk_index, index_fingerprint
+    from apps.opspilot.tasks import wiki_build_chunk_index_task
+
+    kb = _kb()
+    page = _page(kb, "主从切换", "# 步骤\n先切换流量")
+    reindex_page_chunks(page, None, embed_fn=_stub)
+    cached = get_chunk_index(kb)
+
+    # 检索时指纹只按主键读一行,不对块做聚合
+    with django_assert_num_queries(1):
+        fingerprint = index_fingerprint(kb)
+    assert get_chunk_index(kb) is cached
+
+    page.title = "改名"
+    page.save(update_fields=["title"])
+    assert index_fingerprint(kb) == fingerprint
+
+    clear_page_vectors([page.id])
+    cleared = index_fingerprint(kb)
+    assert cleared != fingerprint
+    assert wiki_build_chunk_index_task(kb.id) == 0
+    assert get_chunk_index(kb) is None
+
+    reindex_page_chunks(page, None, embed_fn=_stub)
+    assert index_fingerprint(kb) != cleared
+    assert len(get_chunk_index(kb)) == 1
+    page.status = "archived"
+    page.save(update_fields=["status"])
+    wiki_build_chunk_index_task(kb.id)
+    assert get_chunk_index(kb) is None
+
+
+@pytest.mark.django_db
+def test_first_build_is_single_flight(build_delay, locmem_cache):
+    from apps.opspilot.services.wiki import vector_index_service
+    from apps.opspilot.services.wiki.embedding_service import reindex_page_chunks
+    from apps.opspilot.services.wiki.vector_index_service import BUILD_LOCK_KEY, get_chunk_index
+
+    kb = _kb()
+    reindex_page_chunks(_page(kb, "主从切换", "# 步骤\n先切换流量"), None, embed_fn=_stub)
+    # 其他请求/任务正在构建:不重复构建,直接走回退
+    locmem_cache.add(BUILD_LOCK_KEY.format(kb.id), 1, 60)
+    with mock.patch.object(vector_index_service, "build_chunk_index") as build:
+        assert get_chunk_index(kb) is None
+    build.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_index_file_from_another_source_is_ignored(build_delay):
+    from apps.opspilot.services.wiki.embedding_service import reindex_page_chunks
+    from apps.opspilot.services.wiki.vector_index_service import ChunkVectorIndex, get_chunk_index, index_fingerprint, index_path
+
+    kb = _kb()
+    page = _page(kb, "主从切换", "# 步骤\n先切换流量")
+    reindex_page_chunks(page, None, embed_fn=_stub)
+    # 另一部署(或重建过的库)里同 id 知识库留下的 v0 索引文件
+    foreign = f"other-db:kb{kb.id}:0.000000@v{kb.chunk_index_version}"
+    ChunkVectorIndex.build(foreign, [(999, 999, [1.0, 0.0])]).save(index_path(kb.id))
+
+    index = get_chunk_index(kb)
+
+    assert index.fingerprint == index_fingerprint(kb)
+    assert [hit[1] for hit in index.search([1.0, 0.0])] == [page.id]
+    build_delay.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_process_cache_is_bounded(build_delay, monkeypatch):
+    from apps.opspilot.services.wiki import vector_index_service
+    from apps.opspilot.services.wiki.embedding_service import reindex_page_chunks
+
+    monkeypatch.setattr(vector_index_service, "CHUNK_INDEX_CACHE_SIZE", 2)
+    kbs = [_kb() for _ in range(3)]
+    for kb in kbs:
+        reindex_page_chunks(_page(kb, "主从切换", "# 步骤\n先切换流量"), None, embed_fn=_stub)
+        vector_index_service.get_chunk_index(kb)
+
+    assert list(vector_index_service._cache) == [kbs[1].id, kbs[2].id]
+
+
+@pytest.mark.django_db
+def test_hybrid_search_fuses_vector_recall_without_candidate_embedding():
+    from apps.opspilot.services.wiki.embedding_service import reindex_page_chunks
+    from apps.opspilot.services.wiki.retrieval_service import hybrid_search
+
+    kb = _kb()
+    keyword_page = _page(kb, "重启服务", "systemctl restart 重启")
+    vector_page = _page(kb, "流量调度", "切换前先摘除流量")
+    for page in (keyword_page, vector_page):
+        reindex_page_chunks(page, None, embed_fn=_stub)
+
+    calls = []
+
+    def embed(texts):
+        calls.append(list(texts))
+        return [[1.0, 0.0]]
+
+    results = hybrid_search(kb, "重启", embed_fn=embed)
+
+    assert calls == [["重启"]]
+    by_id = {r["id"]: r["explanation"] for r in results}
+    assert by_id[vector_page.id]["matched_by"] == ["vector"]
+    assert by_id[vector_page.id]["chunk_index"] == 0
+    assert by_id[keyword_page.id]["matched_by"] == ["keyword", "vector"]
+    assert by_id[vector_page.id]["semantic_rank"] == 1
+
+
+@pytest.mark.slow
+def test_benchmark_index_vs_python_cosine():
+    from apps.opspilot.services.wiki.embedding_service import cosine
+    from apps.opspilot.services.wiki.vector_index_service import ChunkVectorIndex
+
+    vectors = _clustered(20000, dim=256).tolist()
+    index = ChunkVectorIndex.build("fp", [(i, i, v) for i, v in enumerate(vectors)])
+    query = vectors[123]
+
+    started = time.perf_counter()
+    hits = index.search(query, top_k=10)
+    index_elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    scored = sorted(((cosine(query, v), i) for i, v in enumerate(vectors)), reverse=True)[:10]
+    loop_elapsed = time.perf_counter() - started
+
+    assert hits[0][0] == 123 and math.isclose(scored[0][0], 1.0, rel_tol=1e-6)
+    assert index_elapsed < loop_elapsed
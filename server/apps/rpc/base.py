@@ -4,6 +4,7 @@ import os
 from django.conf import settings
 
 import nats_client
+from nats_client.clients import normalize_call, run_pooled
 
 DEFAULT_REQUEST_TIMEOUT = 60
 
@@ -23,7 +24,7 @@ class RpcClient(object):
             request_coro = nats_client.request(self.namespace, method_name, *args, **kwargs)
             if effective_timeout and effective_timeout > 0:
                 request_coro = asyncio.wait_for(request_coro, timeout=effective_timeout)
-            return asyncio.run(request_coro)
+            return run_pooled(request_coro)
         except TimeoutError:
             raise TimeoutError(f"RPC request timeout: namespace={self.namespace}, method={method_name}, timeout={effective_timeout}s")
 
@@ -34,10 +35,37 @@ class RpcClient(object):
             request_coro = nats_client.nat_request(self.namespace, method_name, **kwargs)
             if effective_timeout and effective_timeout > 0:
                 request_coro = asyncio.wait_for(request_coro, timeout=effective_timeout)
-            return asyncio.run(request_coro)
+            return run_pooled(request_coro)
         except TimeoutError:
             raise TimeoutError(f"RPC request timeout: namespace={self.namespace}, method={method_name}, timeout={effective_timeout}s")
 
+    def run_many(self, calls, _timeout=None, max_in_flight=None, return_exceptions=False, envelope=False):
+        """并发执行多次 RPC 调用，结果按 calls 顺序返回。
+
+        calls: [(method_name, args, kwargs), ...]；所有请求复用同一条 NATS 连接，
+        最多 max_in_flight 个同时在途，每次调用各自受 _timeout（或 kwargs["_timeout"]）约束。
+        envelope=True 时打包成一条批量信封消息，由服务端 `__batch__` 入口一次处理。
+        """
+        return run_pooled(
+            self.run_many_async(
+                calls,
+                _timeout=_timeout,
+                max_in_flight=max_in_flight,
+                return_exceptions=return_exceptions,
+                envelope=envelope,
+            )
+        )
+
+    async def run_many_async(self, calls, _timeout=None, max_in_flight=None, return_exceptions=False, envelope=False):
+        return await nats_client.request_many(
+            self.namespace,
+            calls,
+            _timeout=_timeout,
+            _max_in_flight=max_in_flight,
+            _return_exceptions=return_exceptions,
+            _envelope=envelope,
+        )
+
 
 class AppClient(object):
     def __init__(self, path):
@@ -50,6 +78,20 @@ class AppClient(object):
             raise ValueError(f"Method {method_name} not found in {self.path}")
         return method(*args, **kwargs)
 
+    def run_many(self, calls, return_exceptions=False, **_options):
+        """本地调用无网络往返，按顺序逐个执行，接口与 RpcClient.run_many 保持一致。"""
+        results = []
+        for call in calls:
+            method_name, args, kwargs = normalize_call(call)
+            kwargs.pop("_timeout", None)
+            try:
+                results.append(self.run(method_name, *args, **kwargs))
+            except Exception as e:  # noqa
+                if not return_exceptions:
+                    raise
+                results.append(e)
+        return results
+
 
 class OperationAnalysisRpc(RpcClient):
     """
@@ -41,6 +41,11 @@ class CMDB(object):
         """告警丰富批量查询 CMDB 实例。"""
         return self.client.run("search_instances_batch", **kwargs)
 
+    def search_instances_batch_many(self, queries):
+        """并发执行多组 search_instances_batch，结果按 queries 顺序返回，失败项为异常对象。"""
+        calls = [("search_instances_batch", (), query) for query in queries]
+        return self.client.run_many(calls, return_exceptions=True)
+
     def list_instances(self, **kwargs):
         """
         查询单个模型下的实例列表（分页 + 过滤）
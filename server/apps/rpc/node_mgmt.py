@@ -131,6 +131,36 @@ class NodeMgmt(object):
         )
         return return_data
 
+    def get_configs_and_child_configs_by_ids(self, ids, child_ids):
+        """
+        一次批量请求同时获取配置与子配置（RpcClient 下两次调用并发发出）
+        :param ids: 配置ID列表
+        :param child_ids: 子配置ID列表
+        :return: (配置列表, 子配置列表)
+        """
+        configs, child_configs = self.client.run_many(
+            [
+                ("get_configs_by_ids", (ids,), {}),
+                ("get_child_configs_by_ids", (child_ids,), {}),
+            ]
+        )
+        return configs, child_configs
+
+    def update_config_contents(self, config=None, child_config=None):
+        """
+        批量更新配置与子配置内容，缺省的一方不更新
+        :param config: {"id", "content", "env_config"}
+        :param child_config: {"id", "content", "env_config"}
+        """
+        calls = []
+        if config:
+            calls.append(("update_config_content", (config,), {}))
+        if child_config:
+            calls.append(("update_child_config_content", (child_config,), {}))
+        if not calls:
+            return []
+        return self.client.run_many(calls)
+
     def update_child_config_content(self, id, content, env_config=None):
         """
         :param id: 子配置ID
@@ -122,3 +122,30 @@ class TestBaseOperationAnaRpc:
         base = BaseOperationAnaRpc()
         assert isinstance(base.client, OperationAnalysisRpc)
         assert base.client.server == ""
+
+
+class TestRunMany:
+    def test_run_many_转发给_request_many(self):
+        client = RpcClient(namespace="ns")
+        calls = [("a", (1,), {}), ("b", (), {"k": "v"})]
+        with mock.patch("apps.rpc.base.nats_client") as m:
+            m.request_many.side_effect = _coro(["ra", "rb"])
+            out = client.run_many(calls, _timeout=5, max_in_flight=8, return_exceptions=True)
+        assert out == ["ra", "rb"]
+        call = m.request_many.call_args
+        assert call.args == ("ns", calls)
+        assert call.kwargs == {
+            "_timeout": 5,
+            "_max_in_flight": 8,
+            "_return_exceptions": True,
+            "_envelope": False,
+        }
+
+    def test_app_client_run_many_顺序执行并收集异常(self):
+        from apps.rpc.base import AppClient
+
+        client = AppClient("math")
+        out = client.run_many([("sqrt", (16,)), ("no_such_function",), ("pow", (2, 3), {"_timeout": 1})], return_exceptions=True)
+        assert out[0] == 4.0
+        assert isinstance(out[1], ValueError)
+        assert out[2] == 8.0
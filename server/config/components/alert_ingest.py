@@ -0,0 +1,15 @@
+import os
+
+# 告警事件流式接入（JetStream 微批），详见 apps.alerts.service.ingest_stream
+ALERT_INGEST_STREAM_ENABLED = os.getenv("ALERT_INGEST_STREAM_ENABLED", "false").lower() == "true"
+ALERT_INGEST_DURABLE_NAME = os.getenv("ALERT_INGEST_DURABLE_NAME", "alert-ingest-worker")
+# 单个微批的事件数上限与最长等待时间（秒），先到先触发
+ALERT_INGEST_BATCH_SIZE = int(os.getenv("ALERT_INGEST_BATCH_SIZE", "500"))
+ALERT_INGEST_MAX_WAIT = float(os.getenv("ALERT_INGEST_MAX_WAIT", "1.0"))
+# 流积压上限：超出后拒绝写入（DiscardPolicy.NEW），接收器退回同步处理
+ALERT_INGEST_MAX_PENDING = int(os.getenv("ALERT_INGEST_MAX_PENDING", "100000"))
+ALERT_INGEST_MAX_BYTES = int(os.getenv("ALERT_INGEST_MAX_BYTES", str(1024 * 1024 * 1024)))
+ALERT_INGEST_MAX_AGE = int(os.getenv("ALERT_INGEST_MAX_AGE", str(24 * 3600)))
+ALERT_INGEST_PUBLISH_TIMEOUT = float(os.getenv("ALERT_INGEST_PUBLISH_TIMEOUT", "2"))
+# 消费者 ack 超时（秒）：处理中的微批会按其 1/3 周期发送 in_progress 续期，超时未 ack 才会重投
+ALERT_INGEST_ACK_WAIT = float(os.getenv("ALERT_INGEST_ACK_WAIT", "60"))
@@ -73,3 +73,11 @@ NATS_OPTIONS = {
 
 # 清理 None 值的配置项
 NATS_OPTIONS = {k: v for k, v in NATS_OPTIONS.items() if v is not None}
+
+# RpcClient 是否复用进程级 NATS 长连接（后台事件循环线程 + 多路复用连接），关闭后退回按次建连
+NATS_POOLED_CONNECTION = os.getenv("NATS_POOLED_CONNECTION", "true").lower() == "true"
+
+# RpcClient.run_many 同时在途的请求数上限
+NATS_BATCH_MAX_IN_FLIGHT = int(os.getenv("NATS_BATCH_MAX_IN_FLIGHT", "32"))
+# nats_listener 是否注册批量信封入口 `{namespace}.__batch__`
+NATS_BATCH_ENABLED = os.getenv("NATS_BATCH_ENABLED", "true").lower() == "true"
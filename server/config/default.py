@@ -15,6 +15,7 @@ include(
     "components/log.py",
     "components/minio.py",
     "components/nats.py",
+    "components/alert_ingest.py",
     "components/extra.py",
     "components/mlflow.py",
 )
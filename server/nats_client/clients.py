@@ -1,6 +1,7 @@
-__all__ = ["nat_request", "request", "request_sync", "publish", "publish_sync", "js_publish", "js_publish_sync", "request_v2", "subscribe_lines_sync", "publish_raw", "publish_raw_sync", "ensure_stream", "ensure_stream_sync", "iter_jetstream_subject"]
+__all__ = ["nat_request", "request", "request_sync", "request_many", "borrow_client", "run_pooled", "publish", "publish_sync", "js_publish", "js_publish_sync", "request_v2", "subscribe_lines_sync", "publish_raw", "publish_raw_sync", "ensure_stream", "ensure_stream_sync", "iter_jetstream_subject"]
 
 import asyncio
+import contextlib
 import functools
 import json
 import queue
@@ -15,11 +16,14 @@ from nats.js.api import DiscardPolicy, StreamConfig
 from apps.core.logger import nats_logger as logger
 from apps.rpc.sensitive import sanitize_sensitive_data
 
+from .connection import connection_manager
 from .exceptions import NatsClientException
+from .registry import BATCH_METHOD_NAME
 from .types import ResponseType
 from .utils import parse_arguments
 
 DEFAULT_REQUEST_TIMEOUT = 60
+DEFAULT_BATCH_MAX_IN_FLIGHT = 32
 
 
 def _mask_server_url(server_url: str) -> str:
@@ -83,12 +87,9 @@ async def nat_request(
     **kwargs,
 ) -> ResponseType:
     payload = json.dumps(kwargs).encode()
-    nc = await get_nc_client()
     timeout = _timeout or getattr(settings, "NATS_REQUEST_TIMEOUT", DEFAULT_REQUEST_TIMEOUT)
-    try:
+    async with borrow_client() as nc:
         response = await nc.request(f"{namespace}.{method_name}", payload, timeout=timeout)
-    finally:
-        await nc.close()
     data = response.data.decode()
     parsed = json.loads(data)
     return parsed
@@ -100,6 +101,30 @@ def get_default_nats_server():
     return servers
 
 
+@contextlib.asynccontextmanager
+async def borrow_client():
+    """获取一个可用的 NATS 连接。
+
+    运行在连接管理器的后台事件循环中时复用进程级长连接（不关闭）；
+    其余场景（如调用方自行 asyncio.run）保持按次建连、用完即关。
+    """
+    if connection_manager.in_loop():
+        yield await connection_manager.get_client()
+        return
+    nc = await get_nc_client()
+    try:
+        yield nc
+    finally:
+        await nc.close()
+
+
+def run_pooled(coro):
+    """同步执行 NATS 协程：启用长连接时桥接到连接管理器的事件循环，否则 asyncio.run。"""
+    if getattr(settings, "NATS_POOLED_CONNECTION", True):
+        return connection_manager.run(coro)
+    return asyncio.run(coro)
+
+
 async def get_nc_client(nc=None, server: str = "", user: Optional[str] = None, password: Optional[str] = None) -> Client:
     if nc is None:
         nc = Client()
@@ -137,16 +162,16 @@ async def get_nc_client(nc=None, server: str = "", user: Optional[str] = None, p
 
 async def request(namespace: str, method_name: str, *args, _timeout: Optional[float] = None, _raw=False, **kwargs) -> ResponseType:
     payload = parse_arguments(args, kwargs)
-    nc = await get_nc_client()
 
     timeout = _timeout or getattr(settings, "NATS_REQUEST_TIMEOUT", DEFAULT_REQUEST_TIMEOUT)
-    try:
+    async with borrow_client() as nc:
         response = await nc.request(f"{namespace}.{method_name}", payload, timeout=timeout)
-    finally:
-        await nc.close()
 
-    data = response.data.decode()
-    parsed = json.loads(data)
+    return _unwrap_response(json.loads(response.data.decode()), _raw=_raw)
+
+
+def _unwrap_response(parsed: dict, _raw=False) -> ResponseType:
+    """解析 RPC 响应信封：成功返回 result，失败抛 NatsClientException。"""
     if _raw:
         parsed.pop("pickled_exc", None)
         return parsed
@@ -196,6 +221,75 @@ async def request(namespace: str, method_name: str, *args, _timeout: Optional[fl
     return parsed["result"]
 
 
+def normalize_call(call) -> tuple:
+    """(method,) / (method, args) / (method, args, kwargs) 统一为三元组。"""
+    if isinstance(call, str):
+        return call, (), {}
+    method_name, args, kwargs = (tuple(call) + ((), {}))[:3]
+    return method_name, tuple(args or ()), dict(kwargs or {})
+
+
+async def request_many(
+    namespace: str,
+    calls,
+    _timeout: Optional[float] = None,
+    _max_in_flight: Optional[int] = None,
+    _return_exceptions=False,
+    _envelope=False,
+) -> list:
+    """在同一条 NATS 连接上并发发起多次 RPC，结果按 calls 顺序返回。
+
+    - calls: [(method_name, args, kwargs), ...]，kwargs 中的 ``_timeout`` 作为该次调用的独立超时；
+    - _max_in_flight: 同时在途的请求数上限，默认 NATS_BATCH_MAX_IN_FLIGHT；
+    - _envelope: 以批量信封一次性发送到服务端 ``{namespace}.__batch__``，由服务端在一条消息内处理全部调用；
+    - _return_exceptions: 为 True 时失败项以异常对象占位，否则抛出第一个失败。
+    """
+    calls = [normalize_call(call) for call in calls]
+    if not calls:
+        return []
+    timeout = _timeout or getattr(settings, "NATS_REQUEST_TIMEOUT", DEFAULT_REQUEST_TIMEOUT)
+    max_in_flight = _max_in_flight or getattr(settings, "NATS_BATCH_MAX_IN_FLIGHT", DEFAULT_BATCH_MAX_IN_FLIGHT)
+
+    async with borrow_client() as nc:
+        if _envelope:
+            results = await _request_envelope(nc, namespace, calls, timeout)
+        else:
+            semaphore = asyncio.Semaphore(max_in_flight)
+
+            async def _one(method_name, args, kwargs):
+                call_timeout = kwargs.pop("_timeout", None) or timeout
+                async with semaphore:
+                    response = await nc.request(f"{namespace}.{method_name}", parse_arguments(args, kwargs), timeout=call_timeout)
+                return _unwrap_response(json.loads(response.data.decode()))
+
+            results = await asyncio.gather(*(_one(*call) for call in calls), return_exceptions=True)
+
+    if not _return_exceptions:
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+    return results
+
+
+async def _request_envelope(nc, namespace: str, calls: list, timeout: float) -> list:
+    batch_calls = []
+    for method_name, args, kwargs in calls:
+        kwargs.pop("_timeout", None)
+        batch_calls.append({"method": method_name, "args": args, "kwargs": kwargs})
+    payload = parse_arguments((), {"calls": batch_calls})
+    response = await nc.request(f"{namespace}.{BATCH_METHOD_NAME}", payload, timeout=timeout)
+    items = _unwrap_response(json.loads(response.data.decode()))
+    if not isinstance(items, list) or len(items) != len(calls):
+        raise NatsClientException(f"Invalid batch response: expected {len(calls)} items")
+    results = []
+    for item in items:
+        try:
+            results.append(_unwrap_response(item))
+        except NatsClientException as e:
+            results.append(e)
+    return results
+
+
 async def request_v2(
     namespace: str,
     method_name: str,
@@ -283,22 +377,18 @@ async def request_v2(
 
 
 def request_sync(*args, **kwargs):
-    return asyncio.run(request(*args, **kwargs))
+    return run_pooled(request(*args, **kwargs))
 
 
 async def publish(namespace: str, method_name: str, *args, _js=False, **kwargs) -> None:
     payload = parse_arguments(args, kwargs)
 
-    nc = await get_nc_client()
-
-    try:
+    async with borrow_client() as nc:
         if _js:
             js = nc.jetstream()
             await js.publish(f"{namespace}.js.{method_name}", payload)
         else:
             await nc.publish(f"{namespace}.{method_name}", payload)
-    finally:
-        await nc.close()
 
 
 def publish_sync(*args, **kwargs):
@@ -345,12 +435,9 @@ def subscribe_lines_sync(subject: str, timeout: Optional[float] = None, stop_eve
 
 async def publish_raw(subject: str, payload: dict) -> None:
     """向原始 subject 发布一条扁平 JSON（不走 RPC 的 args/kwargs 包装）。"""
-    nc = await get_nc_client()
-    try:
+    async with borrow_client() as nc:
         await nc.publish(subject, json.dumps(payload, ensure_ascii=False).encode())
         await nc.flush()
-    finally:
-        await nc.close()
 
 
 def publish_raw_sync(subject: str, payload: dict) -> None:
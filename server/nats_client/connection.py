@@ -0,0 +1,136 @@
+__all__ = ["NatsConnectionManager", "connection_manager"]
+
+import asyncio
+import atexit
+import os
+import threading
+from typing import Optional
+
+from nats.aio.client import Client
+
+from apps.core.logger import nats_logger as logger
+
+DEFAULT_SHUTDOWN_TIMEOUT = 5
+
+
+class NatsConnectionManager:
+    """进程级 NATS 长连接管理器。
+
+    - 独立的后台事件循环线程承载一条多路复用的 NATS 连接，所有同步调用方通过 ``run`` 桥接；
+    - 连接懒加载，断开后由 nats-py 自动重连，重连耗尽（连接已关闭）时下一次调用重新建连；
+    - fork 安全：Celery prefork / gunicorn worker 子进程检测到 pid 变化后丢弃父进程的循环与连接，重新初始化。
+    """
+
+    def __init__(self, client_factory=Client):
+        self._client_factory = client_factory
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._nc: Optional[Client] = None
+        self._connect_lock: Optional[asyncio.Lock] = None
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        return self._ensure_loop()
+
+    def in_loop(self) -> bool:
+        """当前协程是否运行在管理器的后台事件循环中。"""
+        if self._loop is None or self._pid != os.getpid():
+            return False
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return self._loop
+        with self._lock:
+            if self._pid != os.getpid():
+                # 父进程的线程不会被 fork 复制，连接的 socket 也不能跨进程共用，直接丢弃引用
+                self._reset()
+            if self._loop is None or not self._thread.is_alive():
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=self._run_loop, args=(loop,), name="nats-connection-loop", daemon=True)
+                thread.start()
+                self._loop = loop
+                self._thread = thread
+                self._connect_lock = None
+                self._nc = None
+                self._pid = os.getpid()
+        return self._loop
+
+    @staticmethod
+    def _run_loop(loop: asyncio.AbstractEventLoop) -> None:
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+
+    def _reset(self) -> None:
+        self._lock = threading.Lock()
+        self._pid = None
+        self._loop = None
+        self._thread = None
+        self._nc = None
+        self._connect_lock = None
+
+    def _after_fork_in_child(self) -> None:
+        self._reset()
+
+    async def get_client(self) -> Client:
+        """返回共享连接，必须在管理器的事件循环内调用。"""
+        if not self.in_loop():
+            raise RuntimeError("NatsConnectionManager.get_client must be awaited on the manager loop")
+        nc = self._nc
+        if nc is not None and not nc.is_closed:
+            return nc
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            nc = self._nc
+            if nc is not None and not nc.is_closed:
+                return nc
+            if nc is not None:
+                logger.warning("NATS pooled connection closed, reconnecting, pid=%s", os.getpid())
+            # 延迟导入，避免与 clients 模块循环依赖
+            from .clients import get_nc_client
+
+            self._nc = await get_nc_client(self._client_factory())
+            logger.info("NATS pooled connection established, pid=%s", os.getpid())
+            return self._nc
+
+    def run(self, coro, timeout: Optional[float] = None):
+        """在后台事件循环中执行协程并阻塞等待结果（同步桥接）。"""
+        loop = self._ensure_loop()
+        if self.in_loop():
+            coro.close()
+            raise RuntimeError("NatsConnectionManager.run cannot be called from the manager loop")
+        future = asyncio.run_coroutine_threadsafe(coro, loop)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    def close(self, timeout: float = DEFAULT_SHUTDOWN_TIMEOUT) -> None:
+        """关闭共享连接并停止后台事件循环。"""
+        with self._lock:
+            loop, thread, nc = self._loop, self._thread, self._nc
+            owned = self._pid == os.getpid()
+            self._reset()
+        if not owned or loop is None or not thread.is_alive():
+            return
+        if nc is not None and not nc.is_closed:
+            try:
+                asyncio.run_coroutine_threadsafe(nc.close(), loop).result(timeout)
+            except Exception as e:  # noqa
+                logger.warning("NATS pooled connection close failed, error=%s", e)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+
+
+connection_manager = NatsConnectionManager()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=connection_manager._after_fork_in_child)
+atexit.register(connection_manager.close)
@@ -1,6 +1,11 @@
 import asyncio
+import json
 
-from .registry import default_registry
+import jsonpickle
+from django.conf import settings
+from django.core.exceptions import ValidationError
+
+from .registry import BATCH_METHOD_NAME, default_registry
 from .utils import database_sync_to_async
 
 
@@ -17,3 +22,54 @@ async def nats_handler(key: str, data):
         func = database_sync_to_async(func)
 
     return await func(*args, **kwargs)
+
+
+def build_error_payload(e: Exception) -> dict:
+    """异常转换为 RPC 失败响应信封（与单次调用的失败格式一致）。"""
+    if isinstance(e, ValidationError):
+        message = e.message_dict
+    else:
+        message = str(e)
+        try:
+            message = json.loads(message)
+        except json.JSONDecodeError:
+            pass
+    return {
+        'success': False,
+        'error': e.__class__.__name__,
+        'message': message,
+        'pickled_exc': jsonpickle.encode(e),
+    }
+
+
+async def batch_handler(registry, namespace: str, calls: list, max_in_flight: int = None) -> list:
+    """逐项分发批量信封中的调用，结果按请求顺序返回，单项失败不影响其余调用。
+
+    同时执行的调用数受 max_in_flight（默认 NATS_BATCH_MAX_IN_FLIGHT）限制，
+    避免一个大信封把 database_sync_to_async 线程池和数据库连接占满。
+    """
+    if not max_in_flight or max_in_flight <= 0:
+        max_in_flight = getattr(settings, 'NATS_BATCH_MAX_IN_FLIGHT', 32)
+    semaphore = asyncio.Semaphore(max_in_flight)
+
+    async def _dispatch(call):
+        async with semaphore:
+            return await _dispatch_one(call)
+
+    async def _dispatch_one(call):
+        method_name = call.get('method')
+        try:
+            if not method_name or method_name == BATCH_METHOD_NAME:
+                raise ValueError(f'Invalid batch method `{method_name}`')
+            data = registry.registry.get(f'{namespace}.{method_name}')
+            if data is None:
+                raise ValueError(f'No function found for `{namespace}.{method_name}`')
+            func = data['func']
+            if not asyncio.iscoroutinefunction(func):
+                func = database_sync_to_async(func)
+            result = await func(*call.get('args', []), **call.get('kwargs', {}))
+        except Exception as e:  # pylint: disable=broad-except
+            return build_error_payload(e)
+        return {'success': True, 'result': result}
+
+    return await asyncio.gather(*(_dispatch(call) for call in calls))
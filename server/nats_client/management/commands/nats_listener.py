@@ -1,10 +1,8 @@
 import asyncio
 import json
 
-import jsonpickle
 import nats.errors
 from django.conf import settings
-from django.core.exceptions import ValidationError
 from django.core.management import BaseCommand
 from django.core.serializers.json import DjangoJSONEncoder
 from django.utils import autoreload
@@ -13,7 +11,7 @@ from nats.aio.errors import ErrNoServers, ErrTimeout
 from nats.aio.msg import Msg
 
 from ...clients import get_nc_client
-from ...handlers import nats_handler
+from ...handlers import build_error_payload, nats_handler
 from ...registry import default_registry
 
 
@@ -75,6 +73,9 @@ class Command(BaseCommand):
             print("** No function found!")
             return
 
+        if getattr(settings, "NATS_BATCH_ENABLED", True):
+            default_registry.register_batch_handler(namespace)
+
         if self.js is not None and create_stream:
             print("** Creating stream")
             stream_config.pop("name", None)
@@ -131,26 +132,7 @@ class Command(BaseCommand):
             r = await nats_handler(func_name, data)
         except Exception as e:  # pylint: disable=broad-except
             if reply:
-                if isinstance(e, ValidationError):
-                    message = e.message_dict
-                else:
-                    message = str(e)
-                    try:
-                        message = json.loads(message)
-                    except json.JSONDecodeError:
-                        pass
-
-                await self.nats.publish(
-                    reply,
-                    json.dumps(
-                        {
-                            "success": False,
-                            "error": e.__class__.__name__,
-                            "message": message,
-                            "pickled_exc": jsonpickle.encode(e),
-                        }
-                    ).encode(),
-                )
+                await self.nats.publish(reply, json.dumps(build_error_payload(e)).encode())
             raise e
 
         if reply:
@@ -1,7 +1,10 @@
-__all__ = ['register']
+__all__ = ['register', 'BATCH_METHOD_NAME']
 
 from django.conf import settings
 
+# 批量信封入口：客户端把 N 次逻辑调用打包成一条消息发到 `{namespace}.__batch__`
+BATCH_METHOD_NAME = '__batch__'
+
 
 class FunctionRegistry:
     """Function registry for callback functions from NATS"""
@@ -41,6 +44,20 @@ class FunctionRegistry:
         }
         return func
 
+    def register_batch_handler(self, namespace: str = None):
+        """注册批量信封入口 `{namespace}.__batch__`，服务端在一条消息内分发并返回 N 次调用结果。"""
+        namespace = namespace or getattr(settings, 'NATS_NAMESPACE', 'default')
+        key = f'{namespace}.{BATCH_METHOD_NAME}'
+        if key in self.registry:
+            return self.registry[key]['func']
+
+        async def batch_dispatch(calls=None):
+            from .handlers import batch_handler
+
+            return await batch_handler(self, namespace, calls or [])
+
+        return self.register_function(batch_dispatch, BATCH_METHOD_NAME, namespace=namespace)
+
 
 default_registry = FunctionRegistry()
 register = default_registry.register
@@ -0,0 +1,165 @@
+# server/nats_client/tests/test_batch.py
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from nats_client import clients
+from nats_client.connection import NatsConnectionManager
+from nats_client.exceptions import NatsClientException
+from nats_client.handlers import batch_handler
+from nats_client.registry import BATCH_METHOD_NAME, FunctionRegistry
+
+pytestmark = pytest.mark.unit
+
+
+class _EchoClient:
+    """按 subject 回显，可配置单次延迟，记录最大在途数。"""
+
+    def __init__(self, delays=None, registry=None):
+        self.is_closed = False
+        self.delays = delays or {}
+        self.registry = registry
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.subjects = []
+
+    async def connect(self, **_kwargs):
+        return None
+
+    async def request(self, subject, payload, timeout=None):
+        self.subjects.append(subject)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            body = json.loads(payload.decode())
+            if self.registry is not None and subject.endswith(BATCH_METHOD_NAME):
+                func = self.registry.registry[subject]["func"]
+                result = await func(**body["kwargs"])
+                return SimpleNamespace(data=json.dumps({"success": True, "result": result}).encode())
+            delay = self.delays.get(subject, 0)
+            if delay > timeout:
+                await asyncio.sleep(timeout)
+                raise TimeoutError(subject)
+            await asyncio.sleep(delay)
+            if body["kwargs"].get("fail"):
+                return SimpleNamespace(data=json.dumps({"success": False, "error": "ValueError", "message": "bad"}).encode())
+            return SimpleNamespace(data=json.dumps({"success": True, "result": [subject, body["args"]]}).encode())
+        finally:
+            self.in_flight -= 1
+
+    async def close(self):
+        self.is_closed = True
+
+
+@pytest.fixture
+def run_with_client(monkeypatch):
+    managers = []
+
+    def _run(client, coro):
+        manager = NatsConnectionManager(client_factory=lambda: client)
+        managers.append(manager)
+        monkeypatch.setattr(clients, "connection_manager", manager)
+        return manager.run(coro)
+
+    yield _run
+    for manager in managers:
+        manager.close()
+
+
+def test_request_many_returns_results_in_call_order(run_with_client):
+    client = _EchoClient(delays={"ns.slow": 0.05})
+    calls = [("slow", (1,), {}), ("fast", (2,)), "bare"]
+
+    results = run_with_client(client, clients.request_many("ns", calls))
+
+    assert results == [["ns.slow", [1]], ["ns.fast", [2]], ["ns.bare", []]]
+
+
+def test_request_many_bounds_in_flight_requests(run_with_client):
+    client = _EchoClient(delays={"ns.m": 0.01})
+
+    run_with_client(client, clients.request_many("ns", [("m",)] * 20, _max_in_flight=4))
+
+    assert client.max_in_flight == 4
+
+
+def test_request_many_per_call_timeout_and_return_exceptions(run_with_client):
+    client = _EchoClient(delays={"ns.hang": 1})
+    calls = [("hang", (), {"_timeout": 0.01}), ("ok",), ("bad", (), {"fail": True})]
+
+    results = run_with_client(client, clients.request_many("ns", calls, _return_exceptions=True))
+
+    assert isinstance(results[0], TimeoutError)
+    assert results[1] == ["ns.ok", []]
+    assert isinstance(results[2], NatsClientException)
+
+
+def test_request_many_raises_first_failure_by_default(run_with_client):
+    client = _EchoClient()
+
+    with pytest.raises(NatsClientException, match="ValueError: bad"):
+        run_with_client(client, clients.request_many("ns", [("ok",), ("bad", (), {"fail": True})]))
+
+
+def test_request_many_envelope_sends_single_message(run_with_client):
+    registry = FunctionRegistry()
+    registry.register("double", lambda x: x * 2, namespace="ns")
+
+    async def _boom():
+        raise ValueError("boom")
+
+    registry.register("boom", _boom, namespace="ns")
+    registry.register_batch_handler("ns")
+    client = _EchoClient(registry=registry)
+
+    results = run_with_client(
+        client,
+        clients.request_many("ns", [("double", (2,)), ("boom",), ("missing",)], _envelope=True, _return_exceptions=True),
+    )
+
+    assert client.subjects == [f"ns.{BATCH_METHOD_NAME}"]
+    assert results[0] == 4
+    assert isinstance(results[1], NatsClientException) and "boom" in str(results[1])
+    assert isinstance(results[2], NatsClientException) and "No function found" in str(results[2])
+
+
+def test_batch_handler_rejects_nested_batch():
+    registry = FunctionRegistry()
+    registry.register_batch_handler("ns")
+
+    results = asyncio.run(batch_handler(registry, "ns", [{"method": BATCH_METHOD_NAME}]))
+
+    assert results[0]["success"] is False
+    assert results[0]["error"] == "ValueError"
+
+
+def test_register_batch_handler_is_idempotent():
+    registry = FunctionRegistry()
+
+    first = registry.register_batch_handler("ns")
+    second = registry.register_batch_handler("ns")
+
+    assert first is second
+    assert list(registry.registry) == [f"ns.{BATCH_METHOD_NAME}"]
+
+
+def test_batch_handler_bounds_concurrency():
+    registry = FunctionRegistry()
+    state = {"running": 0, "peak": 0}
+
+    async def _slow(i):
+        state["running"] += 1
+        state["peak"] = max(state["peak"], state["running"])
+        await asyncio.sleep(0.01)
+        state["running"] -= 1
+        return i
+
+    registry.register("slow", _slow, namespace="ns")
+    calls = [{"method": "slow", "args": [i]} for i in range(20)]
+
+    results = asyncio.run(batch_handler(registry, "ns", calls, max_in_flight=3))
+
+    assert [r["result"] for r in results] == list(range(20))
+    assert state["peak"] == 3
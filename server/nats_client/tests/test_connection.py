@@ -0,0 +1,104 @@
+# server/nats_client/tests/test_connection.py
+import asyncio
+import json
+import threading
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from nats_client import clients
+from nats_client.connection import NatsConnectionManager
+
+pytestmark = pytest.mark.unit
+
+
+class _FakeClient:
+    instances = []
+
+    def __init__(self):
+        self.is_closed = False
+        self.requests = []
+        _FakeClient.instances.append(self)
+
+    async def connect(self, **_kwargs):
+        return None
+
+    async def request(self, subject, payload, timeout=None):
+        self.requests.append((subject, payload))
+        return SimpleNamespace(data=json.dumps({"success": True, "result": subject}).encode())
+
+    async def close(self):
+        self.is_closed = True
+
+
+@pytest.fixture
+def manager():
+    _FakeClient.instances = []
+    mgr = NatsConnectionManager(client_factory=_FakeClient)
+    with patch.object(clients, "connection_manager", mgr):
+        yield mgr
+    mgr.close()
+
+
+def test_run_reuses_single_connection_across_calls(manager):
+    results = [manager.run(clients.request("ns", f"m{i}")) for i in range(5)]
+
+    assert results == [f"ns.m{i}" for i in range(5)]
+    assert len(_FakeClient.instances) == 1
+    assert len(_FakeClient.instances[0].requests) == 5
+    assert _FakeClient.instances[0].is_closed is False
+
+
+def test_run_executes_on_dedicated_background_thread(manager):
+    async def _thread_name():
+        return threading.current_thread().name
+
+    assert manager.run(_thread_name()) == "nats-connection-loop"
+
+
+def test_closed_connection_is_reestablished(manager):
+    manager.run(clients.request("ns", "first"))
+    _FakeClient.instances[0].is_closed = True
+
+    manager.run(clients.request("ns", "second"))
+
+    assert len(_FakeClient.instances) == 2
+    assert _FakeClient.instances[1].requests == [("ns.second", _FakeClient.instances[1].requests[0][1])]
+
+
+def test_after_fork_child_starts_fresh_loop(manager):
+    manager.run(clients.request("ns", "parent"))
+    parent_loop = manager.loop
+
+    manager._after_fork_in_child()
+    manager.run(clients.request("ns", "child"))
+
+    assert manager.loop is not parent_loop
+    assert len(_FakeClient.instances) == 2
+
+
+def test_request_outside_manager_loop_keeps_connect_per_call(manager):
+    async def _fake_get(*_a, **_k):
+        return _FakeClient()
+
+    with patch.object(clients, "get_nc_client", _fake_get):
+        asyncio.run(clients.request("ns", "standalone"))
+
+    assert len(_FakeClient.instances) == 1
+    assert _FakeClient.instances[0].is_closed is True
+
+
+def test_run_timeout_propagates_timeout_error(manager):
+    async def _slow():
+        await asyncio.sleep(5)
+
+    with pytest.raises(TimeoutError):
+        manager.run(asyncio.wait_for(_slow(), timeout=0.01))
+
+
+def test_close_closes_shared_connection(manager):
+    manager.run(clients.request("ns", "m"))
+    manager.close()
+
+    assert _FakeClient.instances[0].is_closed is True